@@ -68,6 +68,8 @@ eval "$SSH_CMD 'cd /home/django/gemnar-website && sudo -u django ENVIRONMENT=pro
 echo "🔄 Step 6: Restarting application server..."
 eval "$SSH_CMD 'sudo systemctl kill --kill-who=all uvicorn.service || true'"
 eval "$SSH_CMD 'sudo systemctl restart uvicorn.service'"
+# The scheduler is long-running, so it must be restarted to pick up new code
+eval "$SSH_CMD 'sudo systemctl restart scheduler.service || true'"
 
 echo ""
 echo "✅ Deployment completed successfully!"
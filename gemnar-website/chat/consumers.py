@@ -463,6 +463,18 @@ class UserNotificationConsumer(AsyncWebsocketConsumer):
             )
         )
 
+    async def image_job_update(self, event):
+        """Send image generation job progress to user."""
+        await self.send(
+            text_data=json.dumps({"type": "image_job_update", "job": event["job"]})
+        )
+
+    async def video_task_update(self, event):
+        """Send video generation task progress to user."""
+        await self.send(
+            text_data=json.dumps({"type": "video_task_update", "task": event["task"]})
+        )
+
     async def send_error(self, message):
         """Send error message to client."""
         await self.send(
@@ -1,4 +1,5 @@
 import base64
+import functools
 import os
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import hashes
@@ -7,6 +8,27 @@ from cryptography.hazmat.backends import default_backend
 from django.conf import settings
 
 
+@functools.lru_cache(maxsize=4)
+def _derive_key(master_key):
+    """AES-256 key for ``master_key``.
+
+    The PBKDF2 derivation is deliberately slow and its inputs never change
+    while the process runs, so it is done once per master key.
+    """
+    # Ensure key is exactly 32 bytes for AES-256
+    if len(master_key.encode()) != 32:
+        # Derive a proper 32-byte key using PBKDF2
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=b"gemnar_chat_salt_2024",  # Fixed salt
+            iterations=100000,
+            backend=default_backend(),
+        )
+        return kdf.derive(master_key.encode())
+    return master_key.encode()
+
+
 class ChatEncryption:
     """
     Quantum-resistant encryption for chat messages using AES-256-GCM
@@ -19,19 +41,7 @@ class ChatEncryption:
         master_key = getattr(settings, "CHAT_ENCRYPTION_KEY", None)
         if not master_key:
             raise ValueError("CHAT_ENCRYPTION_KEY not configured in settings")
-
-        # Ensure key is exactly 32 bytes for AES-256
-        if len(master_key.encode()) != 32:
-            # Derive a proper 32-byte key using PBKDF2
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=b"gemnar_chat_salt_2024",  # Fixed salt
-                iterations=100000,
-                backend=default_backend(),
-            )
-            return kdf.derive(master_key.encode())
-        return master_key.encode()
+        return _derive_key(master_key)
 
     @staticmethod
     def encrypt_message(message):
@@ -257,9 +257,10 @@ CHAT_ENCRYPTION_KEY = os.environ.get(
 )
 
 # Background Task Processing
-# We use cron jobs instead of Celery for simplicity
-# Run: * * * * * cd /path/to/project && poetry run python manage.py send_brand_tweets
-# This management command handles all background tasks including:
+# We use a long-running scheduler process instead of Celery for simplicity
+# Run: poetry run python manage.py scheduler  (see ansible/scheduler.service.j2)
+# It runs send_brand_tweets, send_brand_instagram_posts and
+# collect_system_stats on their own intervals and handles:
 # - Posting scheduled tweets
 # - Refreshing Twitter metrics
 # - Processing queued operations
@@ -35,6 +35,8 @@ from .models import (
     ServiceConnection,
     AIServiceUsage,
     AIServiceLimit,
+    ImageGenerationJob,
+    VideoGenerationTask,
     WebLog,
     # CRM Models
     CRMContact,
@@ -51,6 +53,7 @@ from .models import (
     BrandInstagramPost,
     SystemStats,
     CreditTransaction,
+    CreditReservation,
     CreditPackage,
 )
 
@@ -1358,6 +1361,7 @@ class BrandInstagramPostAdmin(admin.ModelAdmin):
     ]
     list_filter = [
         "status",
+        "publish_stage",
         "is_video_post",
         "brand",
         "created_at",
@@ -1368,6 +1372,10 @@ class BrandInstagramPostAdmin(admin.ModelAdmin):
     readonly_fields = [
         "instagram_id",
         "instagram_url",
+        "publish_stage",
+        "container_id",
+        "container_created_at",
+        "container_checked_at",
         "posted_at",
         "created_at",
         "updated_at",
@@ -1422,6 +1430,10 @@ class BrandInstagramPostAdmin(admin.ModelAdmin):
                 "fields": [
                     "instagram_id",
                     "instagram_url",
+                    "publish_stage",
+                    "container_id",
+                    "container_created_at",
+                    "container_checked_at",
                     "posted_at",
                     "error_message",
                 ],
@@ -1964,6 +1976,42 @@ class AIServiceLimitAdmin(admin.ModelAdmin):
         return request.user.is_superuser
 
 
+@admin.register(ImageGenerationJob)
+class ImageGenerationJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "operation",
+        "user",
+        "status",
+        "response_status",
+        "created_at",
+        "completed_at",
+    ]
+    list_filter = ["status", "operation", "created_at"]
+    search_fields = ["id", "user__username", "error_message"]
+    readonly_fields = ["created_at", "started_at", "completed_at"]
+    ordering = ["-created_at"]
+
+
+@admin.register(VideoGenerationTask)
+class VideoGenerationTaskAdmin(admin.ModelAdmin):
+    list_display = [
+        "task_id",
+        "provider",
+        "user",
+        "status",
+        "poll_count",
+        "next_poll_at",
+        "created_at",
+        "completed_at",
+    ]
+    list_filter = ["status", "provider", "created_at"]
+    search_fields = ["task_id", "user__username", "error_message"]
+    readonly_fields = ["created_at", "last_polled_at", "completed_at"]
+    raw_id_fields = ["instagram_post"]
+    ordering = ["-created_at"]
+
+
 @admin.register(WebLog)
 class WebLogAdmin(admin.ModelAdmin):
     list_display = [
@@ -2941,6 +2989,33 @@ class CreditTransactionAdmin(admin.ModelAdmin):
         return self.readonly_fields
 
 
+@admin.register(CreditReservation)
+class CreditReservationAdmin(admin.ModelAdmin):
+    list_display = [
+        "brand",
+        "amount",
+        "status",
+        "service_used",
+        "created_at",
+        "expires_at",
+        "settled_at",
+    ]
+    list_filter = ["status", "created_at"]
+    search_fields = ["brand__name", "description", "api_request_id"]
+    raw_id_fields = ["brand", "transaction"]
+    # Holds move the brand balance; settle them through the ledger only
+    readonly_fields = [
+        "brand",
+        "amount",
+        "status",
+        "transaction",
+        "created_at",
+        "expires_at",
+        "settled_at",
+    ]
+    ordering = ["-created_at"]
+
+
 @admin.register(CreditPackage)
 class CreditPackageAdmin(admin.ModelAdmin):
     list_display = [
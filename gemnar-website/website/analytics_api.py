@@ -6,17 +6,34 @@ import json
 import gzip
 import logging
 import uuid
+from django.db.models import Case, F, Value, When
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from .analytics_models import (
-    AnalyticsProject,
     AnalyticsSession,
     AnalyticsPageView,
     AnalyticsEvent,
     AnalyticsRecording,
 )
+from .services.analytics_buffer import (
+    RETRY_AFTER_SECONDS,
+    ingest_buffer,
+    write_behind_enabled,
+)
+from .services import analytics_live
+from .services.analytics_cache import analytics_lookups
+from .services.analytics_ingest import (
+    LOAD_METRIC_FIELDS,
+    MAX_MESSAGES,
+    MAX_PAGE_SECONDS,
+    MAX_SESSION_SECONDS,
+    MessageError,
+    clamp,
+    ingest_batch,
+    stamp_messages,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +59,15 @@ def get_client_ip(request):
     return ip
 
 
+def buffer_messages(project, messages, ip_address):
+    """Queue messages for the write-behind flusher; 204, or 503 when saturated"""
+    if ingest_buffer.submit(project.id, stamp_messages(messages, ip_address)):
+        return HttpResponse(status=204)
+    response = JsonResponse({"error": "Ingest buffer full"}, status=503)
+    response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
 def parse_user_agent(user_agent):
     """Parse user agent string to extract browser and device info"""
     if not user_agent:
@@ -100,55 +126,69 @@ def analytics_pageview(request):
             return JsonResponse({"error": "Missing tracking code"}, status=400)
 
         # Get analytics project
-        try:
-            project = AnalyticsProject.objects.get(
-                tracking_code=tracking_code, is_active=True
-            )
-        except AnalyticsProject.DoesNotExist:
+        project = analytics_lookups.project(tracking_code)
+        if project is None:
             return JsonResponse({"error": "Invalid tracking code"}, status=404)
 
-        # Get or create session
         session_id = data.get("session_id")
-        ip_address = get_client_ip(request)
-        user_agent = data.get("user_agent", "")
-        user_agent_info = parse_user_agent(user_agent)
-
-        session, created = AnalyticsSession.objects.get_or_create(
-            project=project,
-            session_id=session_id,
-            defaults={
-                "ip_address": ip_address,
-                "user_agent": user_agent,
-                "referrer": data.get("referrer", ""),
-                "browser": user_agent_info["browser"],
-                "os": user_agent_info["os"],
-                "device_type": user_agent_info["device_type"],
-            },
-        )
-
-        if not created:
-            # Update session activity
-            session.last_activity = timezone.now()
-            session.page_views += 1
-            if session.page_views > 1:
-                session.is_bounce = False
-            # Update session duration with validation
-            duration = (timezone.now() - session.started_at).total_seconds()
-            # Validate session duration: should be positive and reasonable (max 24 hours)
-            if duration < 0:
-                duration = 0
-            elif duration > 86400:  # 24 hours max
-                duration = 86400
-            session.duration_seconds = duration
-            session.save()
+        now = timezone.now()
+
+        # A session seen by this process is updated in place without a read
+        session_ref = analytics_lookups.session(project.id, session_id)
+        if session_ref is not None and AnalyticsSession.objects.filter(
+            pk=session_ref.pk
+        ).update(
+            last_activity=now,
+            page_views=F("page_views") + 1,
+            # Evaluated against the count before this increment
+            is_bounce=Case(
+                When(page_views__gte=1, then=Value(False)), default=F("is_bounce")
+            ),
+            duration_seconds=clamp(
+                (now - session_ref.started_at).total_seconds(), MAX_SESSION_SECONDS
+            ),
+        ):
+            session = session_ref
         else:
-            # For newly created sessions, initialize duration
-            session.duration_seconds = 0
-            session.save()
+            # Get or create session
+            ip_address = get_client_ip(request)
+            user_agent = data.get("user_agent", "")
+            user_agent_info = parse_user_agent(user_agent)
+
+            session, created = AnalyticsSession.objects.get_or_create(
+                project=project,
+                session_id=session_id,
+                defaults={
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "referrer": data.get("referrer", ""),
+                    "browser": user_agent_info["browser"],
+                    "os": user_agent_info["os"],
+                    "device_type": user_agent_info["device_type"],
+                },
+            )
+
+            if not created:
+                # Update session activity
+                session.last_activity = now
+                session.page_views += 1
+                if session.page_views > 1:
+                    session.is_bounce = False
+                # Update session duration with validation (max 24 hours)
+                session.duration_seconds = clamp(
+                    (now - session.started_at).total_seconds(), MAX_SESSION_SECONDS
+                )
+                session.save()
+            else:
+                # For newly created sessions, initialize duration
+                session.duration_seconds = 0
+                session.save()
+
+            analytics_lookups.remember_session(project.id, session_id, session)
 
         # Create page view
         pageview = AnalyticsPageView.objects.create(
-            session=session,
+            session_id=session.pk,
             url=data.get("url", ""),
             title=data.get("title", ""),
             path=data.get("path", ""),
@@ -164,6 +204,12 @@ def analytics_pageview(request):
             largest_contentful_paint_ms=data.get("largest_contentful_paint_ms"),
             first_input_delay_ms=data.get("first_input_delay_ms"),
         )
+        analytics_lookups.remember_pageview(project.id, pageview, session)
+        analytics_live.publish(
+            project.id,
+            analytics_live.PAGEVIEWS,
+            [analytics_live.pageview_payload(pageview, session)],
+        )
 
         return JsonResponse(
             {
@@ -178,6 +224,21 @@ def analytics_pageview(request):
         return JsonResponse({"error": "Internal server error"}, status=500)
 
 
+def touch_session(pageview_ref):
+    """Record activity on the pageview's session for the daily rollups"""
+    AnalyticsSession.objects.filter(pk=pageview_ref.session_pk).update(
+        last_activity=timezone.now()
+    )
+
+
+def authorize_pageview(tracking_code, page_view_id):
+    """``(project, PageviewRef)`` for a write, or ``None`` for either"""
+    project = analytics_lookups.project(tracking_code)
+    if project is None:
+        return None, None
+    return project, analytics_lookups.pageview(project, page_view_id)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def analytics_event(request):
@@ -194,19 +255,23 @@ def analytics_event(request):
         if not is_valid_uuid(page_view_id):
             return JsonResponse({"error": "Invalid page view ID format"}, status=400)
 
-        # Verify tracking code and get page view
-        try:
-            pageview = AnalyticsPageView.objects.select_related("session__project").get(
-                id=page_view_id,
-                session__project__tracking_code=tracking_code,
-                session__project__is_active=True,
+        if write_behind_enabled():
+            # The pageview is resolved when the buffer is flushed
+            project = analytics_lookups.project(tracking_code)
+            if project is None:
+                return JsonResponse({"error": "Invalid tracking code"}, status=404)
+            return buffer_messages(
+                project, [{**data, "type": "event"}], get_client_ip(request)
             )
-        except AnalyticsPageView.DoesNotExist:
+
+        # Verify tracking code and page view
+        project, pageview_ref = authorize_pageview(tracking_code, page_view_id)
+        if pageview_ref is None:
             return JsonResponse({"error": "Invalid page view"}, status=404)
 
         # Create event
         event = AnalyticsEvent.objects.create(
-            pageview=pageview,
+            pageview_id=page_view_id,
             event_type=data.get("event_type", "custom"),
             element_tag=data.get("element_tag", ""),
             element_classes=data.get("element_classes", ""),
@@ -219,11 +284,30 @@ def analytics_event(request):
 
         # Update page view metrics
         if data.get("event_type") == "click":
-            pageview.clicks_count += 1
-            pageview.save()
+            counter = "clicks_count"
         elif data.get("event_type") in ["form_focus", "form_submit"]:
-            pageview.form_interactions += 1
-            pageview.save()
+            counter = "form_interactions"
+        else:
+            counter = None
+        if counter:
+            AnalyticsPageView.objects.filter(id=page_view_id).update(
+                **{counter: F(counter) + 1}
+            )
+        touch_session(pageview_ref)
+
+        analytics_live.publish(
+            project.id,
+            analytics_live.EVENTS,
+            [
+                analytics_live.event_payload(
+                    event,
+                    pageview_ref.url,
+                    pageview_ref.path,
+                    pageview_ref.session_pk,
+                    pageview_ref.ip_address,
+                )
+            ],
+        )
 
         return JsonResponse({"success": True, "event_id": str(event.id)})
 
@@ -248,40 +332,22 @@ def analytics_update_pageview(request):
         if not is_valid_uuid(page_view_id):
             return JsonResponse({"error": "Invalid page view ID format"}, status=400)
 
-        # Get the pageview
-        try:
-            pageview = AnalyticsPageView.objects.select_related("session__project").get(
-                id=page_view_id,
-                session__project__tracking_code=tracking_code,
-                session__project__is_active=True,
-            )
-        except AnalyticsPageView.DoesNotExist:
+        # Verify tracking code and page view
+        project, pageview_ref = authorize_pageview(tracking_code, page_view_id)
+        if pageview_ref is None:
             return JsonResponse({"error": "Invalid page view"}, status=404)
 
         # Update load metrics if provided
-        update_fields = []
-        if data.get("load_time_ms") is not None:
-            pageview.load_time_ms = data.get("load_time_ms")
-            update_fields.append("load_time_ms")
-        if data.get("dom_content_loaded_ms") is not None:
-            pageview.dom_content_loaded_ms = data.get("dom_content_loaded_ms")
-            update_fields.append("dom_content_loaded_ms")
-        if data.get("first_paint_ms") is not None:
-            pageview.first_paint_ms = data.get("first_paint_ms")
-            update_fields.append("first_paint_ms")
-        if data.get("largest_contentful_paint_ms") is not None:
-            pageview.largest_contentful_paint_ms = data.get(
-                "largest_contentful_paint_ms"
-            )
-            update_fields.append("largest_contentful_paint_ms")
-        if data.get("first_input_delay_ms") is not None:
-            pageview.first_input_delay_ms = data.get("first_input_delay_ms")
-            update_fields.append("first_input_delay_ms")
-
-        if update_fields:
-            pageview.save(update_fields=update_fields)
+        metrics = {
+            field: data[field]
+            for field in LOAD_METRIC_FIELDS
+            if data.get(field) is not None
+        }
+        if metrics:
+            AnalyticsPageView.objects.filter(id=page_view_id).update(**metrics)
+            touch_session(pageview_ref)
 
-        return JsonResponse({"success": True, "updated_fields": update_fields})
+        return JsonResponse({"success": True, "updated_fields": list(metrics)})
 
     except Exception as e:
         logger.error(f"Error in analytics_update_pageview: {e}")
@@ -304,18 +370,13 @@ def analytics_recording(request):
         if not is_valid_uuid(page_view_id):
             return JsonResponse({"error": "Invalid page view ID format"}, status=400)
 
-        # Verify tracking code and get page view
-        try:
-            pageview = AnalyticsPageView.objects.select_related("session__project").get(
-                id=page_view_id,
-                session__project__tracking_code=tracking_code,
-                session__project__is_active=True,
-            )
-        except AnalyticsPageView.DoesNotExist:
+        # Verify tracking code and page view
+        project, pageview_ref = authorize_pageview(tracking_code, page_view_id)
+        if pageview_ref is None:
             return JsonResponse({"error": "Invalid page view"}, status=404)
 
         # Check if project has recording enabled
-        if not pageview.session.project.record_mouse_movements:
+        if not project.record_mouse_movements:
             return JsonResponse({"success": True, "message": "Recording disabled"})
 
         # Compress mouse movement data
@@ -324,7 +385,7 @@ def analytics_recording(request):
 
         # Get or create recording
         recording, created = AnalyticsRecording.objects.get_or_create(
-            pageview=pageview,
+            pageview_id=page_view_id,
             defaults={
                 "mouse_movements": compressed_data,
                 "recording_duration": data.get("recording_duration", 0),
@@ -339,6 +400,7 @@ def analytics_recording(request):
             recording.recording_duration = data.get("recording_duration", 0)
             recording.data_size_bytes = len(compressed_data)
             recording.save()
+        touch_session(pageview_ref)
 
         return JsonResponse({"success": True, "recording_id": str(recording.id)})
 
@@ -363,46 +425,37 @@ def analytics_metrics(request):
         if not is_valid_uuid(page_view_id):
             return JsonResponse({"error": "Invalid page view ID format"}, status=400)
 
-        # Verify tracking code and get page view
-        try:
-            pageview = AnalyticsPageView.objects.select_related("session__project").get(
-                id=page_view_id,
-                session__project__tracking_code=tracking_code,
-                session__project__is_active=True,
-            )
-        except AnalyticsPageView.DoesNotExist:
+        # Verify tracking code and page view
+        project, pageview_ref = authorize_pageview(tracking_code, page_view_id)
+        if pageview_ref is None:
             return JsonResponse({"error": "Invalid page view"}, status=404)
 
-        # Update page view metrics with validation
-        duration_seconds = data.get("duration_seconds", 0)
-        # Validate duration: should be positive and reasonable (max 1 hour per page)
-        if duration_seconds < 0:
-            duration_seconds = 0
-        elif duration_seconds > 3600:  # 1 hour max per page
-            duration_seconds = 3600
+        now = timezone.now()
 
-        pageview.duration_seconds = duration_seconds
-        pageview.scroll_depth_percentage = data.get("scroll_depth_percentage", 0)
-        pageview.clicks_count = data.get("clicks_count", 0)
-        pageview.form_interactions = data.get("form_interactions", 0)
+        # Update page view metrics with validation (max 1 hour per page)
+        metrics = {
+            "duration_seconds": clamp(
+                data.get("duration_seconds", 0), MAX_PAGE_SECONDS
+            ),
+            "scroll_depth_percentage": data.get("scroll_depth_percentage", 0),
+            "clicks_count": data.get("clicks_count", 0),
+            "form_interactions": data.get("form_interactions", 0),
+        }
 
         # Set end time if page is being closed
         if data.get("is_final_update"):
-            pageview.ended_at = timezone.now()
-
-        pageview.save()
+            metrics["ended_at"] = now
 
-        # Update session duration with validation
-        session = pageview.session
-        session_duration = (timezone.now() - session.started_at).total_seconds()
-        # Validate session duration: should be positive and reasonable (max 24 hours)
-        if session_duration < 0:
-            session_duration = 0
-        elif session_duration > 86400:  # 24 hours max
-            session_duration = 86400
+        AnalyticsPageView.objects.filter(id=page_view_id).update(**metrics)
 
-        session.duration_seconds = session_duration
-        session.save()
+        # Update session duration with validation (max 24 hours)
+        AnalyticsSession.objects.filter(pk=pageview_ref.session_pk).update(
+            last_activity=now,
+            duration_seconds=clamp(
+                (now - pageview_ref.session_started_at).total_seconds(),
+                MAX_SESSION_SECONDS,
+            ),
+        )
 
         return JsonResponse({"success": True})
 
@@ -411,6 +464,55 @@ def analytics_metrics(request):
         return JsonResponse({"error": "Internal server error"}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def analytics_batch(request):
+    """Handle an ordered batch of tracker messages for one project.
+
+    Accepts ``{"tracking_code": ..., "messages": [{"type": ..., ...}]}``
+    whatever the content type, so ``navigator.sendBeacon`` can post it as
+    ``text/plain`` without a CORS preflight. With write-behind enabled the
+    messages are queued and the response is an empty 204.
+    """
+    try:
+        try:
+            data = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+        tracking_code = data.get("tracking_code")
+        messages = data.get("messages")
+        if not tracking_code or not isinstance(messages, list):
+            return JsonResponse({"error": "Missing required fields"}, status=400)
+        if len(messages) > MAX_MESSAGES:
+            return JsonResponse(
+                {"error": f"At most {MAX_MESSAGES} messages per batch"}, status=413
+            )
+
+        project = analytics_lookups.project(tracking_code)
+        if project is None:
+            return JsonResponse({"error": "Invalid tracking code"}, status=404)
+
+        if write_behind_enabled():
+            return buffer_messages(project, messages, get_client_ip(request))
+
+        result = ingest_batch(
+            project,
+            messages,
+            ip_address=get_client_ip(request),
+            user_agent_parser=parse_user_agent,
+        )
+        return JsonResponse({"success": True, **result})
+
+    except MessageError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error in analytics_batch: {e}")
+        return JsonResponse({"error": "Internal server error"}, status=500)
+
+
 @require_http_methods(["GET"])
 def analytics_script(request, tracking_code):
     """Generate JavaScript tracking script for a project"""
@@ -491,23 +593,54 @@ def analytics_script(request, tracking_code):
         return metrics;
     }}
     
-    // Send data to API
-    function sendData(endpoint, data) {{
-        if (isUnloading) {{
-            // Use sendBeacon for unload events
-            if (navigator.sendBeacon) {{
-                const blob = new Blob([JSON.stringify(data)], {{type: 'application/json'}});
-                navigator.sendBeacon(API_BASE + endpoint, blob);
-                return;
-            }}
+    // Messages are queued and posted together to the batch endpoint every
+    // FLUSH_INTERVAL_MS, when MAX_BATCH are waiting, or when the page is hidden
+    const BATCH_ENDPOINT = API_BASE + '/api/analytics/batch';
+    const MAX_BATCH = 200;
+    const FLUSH_INTERVAL_MS = 15000;
+    let queue = [];
+    
+    function generateId() {{
+        if (window.crypto && crypto.randomUUID) {{
+            return crypto.randomUUID();
+        }}
+        return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, c => {{
+            const r = Math.random() * 16 | 0;
+            return (c === 'x' ? r : (r & 0x3 | 0x8)).toString(16);
+        }});
+    }}
+    
+    function enqueue(type, data) {{
+        if (type === 'metrics') {{
+            // Each metrics message is a snapshot; only the latest is worth sending
+            queue = queue.filter(message =>
+                message.type !== 'metrics' || message.page_view_id !== data.page_view_id);
+        }}
+        queue.push({{type: type, ...data}});
+        if (queue.length >= MAX_BATCH) {{
+            flush();
+        }}
+    }}
+    
+    function flush() {{
+        if (!queue.length) return;
+        
+        const body = JSON.stringify({{
+            tracking_code: TRACKING_CODE,
+            messages: queue.splice(0, MAX_BATCH)
+        }});
+        // text/plain keeps the beacon a simple request (no CORS preflight)
+        if (navigator.sendBeacon &&
+            navigator.sendBeacon(BATCH_ENDPOINT, new Blob([body], {{type: 'text/plain'}}))) {{
+            return;
         }}
         
-        fetch(API_BASE + endpoint, {{
+        fetch(BATCH_ENDPOINT, {{
             method: 'POST',
             headers: {{
-                'Content-Type': 'application/json',
+                'Content-Type': 'text/plain',
             }},
-            body: JSON.stringify(data),
+            body: body,
             keepalive: true
         }}).catch(err => {{
             console.warn('Analytics tracking failed:', err);
@@ -517,9 +650,11 @@ def analytics_script(request, tracking_code):
     // Track page view
     function trackPageView() {{
         sessionId = getSessionId();
+        // Generated here so later messages needn't wait for a response
+        pageViewId = generateId();
         
-        const pageViewData = {{
-            tracking_code: TRACKING_CODE,
+        enqueue('pageview', {{
+            page_view_id: pageViewId,
             session_id: sessionId,
             url: window.location.href,
             title: document.title,
@@ -532,27 +667,7 @@ def analytics_script(request, tracking_code):
             screen_width: screen.width,
             screen_height: screen.height,
             ...getPageLoadMetrics()
-        }};
-        
-        // Send pageview data and get the real pageview ID from response
-        fetch(API_BASE + '/api/analytics/pageview', {{
-            method: 'POST',
-            headers: {{
-                'Content-Type': 'application/json',
-            }},
-            body: JSON.stringify(pageViewData),
-            keepalive: true
-        }}).then(response => response.json())
-          .then(data => {{
-              if (data.success && data.page_view_id) {{
-                  pageViewId = data.page_view_id;
-              }}
-          }})
-          .catch(err => {{
-              console.warn('Analytics pageview tracking failed:', err);
-              // Generate fallback ID if API fails
-              pageViewId = 'pv_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
-          }});
+        }});
     }}
     
     // Track metrics (scroll, clicks, etc.)
@@ -565,17 +680,14 @@ def analytics_script(request, tracking_code):
         
         const duration = Math.round((Date.now() - startTime) / 1000);
         
-        const metricsData = {{
-            tracking_code: TRACKING_CODE,
+        enqueue('metrics', {{
             page_view_id: pageViewId,
             duration_seconds: duration,
             scroll_depth_percentage: scrollDepth,
             clicks_count: clickCount,
             form_interactions: formInteractions,
             is_final_update: isUnloading
-        }};
-        
-        sendData('/api/analytics/metrics', metricsData);
+        }});
     }}
     
     // Track scroll depth
@@ -604,8 +716,7 @@ def analytics_script(request, tracking_code):
         
         const loadMetrics = getPageLoadMetrics();
         if (loadMetrics.load_time_ms) {{
-            sendData('/api/analytics/update-pageview', {{
-                tracking_code: TRACKING_CODE,
+            enqueue('update_pageview', {{
                 page_view_id: pageViewId,
                 ...loadMetrics
             }});
@@ -621,18 +732,21 @@ def analytics_script(request, tracking_code):
         }});
     }}
     
-    // Update metrics periodically
+    // Update metrics periodically; they go out with the next flush
     setInterval(updateMetrics, 5000);
+    setInterval(flush, FLUSH_INTERVAL_MS);
     
     // Final update on page unload
-    window.addEventListener('beforeunload', () => {{
+    window.addEventListener('pagehide', () => {{
         isUnloading = true;
         updateMetrics();
+        while (queue.length) flush();
     }});
     
     window.addEventListener('visibilitychange', () => {{
         if (document.visibilityState === 'hidden') {{
             updateMetrics();
+            while (queue.length) flush();
         }}
     }});
 }})();
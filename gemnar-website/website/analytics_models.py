@@ -310,3 +310,93 @@ class AnalyticsAlert(models.Model):
 
     class Meta:
         db_table = "analytics_alerts"
+
+
+class AnalyticsDailyStats(models.Model):
+    """
+    Per-project daily rollup of sessions and pageviews for the dashboards
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(
+        AnalyticsProject, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    date = models.DateField()
+
+    # Sessions started on this day
+    sessions = models.IntegerField(default=0)
+    bounced_sessions = models.IntegerField(default=0)
+    # Stored durations between 0 and 24 hours (exclusive)
+    session_duration_sum = models.BigIntegerField(default=0)
+    session_duration_count = models.IntegerField(default=0)
+    # last_activity - started_at, between 1 second and 24 hours
+    activity_duration_sum = models.FloatField(default=0)
+    activity_duration_count = models.IntegerField(default=0)
+    devices = JSONField(default=dict)  # device type -> sessions
+    browsers = JSONField(default=dict)  # browser -> sessions
+
+    # Pageviews started on this day
+    pageviews = models.IntegerField(default=0)
+    # Load times between 0 and 30 seconds (exclusive)
+    load_time_sum = models.BigIntegerField(default=0)
+    load_time_count = models.IntegerField(default=0)
+
+    computed_at = models.DateTimeField()  # Start of the rollup run
+
+    class Meta:
+        db_table = "analytics_daily_stats"
+        unique_together = [["project", "date"]]
+        indexes = [models.Index(fields=["computed_at"])]
+
+
+class AnalyticsDailyPageStats(models.Model):
+    """
+    Per-project, per-path daily rollup of pageviews for the dashboards
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(
+        AnalyticsProject, on_delete=models.CASCADE, related_name="daily_page_stats"
+    )
+    date = models.DateField()
+    path = models.CharField(max_length=500)
+    url = models.URLField(blank=True)  # A sample URL for the path
+
+    views = models.IntegerField(default=0)
+    sessions = models.IntegerField(default=0)  # Distinct sessions on the day
+    exits = models.IntegerField(default=0)  # Sessions whose last page this was
+
+    # Durations between 0 and 1 hour (exclusive)
+    duration_sum = models.BigIntegerField(default=0)
+    duration_count = models.IntegerField(default=0)
+
+    # Load metrics: sums and counts of positive values (load time < 30s)
+    load_time_sum = models.BigIntegerField(default=0)
+    load_time_count = models.IntegerField(default=0)
+    dom_loaded_sum = models.BigIntegerField(default=0)
+    dom_loaded_count = models.IntegerField(default=0)
+    first_paint_sum = models.BigIntegerField(default=0)
+    first_paint_count = models.IntegerField(default=0)
+    lcp_sum = models.BigIntegerField(default=0)
+    lcp_count = models.IntegerField(default=0)
+    fid_sum = models.FloatField(default=0)
+    fid_count = models.IntegerField(default=0)
+    # Views by load time: < 1s, 1-3s, >= 3s
+    load_fast = models.IntegerField(default=0)
+    load_average = models.IntegerField(default=0)
+    load_slow = models.IntegerField(default=0)
+
+    scroll_depth_sum = models.BigIntegerField(default=0)
+    clicks = models.BigIntegerField(default=0)
+    form_interactions = models.BigIntegerField(default=0)
+
+    hourly = JSONField(default=dict)  # hour -> views
+    devices = JSONField(default=dict)  # device type -> views
+    browsers = JSONField(default=dict)  # browser -> views
+    referrers = JSONField(default=dict)  # referrer -> views (top 20)
+
+    computed_at = models.DateTimeField()  # Start of the rollup run
+
+    class Meta:
+        db_table = "analytics_daily_page_stats"
+        unique_together = [["project", "date", "path"]]
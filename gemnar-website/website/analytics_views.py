@@ -5,12 +5,13 @@ Analytics views for brand dashboard integration
 import json
 import gzip
 import secrets
+from collections import Counter
 from datetime import timedelta
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db.models import Count, Avg, Sum, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_POST
@@ -22,6 +23,7 @@ from .analytics_models import (
     AnalyticsRecording,
 )
 from .models import Brand
+from .services import analytics_live, analytics_rollups
 
 
 def calculate_funnel_data(project, start_date, end_date):
@@ -39,21 +41,18 @@ def calculate_funnel_data(project, start_date, end_date):
     ]
 
     # Calculate sessions that reached each step
-    total_sessions = project.sessions.filter(
-        started_at__gte=start_date, started_at__lte=end_date
-    ).count()
+    start_day, end_day = start_date.date(), end_date.date()
+    total_sessions = analytics_rollups.session_total(project, start_day, end_day)
 
     funnel_data = []
     for i, step in enumerate(funnel_steps):
-        # Find sessions that visited any of the paths in this step
-        sessions_with_step = (
-            project.sessions.filter(
-                started_at__gte=start_date,
-                started_at__lte=end_date,
-                pageviews__path__in=[path for path in step["paths"]],
-            )
-            .distinct()
-            .count()
+        # Sessions that visited any of the paths in this step, from the daily
+        # path rollups (a session on several of the paths counts for each)
+        sessions_with_step = min(
+            analytics_rollups.path_sessions(
+                project, start_day, end_day, step["paths"]
+            ),
+            total_sessions,
         )
 
         conversion_rate = (
@@ -79,18 +78,12 @@ def calculate_conversion_metrics(project, start_date, end_date):
     # Goal completion tracking (can be customized)
     goal_paths = ["/thank-you", "/success", "/confirmation", "/checkout-complete"]
 
-    total_sessions = project.sessions.filter(
-        started_at__gte=start_date, started_at__lte=end_date
-    ).count()
+    start_day, end_day = start_date.date(), end_date.date()
+    total_sessions = analytics_rollups.session_total(project, start_day, end_day)
 
-    conversion_sessions = (
-        project.sessions.filter(
-            started_at__gte=start_date,
-            started_at__lte=end_date,
-            pageviews__path__in=goal_paths,
-        )
-        .distinct()
-        .count()
+    conversion_sessions = min(
+        analytics_rollups.path_sessions(project, start_day, end_day, goal_paths),
+        total_sessions,
     )
 
     conversion_rate = (
@@ -120,130 +113,11 @@ def analytics_dashboard(request, brand_id):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
 
-    # Get basic metrics
-    total_sessions = project.sessions.filter(started_at__gte=start_date).count()
-
-    total_pageviews = AnalyticsPageView.objects.filter(
-        session__project=project, started_at__gte=start_date
-    ).count()
-
-    # Calculate average session duration with fallback calculation
-    sessions_for_duration = project.sessions.filter(started_at__gte=start_date)
-
-    # First try to get average from stored duration_seconds
-    # Only include positive, reasonable durations (not 0 and not > 24 hours)
-    stored_avg_duration = sessions_for_duration.filter(
-        duration_seconds__gt=0,
-        duration_seconds__lt=86400,  # 24 hours max
-    ).aggregate(avg_duration=Avg("duration_seconds"))["avg_duration"]
-
-    # If no stored durations or they're all zero, calculate from timestamps
-    if not stored_avg_duration or stored_avg_duration == 0:
-        # Calculate duration from start/last_activity timestamps
-        calculated_durations = []
-        for session in sessions_for_duration:
-            if session.last_activity and session.started_at:
-                time_diff = session.last_activity - session.started_at
-                duration = time_diff.total_seconds()
-                # Only include positive durations between 1 second and 24 hours
-                if 1 <= duration <= 86400:
-                    calculated_durations.append(duration)
-
-        if calculated_durations:
-            total_duration = sum(calculated_durations)
-            avg_session_duration = total_duration / len(calculated_durations)
-        else:
-            avg_session_duration = 0
-    else:
-        avg_session_duration = stored_avg_duration
-
-    bounce_rate = 0
-    if total_sessions > 0:
-        bounced_sessions = project.sessions.filter(
-            started_at__gte=start_date, is_bounce=True
-        ).count()
-        bounce_rate = (bounced_sessions / total_sessions) * 100
-
-    # Get top pages with better duration filtering
-    top_pages = (
-        AnalyticsPageView.objects.filter(
-            session__project=project, started_at__gte=start_date
-        )
-        .values("path")
-        .annotate(
-            views=Count("id"),
-            avg_duration=Avg(
-                "duration_seconds",
-                filter=Q(
-                    duration_seconds__gt=0,
-                    duration_seconds__lt=3600,  # 1 hour max for pageviews
-                ),
-            ),
-            avg_load_time=Avg(
-                "load_time_ms",
-                filter=Q(
-                    load_time_ms__isnull=False,
-                    load_time_ms__gt=0,
-                    load_time_ms__lt=30000,  # 30 seconds max load time
-                ),
-            ),
-        )
-        .order_by("-views")[:10]
-    )
-
-    # Calculate average page load time for the project
-    # First try with strict filtering
-    avg_page_load_time = AnalyticsPageView.objects.filter(
-        session__project=project,
-        started_at__gte=start_date,
-        load_time_ms__isnull=False,
-        load_time_ms__gt=0,
-        load_time_ms__lt=30000,  # 30 seconds max
-    ).aggregate(avg_load=Avg("load_time_ms"))["avg_load"]
-
-    # If no data with strict filtering, try with more lenient filtering
-    if not avg_page_load_time:
-        avg_page_load_time = AnalyticsPageView.objects.filter(
-            session__project=project,
-            started_at__gte=start_date,
-            load_time_ms__isnull=False,
-            load_time_ms__gt=0,
-        ).aggregate(avg_load=Avg("load_time_ms"))["avg_load"]
-
-    # Final fallback to 0 if still no data
-    avg_page_load_time = avg_page_load_time or 0
-
-    # Get device breakdown
-    device_breakdown = (
-        project.sessions.filter(started_at__gte=start_date)
-        .values("device_type")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-
-    # Get browser breakdown
-    browser_breakdown = (
-        project.sessions.filter(started_at__gte=start_date)
-        .values("browser")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:5]
-    )
-
-    # Get daily traffic for the chart
-    daily_traffic = []
-    for i in range(30):
-        date = start_date + timedelta(days=i)
-        sessions = project.sessions.filter(started_at__date=date.date()).count()
-        pageviews = AnalyticsPageView.objects.filter(
-            session__project=project, started_at__date=date.date()
-        ).count()
-        daily_traffic.append(
-            {
-                "date": date.strftime("%Y-%m-%d"),
-                "sessions": sessions,
-                "pageviews": pageviews,
-            }
-        )
+    # Totals, breakdowns and the traffic chart come from the daily rollups
+    start_day = start_date.date()
+    summary = analytics_rollups.project_summary(project, start_day)
+    top_pages = analytics_rollups.top_pages(project, start_day)
+    daily_traffic = analytics_rollups.daily_traffic(project, start_day, 30)
 
     # Get recent sessions for activity feed
     recent_sessions = project.sessions.filter(started_at__gte=start_date).order_by(
@@ -293,14 +167,14 @@ def analytics_dashboard(request, brand_id):
     context = {
         "brand": brand,
         "project": project,
-        "total_sessions": total_sessions,
-        "total_pageviews": total_pageviews,
-        "avg_session_duration": round(avg_session_duration, 1),
-        "avg_page_load_time": round(avg_page_load_time, 0),
-        "bounce_rate": round(bounce_rate, 1),
+        "total_sessions": summary["total_sessions"],
+        "total_pageviews": summary["total_pageviews"],
+        "avg_session_duration": round(summary["avg_session_duration"], 1),
+        "avg_page_load_time": round(summary["avg_page_load_time"], 0),
+        "bounce_rate": round(summary["bounce_rate"], 1),
         "top_pages": top_pages,
-        "device_breakdown": device_breakdown,
-        "browser_breakdown": browser_breakdown,
+        "device_breakdown": summary["device_breakdown"],
+        "browser_breakdown": summary["browser_breakdown"],
         "daily_traffic": daily_traffic,
         "recent_sessions": recent_sessions,
         "funnel_data": funnel_data,
@@ -461,18 +335,7 @@ def analytics_heatmaps(request, brand_id):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
 
-    popular_pages = (
-        AnalyticsPageView.objects.filter(
-            session__project=project, started_at__gte=start_date
-        )
-        .values("path", "url")
-        .annotate(
-            views=Count("id"),
-            avg_scroll_depth=Avg("scroll_depth_percentage"),
-            total_clicks=Sum("clicks_count"),
-        )
-        .order_by("-views")[:20]
-    )
+    popular_pages = analytics_rollups.top_pages(project, start_date.date(), limit=20)
 
     # Get existing heatmaps
     existing_heatmaps = project.heatmaps.filter(
@@ -592,82 +455,47 @@ def analytics_api_data(request, brand_id):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
 
+    start_day = start_date.date()
+
     if data_type == "traffic":
         # Daily traffic data
-        daily_data = []
-        for i in range(days):
-            date = start_date + timedelta(days=i)
-            sessions = project.sessions.filter(started_at__date=date.date()).count()
-            pageviews = AnalyticsPageView.objects.filter(
-                session__project=project, started_at__date=date.date()
-            ).count()
-            daily_data.append(
-                {
-                    "date": date.strftime("%Y-%m-%d"),
-                    "sessions": sessions,
-                    "pageviews": pageviews,
-                }
-            )
+        daily_data = analytics_rollups.daily_traffic(project, start_day, days)
         return JsonResponse({"data": daily_data})
 
     elif data_type == "devices":
         # Device breakdown
-        device_data = list(
-            project.sessions.filter(started_at__gte=start_date)
-            .values("device_type")
-            .annotate(count=Count("id"))
-            .order_by("-count")
-        )
-        return JsonResponse({"data": device_data})
+        summary = analytics_rollups.project_summary(project, start_day)
+        return JsonResponse({"data": summary["device_breakdown"]})
 
     elif data_type == "pages":
         # Top pages with proper duration filtering
-        page_data = list(
-            AnalyticsPageView.objects.filter(
-                session__project=project, started_at__gte=start_date
-            )
-            .values("path")
-            .annotate(
-                views=Count("id"),
-                avg_duration=Avg(
-                    "duration_seconds",
-                    filter=Q(
-                        duration_seconds__gt=0,
-                        duration_seconds__lt=3600,  # 1 hour max for pageviews
-                    ),
-                ),
-                avg_load_time=Avg(
-                    "load_time_ms",
-                    filter=Q(
-                        load_time_ms__isnull=False,
-                        load_time_ms__gt=0,
-                        load_time_ms__lt=30000,  # 30 seconds max load time
-                    ),
-                ),
-            )
-            .order_by("-views")[:10]
-        )
+        page_data = [
+            {
+                "path": page["path"],
+                "views": page["views"],
+                "avg_duration": page["avg_duration"],
+                "avg_load_time": page["avg_load_time"],
+            }
+            for page in analytics_rollups.top_pages(project, start_day)
+        ]
         return JsonResponse({"data": page_data})
 
     elif data_type == "performance":
         # Page load performance metrics
-        performance_data = list(
-            AnalyticsPageView.objects.filter(
-                session__project=project,
-                started_at__gte=start_date,
-                load_time_ms__isnull=False,
-            )
-            .values("path")
-            .annotate(
-                avg_load_time=Avg("load_time_ms"),
-                avg_dom_loaded=Avg("dom_content_loaded_ms"),
-                avg_first_paint=Avg("first_paint_ms"),
-                avg_lcp=Avg("largest_contentful_paint_ms"),
-                avg_fid=Avg("first_input_delay_ms"),
-                samples=Count("id"),
+        performance_data = [
+            {
+                "path": page["path"],
+                "avg_load_time": page["avg_load_time"],
+                "avg_dom_loaded": page["avg_dom_loaded"],
+                "avg_first_paint": page["avg_first_paint"],
+                "avg_lcp": page["avg_lcp"],
+                "avg_fid": page["avg_fid"],
+                "samples": page["samples"],
+            }
+            for page in analytics_rollups.top_pages(
+                project, start_day, order="load_time_count", load_time_count__gt=0
             )
-            .order_by("-samples")[:10]
-        )
+        ]
         return JsonResponse({"data": performance_data})
 
     return JsonResponse({"error": "Invalid data type"}, status=400)
@@ -894,97 +722,36 @@ def analytics_all_events(request, brand_id):
     return render(request, "website/analytics/all_events.html", context)
 
 
-@login_required
-def analytics_pages_stream(request, brand_id):
-    """Server-Sent Events endpoint for real-time page views"""
-    brand = get_object_or_404(Brand, id=brand_id, owner=request.user)
-    project = get_object_or_404(AnalyticsProject, brand=brand, is_active=True)
-
-    def event_stream():
-        import time
-
-        while True:
-            # Get the latest page view
-            latest_pageview = (
-                AnalyticsPageView.objects.filter(session__project=project)
-                .select_related("session")
-                .order_by("-started_at")
-                .first()
-            )
-
-            if latest_pageview:
-                data = {
-                    "id": str(latest_pageview.id),
-                    "url": latest_pageview.url,
-                    "title": latest_pageview.title,
-                    "path": latest_pageview.path,
-                    "timestamp": latest_pageview.started_at.isoformat(),
-                    "session_id": str(latest_pageview.session.id),
-                    "ip_address": latest_pageview.session.ip_address,
-                    "browser": latest_pageview.session.browser,
-                    "device_type": latest_pageview.session.device_type,
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-
-            time.sleep(2)  # Check for new data every 2 seconds
-
-    from django.http import StreamingHttpResponse
+async def live_stream_response(request, brand_id, stream):
+    """Subscribe the brand owner to a live analytics stream over SSE"""
+    # login_required only wraps async views from Django 5.1
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    brand = await aget_object_or_404(Brand, id=brand_id, owner=user)
+    project = await aget_object_or_404(AnalyticsProject, brand=brand, is_active=True)
 
-    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    # EventSource resends the last id on reconnect; the pages pass it explicitly
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get(
+        "last_event_id"
+    )
+    response = StreamingHttpResponse(
+        analytics_live.sse_stream(project.id, stream, last_event_id),
+        content_type="text/event-stream",
+    )
     response["Cache-Control"] = "no-cache"
-    response["Connection"] = "keep-alive"
+    response["X-Accel-Buffering"] = "no"
     return response
 
 
-@login_required
-def analytics_events_stream(request, brand_id):
-    """Server-Sent Events endpoint for real-time events"""
-    brand = get_object_or_404(Brand, id=brand_id, owner=request.user)
-    project = get_object_or_404(AnalyticsProject, brand=brand, is_active=True)
-
-    def event_stream():
-        import time
-        from .analytics_models import AnalyticsEvent
-
-        while True:
-            # Get the latest event
-            latest_event = (
-                AnalyticsEvent.objects.filter(pageview__session__project=project)
-                .select_related("pageview", "pageview__session")
-                .order_by("-timestamp")
-                .first()
-            )
-
-            if latest_event:
-                data = {
-                    "id": str(latest_event.id),
-                    "event_type": latest_event.event_type,
-                    "timestamp": latest_event.timestamp.isoformat(),
-                    "element_tag": latest_event.element_tag,
-                    "element_classes": latest_event.element_classes,
-                    "element_id": latest_event.element_id,
-                    "element_text": (
-                        latest_event.element_text[:50]
-                        if latest_event.element_text
-                        else ""
-                    ),
-                    "x_coordinate": latest_event.x_coordinate,
-                    "y_coordinate": latest_event.y_coordinate,
-                    "page_url": latest_event.pageview.url,
-                    "page_path": latest_event.pageview.path,
-                    "session_id": str(latest_event.pageview.session.id),
-                    "ip_address": latest_event.pageview.session.ip_address,
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-
-            time.sleep(1)  # Check for new data every 1 second
+async def analytics_pages_stream(request, brand_id):
+    """Server-Sent Events endpoint for real-time page views"""
+    return await live_stream_response(request, brand_id, analytics_live.PAGEVIEWS)
 
-    from django.http import StreamingHttpResponse
 
-    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
-    response["Cache-Control"] = "no-cache"
-    response["Connection"] = "keep-alive"
-    return response
+async def analytics_events_stream(request, brand_id):
+    """Server-Sent Events endpoint for real-time events"""
+    return await live_stream_response(request, brand_id, analytics_live.EVENTS)
 
 
 @require_POST
@@ -1154,20 +921,12 @@ def generate_all_heatmaps(request, brand_id):
         end_date = timezone.now()
         start_date = end_date - timedelta(days=30)
 
-        # Get popular pages
-        popular_pages = (
-            AnalyticsPageView.objects.filter(
-                session__project=project, started_at__gte=start_date
-            )
-            .values("path")
-            .annotate(
-                views=Count("id"),
-                avg_scroll_depth=Avg("scroll_depth_percentage"),
-                total_clicks=Sum("clicks_count"),
-            )
-            .filter(views__gte=5)  # Only pages with at least 5 views
-            .order_by("-views")[:10]  # Top 10 pages
-        )
+        # Get popular pages: top 10 with at least 5 views
+        popular_pages = [
+            page
+            for page in analytics_rollups.top_pages(project, start_date.date())
+            if page["views"] >= 5
+        ]
 
         generated_count = 0
         errors = []
@@ -1339,152 +1098,108 @@ def page_detail_analytics(request, brand_id, path):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
 
-    # Get all pageviews for this path
-    pageviews = (
-        AnalyticsPageView.objects.filter(
-            session__project=project, path=decoded_path, started_at__gte=start_date
-        )
-        .select_related("session")
-        .order_by("-started_at")
+    # Statistics come from the daily path rollups
+    rows = list(
+        project.daily_page_stats.filter(
+            path=decoded_path, date__gte=start_date.date()
+        ).order_by("date")
     )
+    page = analytics_rollups.page_summary(
+        {
+            field: sum(getattr(row, field) for row in rows)
+            for field in analytics_rollups.PAGE_SUM_FIELDS
+        }
+    )
+    hourly, devices, browsers, referrers = Counter(), Counter(), Counter(), Counter()
+    for row in rows:
+        hourly.update(row.hourly)
+        devices.update(row.devices)
+        browsers.update(row.browsers)
+        referrers.update(row.referrers)
 
     # Calculate page statistics
-    total_views = pageviews.count()
-    unique_sessions = pageviews.values("session").distinct().count()
+    total_views = page["views"]
+    unique_sessions = page["sessions"]
 
     # Average metrics
-    avg_duration = (
-        pageviews.filter(duration_seconds__gt=0, duration_seconds__lt=3600).aggregate(
-            avg=Avg("duration_seconds")
-        )["avg"]
-        or 0
-    )
-
-    avg_load_time = (
-        pageviews.filter(
-            load_time_ms__isnull=False, load_time_ms__gt=0, load_time_ms__lt=30000
-        ).aggregate(avg=Avg("load_time_ms"))["avg"]
-        or 0
-    )
-
-    avg_scroll_depth = (
-        pageviews.aggregate(avg=Avg("scroll_depth_percentage"))["avg"] or 0
-    )
+    avg_duration = page["avg_duration"] or 0
+    avg_load_time = page["avg_load_time"] or 0
+    avg_scroll_depth = page["avg_scroll_depth"] or 0
 
     # Performance metrics
     performance_metrics = {
         "avg_load_time": round(avg_load_time, 0),
-        "avg_dom_loaded": round(
-            pageviews.filter(
-                dom_content_loaded_ms__isnull=False, dom_content_loaded_ms__gt=0
-            ).aggregate(avg=Avg("dom_content_loaded_ms"))["avg"]
-            or 0,
-            0,
-        ),
-        "avg_first_paint": round(
-            pageviews.filter(
-                first_paint_ms__isnull=False, first_paint_ms__gt=0
-            ).aggregate(avg=Avg("first_paint_ms"))["avg"]
-            or 0,
-            0,
-        ),
-        "avg_lcp": round(
-            pageviews.filter(
-                largest_contentful_paint_ms__isnull=False,
-                largest_contentful_paint_ms__gt=0,
-            ).aggregate(avg=Avg("largest_contentful_paint_ms"))["avg"]
-            or 0,
-            0,
-        ),
+        "avg_dom_loaded": round(page["avg_dom_loaded"] or 0, 0),
+        "avg_first_paint": round(page["avg_first_paint"] or 0, 0),
+        "avg_lcp": round(page["avg_lcp"] or 0, 0),
     }
 
     # Engagement metrics
     engagement_metrics = {
-        "total_clicks": pageviews.aggregate(total=Sum("clicks_count"))["total"] or 0,
-        "total_form_interactions": pageviews.aggregate(total=Sum("form_interactions"))[
-            "total"
-        ]
-        or 0,
+        "total_clicks": page["total_clicks"],
+        "total_form_interactions": page["total_form_interactions"],
         "avg_scroll_depth": round(avg_scroll_depth, 1),
     }
 
     # Device breakdown for this page
-    device_breakdown = (
-        pageviews.values("session__device_type")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
+    device_breakdown = [
+        {"session__device_type": device, "count": count}
+        for device, count in devices.most_common()
+    ]
 
     # Browser breakdown for this page
-    browser_breakdown = (
-        pageviews.values("session__browser")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:5]
-    )
+    browser_breakdown = [
+        {"session__browser": browser, "count": count}
+        for browser, count in browsers.most_common(5)
+    ]
 
     # Traffic sources (referrers)
-    traffic_sources = (
-        pageviews.filter(session__referrer__isnull=False)
-        .exclude(session__referrer="")
-        .values("session__referrer")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:10]
-    )
+    traffic_sources = [
+        {"session__referrer": referrer, "count": count}
+        for referrer, count in referrers.most_common(10)
+    ]
 
     # Hourly distribution
-    hourly_distribution = []
-    for hour in range(24):
-        views = pageviews.filter(started_at__hour=hour).count()
-        hourly_distribution.append(
-            {"hour": hour, "views": views, "label": f"{hour:02d}:00"}
-        )
+    hourly_distribution = [
+        {"hour": hour, "views": hourly.get(str(hour), 0), "label": f"{hour:02d}:00"}
+        for hour in range(24)
+    ]
 
     # Daily views for the last 30 days
+    by_date = {row.date: row for row in rows}
     daily_views = []
     for i in range(30):
         date = start_date + timedelta(days=i)
-        views = pageviews.filter(started_at__date=date.date()).count()
-        unique_sessions_day = (
-            pageviews.filter(started_at__date=date.date())
-            .values("session")
-            .distinct()
-            .count()
-        )
+        row = by_date.get(date.date())
 
         daily_views.append(
             {
                 "date": date.strftime("%Y-%m-%d"),
-                "views": views,
-                "unique_sessions": unique_sessions_day,
+                "views": row.views if row else 0,
+                "unique_sessions": row.sessions if row else 0,
                 "label": date.strftime("%m/%d"),
             }
         )
 
-    # Exit rate calculation
-    # Pages where this was the last page in the session
-    exit_sessions = 0
-    for session in pageviews.values("session").distinct():
-        session_id = session["session"]
-        last_page = (
-            AnalyticsPageView.objects.filter(session_id=session_id)
-            .order_by("-started_at")
-            .first()
-        )
-
-        if last_page and last_page.path == decoded_path:
-            exit_sessions += 1
-
-    exit_rate = (exit_sessions / unique_sessions * 100) if unique_sessions > 0 else 0
+    # Exit rate: sessions whose last page was this one
+    exit_rate = (page["exits"] / unique_sessions * 100) if unique_sessions > 0 else 0
 
     # Page timing distribution
     load_time_buckets = {
-        "fast": pageviews.filter(load_time_ms__lt=1000).count(),
-        "average": pageviews.filter(
-            load_time_ms__gte=1000, load_time_ms__lt=3000
-        ).count(),
-        "slow": pageviews.filter(load_time_ms__gte=3000).count(),
+        "fast": page["load_fast"],
+        "average": page["load_average"],
+        "slow": page["load_slow"],
     }
 
+    # Individual pageviews for the detailed list
+    pageviews = (
+        AnalyticsPageView.objects.filter(
+            session__project=project, path=decoded_path, started_at__gte=start_date
+        )
+        .select_related("session")
+        .order_by("-started_at")
+    )
+
     # Pagination for detailed pageview list
     paginator = Paginator(pageviews, 50)  # 50 pageviews per page
     page_number = request.GET.get("page")
@@ -42,6 +42,7 @@ from django.core.files.base import ContentFile
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.http import HttpResponse
+from django.urls import reverse
 from django.utils import timezone
 import uuid
 import os
@@ -52,9 +53,14 @@ import json
 import base64
 import stripe
 import traceback
+import functools
 from PIL import Image
 import io
 import tweepy
+from .services.api_clients import brand_twitter_api, brand_twitter_client
+from .services.rate_limits import governed_twitter_client
+from .services import image_jobs, video_tasks
+from .services.generation_cache import cached_chat_completion, generation_cache
 from django.conf import settings
 from .models import Tweet
 import random
@@ -873,9 +879,92 @@ def upload_instagram_image(request):
         )
 
 
+def image_generation_job(operation):
+    """Let an image endpoint run on the image worker pool.
+
+    Requests sending ``async=true`` (form field or query parameter) get a
+    job ID back with 202 straight away; the endpoint itself then runs on a
+    pool thread and its response is stored on the job. Queued jobs hold
+    their uploads in memory, so only signed-in users may queue them.
+    """
+
+    def decorator(func):
+        image_jobs.register_operation(operation, func)
+
+        @functools.wraps(func)
+        def wrapper(request, *args, **kwargs):
+            flag = request.query_params.get("async") or request.data.get("async")
+            if str(flag).lower() not in ("1", "true", "yes"):
+                return func(request, *args, **kwargs)
+
+            if not request.user.is_authenticated:
+                return Response(
+                    {"error": "Sign in to run image generations in the background"},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+
+            if not image_jobs.has_capacity(request.user):
+                return Response(
+                    {
+                        "error": "Too many image generations in progress. "
+                        "Please wait for one to finish."
+                    },
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                )
+
+            job = image_jobs.submit_job(request, operation)
+            return Response(
+                {
+                    "success": True,
+                    "job_id": str(job.pk),
+                    "status": job.status,
+                    "status_url": reverse(
+                        "website:image_generation_job_status", args=[job.pk]
+                    ),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def image_generation_job_status(request, job_id):
+    """
+    Poll an asynchronous image generation job
+    """
+    from .models import ImageGenerationJob
+
+    job = ImageGenerationJob.objects.filter(pk=job_id).first()
+    # Jobs of signed-in users are only visible to them
+    if job is None or (job.user_id and job.user_id != request.user.id):
+        return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    image_jobs.expire_stale_job(job)
+    return Response(job.to_dict())
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def video_generation_task_status(request, provider, task_id):
+    """
+    Read a video task's state as last seen by the background video poller
+    """
+    task = video_tasks.get_tracked_task(provider, task_id)
+    # Tasks of signed-in users are only visible to them
+    if task is None or (task.user_id and task.user_id != request.user.id):
+        return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(task.to_dict())
+
+
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("generate_ai_image")
 def generate_ai_image(request):
     """
     Generate AI image using Runware API for mobile app
@@ -1127,6 +1216,7 @@ def generate_ai_image(request):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("generate_ai_image_openai")
 def generate_ai_image_openai(request):
     """
     Generate AI image using OpenAI's image generation API for mobile app
@@ -1348,13 +1438,15 @@ def generate_ai_image_openai(request):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("generate_ai_image_edit_openai")
 def generate_ai_image_edit_openai(request):
     """
     Generate AI image using OpenAI's GPT-4V image editing API.
     Follows the simple working example exactly.
     """
+    images = []
+    temp_paths = []
     try:
-        from openai import OpenAI
         import os
 
         # Get prompt from request
@@ -1365,15 +1457,15 @@ def generate_ai_image_edit_openai(request):
             )
 
         # Get images from request
-        images = []
         image_count = 0
         while f"image_{image_count}" in request.FILES:
-            # Save uploaded file temporarily
+            # Save uploaded file temporarily; unique names keep concurrent
+            # generations from reading each other's uploads
             uploaded_file = request.FILES[f"image_{image_count}"]
-            temp_path = f"/tmp/image_{image_count}.png"
-            with open(temp_path, "wb") as f:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as f:
                 f.write(uploaded_file.read())
-            images.append(open(temp_path, "rb"))
+            temp_paths.append(f.name)
+            images.append(open(f.name, "rb"))
             image_count += 1
 
         if not images:
@@ -1382,8 +1474,13 @@ def generate_ai_image_edit_openai(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Initialize OpenAI client
-        client = OpenAI()
+        # Shared OpenAI client
+        client = get_openai_client()
+        if not client:
+            return Response(
+                {"error": "OpenAI API key is not configured"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
         # Make the API call exactly like the example
         result = client.images.edit(
@@ -1463,9 +1560,9 @@ def generate_ai_image_edit_openai(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     finally:
         # Clean up temporary files
-        for i in range(image_count):
+        for path in temp_paths:
             try:
-                os.remove(f"/tmp/image_{i}.png")
+                os.remove(path)
             except OSError:
                 pass
         # Close file handles
@@ -1479,6 +1576,7 @@ def generate_ai_image_edit_openai(request):
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("gpt_image_multi_reference")
 def gpt_image_multi_reference(request):
     """
     Generate AI image using GPT Image with multiple reference images.
@@ -1647,6 +1745,7 @@ def gpt_image_multi_reference(request):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("gpt_image_inpainting")
 def gpt_image_inpainting(request):
     """
     Edit part of an image using a mask (inpainting).
@@ -1746,6 +1845,7 @@ def gpt_image_inpainting(request):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("gpt_image_high_fidelity")
 def gpt_image_high_fidelity(request):
     """
     Generate or edit images with high input fidelity.
@@ -1847,6 +1947,7 @@ def gpt_image_high_fidelity(request):
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@image_generation_job("gpt_image_generate_advanced")
 def gpt_image_generate_advanced(request):
     """
     Advanced GPT Image generation with all customization options.
@@ -1947,6 +2048,7 @@ def gpt_image_generate_advanced(request):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@image_generation_job("gpt_image_transparent_background")
 def gpt_image_transparent_background(request):
     """
     Generate images with transparent backgrounds using GPT Image.
@@ -2167,6 +2269,11 @@ def _generate_sora_video(request, prompt, model):
         # Clamp duration
         duration = max(1.0, min(duration, 60.0))
 
+        # With async=true Runware tasks are handed to the video poller
+        # instead of holding this request until the video is ready
+        flag = request.query_params.get("async") or request.data.get("async")
+        wait = provider != "runware" or str(flag).lower() not in ("1", "true", "yes")
+
         # Generate video
         video_url, metadata = video_service.generate_video(
             prompt=prompt,
@@ -2174,8 +2281,36 @@ def _generate_sora_video(request, prompt, model):
             quality=quality,
             duration=duration,
             aspect_ratio=aspect_ratio,
+            wait=wait,
         )
 
+        if not wait:
+            task = video_tasks.track_task(
+                "runware", metadata["task_uuid"], user=request.user
+            )
+            return Response(
+                {
+                    "success": True,
+                    "task_id": task.task_id,
+                    "status": task.status,
+                    "status_url": reverse(
+                        "website:video_generation_task_status",
+                        args=["runware", task.task_id],
+                    ),
+                    "model": "sora2",
+                    "metadata": {
+                        "provider": "runware",
+                        "prompt": prompt,
+                        "quality": quality,
+                        "duration": duration,
+                        "aspect_ratio": aspect_ratio,
+                        "width": metadata.get("width"),
+                        "height": metadata.get("height"),
+                    },
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
         # Return success response
         response_data = {
             "success": True,
@@ -2250,6 +2385,8 @@ def _generate_veo_video(request, prompt, model):
             enable_translation=enable_translation,
         )
 
+        video_tasks.track_task("veo", result["task_id"], user=request.user)
+
         # Return task info (Veo is async, client needs to poll for status)
         response_data = {
             "success": True,
@@ -2324,6 +2461,9 @@ def generate_kling_video(request):
             negative_prompt=negative_prompt if negative_prompt else None
         )
         
+        if result.get("id"):
+            video_tasks.track_task("kling", result["id"], user=request.user)
+
         # Return task info (client needs to poll for status)
         response_data = {
             "success": True,
@@ -2397,8 +2537,10 @@ def get_kling_video_status(request, generation_id):
         # URL decode the generation_id (handles special characters like : and /)
         generation_id = unquote(generation_id)
         
-        # Get video status
-        status_data = kling_generator.get_video_status(generation_id)
+        # Get video status, from the video poller when it tracks the task
+        status_data = video_tasks.tracked_status("kling", generation_id)
+        if status_data is None:
+            status_data = kling_generator.get_video_status(generation_id)
         
         # Format response
         video_status = status_data.get("status", "unknown")
@@ -2440,8 +2582,10 @@ def get_veo_video_status(request, task_id):
     try:
         from website.veo_utils import veo_generator
 
-        # Get video status
-        status_data = veo_generator.get_video_status(task_id)
+        # Get video status, from the video poller when it tracks the task
+        status_data = video_tasks.tracked_status("veo", task_id)
+        if status_data is None:
+            status_data = veo_generator.get_video_status(task_id)
         
         # Format response
         success_flag = status_data.get("success_flag", 0)
@@ -5042,7 +5186,7 @@ def save_twitter_config(request, brand_id):
     # Try to get username from Twitter API
     try:
         if bearer_token:
-            client = tweepy.Client(bearer_token=bearer_token)
+            client = governed_twitter_client(bearer_token=bearer_token)
             user = client.get_me()
             if user.data:
                 brand.twitter_username = user.data.username
@@ -5102,13 +5246,7 @@ def test_twitter_connection(request, brand_id):
 
     try:
         # Use full OAuth 1.0a authentication for better compatibility
-        client = tweepy.Client(
-            bearer_token=brand.twitter_bearer_token,
-            consumer_key=brand.twitter_api_key,
-            consumer_secret=brand.twitter_api_secret,
-            access_token=brand.twitter_access_token,
-            access_token_secret=brand.twitter_access_token_secret,
-        )
+        client = brand_twitter_client(brand)
         user = client.get_me()
         
         if user.data:
@@ -5183,14 +5321,7 @@ def send_test_tweet(request, brand_id):
 
     try:
         # Create Twitter client
-        client = tweepy.Client(
-            bearer_token=brand.twitter_bearer_token,
-            consumer_key=brand.twitter_api_key,
-            consumer_secret=brand.twitter_api_secret,
-            access_token=brand.twitter_access_token,
-            access_token_secret=brand.twitter_access_token_secret,
-            wait_on_rate_limit=True,
-        )
+        client = brand_twitter_client(brand)
 
         # Send tweet
         response = client.create_tweet(text=content)
@@ -5339,14 +5470,7 @@ def send_test_tweet(request, brand_id):
 
     try:
         # Create Twitter client
-        client = tweepy.Client(
-            bearer_token=brand.twitter_bearer_token,
-            consumer_key=brand.twitter_api_key,
-            consumer_secret=brand.twitter_api_secret,
-            access_token=brand.twitter_access_token,
-            access_token_secret=brand.twitter_access_token_secret,
-            wait_on_rate_limit=True,
-        )
+        client = brand_twitter_client(brand)
 
         # Send tweet
         response = client.create_tweet(text=content)
@@ -5473,14 +5597,7 @@ def post_tweet(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        client = tweepy.Client(
-            bearer_token=brand.twitter_bearer_token,
-            consumer_key=brand.twitter_api_key,
-            consumer_secret=brand.twitter_api_secret,
-            access_token=brand.twitter_access_token,
-            access_token_secret=brand.twitter_access_token_secret,
-            wait_on_rate_limit=True,
-        )
+        client = brand_twitter_client(brand)
 
         # Post tweet using API v2
         response = client.create_tweet(text=tweet_content)
@@ -5697,13 +5814,12 @@ def check_twitter_credentials(request):
         ) = credentials
 
         # Create Twitter API v2 client
-        client = tweepy.Client(
+        client = governed_twitter_client(
             bearer_token=bearer_token,
             consumer_key=consumer_key,
             consumer_secret=consumer_secret,
             access_token=access_token,
             access_token_secret=access_token_secret,
-            wait_on_rate_limit=True,
         )
 
         # Verify credentials by getting user info
@@ -6024,31 +6140,14 @@ def post_tweet_now(request, tweet_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        client = tweepy.Client(
-            bearer_token=tweet.brand.twitter_bearer_token,
-            consumer_key=tweet.brand.twitter_api_key,
-            consumer_secret=tweet.brand.twitter_api_secret,
-            access_token=tweet.brand.twitter_access_token,
-            access_token_secret=tweet.brand.twitter_access_token_secret,
-            wait_on_rate_limit=True,
-        )
+        client = brand_twitter_client(tweet.brand)
 
         # Prepare media ids if image present
         media_ids = None
         if tweet.image:
             try:
                 # Upload media using v1.1 API
-                import tweepy as tweepy_v1
-
-                api = tweepy_v1.API(
-                    tweepy_v1.OAuth1UserHandler(
-                        consumer_key=tweet.brand.twitter_api_key,
-                        consumer_secret=tweet.brand.twitter_api_secret,
-                        access_token=tweet.brand.twitter_access_token,
-                        access_token_secret=tweet.brand.twitter_access_token_secret,
-                    ),
-                    wait_on_rate_limit=True,
-                )
+                api = brand_twitter_api(tweet.brand)
                 uploaded = api.media_upload(filename=tweet.image.path)
                 media_ids = [uploaded.media_id]
             except Exception as media_e:
@@ -6174,6 +6273,23 @@ def refresh_brand_tweet_metrics(request, tweet_id):
         )
 
 
+def bypass_generation_cache(request):
+    """True when the client asked for a fresh completion (``bypass_cache``)"""
+    flag = request.query_params.get("bypass_cache") or request.data.get(
+        "bypass_cache"
+    )
+    return str(flag).lower() in ("1", "true", "yes")
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def generation_cache_stats(request):
+    """
+    Hit/miss counters of this process's LLM generation cache
+    """
+    return Response(generation_cache.stats())
+
+
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def generate_tweet_content(request):
@@ -6258,19 +6374,19 @@ Additional guidelines:
 - Do NOT wrap the tweet in quotes - return the raw tweet text only
 - Do NOT add any formatting or punctuation around the tweet"""
 
-        # Call OpenAI API
-        response = client.chat.completions.create(
+        # Call OpenAI API (identical requests are served from the cache)
+        generated_content, cached = cached_chat_completion(
+            client,
             model="gpt-4",
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": formatted_prompt},
             ],
+            bypass=bypass_generation_cache(request),
             max_tokens=100,
             temperature=0.7,
         )
 
-        generated_content = response.choices[0].message.content.strip()
-
         # Remove quotes if the AI wrapped the content in quotes
         if generated_content.startswith('"') and generated_content.endswith('"'):
             generated_content = generated_content[1:-1]
@@ -6287,6 +6403,7 @@ Additional guidelines:
                 "content": generated_content,
                 "prompt_used": formatted_prompt,
                 "system_message": system_message,  # Include for debugging
+                "cached": cached,
             }
         )
 
@@ -6416,22 +6533,13 @@ def delete_tweet(request, tweet_id):
         # Delete from Twitter if it was posted
         if tweet.tweet_id and tweet.status == "posted":
             try:
-                import tweepy
-
                 # Create Twitter API client using brand credentials
                 if not tweet.brand or not tweet.brand.has_twitter_config:
                     print(
                         "Brand does not have Twitter configuration, skipping Twitter deletion"
                     )
                 else:
-                    client = tweepy.Client(
-                        bearer_token=tweet.brand.twitter_bearer_token,
-                        consumer_key=tweet.brand.twitter_api_key,
-                        consumer_secret=tweet.brand.twitter_api_secret,
-                        access_token=tweet.brand.twitter_access_token,
-                        access_token_secret=tweet.brand.twitter_access_token_secret,
-                        wait_on_rate_limit=True,
-                    )
+                    client = brand_twitter_client(tweet.brand)
 
                     # Delete tweet from Twitter
                     client.delete_tweet(tweet.tweet_id)
@@ -7689,7 +7797,12 @@ def post_instagram_now(request, post_id):
                 return Response(
                     {
                         "success": True,
-                        "message": "Instagram post published successfully!",
+                        "message": (
+                            "Instagram is processing the video; it will be "
+                            "published automatically once ready."
+                            if post.status == "publishing"
+                            else "Instagram post published successfully!"
+                        ),
                         "post": serializer.data,
                     }
                 )
@@ -7758,7 +7871,8 @@ def generate_instagram_content(request):
                 {"error": "OpenAI API key is not configured"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-        response = client.chat.completions.create(
+        generated_content, cached = cached_chat_completion(
+            client,
             model="gpt-4",
             messages=[
                 {
@@ -7767,13 +7881,18 @@ def generate_instagram_content(request):
                 },
                 {"role": "user", "content": formatted_prompt},
             ],
+            bypass=bypass_generation_cache(request),
             max_tokens=300,
             temperature=0.7,
         )
 
-        generated_content = response.choices[0].message.content.strip()
-
-        return Response({"content": generated_content, "prompt_used": formatted_prompt})
+        return Response(
+            {
+                "content": generated_content,
+                "prompt_used": formatted_prompt,
+                "cached": cached,
+            }
+        )
 
     except Exception as e:
         return Response(
@@ -7825,13 +7944,12 @@ def connect_brand_twitter(request, brand_id):
             import tweepy
 
             # Create Twitter API client
-            client = tweepy.Client(
+            client = governed_twitter_client(
                 bearer_token=bearer_token,
                 consumer_key=api_key,
                 consumer_secret=api_secret,
                 access_token=access_token,
                 access_token_secret=access_token_secret,
-                wait_on_rate_limit=True,
             )
 
             # Verify credentials by getting user info
@@ -8029,14 +8147,7 @@ def test_brand_twitter(request, brand_id):
             import tweepy
 
             # Create Twitter API client
-            client = tweepy.Client(
-                bearer_token=brand.twitter_bearer_token,
-                consumer_key=brand.twitter_api_key,
-                consumer_secret=brand.twitter_api_secret,
-                access_token=brand.twitter_access_token,
-                access_token_secret=brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(brand)
 
             # First verify credentials
             me = client.get_me()
@@ -9504,6 +9615,7 @@ def generate_tweet_with_strategy(request):
             context["website_url"] = website_url
 
         # Generate tweet using the strategy
+        # Each call saves a new draft, so never reuse a cached completion
         result = strategy.generate_tweet_for_brand(brand, **context)
 
         if result["success"]:
@@ -9592,6 +9704,81 @@ def generate_tweet_with_strategy(request):
         )
 
 
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def generate_tweets_batch(request):
+    """Generate and schedule several strategy tweets for a brand at once"""
+    from .services.tweet_batches import MAX_TWEETS, generate_batch
+
+    brand_id = request.data.get("brand_id")
+    strategy_ids = request.data.get("strategy_ids") or []
+    if not brand_id or not strategy_ids:
+        return Response(
+            {"error": "brand_id and strategy_ids are required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        count = int(request.data.get("count", len(strategy_ids)))
+    except (TypeError, ValueError):
+        return Response(
+            {"error": "count must be a number"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if not 1 <= count <= MAX_TWEETS:
+        return Response(
+            {"error": f"count must be between 1 and {MAX_TWEETS}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        brand = Brand.objects.get(id=brand_id, owner=request.user)
+    except Brand.DoesNotExist:
+        return Response(
+            {"error": "Brand not found or access denied"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # Unknown or malformed IDs are skipped rather than failing the batch
+    requested = [int(sid) for sid in strategy_ids if str(sid).isdigit()]
+    strategies_by_id = TweetStrategy.objects.filter(
+        id__in=requested, is_active=True
+    ).in_bulk()
+    strategies = [
+        strategies_by_id[sid] for sid in requested if sid in strategies_by_id
+    ]
+    if not strategies:
+        return Response(
+            {"error": "Tweet strategy not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    try:
+        result = generate_batch(
+            brand,
+            strategies,
+            count,
+            context=request.data.get("context") or {},
+            user=request.user,
+            schedule=request.data.get("schedule", True) not in (False, "false", "0"),
+        )
+    except Exception as e:
+        logger.error(f"Batch tweet generation failed for brand {brand.id}: {str(e)}")
+        return Response(
+            {"error": f"Failed to generate tweets: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    return Response(
+        {
+            "success": True,
+            "count": len(result["tweets"]),
+            "tweets": BrandTweetSerializer(result["tweets"], many=True).data,
+            "rejected": result["rejected"],
+            "unscheduled": result["unscheduled"],
+        }
+    )
+
+
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def tweet_strategy_detail(request, strategy_id):
@@ -9767,7 +9954,8 @@ Please provide only the tweet text, no additional commentary."""
         try:
             client = get_openai_client()
 
-            response = client.chat.completions.create(
+            content, cached = cached_chat_completion(
+                client,
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -9776,12 +9964,11 @@ Please provide only the tweet text, no additional commentary."""
                     },
                     {"role": "user", "content": ai_prompt},
                 ],
+                bypass=bypass_generation_cache(request),
                 max_tokens=300,
                 temperature=0.7,
             )
 
-            content = response.choices[0].message.content.strip()
-
             # Remove quotes if the AI wrapped the content in quotes
             if content.startswith('"') and content.endswith('"'):
                 content = content[1:-1]
@@ -9794,7 +9981,12 @@ Please provide only the tweet text, no additional commentary."""
                 content = content[7:]
 
             return Response(
-                {"success": True, "content": content, "prompt_used": ai_prompt}
+                {
+                    "success": True,
+                    "content": content,
+                    "prompt_used": ai_prompt,
+                    "cached": cached,
+                }
             )
 
         except Exception as e:
@@ -10640,6 +10832,7 @@ def sora_create_video(request):
             size=size,
             seconds=seconds,
         )
+        video_tasks.track_task("sora", video_job.id, user=request.user)
 
         return Response({
             "success": True,
@@ -10739,6 +10932,7 @@ def sora_create_video_with_reference(request):
                     seconds=seconds,
                     input_reference=image_file,
                 )
+            video_tasks.track_task("sora", video_job.id, user=request.user)
 
             return Response({
                 "success": True,
@@ -10778,38 +10972,25 @@ def sora_get_video_status(request, video_id):
     try:
         from website.utils import get_openai_client
 
-        # Initialize OpenAI client
-        client = get_openai_client()
-        if not client:
-            return Response(
-                {"error": "OpenAI API key is not configured"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        # Retrieve video status
-        video = client.videos.retrieve(video_id)
+        # Answer from the video poller when it tracks the job
+        status_data = video_tasks.tracked_status("sora", video_id)
+        if status_data is None:
+            # Initialize OpenAI client
+            client = get_openai_client()
+            if not client:
+                return Response(
+                    {"error": "OpenAI API key is not configured"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
 
-        response_data = {
-            "success": True,
-            "video_id": video.id,
-            "status": video.status,  # queued, in_progress, completed, failed
-            "progress": getattr(video, 'progress', 0),  # 0-100 percentage
-            "model": video.model,
-            "size": getattr(video, 'size', None),
-            "seconds": getattr(video, 'seconds', None),
-            "created_at": video.created_at,
-        }
+            # Retrieve video status
+            video = client.videos.retrieve(video_id)
+            # status: queued, in_progress, completed, failed; progress: 0-100
+            status_data = video_tasks.sora_status_payload(video)
 
-        # Add error info if failed
-        if video.status == "failed":
-            error_info = getattr(video, 'error', None)
-            if error_info:
-                response_data["error"] = {
-                    "message": getattr(error_info, 'message', 'Video generation failed'),
-                    "code": getattr(error_info, 'code', None),
-                }
+        response_data = {"success": True, **status_data}
 
-        logger.info(f"Sora video {video_id} status: {video.status}, progress: {response_data['progress']}%")
+        logger.info(f"Sora video {video_id} status: {response_data['status']}, progress: {response_data['progress']}%")
 
         return Response(response_data)
 
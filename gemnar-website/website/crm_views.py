@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from organizations.models import Organization
 from .models import CRMContact, CRMCompany, CRMDeal, CRMActivity, CRMNote, CRMTask, User
 import tweepy
+from .services.api_clients import brand_twitter_client
 import logging
 
 
@@ -1278,14 +1279,7 @@ def get_latest_tweet(request, organization_pk, company_pk):
 
     try:
         # Initialize Twitter client
-        client = tweepy.Client(
-            bearer_token=brand.twitter_bearer_token,
-            consumer_key=brand.twitter_api_key,
-            consumer_secret=brand.twitter_api_secret,
-            access_token=brand.twitter_access_token,
-            access_token_secret=brand.twitter_access_token_secret,
-            wait_on_rate_limit=True,
-        )
+        client = brand_twitter_client(brand)
 
         # Get user by username
         user = client.get_user(username=twitter_handle)
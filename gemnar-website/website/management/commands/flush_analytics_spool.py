@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from website.services.analytics_buffer import drain_spool_dir, ingest_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Ingest analytics spool files left behind by web workers that exited "
+        "before flushing them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=60,
+            help="Only drain spool files untouched for this many seconds",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Report runs that found nothing to drain",
+        )
+
+    def handle(self, *args, **options):
+        spool_dir = getattr(settings, "ANALYTICS_SPOOL_DIR", None)
+        if not spool_dir:
+            if options["verbose"]:
+                self.stdout.write("ANALYTICS_SPOOL_DIR is not set")
+            return
+
+        written, rejected = drain_spool_dir(spool_dir, min_age=options["min_age"])
+        ingest_buffer.flush()
+
+        if written or rejected:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Ingested {written} spooled analytics messages "
+                    f"({rejected} rejected)"
+                )
+            )
+        elif options["verbose"]:
+            self.stdout.write("No stale analytics spool files")
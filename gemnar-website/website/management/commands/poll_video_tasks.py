@@ -0,0 +1,44 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from website.services.video_tasks import DEFAULT_BATCH_SIZE, poll_due_tasks
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Check due Runware, Kling, Veo and Sora video tasks in per-provider "
+        "batches and finish the ones that are ready"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Maximum tasks to check in this run (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Report runs that found no due tasks",
+        )
+
+    def handle(self, *args, **options):
+        summary = poll_due_tasks(limit=options["limit"])
+
+        if not summary["checked"]:
+            if options["verbose"]:
+                self.stdout.write("No video tasks due")
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {summary['checked']} video tasks: "
+                f"{summary['completed']} completed, {summary['failed']} failed, "
+                f"{summary['pending']} still running"
+            )
+        )
+        for error in summary["errors"]:
+            self.stdout.write(self.style.ERROR(f"  {error}"))
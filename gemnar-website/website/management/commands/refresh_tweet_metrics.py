@@ -0,0 +1,102 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from website.models import Brand, WebLog
+from website.services.tweet_metrics import refresh_recent_tweet_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh public metrics for posted brand tweets using batched "
+        "multi-ID lookups, most recently posted tweets first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help=(
+                "Only refresh tweets posted in the last N days, 0 for all (default: 30)"
+            ),
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Maximum number of tweets to refresh, 0 for all (default: 1000)",
+        )
+        parser.add_argument(
+            "--brand",
+            type=int,
+            help="Only refresh tweets for this brand ID",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show how many tweets and API calls a refresh would take",
+        )
+
+    def handle(self, *args, **options):
+        brand = None
+        if options["brand"]:
+            try:
+                brand = Brand.objects.get(pk=options["brand"])
+            except Brand.DoesNotExist:
+                raise CommandError(f"Brand {options['brand']} does not exist")
+
+        web_log = WebLog.log_system_event(
+            event_name="refresh_tweet_metrics",
+            description="Batched refresh of posted tweet metrics",
+            details={
+                "days": options["days"],
+                "limit": options["limit"],
+                "brand": options["brand"],
+                "dry_run": options["dry_run"],
+            },
+        )
+
+        try:
+            summary = refresh_recent_tweet_metrics(
+                posted_within=(
+                    timedelta(days=options["days"]) if options["days"] > 0 else None
+                ),
+                limit=options["limit"] or None,
+                brand=brand,
+                dry_run=options["dry_run"],
+            )
+        except Exception as e:
+            logger.error(f"Tweet metrics refresh failed: {str(e)}")
+            web_log.mark_failed(
+                error_message=str(e), error_traceback=traceback.format_exc()
+            )
+            raise
+
+        web_log.mark_completed(
+            items_succeeded=summary["updated"],
+            items_failed=summary["missing"] + summary["skipped"],
+            details={"summary": summary},
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"DRY RUN: {summary['requested']} tweets would be refreshed "
+                    f"in {summary['api_calls']} API calls"
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed {summary['updated']} of {summary['requested']} tweets "
+                f"in {summary['api_calls']} API calls "
+                f"({summary['missing']} unavailable, {summary['skipped']} skipped)"
+            )
+        )
+        for error in summary["errors"]:
+            self.stdout.write(self.style.ERROR(f"  {error}"))
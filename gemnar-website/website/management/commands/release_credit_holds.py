@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from website.services.credit_ledger import release_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Release credit reservations whose generation job never captured or "
+        "released them before they expired"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Report runs that found no expired holds",
+        )
+
+    def handle(self, *args, **options):
+        released = release_expired()
+
+        if released:
+            self.stdout.write(
+                self.style.SUCCESS(f"Released {released} expired credit holds")
+            )
+        elif options["verbose"]:
+            self.stdout.write("No expired credit holds")
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from website.services.analytics_rollups import rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the daily analytics rollups for every project and day with "
+        "activity since the previous run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=0,
+            help="Rebuild every day with activity in the last N days instead",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Report runs that found nothing to refresh",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["days"]:
+            since = timezone.now() - timedelta(days=options["days"])
+
+        rebuilt = rollup(since=since)
+
+        if rebuilt:
+            self.stdout.write(
+                self.style.SUCCESS(f"Refreshed {rebuilt} project-day rollups")
+            )
+        elif options["verbose"]:
+            self.stdout.write("No analytics activity to roll up")
@@ -0,0 +1,406 @@
+import logging
+import random
+import signal
+import threading
+import time
+import traceback
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from website.models import WebLog
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob(threading.Thread):
+    """A management command run on its own interval in a dedicated thread.
+
+    The thread is kept for the life of the scheduler so its database
+    connection is reused between runs (subject to CONN_MAX_AGE). A trigger
+    that arrives while the previous run is still going is skipped rather
+    than queued, so runs of the same job never overlap.
+    """
+
+    def __init__(self, name, command, interval, jitter=0, stdout=None, **kwargs):
+        super().__init__(name=f"scheduler-{name}", daemon=True)
+        self.job_name = name
+        self.command = command
+        self.interval = interval
+        self.jitter = jitter
+        self.command_kwargs = kwargs
+        self.stdout = stdout
+        self.next_run = time.monotonic()
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration = None
+        self._trigger = threading.Event()
+        self._stop_requested = threading.Event()
+        self._running = threading.Event()
+
+    @property
+    def is_running(self):
+        return self._running.is_set()
+
+    @property
+    def is_busy(self):
+        """True while a run is pending or in progress"""
+        return self._trigger.is_set() or self._running.is_set()
+
+    def schedule_next(self, now):
+        self.next_run = now + self.interval + random.uniform(0, self.jitter)
+
+    def trigger(self):
+        """Ask the job to run; returns False if a run is already in progress"""
+        if self._running.is_set() or self._trigger.is_set():
+            self.skipped += 1
+            return False
+        self._trigger.set()
+        return True
+
+    def stop(self):
+        self._stop_requested.set()
+        self._trigger.set()
+
+    def run(self):
+        while True:
+            self._trigger.wait()
+            if self._stop_requested.is_set():
+                break
+            self._running.set()
+            self._trigger.clear()
+            try:
+                self.run_once()
+            finally:
+                self._running.clear()
+        connection.close()
+
+    def run_once(self):
+        started = time.monotonic()
+        close_old_connections()
+        try:
+            call_command(self.command, stdout=self.stdout, **self.command_kwargs)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Scheduled job {self.job_name} failed: {str(e)}")
+            logger.error(traceback.format_exc())
+        finally:
+            self.runs += 1
+            self.last_duration = time.monotonic() - started
+            close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the minute-based automation jobs (tweets, Instagram, system stats, "
+        "video task polling, expired credit holds, analytics spools and rollups) "
+        "in a long-running process instead of booting Django from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Run jobs in dry-run mode",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Enable verbose logging",
+        )
+        parser.add_argument(
+            "--tweet-interval",
+            type=float,
+            default=60,
+            help="Seconds between tweet queue runs (default: 60)",
+        )
+        parser.add_argument(
+            "--instagram-interval",
+            type=float,
+            default=60,
+            help="Seconds between Instagram queue runs (default: 60)",
+        )
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=60,
+            help="Seconds between system stats collections (default: 60)",
+        )
+        parser.add_argument(
+            "--video-interval",
+            type=float,
+            default=5,
+            help="Seconds between video task polls (default: 5)",
+        )
+        parser.add_argument(
+            "--credit-hold-interval",
+            type=float,
+            default=60,
+            help="Seconds between expired credit hold sweeps (default: 60)",
+        )
+        parser.add_argument(
+            "--analytics-spool-interval",
+            type=float,
+            default=60,
+            help="Seconds between stale analytics spool drains (default: 60)",
+        )
+        parser.add_argument(
+            "--analytics-rollup-interval",
+            type=float,
+            default=300,
+            help="Seconds between analytics rollup refreshes (default: 300)",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=5,
+            help="Maximum random delay in seconds added to each interval",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Concurrent brands for tweet processing (default: 4)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Maximum brands per tweet/Instagram run, 0 for all (default: 0)",
+        )
+        parser.add_argument(
+            "--skip-tweets",
+            action="store_true",
+            help="Skip brand tweet processing",
+        )
+        parser.add_argument(
+            "--skip-instagram",
+            action="store_true",
+            help="Skip Instagram post processing",
+        )
+        parser.add_argument(
+            "--skip-stats",
+            action="store_true",
+            help="Skip system stats collection",
+        )
+        parser.add_argument(
+            "--skip-videos",
+            action="store_true",
+            help="Skip video generation task polling",
+        )
+        parser.add_argument(
+            "--skip-credit-holds",
+            action="store_true",
+            help="Skip releasing expired credit reservations",
+        )
+        parser.add_argument(
+            "--skip-analytics-spool",
+            action="store_true",
+            help="Skip draining analytics spool files left by exited workers",
+        )
+        parser.add_argument(
+            "--skip-analytics-rollups",
+            action="store_true",
+            help="Skip refreshing the daily analytics rollups",
+        )
+        parser.add_argument(
+            "--shutdown-timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for running jobs when shutting down",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run every job once, wait for them to finish and exit",
+        )
+
+    def handle(self, *args, **options):
+        self.verbose = options["verbose"]
+        self.shutdown_event = threading.Event()
+        jobs = self.build_jobs(options)
+
+        if not jobs:
+            self.stdout.write(self.style.WARNING("All jobs are skipped - exiting"))
+            return
+
+        web_log = WebLog.log_system_event(
+            event_name="scheduler",
+            description="Long-running automation scheduler",
+            details={
+                "jobs": {
+                    job.job_name: {"command": job.command, "interval": job.interval}
+                    for job in jobs
+                },
+                "jitter": options["jitter"],
+                "dry_run": options["dry_run"],
+            },
+        )
+
+        self.install_signal_handlers()
+        for job in jobs:
+            job.start()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scheduler started with jobs: {', '.join(j.job_name for j in jobs)}"
+            )
+        )
+
+        try:
+            if options["once"]:
+                for job in jobs:
+                    job.trigger()
+                while any(j.is_busy for j in jobs):
+                    if self.shutdown_event.wait(timeout=0.1):
+                        break
+            else:
+                self.run_loop(jobs)
+        finally:
+            self.shutdown(jobs, options["shutdown_timeout"])
+            web_log.mark_completed(
+                items_succeeded=sum(j.runs - j.failures for j in jobs),
+                items_failed=sum(j.failures for j in jobs),
+                details={
+                    "results": {
+                        job.job_name: {
+                            "runs": job.runs,
+                            "failures": job.failures,
+                            "skipped_overlaps": job.skipped,
+                        }
+                        for job in jobs
+                    }
+                },
+            )
+
+    def build_jobs(self, options):
+        common = {"jitter": options["jitter"], "stdout": self.stdout}
+        jobs = []
+
+        if not options["skip_tweets"]:
+            jobs.append(
+                ScheduledJob(
+                    "tweets",
+                    "send_brand_tweets",
+                    options["tweet_interval"],
+                    dry_run=options["dry_run"],
+                    verbose=options["verbose"],
+                    limit=options["limit"],
+                    workers=options["workers"],
+                    **common,
+                )
+            )
+        if not options["skip_instagram"]:
+            jobs.append(
+                ScheduledJob(
+                    "instagram",
+                    "send_brand_instagram_posts",
+                    options["instagram_interval"],
+                    dry_run=options["dry_run"],
+                    verbose=options["verbose"],
+                    limit=options["limit"],
+                    **common,
+                )
+            )
+        if not options["skip_stats"]:
+            jobs.append(
+                ScheduledJob(
+                    "stats",
+                    "collect_system_stats",
+                    options["stats_interval"],
+                    **common,
+                )
+            )
+        if not options["skip_videos"]:
+            # Tasks carry their own backoff; this only sets how often due
+            # tasks are looked for, so it stays short and unjittered
+            jobs.append(
+                ScheduledJob(
+                    "videos",
+                    "poll_video_tasks",
+                    options["video_interval"],
+                    stdout=self.stdout,
+                    verbose=options["verbose"],
+                )
+            )
+        if not options["skip_credit_holds"]:
+            jobs.append(
+                ScheduledJob(
+                    "credit-holds",
+                    "release_credit_holds",
+                    options["credit_hold_interval"],
+                    verbose=options["verbose"],
+                    **common,
+                )
+            )
+        if not options["skip_analytics_spool"]:
+            jobs.append(
+                ScheduledJob(
+                    "analytics-spool",
+                    "flush_analytics_spool",
+                    options["analytics_spool_interval"],
+                    verbose=options["verbose"],
+                    **common,
+                )
+            )
+        if not options["skip_analytics_rollups"]:
+            jobs.append(
+                ScheduledJob(
+                    "analytics-rollups",
+                    "rollup_analytics",
+                    options["analytics_rollup_interval"],
+                    verbose=options["verbose"],
+                    **common,
+                )
+            )
+
+        # Spread the first runs out so jobs don't all fire on the same tick
+        now = time.monotonic()
+        for job in jobs:
+            job.next_run = now + random.uniform(0, options["jitter"])
+
+        return jobs
+
+    def install_signal_handlers(self):
+        def request_shutdown(signum, frame):
+            if self.verbose:
+                self.stdout.write(f"Received signal {signum}, shutting down...")
+            self.shutdown_event.set()
+
+        # Signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, request_shutdown)
+            signal.signal(signal.SIGINT, request_shutdown)
+
+    def run_loop(self, jobs):
+        while not self.shutdown_event.is_set():
+            now = time.monotonic()
+            for job in jobs:
+                if now < job.next_run:
+                    continue
+                if not job.trigger():
+                    logger.warning(
+                        f"Skipping {job.job_name} run: previous run still in progress"
+                    )
+                elif self.verbose:
+                    self.stdout.write(f"Triggered {job.job_name}")
+                job.schedule_next(now)
+
+            wait = min(job.next_run for job in jobs) - time.monotonic()
+            self.shutdown_event.wait(timeout=max(0.1, min(wait, 1.0)))
+
+    def shutdown(self, jobs, timeout):
+        for job in jobs:
+            job.stop()
+
+        deadline = time.monotonic() + timeout
+        for job in jobs:
+            job.join(timeout=max(0, deadline - time.monotonic()))
+
+        still_running = [j.job_name for j in jobs if j.is_alive()]
+        if still_running:
+            logger.warning(
+                f"Scheduler stopped with jobs still running: {still_running}"
+            )
+        self.stdout.write(self.style.SUCCESS("Scheduler stopped"))
@@ -2,9 +2,9 @@ import logging
 import traceback
 
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from django.conf import settings
 from website.models import Brand, BrandInstagramPost, WebLog
+from website.services.instagram_publishing import advance_pending_containers
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -23,7 +23,7 @@ class Command(BaseCommand):
             "--limit",
             type=int,
             default=10,
-            help="Maximum number of brands to process (default: 10)",
+            help="Maximum number of brands to process, 0 for all (default: 10)",
         )
         parser.add_argument(
             "--verbose",
@@ -49,6 +49,7 @@ class Command(BaseCommand):
         self.dry_run = options["dry_run"]
         self.limit = options["limit"]
         self.verbose = options["verbose"]
+        self.worker_id = BrandInstagramPost.default_worker_id()
 
         if self.verbose:
             self.stdout.write("Starting Instagram post automation...")
@@ -57,6 +58,15 @@ class Command(BaseCommand):
             # Report start to Sentry
             # self.report_sentry_cron_checkin(monitor_slug, "in_progress")
 
+            # Free posts whose posting worker died while holding the lease
+            reclaimed = BrandInstagramPost.reclaim_expired()
+            if reclaimed:
+                logger.warning(f"Reclaimed {reclaimed} Instagram posts with expired leases")
+                web_log.details["reclaimed_posts"] = reclaimed
+
+            # Advance Reels whose media containers are still processing
+            publish_summary = self.advance_pending_containers()
+
             # Get ready brands
             ready_brands = self.get_ready_brands()
 
@@ -66,7 +76,7 @@ class Command(BaseCommand):
             processed_count = 0
 
             for brand in ready_brands:
-                if processed_count >= self.limit:
+                if self.limit > 0 and processed_count >= self.limit:
                     if self.verbose:
                         self.stdout.write(f"Reached limit of {self.limit} brands")
                     break
@@ -96,6 +106,7 @@ class Command(BaseCommand):
                 {
                     "brands_processed": processed_count,
                     "brands_found": len(ready_brands),
+                    "containers": publish_summary,
                 }
             )
             web_log.save()
@@ -128,6 +139,21 @@ class Command(BaseCommand):
             self.report_sentry_cron_failure(monitor_slug, error_message)
             raise
 
+    def advance_pending_containers(self):
+        """Poll pending Reel containers once and publish finished ones"""
+        try:
+            summary = advance_pending_containers(dry_run=self.dry_run)
+        except Exception as e:
+            logger.error(f"Error advancing Instagram containers: {str(e)}")
+            return {"error": str(e)}
+
+        if self.verbose and summary["checked"] + summary["published"]:
+            self.stdout.write(
+                f"Containers: {summary['checked']} checked, "
+                f"{summary['published']} published, {summary['failed']} failed"
+            )
+        return summary
+
     def get_ready_brands(self):
         """Get brands that are ready to post to Instagram"""
         if self.verbose:
@@ -206,22 +232,37 @@ class Command(BaseCommand):
 
     def process_brand_posts(self, brand):
         """Process Instagram posts for a specific brand"""
-        now = timezone.now()
-
-        # Check for approved posts ready to be posted
-        approved_posts = BrandInstagramPost.objects.filter(
-            brand=brand, status="approved", scheduled_for__lte=now
-        )
+        if self.dry_run:
+            approved_posts = list(
+                BrandInstagramPost.claimable().filter(brand=brand).order_by(
+                    "scheduled_for"
+                )
+            )
+        else:
+            # Lease the due posts so other workers sharing the queue skip them
+            approved_posts = BrandInstagramPost.claim_ready(
+                worker_id=self.worker_id, brand=brand
+            )
 
         if self.verbose:
             self.stdout.write(
-                f"Found {approved_posts.count()} approved posts ready to post"
+                f"Found {len(approved_posts)} approved posts ready to post"
             )
 
         posted_count = 0
         for post in approved_posts:
-            if self.post_brand_instagram_post(post):
-                posted_count += 1
+            if not self.dry_run and not post.renew_claim(self.worker_id):
+                if self.verbose:
+                    self.stdout.write(
+                        f"Skipping post {post.id}: lease lost to another worker"
+                    )
+                continue
+            try:
+                if self.post_brand_instagram_post(post):
+                    posted_count += 1
+            finally:
+                if not self.dry_run:
+                    post.release_claim()
 
         if self.verbose and posted_count > 0:
             self.stdout.write(
@@ -254,6 +295,13 @@ class Command(BaseCommand):
             success, error = brand_post.post_to_instagram()
 
             if success:
+                if brand_post.status == "publishing":
+                    if self.verbose:
+                        self.stdout.write(
+                            f"Queued Reel container {brand_post.container_id} "
+                            "for publishing"
+                        )
+                    return True
                 if self.verbose:
                     instagram_url = brand_post.get_instagram_url()
                     success_msg = (
@@ -1,10 +1,15 @@
 import logging
 import traceback
+from datetime import timedelta
 
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from django.conf import settings
-from website.models import Brand, WebLog
+from website.models import BrandTweet, WebLog
+from website.services.queue_health import queue_health_snapshot
+from website.services.api_clients import brand_twitter_client
+from website.services.media_preupload import preupload_due_media
+from website.services.rate_limits import RateLimited
+from website.services.tweet_dispatch import BrandDispatcher
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -23,7 +28,36 @@ class Command(BaseCommand):
             "--limit",
             type=int,
             default=10,
-            help="Maximum number of brands to process (default: 10)",
+            help="Maximum number of brands to process, 0 for all (default: 10)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of brands to process concurrently. Tweets within a "
+                "brand are always posted in order (default: 1, serial)"
+            ),
+        )
+        parser.add_argument(
+            "--per-brand-limit",
+            type=int,
+            default=0,
+            help="Maximum tweets to post per brand in one run, 0 for no limit",
+        )
+        parser.add_argument(
+            "--preupload-minutes",
+            type=int,
+            default=120,
+            help=(
+                "Upload media for tweets due within this many minutes ahead of "
+                "time, 0 to disable (default: 120)"
+            ),
+        )
+        parser.add_argument(
+            "--notify-queue",
+            action="store_true",
+            help="Send Slack alerts for brands whose tweet queue is empty or low",
         )
         parser.add_argument(
             "--verbose",
@@ -40,6 +74,10 @@ class Command(BaseCommand):
                 "dry_run": options["dry_run"],
                 "limit": options["limit"],
                 "verbose": options["verbose"],
+                "workers": options["workers"],
+                "per_brand_limit": options["per_brand_limit"],
+                "notify_queue": options["notify_queue"],
+                "preupload_minutes": options["preupload_minutes"],
             },
         )
 
@@ -51,6 +89,12 @@ class Command(BaseCommand):
             self.dry_run = options["dry_run"]
             self.limit = options["limit"]
             self.verbose = options["verbose"]
+            self.workers = max(1, options["workers"])
+            self.worker_id = BrandTweet.default_worker_id()
+            self.per_brand_limit = options["per_brand_limit"]
+            self.notify_queue = options["notify_queue"]
+            self.preupload_minutes = options["preupload_minutes"]
+            self.queue_health = {}
             self.web_log = web_log
 
             if self.verbose:
@@ -58,22 +102,16 @@ class Command(BaseCommand):
                     self.style.SUCCESS("Starting brand tweet processing...")
                 )
 
-            # Early exit if no brands with Twitter configuration exist
-            from website.models import Brand
-
-            brands_with_twitter = Brand.objects.filter(
-                twitter_api_key__isnull=False,
-                twitter_api_secret__isnull=False,
-                twitter_access_token__isnull=False,
-                twitter_access_token_secret__isnull=False,
-            ).exclude(
-                twitter_api_key="",
-                twitter_api_secret="",
-                twitter_access_token="",
-                twitter_access_token_secret="",
-            )
+            # Free tweets whose posting worker died while holding the lease
+            reclaimed = BrandTweet.reclaim_expired()
+            if reclaimed:
+                logger.warning(f"Reclaimed {reclaimed} tweets with expired leases")
+                web_log.details["reclaimed_tweets"] = reclaimed
 
-            if not brands_with_twitter.exists():
+            # One query for every brand's ready count and queue depth
+            self.queue_health = queue_health_snapshot()
+
+            if not self.queue_health:
                 if self.verbose:
                     self.stdout.write(
                         self.style.WARNING(
@@ -94,6 +132,9 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.WARNING("No brands have scheduled tweets ready to post")
                 )
+                if self.notify_queue:
+                    self.notify_queue_health()
+                self.preupload_media()
                 # Mark as completed with no processing
                 web_log.mark_completed(
                     items_succeeded=0,
@@ -104,39 +145,24 @@ class Command(BaseCommand):
                 )
                 return
 
-            # Process each brand
-            processed_count = 0
-            success_count = 0
-            failed_count = 0
+            brands_to_process = (
+                ready_brands[: self.limit] if self.limit > 0 else ready_brands
+            )
 
-            for brand in ready_brands[: self.limit]:
-                try:
-                    if self.process_brand_tweets(brand):
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                    processed_count += 1
-
-                    # Update progress
-                    web_log.update_progress(
-                        items_processed=processed_count,
-                        items_succeeded=success_count,
-                        items_failed=failed_count,
-                        details={
-                            "current_brand": brand.name,
-                            "brands_remaining": len(ready_brands) - processed_count,
-                        },
-                    )
-                except Exception as e:
-                    failed_count += 1
-                    processed_count += 1
-                    logger.error(f"Error processing brand {brand.name}: {str(e)}")
-                    if self.verbose:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f"Error processing brand {brand.name}: {str(e)}"
-                            )
-                        )
+            if self.workers > 1:
+                processed_count, success_count, failed_count = (
+                    self.dispatch_brands_concurrently(brands_to_process, ready_brands)
+                )
+            else:
+                processed_count, success_count, failed_count = (
+                    self.process_brands_serially(brands_to_process, ready_brands)
+                )
+
+            if self.notify_queue:
+                self.notify_queue_health()
+
+            # Due tweets are posted first; then stage media for upcoming ones
+            self.preupload_media()
 
             # Report results
             self.stdout.write(
@@ -179,53 +205,124 @@ class Command(BaseCommand):
             self.report_sentry_cron_failure(monitor_slug, error_message)
             raise
 
-    def get_ready_brands(self):
-        """Get brands that have tweets ready to post"""
-        from django.utils import timezone
-        from website.models import BrandTweet
-
-        # First check if there are any brands with Twitter configuration
-        brands_with_twitter = Brand.objects.filter(
-            twitter_api_key__isnull=False,
-            twitter_api_secret__isnull=False,
-            twitter_access_token__isnull=False,
-            twitter_access_token_secret__isnull=False,
-        ).exclude(
-            twitter_api_key="",
-            twitter_api_secret="",
-            twitter_access_token="",
-            twitter_access_token_secret="",
-        )
+    def process_brands_serially(self, brands, ready_brands):
+        """Process brands one after another in the current thread"""
+        processed_count = 0
+        success_count = 0
+        failed_count = 0
 
-        if not brands_with_twitter.exists():
-            if self.verbose:
-                self.stdout.write(
-                    self.style.WARNING("No brands with Twitter configuration found")
+        for brand in brands:
+            try:
+                if self.process_brand_tweets(brand):
+                    success_count += 1
+                else:
+                    failed_count += 1
+                processed_count += 1
+
+                # Update progress
+                self.web_log.update_progress(
+                    items_processed=processed_count,
+                    items_succeeded=success_count,
+                    items_failed=failed_count,
+                    details={
+                        "current_brand": brand.name,
+                        "brands_remaining": len(ready_brands) - processed_count,
+                    },
                 )
-            return []
+            except Exception as e:
+                failed_count += 1
+                processed_count += 1
+                logger.error(f"Error processing brand {brand.name}: {str(e)}")
+                if self.verbose:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"Error processing brand {brand.name}: {str(e)}"
+                        )
+                    )
 
-        # Check if there are any tweets ready to post
-        ready_tweets = BrandTweet.objects.filter(
-            status="approved",
-            scheduled_for__lte=timezone.now(),
-            brand__in=brands_with_twitter,
-        )
+        return processed_count, success_count, failed_count
 
-        if not ready_tweets.exists():
-            if self.verbose:
-                self.stdout.write(self.style.WARNING("No tweets ready to post"))
-            return []
+    def dispatch_brands_concurrently(self, brands, ready_brands):
+        """Fan brands out across a thread pool of ``self.workers`` threads"""
+        totals = {"processed": 0, "succeeded": 0, "failed": 0, "skipped": 0}
 
-        # Get unique brands that have ready tweets
-        ready_brand_ids = ready_tweets.values_list("brand_id", flat=True).distinct()
-        ready_brands = brands_with_twitter.filter(id__in=ready_brand_ids)
+        def record_result(result):
+            # Runs in the dispatching thread, so WebLog writes stay serial
+            totals["processed"] += 1
+            if result.skipped:
+                totals["skipped"] += 1
+            elif result.success:
+                totals["succeeded"] += 1
+            else:
+                totals["failed"] += 1
+
+            if result.error and self.verbose:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Error processing brand {result.brand_name}: {result.error}"
+                    )
+                )
+
+            self.web_log.update_progress(
+                items_processed=totals["processed"],
+                items_succeeded=totals["succeeded"],
+                items_failed=totals["failed"],
+                details={
+                    "last_completed_brand": result.brand_name,
+                    "brands_remaining": len(ready_brands) - totals["processed"],
+                    "brands_skipped": totals["skipped"],
+                    "workers": self.workers,
+                },
+            )
 
         if self.verbose:
             self.stdout.write(
-                f"Found {ready_brands.count()} brands with tweets ready to post"
+                f"Dispatching {len(brands)} brands across {self.workers} workers"
             )
 
-        return list(ready_brands)
+        dispatcher = BrandDispatcher(
+            self.process_brand_tweets,
+            max_workers=self.workers,
+            on_result=record_result,
+        )
+        dispatcher.dispatch(brands)
+
+        return totals["processed"], totals["succeeded"], totals["failed"]
+
+    def preupload_media(self):
+        """Upload media for tweets due soon so posting is a single call"""
+        if self.preupload_minutes <= 0:
+            return
+        try:
+            summary = preupload_due_media(
+                horizon=timedelta(minutes=self.preupload_minutes),
+                dry_run=self.dry_run,
+            )
+        except Exception as e:
+            logger.error(f"Media pre-upload failed: {str(e)}")
+            return
+        self.web_log.details["preupload"] = summary
+        if self.verbose and any(summary.values()):
+            self.stdout.write(
+                f"Media pre-upload: {summary['uploaded']} uploaded, "
+                f"{summary['failed']} failed, {summary['deferred']} deferred"
+            )
+
+    def get_ready_brands(self):
+        """Get brands that have tweets ready to post, from the queue snapshot"""
+        ready_brands = [
+            health.brand for health in self.queue_health.values() if health.ready
+        ]
+
+        if self.verbose:
+            if ready_brands:
+                self.stdout.write(
+                    f"Found {len(ready_brands)} brands with tweets ready to post"
+                )
+            else:
+                self.stdout.write(self.style.WARNING("No tweets ready to post"))
+
+        return ready_brands
 
     def process_brand_tweets(self, brand):
         """Process tweets for a specific brand"""
@@ -253,20 +350,25 @@ class Command(BaseCommand):
 
     def process_brand_tweet_objects(self, brand):
         """Process BrandTweet objects for a specific brand"""
-        from django.utils import timezone
-        from website.models import BrandTweet
-
         if self.verbose:
             self.stdout.write(f"\nProcessing tweets for brand: {brand.name}")
 
-        # Get approved tweets that are scheduled for now or earlier
-        ready_tweets = BrandTweet.objects.filter(
-            brand=brand,
-            status="approved",
-            scheduled_for__lte=timezone.now(),
-        ).order_by("scheduled_for")
+        if self.dry_run:
+            # Don't take leases in dry-run mode, just report what is due
+            ready_tweets = list(
+                BrandTweet.claimable().filter(brand=brand).order_by("scheduled_for")[
+                    : self.per_brand_limit or None
+                ]
+            )
+        else:
+            # Lease the due tweets so other workers sharing the queue skip them
+            ready_tweets = BrandTweet.claim_ready(
+                worker_id=self.worker_id,
+                limit=self.per_brand_limit or None,
+                brand=brand,
+            )
 
-        if not ready_tweets.exists():
+        if not ready_tweets:
             if self.verbose:
                 self.stdout.write(f"No tweets ready to post for brand {brand.name}")
             return 0
@@ -283,7 +385,18 @@ class Command(BaseCommand):
                     posted_count += 1
                     continue
 
-                success, error = self.post_with_brand_credentials(brand_tweet)
+                # The lease may have expired while earlier tweets were posting
+                if not brand_tweet.renew_claim(self.worker_id):
+                    if self.verbose:
+                        self.stdout.write(
+                            f"Skipping tweet {brand_tweet.id}: lease lost to another worker"
+                        )
+                    continue
+
+                try:
+                    success, error = self.post_with_brand_credentials(brand_tweet)
+                finally:
+                    brand_tweet.release_claim()
 
                 if success:
                     posted_count += 1
@@ -317,49 +430,38 @@ class Command(BaseCommand):
 
         return posted_count
 
-    def check_and_notify_empty_queue(self, brand, posted_count):
-        """Check if brand has empty tweet queue and send Slack notification"""
-        from datetime import timedelta
+    def notify_queue_health(self):
+        """Send queue alerts for every brand in the current snapshot"""
+        for health in self.queue_health.values():
+            self.check_and_notify_empty_queue(health.brand, health=health)
 
-        now = timezone.now()
-        next_24_hours = now + timedelta(hours=24)
-        next_3_days = now + timedelta(days=3)
-        next_week = now + timedelta(days=7)
-
-        # Check for tweets in different time periods
-        tweets_next_24h = brand.brand_tweets.filter(
-            status__in=["approved", "draft"], scheduled_for__range=[now, next_24_hours]
-        ).count()
-
-        tweets_next_3_days = brand.brand_tweets.filter(
-            status__in=["approved", "draft"], scheduled_for__range=[now, next_3_days]
-        ).count()
-
-        tweets_next_week = brand.brand_tweets.filter(
-            status__in=["approved", "draft"], scheduled_for__range=[now, next_week]
-        ).count()
+    def check_and_notify_empty_queue(self, brand, posted_count=None, health=None):
+        """Check if brand has empty tweet queue and send Slack notification"""
+        if health is None:
+            health = queue_health_snapshot(brand_ids=[brand.pk]).get(brand.pk)
+            if health is None:
+                return
 
-        # Total pending tweets (regardless of schedule)
-        total_pending = brand.brand_tweets.filter(
-            status__in=["approved", "draft"]
-        ).count()
+        tweets_next_24h = health.next_24h
+        tweets_next_3_days = health.next_3_days
+        tweets_next_week = health.next_week
+        total_pending = health.total_pending
+        alert_level = health.alert_level
 
         # Send notification if completely empty or running low
-        should_notify = False
+        should_notify = alert_level is not None
         message = ""
 
-        if total_pending == 0:
+        if alert_level == "empty":
             # Completely empty queue
-            should_notify = True
             message = (
                 f"🚨 *URGENT: Tweet Queue Completely Empty* for {brand.name}\n\n"
                 f"❌ No tweets are scheduled at all!\n"
                 f"Your Twitter automation will stop working until new tweets are added.\n\n"
                 f"🔗 **Action Required:** Log in to Gemnar immediately to schedule tweets."
             )
-        elif tweets_next_24h == 0:
+        elif alert_level == "no_24h":
             # No tweets in next 24 hours
-            should_notify = True
             message = (
                 f"⚠️ *Tweet Queue Running Low* for {brand.name}\n\n"
                 f"❌ No tweets scheduled for the next 24 hours\n"
@@ -369,9 +471,8 @@ class Command(BaseCommand):
                 f"   • Total pending: {total_pending} tweets\n\n"
                 f"🔗 Consider adding more tweets to maintain consistent posting."
             )
-        elif tweets_next_3_days <= 2:
+        elif alert_level == "low":
             # Low on tweets for next 3 days
-            should_notify = True
             message = (
                 f"⚠️ *Tweet Queue Low* for {brand.name}\n\n"
                 f"📊 **Status:**\n"
@@ -402,7 +503,8 @@ class Command(BaseCommand):
         # Always log queue status in verbose mode
         if self.verbose:
             self.stdout.write(f"Queue status for {brand.name}:")
-            self.stdout.write(f"  - Posted this run: {posted_count}")
+            if posted_count is not None:
+                self.stdout.write(f"  - Posted this run: {posted_count}")
             self.stdout.write(f"  - Next 24h: {tweets_next_24h}")
             self.stdout.write(f"  - Next 3 days: {tweets_next_3_days}")
             self.stdout.write(f"  - Next 7 days: {tweets_next_week}")
@@ -486,22 +588,20 @@ class Command(BaseCommand):
                 return False, error_msg
 
             # Create Twitter API v2 client using brand credentials
-            client = tweepy.Client(
-                bearer_token=brand.twitter_bearer_token,
-                consumer_key=brand.twitter_api_key,
-                consumer_secret=brand.twitter_api_secret,
-                access_token=brand.twitter_access_token,
-                access_token_secret=brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(brand)
 
             if self.verbose:
                 self.stdout.write(
                     f"Posting tweet with brand {brand.name} credentials..."
                 )
 
+            # Media is normally pre-uploaded; this only uploads if it wasn't
+            media_ids = brand_tweet.get_media_ids()
+
             # Post tweet using API v2
-            response = client.create_tweet(text=brand_tweet.content)
+            response = client.create_tweet(
+                text=brand_tweet.content, media_ids=media_ids
+            )
 
             if response.data:
                 # Update tweet record
@@ -527,11 +627,17 @@ class Command(BaseCommand):
             brand_tweet.error_message = error_msg
             brand_tweet.save()
             return False, error_msg
+        except RateLimited as e:
+            # Leave the tweet approved so a later run posts it
+            error_msg = f"Deferred: {str(e)}"
+            brand_tweet.error_message = error_msg
+            brand_tweet.save(update_fields=["error_message", "updated_at"])
+            return False, error_msg
         except tweepy.TooManyRequests as e:
-            error_msg = f"Twitter API rate limit exceeded: {str(e)}"
-            brand_tweet.status = "failed"
+            # The governor has recorded the reset time; retry on a later run
+            error_msg = f"Deferred: Twitter API rate limit exceeded: {str(e)}"
             brand_tweet.error_message = error_msg
-            brand_tweet.save()
+            brand_tweet.save(update_fields=["error_message", "updated_at"])
             return False, error_msg
         except Exception as e:
             error_msg = f"Error posting to Twitter: {str(e)}"
@@ -0,0 +1,79 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0071_add_missing_flowworkspace_fields"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="brandinstagrampost",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("approved", "Approved"),
+                    ("publishing", "Publishing"),
+                    ("posted", "Posted"),
+                    ("failed", "Failed"),
+                ],
+                default="draft",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="publish_stage",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("container_created", "Container Created"),
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("published", "Published"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                default="none",
+                help_text="Stage of the Instagram media container publish flow",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="container_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Instagram media container (creation) ID awaiting publish",
+                max_length=100,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="container_api_base",
+            field=models.CharField(
+                blank=True,
+                help_text="Graph API host the media container was created on",
+                max_length=100,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="container_created_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the media container was created", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="container_checked_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last time the media container status was polled",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0072_brandinstagrampost_publish_stage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="brandtweet",
+            name="claimed_by",
+            field=models.CharField(
+                blank=True,
+                help_text="Worker currently holding the posting lease",
+                max_length=200,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandtweet",
+            name="claimed_until",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="When the posting lease expires and the row can be reclaimed",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="claimed_by",
+            field=models.CharField(
+                blank=True,
+                help_text="Worker currently holding the posting lease",
+                max_length=200,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="claimed_until",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="When the posting lease expires and the row can be reclaimed",
+                null=True,
+            ),
+        ),
+    ]
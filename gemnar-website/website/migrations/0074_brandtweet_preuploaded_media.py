@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0073_queue_claim_leases"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="brandtweet",
+            name="twitter_media_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Twitter media ID uploaded ahead of posting",
+                max_length=100,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandtweet",
+            name="twitter_media_source",
+            field=models.CharField(
+                blank=True,
+                help_text="Image file the pre-uploaded media ID was created from",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandtweet",
+            name="twitter_media_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When Twitter discards the pre-uploaded media",
+                null=True,
+            ),
+        ),
+    ]
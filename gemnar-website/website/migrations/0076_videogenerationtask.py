@@ -0,0 +1,108 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0075_imagegenerationjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VideoGenerationTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        choices=[
+                            ("runware", "Runware"),
+                            ("kling", "Kling AI"),
+                            ("veo", "Veo 3.1"),
+                            ("sora", "Sora 2"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "task_id",
+                    models.CharField(
+                        help_text="Provider task/generation ID", max_length=255
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("video_url", models.URLField(blank=True, max_length=2000)),
+                ("error_message", models.TextField(blank=True)),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Latest status payload from the provider",
+                        null=True,
+                    ),
+                ),
+                ("poll_count", models.PositiveIntegerField(default=0)),
+                (
+                    "next_poll_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("last_polled_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "instagram_post",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Post the finished video is saved to",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="video_generation_tasks",
+                        to="website.brandinstagrampost",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="video_generation_tasks",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "unique_together": {("provider", "task_id")},
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_poll_at"],
+                        name="website_vid_status_0cd945_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
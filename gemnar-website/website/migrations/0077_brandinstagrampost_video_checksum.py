@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0076_videogenerationtask"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="brandinstagrampost",
+            name="video_checksum",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 of the downloaded video file",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,91 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0077_brandinstagrampost_video_checksum"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CreditReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Credits held for the job",
+                        max_digits=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("held", "Held"),
+                            ("captured", "Captured"),
+                            ("released", "Released"),
+                        ],
+                        default="held",
+                        max_length=20,
+                    ),
+                ),
+                ("description", models.TextField(blank=True)),
+                ("service_used", models.CharField(blank=True, max_length=100)),
+                ("api_request_id", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        help_text="Holds still open after this are released automatically"
+                    ),
+                ),
+                ("settled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="credit_reservations",
+                        to="website.brand",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        blank=True,
+                        help_text="Usage transaction written when the hold was captured",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reservation",
+                        to="website.credittransaction",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Credit Reservation",
+                "verbose_name_plural": "Credit Reservations",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "expires_at"],
+                        name="website_cre_status_3b8c83_idx",
+                    ),
+                    models.Index(
+                        fields=["brand", "status"],
+                        name="website_cre_brand_i_5f296c_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,112 @@
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0078_creditreservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("sessions", models.IntegerField(default=0)),
+                ("bounced_sessions", models.IntegerField(default=0)),
+                ("session_duration_sum", models.BigIntegerField(default=0)),
+                ("session_duration_count", models.IntegerField(default=0)),
+                ("activity_duration_sum", models.FloatField(default=0)),
+                ("activity_duration_count", models.IntegerField(default=0)),
+                ("devices", models.JSONField(default=dict)),
+                ("browsers", models.JSONField(default=dict)),
+                ("pageviews", models.IntegerField(default=0)),
+                ("load_time_sum", models.BigIntegerField(default=0)),
+                ("load_time_count", models.IntegerField(default=0)),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="website.analyticsproject",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "analytics_daily_stats",
+                "indexes": [
+                    models.Index(
+                        fields=["computed_at"], name="analytics_d_compute_442dd4_idx"
+                    )
+                ],
+                "unique_together": {("project", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AnalyticsDailyPageStats",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("path", models.CharField(max_length=500)),
+                ("url", models.URLField(blank=True)),
+                ("views", models.IntegerField(default=0)),
+                ("sessions", models.IntegerField(default=0)),
+                ("exits", models.IntegerField(default=0)),
+                ("duration_sum", models.BigIntegerField(default=0)),
+                ("duration_count", models.IntegerField(default=0)),
+                ("load_time_sum", models.BigIntegerField(default=0)),
+                ("load_time_count", models.IntegerField(default=0)),
+                ("dom_loaded_sum", models.BigIntegerField(default=0)),
+                ("dom_loaded_count", models.IntegerField(default=0)),
+                ("first_paint_sum", models.BigIntegerField(default=0)),
+                ("first_paint_count", models.IntegerField(default=0)),
+                ("lcp_sum", models.BigIntegerField(default=0)),
+                ("lcp_count", models.IntegerField(default=0)),
+                ("fid_sum", models.FloatField(default=0)),
+                ("fid_count", models.IntegerField(default=0)),
+                ("load_fast", models.IntegerField(default=0)),
+                ("load_average", models.IntegerField(default=0)),
+                ("load_slow", models.IntegerField(default=0)),
+                ("scroll_depth_sum", models.BigIntegerField(default=0)),
+                ("clicks", models.BigIntegerField(default=0)),
+                ("form_interactions", models.BigIntegerField(default=0)),
+                ("hourly", models.JSONField(default=dict)),
+                ("devices", models.JSONField(default=dict)),
+                ("browsers", models.JSONField(default=dict)),
+                ("referrers", models.JSONField(default=dict)),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_page_stats",
+                        to="website.analyticsproject",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "analytics_daily_page_stats",
+                "unique_together": {("project", "date", "path")},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0079_analytics_daily_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="brandtweet",
+            name="twitter_media_failures",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Failed media pre-uploads since the last successful one",
+            ),
+        ),
+        migrations.AddField(
+            model_name="brandtweet",
+            name="twitter_media_retry_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a failed media pre-upload may be tried again",
+                null=True,
+            ),
+        ),
+    ]
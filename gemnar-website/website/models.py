@@ -752,6 +752,7 @@ class Brand(models.Model):
     def delete_tweet_from_twitter(self, twitter_id):
         """Delete a tweet from Twitter using this brand's API credentials"""
         import tweepy
+        from .services.api_clients import brand_twitter_client
         import logging
 
         logger = logging.getLogger(__name__)
@@ -764,14 +765,7 @@ class Brand(models.Model):
 
         try:
             # Create Twitter API client
-            client = tweepy.Client(
-                bearer_token=self.twitter_bearer_token,
-                consumer_key=self.twitter_api_key,
-                consumer_secret=self.twitter_api_secret,
-                access_token=self.twitter_access_token,
-                access_token_secret=self.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(self)
 
             # Delete the tweet
             response = client.delete_tweet(twitter_id)
@@ -886,53 +880,29 @@ class Brand(models.Model):
         scheduled_today = self.get_tweets_scheduled_today()
         return scheduled_today < daily_limit
 
-    def get_next_available_time_slot(self):
+    def get_next_available_time_slot(self, exclude_tweet=None, daily_limit=None):
         """Get the next available time slot for scheduling a tweet"""
-        from django.utils import timezone
-        import datetime
-
-        daily_limit = self.get_daily_tweet_limit()
-        if daily_limit == 0:
-            return None
+        slots = self.get_next_available_time_slots(
+            1, exclude_tweet=exclude_tweet, daily_limit=daily_limit
+        )
+        return slots[0] if slots else None
 
-        now = timezone.now()
+    def get_next_available_time_slots(self, count, exclude_tweet=None, daily_limit=None):
+        """Get up to ``count`` distinct free time slots within the next 30 days
 
-        # Check today first
-        today = now.date()
-        scheduled_today = self.get_tweets_scheduled_today()
+        ``daily_limit`` can be passed when the caller already looked up the
+        plan, saving a second Stripe round trip.
+        """
+        from .services.tweet_slots import TweetSlotIndex
 
-        if scheduled_today < daily_limit:
-            # Find next available hour today (9 AM to 8 PM)
-            current_hour = now.hour
-            for hour in range(max(9, current_hour + 1), 21):  # 9 AM to 8 PM
-                potential_time = now.replace(
-                    hour=hour, minute=0, second=0, microsecond=0
-                )
-                if potential_time > now:
-                    # Check if this time slot is already taken
-                    existing_tweets = self.brand_tweets.filter(
-                        scheduled_for__hour=hour,
-                        scheduled_for__date=today,
-                        status__in=["draft", "approved"],
-                    ).count()
-
-                    if existing_tweets == 0:
-                        return potential_time
-
-        # If no slots today, find next day with available slots
-        for days_ahead in range(1, 30):  # Check next 30 days
-            check_date = today + datetime.timedelta(days=days_ahead)
-            scheduled_that_day = self.brand_tweets.filter(
-                scheduled_for__date=check_date, status__in=["draft", "approved"]
-            ).count()
-
-            if scheduled_that_day < daily_limit:
-                # Return 9 AM on that day
-                return timezone.make_aware(
-                    datetime.datetime.combine(check_date, datetime.time(9, 0))
-                )
+        if daily_limit is None:
+            daily_limit = self.get_daily_tweet_limit()
+        if daily_limit == 0:
+            return []
 
-        return None
+        exclude = [exclude_tweet.pk] if exclude_tweet else []
+        index = TweetSlotIndex(self, daily_limit=daily_limit, exclude=exclude)
+        return index.next_free_slots(count)
 
     def has_sufficient_credits(self, amount):
         """Check if brand has sufficient credits for a transaction"""
@@ -940,44 +910,22 @@ class Brand(models.Model):
 
     def deduct_credits(self, amount, description="", transaction_type="usage"):
         """Deduct credits from brand balance with transaction record"""
-        from decimal import Decimal
-
-        amount = Decimal(str(amount))
-        if not self.has_sufficient_credits(amount):
-            return False, "Insufficient credits"
-
-        # Deduct credits
-        self.credits_balance -= amount
-        self.save(update_fields=["credits_balance"])
+        from website.services import credit_ledger
 
-        # Create transaction record
-        CreditTransaction.objects.create(
-            brand=self,
-            transaction_type=transaction_type,
-            amount=-amount,  # Negative for deduction
-            description=description,
-            balance_after=self.credits_balance,
+        entry = credit_ledger.deduct(
+            self, amount, description=description, transaction_type=transaction_type
         )
+        if entry is None:
+            return False, "Insufficient credits"
 
         return True, "Credits deducted successfully"
 
     def add_credits(self, amount, description="", transaction_type="purchase"):
         """Add credits to brand balance with transaction record"""
-        from decimal import Decimal
+        from website.services import credit_ledger
 
-        amount = Decimal(str(amount))
-
-        # Add credits
-        self.credits_balance += amount
-        self.save(update_fields=["credits_balance"])
-
-        # Create transaction record
-        CreditTransaction.objects.create(
-            brand=self,
-            transaction_type=transaction_type,
-            amount=amount,  # Positive for addition
-            description=description,
-            balance_after=self.credits_balance,
+        credit_ledger.add(
+            self, amount, description=description, transaction_type=transaction_type
         )
 
         return True, "Credits added successfully"
@@ -1501,6 +1449,7 @@ class Tweet(models.Model):
         """Post the tweet to Twitter using Tweepy"""
         try:
             import tweepy
+            from .services.rate_limits import governed_twitter_api
             from django.utils import timezone
 
             # Get user from configuration
@@ -1521,7 +1470,7 @@ class Tweet(models.Model):
             )
 
             # Create API object
-            api = tweepy.API(auth)
+            api = governed_twitter_api(auth)
 
             # Post tweet
             tweet = api.update_status(self.content)
@@ -1662,7 +1611,155 @@ class Tweet(models.Model):
             return False
 
 
-class BrandTweet(models.Model):
+class QueueClaimMixin(models.Model):
+    """Lease-based claims so several posting workers can share a queue.
+
+    Workers call ``claim_ready`` to lock a batch of due rows with
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` and stamp them with a lease. Rows
+    whose lease has expired (e.g. the worker died mid-post) become claimable
+    again, so stuck rows are reclaimed automatically.
+    """
+
+    DEFAULT_LEASE_SECONDS = 600
+
+    claimed_by = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Worker currently holding the posting lease",
+    )
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="When the posting lease expires and the row can be reclaimed",
+    )
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def default_worker_id():
+        """Identify this process across nodes (hostname:pid)"""
+        import os
+        import socket
+
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def claimable(cls, now=None):
+        """Approved, due rows that nobody holds a live lease on"""
+        now = now or timezone.now()
+        return cls.objects.filter(
+            status="approved", scheduled_for__lte=now
+        ).filter(models.Q(claimed_until__isnull=True) | models.Q(claimed_until__lt=now))
+
+    @classmethod
+    def claim_ready(cls, worker_id=None, limit=None, lease_seconds=None, **filters):
+        """Claim up to ``limit`` due rows for ``worker_id``.
+
+        Rows locked by another worker's transaction are skipped rather than
+        waited on. Returns the claimed rows ordered by ``scheduled_for``.
+        """
+        from datetime import timedelta
+        from django.db import transaction
+
+        worker_id = worker_id or cls.default_worker_id()
+        now = timezone.now()
+        lease_until = now + timedelta(
+            seconds=lease_seconds or cls.DEFAULT_LEASE_SECONDS
+        )
+
+        with transaction.atomic():
+            candidates = (
+                cls.claimable(now)
+                .filter(**filters)
+                .select_for_update(skip_locked=True)
+                .order_by("scheduled_for", "pk")
+            )
+            if limit:
+                candidates = candidates[:limit]
+            ids = list(candidates.values_list("pk", flat=True))
+            if not ids:
+                return []
+
+            # Re-check the lease in the UPDATE so backends without row locks
+            # (SQLite) still can't hand the same row to two workers.
+            cls.claimable(now).filter(pk__in=ids).update(
+                claimed_by=worker_id, claimed_until=lease_until
+            )
+
+        return list(
+            cls.objects.filter(
+                pk__in=ids, claimed_by=worker_id, claimed_until=lease_until
+            )
+            .select_related("brand")
+            .order_by("scheduled_for", "pk")
+        )
+
+    @classmethod
+    def reclaim_expired(cls):
+        """Clear expired leases on rows that were never finished"""
+        return cls.objects.filter(
+            status="approved", claimed_until__lt=timezone.now()
+        ).update(claimed_by="", claimed_until=None)
+
+    def claim(self, worker_id=None, lease_seconds=None, **conditions):
+        """Lease this single row if it is unclaimed and matches ``conditions``"""
+        from datetime import timedelta
+
+        worker_id = worker_id or self.default_worker_id()
+        now = timezone.now()
+        lease_until = now + timedelta(
+            seconds=lease_seconds or self.DEFAULT_LEASE_SECONDS
+        )
+        claimed = (
+            type(self)
+            .objects.filter(pk=self.pk, **conditions)
+            .filter(
+                models.Q(claimed_until__isnull=True) | models.Q(claimed_until__lt=now)
+            )
+            .update(claimed_by=worker_id, claimed_until=lease_until)
+        )
+        if claimed:
+            self.claimed_by = worker_id
+            self.claimed_until = lease_until
+        return bool(claimed)
+
+    def renew_claim(self, worker_id=None, lease_seconds=None):
+        """Extend this row's lease if ``worker_id`` still holds it.
+
+        Call right before posting; a False return means the lease expired and
+        another worker may have taken the row, so it must not be posted.
+        """
+        from datetime import timedelta
+
+        worker_id = worker_id or self.default_worker_id()
+        now = timezone.now()
+        lease_until = now + timedelta(
+            seconds=lease_seconds or self.DEFAULT_LEASE_SECONDS
+        )
+        renewed = (
+            type(self)
+            .objects.filter(
+                pk=self.pk,
+                status="approved",
+                claimed_by=worker_id,
+                claimed_until__gte=now,
+            )
+            .update(claimed_until=lease_until)
+        )
+        if renewed:
+            self.claimed_until = lease_until
+        return bool(renewed)
+
+    def release_claim(self):
+        """Drop the lease once the row has been posted or failed"""
+        type(self).objects.filter(pk=self.pk).update(claimed_by="", claimed_until=None)
+        self.claimed_by = ""
+        self.claimed_until = None
+
+
+class BrandTweet(QueueClaimMixin):
     """Brand-specific tweets with AI generation and image support"""
 
     STATUS_CHOICES = [
@@ -1672,6 +1769,9 @@ class BrandTweet(models.Model):
         ("failed", "Failed"),
     ]
 
+    # Re-upload media that would expire within this long of posting
+    MEDIA_EXPIRY_MARGIN_SECONDS = 10 * 60
+
     brand = models.ForeignKey(
         Brand, on_delete=models.CASCADE, related_name="brand_tweets"
     )
@@ -1682,6 +1782,31 @@ class BrandTweet(models.Model):
         null=True,
         help_text="Optional image for the tweet",
     )
+    # Media uploaded ahead of the scheduled time (see services.media_preupload)
+    twitter_media_id = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Twitter media ID uploaded ahead of posting",
+    )
+    twitter_media_source = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Image file the pre-uploaded media ID was created from",
+    )
+    twitter_media_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When Twitter discards the pre-uploaded media",
+    )
+    twitter_media_failures = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Failed media pre-uploads since the last successful one",
+    )
+    twitter_media_retry_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a failed media pre-upload may be tried again",
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
     tweet_id = models.CharField(
         max_length=100,
@@ -1853,6 +1978,64 @@ class BrandTweet(models.Model):
             and bool(self.content.strip())
         )
 
+    def has_preuploaded_media(self, at=None):
+        """True if the stored media ID is for the current image and still usable"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        if not (self.image and self.twitter_media_id and self.twitter_media_expires_at):
+            return False
+        if self.twitter_media_source != self.image.name:
+            return False
+        deadline = (at or timezone.now()) + timedelta(
+            seconds=self.MEDIA_EXPIRY_MARGIN_SECONDS
+        )
+        return self.twitter_media_expires_at > deadline
+
+    def upload_media(self):
+        """Upload the image through the v1.1 API and remember the media ID"""
+        from datetime import timedelta
+        import tweepy
+        from django.utils import timezone
+        from .services.api_clients import brand_twitter_api
+        from .services.rate_limits import find_rate_limited
+
+        try:
+            media = brand_twitter_api(self.brand).media_upload(filename=self.image.path)
+        except tweepy.TweepyException as e:
+            # tweepy.API wraps governor refusals; surface them to the caller
+            rate_limited = find_rate_limited(e)
+            if rate_limited:
+                raise rate_limited
+            raise
+
+        expires_in = getattr(media, "expires_after_secs", None) or 24 * 60 * 60
+        self.twitter_media_id = str(media.media_id)
+        self.twitter_media_source = self.image.name
+        self.twitter_media_expires_at = timezone.now() + timedelta(seconds=expires_in)
+        self.twitter_media_failures = 0
+        self.twitter_media_retry_at = None
+        if self.pk:
+            self.save(
+                update_fields=[
+                    "twitter_media_id",
+                    "twitter_media_source",
+                    "twitter_media_expires_at",
+                    "twitter_media_failures",
+                    "twitter_media_retry_at",
+                    "updated_at",
+                ]
+            )
+        return self.twitter_media_id
+
+    def get_media_ids(self):
+        """Media IDs for ``create_tweet``, uploading only if not done ahead"""
+        if not self.image:
+            return None
+        if self.has_preuploaded_media():
+            return [self.twitter_media_id]
+        return [self.upload_media()]
+
     @classmethod
     def has_posted_tweets(cls, brand=None):
         """Check if there are any posted tweets for the brand"""
@@ -1865,6 +2048,8 @@ class BrandTweet(models.Model):
         """Post the tweet to Twitter using the brand's API keys"""
         try:
             import tweepy
+            from .services.api_clients import brand_twitter_client
+            from .services.rate_limits import RateLimited, find_rate_limited
             from django.utils import timezone
 
             # Check if tweet can be posted
@@ -1879,34 +2064,16 @@ class BrandTweet(models.Model):
             brand = self.brand
 
             # Initialize Twitter API client
-            client = tweepy.Client(
-                bearer_token=brand.twitter_bearer_token,
-                consumer_key=brand.twitter_api_key,
-                consumer_secret=brand.twitter_api_secret,
-                access_token=brand.twitter_access_token,
-                access_token_secret=brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(brand)
 
-            # Handle media upload if image is present
+            # Media is normally uploaded ahead of time; upload now only if not
             media_ids = None
             if self.image:
                 try:
-                    # Create API v1.1 client for media upload (required for v2 media uploads)
-                    api = tweepy.API(
-                        tweepy.OAuth1UserHandler(
-                            consumer_key=self.brand.twitter_api_key,
-                            consumer_secret=self.brand.twitter_api_secret,
-                            access_token=self.brand.twitter_access_token,
-                            access_token_secret=self.brand.twitter_access_token_secret,
-                        ),
-                        wait_on_rate_limit=True,
-                    )
-
-                    # Upload media using API v1.1
-                    media = api.media_upload(filename=self.image.path)
-                    media_ids = [media.media_id]
+                    media_ids = self.get_media_ids()
                 except Exception as e:
+                    if find_rate_limited(e) or isinstance(e, tweepy.TooManyRequests):
+                        return self._defer_rate_limited(e)
                     self.status = "failed"
                     self.error_message = f"Failed to upload image: {str(e)}"
                     self.save()
@@ -1948,12 +2115,8 @@ class BrandTweet(models.Model):
                 self.error_message = error_msg
                 self.save()
                 return False, error_msg
-            except tweepy.TooManyRequests:
-                error_msg = "Twitter API rate limit exceeded"
-                self.status = "failed"
-                self.error_message = error_msg
-                self.save()
-                return False, error_msg
+            except (RateLimited, tweepy.TooManyRequests) as e:
+                return self._defer_rate_limited(e)
             except Exception as api_error:
                 error_msg = f"Twitter API error: {str(api_error)}"
                 self.status = "failed"
@@ -1968,6 +2131,13 @@ class BrandTweet(models.Model):
             self.save()
             return False, error_msg
 
+    def _defer_rate_limited(self, error):
+        """Keep the tweet approved after a rate limit so a later run posts it"""
+        error_msg = f"Deferred: Twitter API rate limit exceeded ({str(error)})"
+        self.error_message = error_msg
+        self.save(update_fields=["error_message", "updated_at"])
+        return False, error_msg
+
     def get_twitter_url(self):
         """Generate Twitter URL for this tweet"""
         if self.tweet_id and self.brand.twitter_username:
@@ -1977,41 +2147,22 @@ class BrandTweet(models.Model):
     def refresh_metrics(self):
         """Refresh Twitter metrics from the API"""
         try:
-            import tweepy
-            from django.utils import timezone
+            from .services.tweet_metrics import refresh_tweet_metrics
 
             # Only refresh metrics for posted tweets with a tweet_id
             if self.status != "posted" or not self.tweet_id:
                 return False, "Tweet must be posted and have a tweet_id"
 
-            # Initialize Twitter API client
-            client = tweepy.Client(
-                bearer_token=self.brand.twitter_bearer_token,
-                consumer_key=self.brand.twitter_api_key,
-                consumer_secret=self.brand.twitter_api_secret,
-                access_token=self.brand.twitter_access_token,
-                access_token_secret=self.brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            if not self.brand.has_twitter_config:
+                return False, "Brand does not have Twitter API configuration"
 
-            # Get tweet metrics
-            tweet = client.get_tweet(
-                self.tweet_id,
-                tweet_fields=["public_metrics", "created_at"],
-            )
-
-            if tweet.data:
-                metrics = tweet.data.public_metrics
-                self.like_count = metrics.get("like_count", 0)
-                self.retweet_count = metrics.get("retweet_count", 0)
-                self.reply_count = metrics.get("reply_count", 0)
-                self.quote_count = metrics.get("quote_count", 0)
-                self.bookmark_count = metrics.get("bookmark_count", 0)
-                self.metrics_last_updated = timezone.now()
-                self.save()
+            # Same batched path the refresh_tweet_metrics command uses
+            summary = refresh_tweet_metrics([self])
+            if summary["updated"]:
                 return True, "Metrics updated successfully"
-            else:
-                return False, "No metrics data available"
+            if summary["errors"]:
+                return False, f"Error fetching metrics: {summary['errors'][0]}"
+            return False, "No metrics data available"
 
         except Exception as e:
             return False, f"Error fetching metrics: {str(e)}"
@@ -2149,9 +2300,14 @@ class TweetStrategy(models.Model):
     def __str__(self):
         return f"{self.get_category_display()}: {self.name}"
 
-    def generate_tweet_for_brand(self, brand, **kwargs):
-        """Generate a tweet using this strategy for a specific brand"""
+    def generate_tweet_for_brand(self, brand, bypass_cache=True, **kwargs):
+        """Generate a tweet using this strategy for a specific brand.
+
+        Every call drafts a new tweet, so the LLM generation cache is only
+        consulted when ``bypass_cache=False`` is passed explicitly.
+        """
         from django.core.exceptions import ValidationError
+        from website.services.generation_cache import cached_chat_completion
         from website.utils import get_openai_client
 
         formatted_prompt = ""  # Initialize to avoid UnboundLocalError
@@ -2175,7 +2331,8 @@ class TweetStrategy(models.Model):
             formatted_prompt = self.prompt_template.format(**context)
 
             # Generate tweet content using OpenAI
-            response = client.chat.completions.create(
+            tweet_content, cached = cached_chat_completion(
+                client,
                 model="gpt-4",
                 messages=[
                     {
@@ -2184,12 +2341,11 @@ class TweetStrategy(models.Model):
                     },
                     {"role": "user", "content": formatted_prompt},
                 ],
+                bypass=bypass_cache,
                 max_tokens=100,
                 temperature=0.7,
             )
 
-            tweet_content = response.choices[0].message.content.strip()
-
             # Update usage count
             self.usage_count += 1
             self.save(update_fields=["usage_count"])
@@ -2199,6 +2355,7 @@ class TweetStrategy(models.Model):
                 "strategy_used": self.name,
                 "prompt_used": formatted_prompt,
                 "success": True,
+                "cached": cached,
             }
 
         except Exception as e:
@@ -2213,7 +2370,7 @@ class TweetStrategy(models.Model):
     def refresh_metrics(self):
         """Refresh Twitter metrics from the API"""
         try:
-            import tweepy
+            from .services.api_clients import brand_twitter_client
             from django.utils import timezone
 
             # Simple rate limiting: prevent multiple simultaneous calls
@@ -2238,14 +2395,7 @@ class TweetStrategy(models.Model):
                         return False, "Metrics were recently updated, skipping refresh"
 
                 # Create Twitter API v2 client
-                client = tweepy.Client(
-                    bearer_token=self.brand.twitter_bearer_token,
-                    consumer_key=self.brand.twitter_api_key,
-                    consumer_secret=self.brand.twitter_api_secret,
-                    access_token=self.brand.twitter_access_token,
-                    access_token_secret=self.brand.twitter_access_token_secret,
-                    wait_on_rate_limit=True,
-                )
+                client = brand_twitter_client(self.brand)
 
                 # Fetch tweet with public metrics
                 tweet = client.get_tweet(
@@ -2339,16 +2489,28 @@ class TweetStrategy(models.Model):
             return False
 
 
-class BrandInstagramPost(models.Model):
+class BrandInstagramPost(QueueClaimMixin):
     """Brand-specific Instagram posts with AI generation and image support"""
 
     STATUS_CHOICES = [
         ("draft", "Draft"),
         ("approved", "Approved"),
+        ("publishing", "Publishing"),
         ("posted", "Posted"),
         ("failed", "Failed"),
     ]
 
+    PUBLISH_STAGE_CHOICES = [
+        ("none", "None"),
+        ("container_created", "Container Created"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("published", "Published"),
+        ("failed", "Failed"),
+    ]
+
+    GRAPH_API_VERSION = "v18.0"
+
     brand = models.ForeignKey(
         Brand, on_delete=models.CASCADE, related_name="brand_instagram_posts"
     )
@@ -2418,6 +2580,11 @@ class BrandInstagramPost(models.Model):
         default="low",
         help_text="Quality setting for video generation",
     )
+    video_checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the downloaded video file",
+    )
 
     # Video generation async tracking
     video_generation_task_uuid = models.CharField(
@@ -2439,6 +2606,34 @@ class BrandInstagramPost(models.Model):
         help_text="Status of video generation task",
     )
 
+    # Staged publishing (media container lifecycle)
+    publish_stage = models.CharField(
+        max_length=20,
+        choices=PUBLISH_STAGE_CHOICES,
+        default="none",
+        db_index=True,
+        help_text="Stage of the Instagram media container publish flow",
+    )
+    container_id = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text="Instagram media container (creation) ID awaiting publish",
+    )
+    container_api_base = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Graph API host the media container was created on",
+    )
+    container_created_at = models.DateTimeField(
+        null=True, blank=True, help_text="When the media container was created"
+    )
+    container_checked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Last time the media container status was polled",
+    )
+
     # Asset management - allows using custom brand assets
     assets = models.ManyToManyField(
         BrandAsset,
@@ -2528,8 +2723,29 @@ class BrandInstagramPost(models.Model):
             and has_subscription
         )
 
+    def get_publish_access_token(self):
+        """Return the access token to publish with and the field it came from"""
+        # Prefer explicit long-lived user token if present; fall back
+        # to legacy access token.
+        if self.brand.instagram_user_token and self.brand.instagram_user_token.strip():
+            return self.brand.instagram_user_token, "instagram_user_token"
+        return self.brand.instagram_access_token, "instagram_access_token"
+
     def post_to_instagram(self):
-        """Post this to Instagram using brand's credentials"""
+        """Post this to Instagram using brand's credentials.
+
+        Image posts are published immediately. Video posts (Reels) stop once
+        the media container is created and are moved to ``publishing``; the
+        publish poller (``website.services.instagram_publishing``) advances
+        them through processing to published on later ticks.
+        """
+        from .services.api_clients import graph_session
+        from .services.rate_limits import (
+            RateLimited,
+            governor,
+            instagram_credential_key,
+        )
+
         try:
             import requests
             from django.utils import timezone
@@ -2549,17 +2765,7 @@ class BrandInstagramPost(models.Model):
                 self.save()
                 return False, error_msg
 
-            # Select the best available access token.
-            # Prefer explicit long-lived user token if present; fall back
-            # to legacy access token.
-            access_token = (
-                self.brand.instagram_user_token
-                if (
-                    self.brand.instagram_user_token
-                    and self.brand.instagram_user_token.strip()
-                )
-                else self.brand.instagram_access_token
-            )
+            access_token, token_field = self.get_publish_access_token()
             user_id = self.brand.instagram_user_id
 
             # Validate Instagram credentials before making API calls
@@ -2583,6 +2789,14 @@ class BrandInstagramPost(models.Model):
                 self.save()
                 return False, error_msg
 
+            # Defer instead of calling Graph while this account is rate limited
+            rate_limit_key = instagram_credential_key(self.brand)
+            retry_at = governor.blocked_until(rate_limit_key, "graph_publish")
+            if retry_at:
+                raise RateLimited(rate_limit_key, "graph_publish", retry_at)
+            governor.acquire(rate_limit_key, "graph")
+            graph = graph_session(self.brand)
+
             # Detect likely Basic Display API tokens. IGQV tokens are classic Basic Display long-lived tokens.
             # IGAA prefixes are sometimes seen in valid Graph tokens; don't hard fail on IGAA, just note.
             if access_token.startswith("IGQV"):
@@ -2645,14 +2859,6 @@ class BrandInstagramPost(models.Model):
                 bool(access_token),
             )
 
-            # Track which token field we are using (explicit user token
-            # preferred)
-            token_field = (
-                "instagram_user_token"
-                if self.brand.instagram_user_token
-                else "instagram_access_token"
-            )
-
             # Prepare post data
             post_data = {
                 "access_token": access_token,
@@ -2857,7 +3063,7 @@ class BrandInstagramPost(models.Model):
                 # (previously working configuration for this project),
                 # fallback to graph.facebook.com only if we hit token /
                 # parameter style errors.
-                api_version = "v18.0"
+                api_version = self.GRAPH_API_VERSION
                 graph_bases = [
                     "https://graph.instagram.com",  # primary
                     "https://graph.facebook.com",  # fallback
@@ -2876,7 +3082,7 @@ class BrandInstagramPost(models.Model):
                         "fields": "id,username,account_type",
                         "access_token": access_token,
                     }
-                    pre_resp = requests.get(
+                    pre_resp = graph.get(
                         preflight_url, params=preflight_params, timeout=10
                     )
                     print(
@@ -2997,7 +3203,8 @@ class BrandInstagramPost(models.Model):
                     print(f"  has_media(): {self.has_media()}")
                     print(f"  can_be_posted(): {self.can_be_posted()}")
 
-                container_response = requests.post(container_url, data=post_data)
+                container_response = graph.post(container_url, data=post_data)
+                governor.record_response(rate_limit_key, "graph", container_response)
 
                 # If first attempt failed with likely domain-related error, try fallback base
                 if (
@@ -3021,7 +3228,7 @@ class BrandInstagramPost(models.Model):
                         print(
                             f"DEBUG: Retrying container creation with fallback domain {fallback_base}"
                         )
-                        fb_resp = requests.post(fallback_url, data=post_data)
+                        fb_resp = graph.post(fallback_url, data=post_data)
                         if fb_resp.status_code == 200:
                             container_response = fb_resp
                             chosen_base = fallback_base
@@ -3163,7 +3370,7 @@ class BrandInstagramPost(models.Model):
                                     _logging.getLogger(__name__).warning(
                                         f"Retrying container creation with alternate token field {token_field}."
                                     )
-                                    container_response = requests.post(
+                                    container_response = graph.post(
                                         container_url, data=post_data
                                     )
                                     print(
@@ -3385,310 +3592,287 @@ class BrandInstagramPost(models.Model):
                     return False, error_msg
                 creation_id = container_data.get("id")
 
-                # For video posts, we need to wait for Instagram to finish processing
+                # Reels are processed asynchronously by Instagram. Persist the
+                # container and let the publish poller advance it on later
+                # ticks instead of holding this process until it finishes.
                 if self.is_video_post:
-                    print(f"DEBUG: Video container created with ID: {creation_id}")
-                    print("DEBUG: Checking container status before publishing...")
-
-                    # Check container status until it's ready
-                    max_attempts = 30  # Wait up to 5 minutes (30 attempts * 10 seconds)
-                    attempt = 0
-                    container_ready = False
-
-                    while attempt < max_attempts and not container_ready:
-                        # Check container status
-                        status_url = f"{chosen_base}/{api_version}/{creation_id}"
-                        status_params = {
-                            "fields": "status_code",
-                            "access_token": access_token,
-                        }
-
-                        try:
-                            status_response = requests.get(
-                                status_url, params=status_params
-                            )
-                            print(
-                                f"DEBUG: Status check attempt {attempt + 1}: HTTP {status_response.status_code}"
-                            )
-
-                            if status_response.status_code == 200:
-                                status_data = status_response.json()
-                                container_status = status_data.get(
-                                    "status_code", "unknown"
-                                )
-                                print(f"DEBUG: Container status: {container_status}")
-
-                                if container_status == "FINISHED":
-                                    container_ready = True
-                                    print("DEBUG: Container is ready for publishing!")
-                                    break
-                                elif container_status == "ERROR":
-                                    error_msg = "Instagram video processing failed. Container status: ERROR"
-                                    self.status = "failed"
-                                    self.error_message = error_msg
-                                    self.save()
-                                    return False, error_msg
-                                else:
-                                    # Status is IN_PROGRESS or similar, wait and retry
-                                    print(
-                                        f"DEBUG: Container still processing (status: {container_status}), waiting 10 seconds..."
-                                    )
-                                    import time
-
-                                    time.sleep(10)
-                            else:
-                                print(
-                                    f"DEBUG: Status check failed: {status_response.text}"
-                                )
-                                import time
-
-                                time.sleep(10)
+                    self.container_id = creation_id
+                    self.container_api_base = chosen_base
+                    self.container_created_at = timezone.now()
+                    self.container_checked_at = None
+                    self.publish_stage = "container_created"
+                    self.status = "publishing"
+                    self.error_message = ""
+                    self.save()
+                    logger.info(
+                        "Instagram posting - Reel container %s queued for publishing",
+                        creation_id,
+                    )
+                    return True, None
 
-                        except Exception as e:
-                            print(f"DEBUG: Status check error: {e}")
-                            import time
+                return self._publish_container(
+                    creation_id, chosen_base, access_token, token_field
+                )
+            else:
+                # Text-only posts (stories or reels might be needed)
+                error_msg = "Text-only Instagram posts are not supported. Please add an image or video."
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                            time.sleep(10)
+        except RateLimited as e:
+            return self._defer_rate_limited(e)
+        except Exception as e:
+            self.status = "failed"
+            self.error_message = str(e)
+            self.save()
 
-                        attempt += 1
+            # Send WebSocket notification for failed post
+            self._send_websocket_notification(
+                "instagram_post_failed",
+                {
+                    "post_id": self.id,
+                    "error_message": str(e),
+                },
+            )
 
-                    if not container_ready:
-                        error_msg = f"Instagram video processing timeout. Container not ready after {max_attempts} attempts (5 minutes). This may be due to large file size or Instagram server issues."
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+            return False, str(e)
 
-                # Publish the media (container is ready)
-                print(f"DEBUG: Publishing media with container ID: {creation_id}")
-                publish_data = {
-                    "creation_id": creation_id,
-                    "access_token": access_token,
-                }
-                publish_url = f"{chosen_base}/{api_version}/{user_id}/media_publish"
-                publish_response = requests.post(publish_url, data=publish_data)
+    def _defer_rate_limited(self, error):
+        """Leave the post queued after a rate limit so a later run retries it"""
+        error_msg = f"Deferred: Instagram API rate limit reached ({str(error)})"
+        self.error_message = error_msg
+        self.save(update_fields=["error_message", "updated_at"])
+        return False, error_msg
 
-                print(f"DEBUG: Publish response status: {publish_response.status_code}")
-                print(f"DEBUG: Publish response text: {publish_response.text}")
+    def _publish_container(self, creation_id, chosen_base, access_token, token_field):
+        """Publish a finished media container and record the resulting post.
 
-                if publish_response.status_code == 200:
-                    try:
-                        publish_data = publish_response.json()
-                    except ValueError:
-                        error_msg = f"Instagram API returned invalid JSON: {publish_response.text}"
-                        print(f"ERROR: {error_msg}")
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+        Raises ``RateLimited`` without calling Graph when the account's
+        publish limit is used up; the container stays ready for a later run.
+        """
+        from django.utils import timezone
 
-                    print(f"DEBUG: Publish response JSON: {publish_data}")
+        from .services.api_clients import graph_session
+        from .services.rate_limits import governor, instagram_credential_key
 
-                    # Check for Instagram API errors even with 200 status
-                    if "error" in publish_data:
-                        error_detail = publish_data["error"]
-                        error_msg = f"Instagram API error: {error_detail.get('message', 'Unknown error')}"
-                        print(f"ERROR: {error_msg}")
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+        rate_limit_key = instagram_credential_key(self.brand)
+        governor.acquire(rate_limit_key, "graph_publish")
+        graph = graph_session(self.brand)
 
-                    instagram_id = publish_data.get("id")
-                    print(f"DEBUG: Instagram ID from response: {instagram_id}")
+        api_version = self.GRAPH_API_VERSION
+        user_id = self.brand.instagram_user_id
 
-                    # Validate Instagram ID before proceeding
-                    if not instagram_id:
-                        error_msg = f"Instagram API returned success but no media ID. Response: {publish_data}"
-                        print(f"ERROR: {error_msg}")
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+        # Publish the media (container is ready)
+        print(f"DEBUG: Publishing media with container ID: {creation_id}")
+        publish_data = {
+            "creation_id": creation_id,
+            "access_token": access_token,
+        }
+        publish_url = f"{chosen_base}/{api_version}/{user_id}/media_publish"
+        publish_response = graph.post(publish_url, data=publish_data)
+        governor.record_response(rate_limit_key, "graph_publish", publish_response)
 
-                    # Validate Instagram ID format (should be numeric)
-                    try:
-                        int(instagram_id)
-                    except (ValueError, TypeError):
-                        error_msg = f"Instagram API returned invalid media ID format: {instagram_id}"
-                        print(f"ERROR: {error_msg}")
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+        print(f"DEBUG: Publish response status: {publish_response.status_code}")
+        print(f"DEBUG: Publish response text: {publish_response.text}")
 
-                    # Ensure Instagram ID is a string
-                    instagram_id = str(instagram_id)
+        if publish_response.status_code == 200:
+            try:
+                publish_data = publish_response.json()
+            except ValueError:
+                error_msg = f"Instagram API returned invalid JSON: {publish_response.text}"
+                print(f"ERROR: {error_msg}")
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                    # Verify the post actually exists by fetching it back from Instagram
-                    verify_url = f"{chosen_base}/{api_version}/{instagram_id}"
-                    verify_params = {
-                        "fields": "id,permalink,media_type",
-                        "access_token": access_token,
-                    }
+            print(f"DEBUG: Publish response JSON: {publish_data}")
 
-                    print(
-                        f"DEBUG: Verifying Instagram post exists for ID: {instagram_id}"
-                    )
-                    verify_response = requests.get(
-                        verify_url, params=verify_params, timeout=10
-                    )
+            # Check for Instagram API errors even with 200 status
+            if "error" in publish_data:
+                error_detail = publish_data["error"]
+                error_msg = f"Instagram API error: {error_detail.get('message', 'Unknown error')}"
+                print(f"ERROR: {error_msg}")
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                    if verify_response.status_code != 200:
-                        try:
-                            verify_error = verify_response.json()
-                            error_msg = f"Instagram post verification failed: {verify_error.get('error', {}).get('message', 'Post not found after creation')}"
-                        except (ValueError, KeyError, TypeError):
-                            error_msg = f"Instagram post verification failed (status {verify_response.status_code}): Post may not have been created successfully"
+            instagram_id = publish_data.get("id")
+            print(f"DEBUG: Instagram ID from response: {instagram_id}")
 
-                        print(f"ERROR: {error_msg}")
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        self.save()
-                        return False, error_msg
+            # Validate Instagram ID before proceeding
+            if not instagram_id:
+                error_msg = f"Instagram API returned success but no media ID. Response: {publish_data}"
+                print(f"ERROR: {error_msg}")
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                    verify_data = verify_response.json()
-                    print(f"DEBUG: Post verification successful: {verify_data}")
+            # Validate Instagram ID format (should be numeric)
+            try:
+                int(instagram_id)
+            except (ValueError, TypeError):
+                error_msg = f"Instagram API returned invalid media ID format: {instagram_id}"
+                print(f"ERROR: {error_msg}")
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                    # Get the permalink from Instagram API
-                    permalink_url = f"{chosen_base}/{api_version}/{instagram_id}"
-                    permalink_params = {
-                        "fields": "permalink",
-                        "access_token": access_token,
-                    }
+            # Ensure Instagram ID is a string
+            instagram_id = str(instagram_id)
 
-                    print(f"DEBUG: Fetching permalink for Instagram ID: {instagram_id}")
-                    permalink_response = requests.get(
-                        permalink_url, params=permalink_params
-                    )
+            # Verify the post actually exists by fetching it back from Instagram
+            verify_url = f"{chosen_base}/{api_version}/{instagram_id}"
+            verify_params = {
+                "fields": "id,permalink,media_type",
+                "access_token": access_token,
+            }
 
-                    instagram_url = None
-                    if permalink_response.status_code == 200:
-                        permalink_data = permalink_response.json()
-                        instagram_url = permalink_data.get("permalink")
-                        print(f"DEBUG: Got Instagram URL: {instagram_url}")
-                    else:
-                        print(
-                            f"DEBUG: Failed to get permalink: {permalink_response.status_code} - {permalink_response.text}"
-                        )
-                        # Don't fail the whole process if permalink fails, but log it
-                        instagram_url = f"https://www.instagram.com/p/{instagram_id}/"
+            print(
+                f"DEBUG: Verifying Instagram post exists for ID: {instagram_id}"
+            )
+            verify_response = graph.get(
+                verify_url, params=verify_params, timeout=10
+            )
 
-                    # Update post record with actual data
-                    self.instagram_id = instagram_id
-                    self.instagram_url = instagram_url
-                    self.status = "posted"
-                    self.posted_at = timezone.now()
+            if verify_response.status_code != 200:
+                try:
+                    verify_error = verify_response.json()
+                    error_msg = f"Instagram post verification failed: {verify_error.get('error', {}).get('message', 'Post not found after creation')}"
+                except (ValueError, KeyError, TypeError):
+                    error_msg = f"Instagram post verification failed (status {verify_response.status_code}): Post may not have been created successfully"
 
-                    print(
-                        f"DEBUG: About to save post {self.id} with instagram_id='{instagram_id}' and instagram_url='{instagram_url}'"
-                    )
+                print(f"ERROR: {error_msg}")
+                self.status = "failed"
+                self.error_message = error_msg
+                self.save()
+                return False, error_msg
 
-                    try:
-                        self.save()
-                        print(f"DEBUG: Successfully saved post {self.id}")
-                        print(
-                            f"DEBUG: Saved values - instagram_id='{self.instagram_id}', instagram_url='{self.instagram_url}', status='{self.status}'"
-                        )
-                    except Exception as save_error:
-                        error_msg = f"Failed to save Instagram post to database: {str(save_error)}"
-                        print(f"ERROR: {error_msg}")
-                        # Try to save at least the error
-                        self.status = "failed"
-                        self.error_message = error_msg
-                        try:
-                            self.save()
-                        except Exception as final_error:
-                            print(
-                                f"ERROR: Could not even save error message: {final_error}"
-                            )
-                        return False, error_msg
+            verify_data = verify_response.json()
+            print(f"DEBUG: Post verification successful: {verify_data}")
 
-                    # Send WebSocket notification for successful post
-                    self._send_websocket_notification(
-                        "instagram_post_posted",
-                        {
-                            "post_id": self.id,
-                            "posted_at": self.posted_at.isoformat(),
-                            "instagram_url": self.instagram_url,
-                            "instagram_id": self.instagram_id,
-                        },
-                    )
+            # Get the permalink from Instagram API
+            permalink_url = f"{chosen_base}/{api_version}/{instagram_id}"
+            permalink_params = {
+                "fields": "permalink",
+                "access_token": access_token,
+            }
 
-                    return True, None
-                else:
-                    # Enhanced error handling for publish failures
-                    error_msg = f"Failed to publish media: {publish_response.text}"
-                    try:
-                        error_data = publish_response.json()
-                        if "error" in error_data:
-                            error_detail = error_data["error"]
-                            error_code = error_detail.get("code", "unknown")
-                            error_subcode = error_detail.get("error_subcode", "unknown")
-                            error_message = error_detail.get("message", "Unknown error")
+            print(f"DEBUG: Fetching permalink for Instagram ID: {instagram_id}")
+            permalink_response = graph.get(
+                permalink_url, params=permalink_params
+            )
 
-                            if error_code == 9007 and error_subcode == 2207027:
-                                error_msg = f"Instagram media not ready for publishing (Error {error_code}/{error_subcode}). The video may still be processing. Please try again in a few minutes."
-                            else:
-                                error_msg = f"Instagram publish failed (Error {error_code}/{error_subcode}): {error_message}"
-                    except (ValueError, KeyError, TypeError):
-                        pass  # Use the original error message
+            instagram_url = None
+            if permalink_response.status_code == 200:
+                permalink_data = permalink_response.json()
+                instagram_url = permalink_data.get("permalink")
+                print(f"DEBUG: Got Instagram URL: {instagram_url}")
+            else:
+                print(
+                    f"DEBUG: Failed to get permalink: {permalink_response.status_code} - {permalink_response.text}"
+                )
+                # Don't fail the whole process if permalink fails, but log it
+                instagram_url = f"https://www.instagram.com/p/{instagram_id}/"
 
-                    # Attempt to enrich publish failure with token info if token error
-                    try:
-                        if "error" in publish_data:
-                            err_d = publish_data["error"]
-                            if err_d.get("code") == 190:
-                                import json as _json
+            # Update post record with actual data
+            self.instagram_id = instagram_id
+            self.instagram_url = instagram_url
+            self.status = "posted"
+            self.publish_stage = "published"
+            self.posted_at = timezone.now()
 
-                                debug_info_pub = {
-                                    "token_field": token_field,
-                                    "token_value": access_token,
-                                    "publish_endpoint": publish_url,
-                                    "http_status": publish_response.status_code,
-                                    "request_payload": {
-                                        "creation_id": publish_data.get("id"),
-                                        "access_token": "<omitted>",
-                                    },
-                                    "response_json": err_d,
-                                    "response_raw": publish_response.text,
-                                }
-                                error_msg += (
-                                    "\n\n[DEBUG TOKEN INFO]\n"
-                                    + _json.dumps(debug_info_pub, indent=2)[:4000]
-                                )
-                    except Exception as _e:  # noqa: BLE001
-                        error_msg += (
-                            f"\n[DEBUG TOKEN INFO] Failed to append publish debug: {_e}"
-                        )
+            print(
+                f"DEBUG: About to save post {self.id} with instagram_id='{instagram_id}' and instagram_url='{instagram_url}'"
+            )
 
-                    self.status = "failed"
-                    self.error_message = error_msg
-                    self.save()
-                    return False, error_msg
-            else:
-                # Text-only posts (stories or reels might be needed)
-                error_msg = "Text-only Instagram posts are not supported. Please add an image or video."
+            try:
+                self.save()
+                print(f"DEBUG: Successfully saved post {self.id}")
+                print(
+                    f"DEBUG: Saved values - instagram_id='{self.instagram_id}', instagram_url='{self.instagram_url}', status='{self.status}'"
+                )
+            except Exception as save_error:
+                error_msg = f"Failed to save Instagram post to database: {str(save_error)}"
+                print(f"ERROR: {error_msg}")
+                # Try to save at least the error
                 self.status = "failed"
                 self.error_message = error_msg
-                self.save()
+                try:
+                    self.save()
+                except Exception as final_error:
+                    print(
+                        f"ERROR: Could not even save error message: {final_error}"
+                    )
                 return False, error_msg
 
-        except Exception as e:
-            self.status = "failed"
-            self.error_message = str(e)
-            self.save()
-
-            # Send WebSocket notification for failed post
+            # Send WebSocket notification for successful post
             self._send_websocket_notification(
-                "instagram_post_failed",
+                "instagram_post_posted",
                 {
                     "post_id": self.id,
-                    "error_message": str(e),
+                    "posted_at": self.posted_at.isoformat(),
+                    "instagram_url": self.instagram_url,
+                    "instagram_id": self.instagram_id,
                 },
             )
 
-            return False, str(e)
+            return True, None
+        else:
+            # Enhanced error handling for publish failures
+            error_msg = f"Failed to publish media: {publish_response.text}"
+            try:
+                error_data = publish_response.json()
+                if "error" in error_data:
+                    error_detail = error_data["error"]
+                    error_code = error_detail.get("code", "unknown")
+                    error_subcode = error_detail.get("error_subcode", "unknown")
+                    error_message = error_detail.get("message", "Unknown error")
+
+                    if error_code == 9007 and error_subcode == 2207027:
+                        error_msg = f"Instagram media not ready for publishing (Error {error_code}/{error_subcode}). The video may still be processing. Please try again in a few minutes."
+                    else:
+                        error_msg = f"Instagram publish failed (Error {error_code}/{error_subcode}): {error_message}"
+            except (ValueError, KeyError, TypeError):
+                pass  # Use the original error message
+
+            # Attempt to enrich publish failure with token info if token error
+            try:
+                if "error" in publish_data:
+                    err_d = publish_data["error"]
+                    if err_d.get("code") == 190:
+                        import json as _json
+
+                        debug_info_pub = {
+                            "token_field": token_field,
+                            "token_value": access_token,
+                            "publish_endpoint": publish_url,
+                            "http_status": publish_response.status_code,
+                            "request_payload": {
+                                "creation_id": publish_data.get("id"),
+                                "access_token": "<omitted>",
+                            },
+                            "response_json": err_d,
+                            "response_raw": publish_response.text,
+                        }
+                        error_msg += (
+                            "\n\n[DEBUG TOKEN INFO]\n"
+                            + _json.dumps(debug_info_pub, indent=2)[:4000]
+                        )
+            except Exception as _e:  # noqa: BLE001
+                error_msg += (
+                    f"\n[DEBUG TOKEN INFO] Failed to append publish debug: {_e}"
+                )
+
+            self.status = "failed"
+            self.error_message = error_msg
+            self.save()
+            return False, error_msg
 
     def _send_websocket_notification(self, event_type, data):
         """Send WebSocket notification to all connected clients"""
@@ -3726,9 +3910,12 @@ class BrandInstagramPost(models.Model):
     def refresh_metrics(self):
         """Refresh Instagram metrics from the API"""
         try:
-            import requests
             from django.utils import timezone
 
+            from .services.api_clients import graph_session
+
+            graph = graph_session(self.brand)
+
             # Detailed validation with specific error messages
             if self.status != "posted":
                 return (
@@ -3786,7 +3973,7 @@ class BrandInstagramPost(models.Model):
             }
 
             try:
-                account_response = requests.get(account_info_url, params=account_params)
+                account_response = graph.get(account_info_url, params=account_params)
                 print(f"DEBUG: Account info response: {account_response.status_code}")
 
                 if account_response.status_code == 200:
@@ -3897,7 +4084,7 @@ class BrandInstagramPost(models.Model):
                 "access_token": access_token,
             }
 
-            response = requests.get(insights_url, params=params)
+            response = graph.get(insights_url, params=params)
 
             print("DEBUG: Instagram Insights API call:")
             print(f"DEBUG: URL: {insights_url}")
@@ -4669,12 +4856,17 @@ class EncryptedVariable(models.Model):
 
         Returns:
             The decrypted value or default
+
+        Values are served from the process-wide secret store; saving or
+        deleting a variable invalidates its entry.
         """
-        try:
-            var = cls.objects.get(key=key, is_active=True)
-            return var.get_decrypted_value()
-        except cls.DoesNotExist:
-            return default
+        from .services.secrets import secret_store
+
+        def load():
+            var = cls.objects.filter(key=key, is_active=True).first()
+            return var.get_decrypted_value() if var else None
+
+        return secret_store.get(key, load, default)
 
     @classmethod
     def set_value(cls, key, value, description="", user=None):
@@ -4872,37 +5064,23 @@ class AIServiceUsage(models.Model):
     @classmethod
     def get_daily_usage(cls, brand, service, date=None):
         """Get daily usage count for a brand and service"""
-        if date is None:
-            date = timezone.now().date()
+        from website.services.ai_usage import usage_counter
 
-        usage, created = cls.objects.get_or_create(
-            brand=brand, service=service, usage_date=date, defaults={"usage_count": 0}
-        )
-        return usage.usage_count
+        return usage_counter.count(brand, service, date)
 
     @classmethod
     def increment_usage(cls, brand, service, date=None):
         """Increment usage count for a brand and service"""
-        if date is None:
-            date = timezone.now().date()
+        from website.services.ai_usage import usage_counter
 
-        usage, created = cls.objects.get_or_create(
-            brand=brand, service=service, usage_date=date, defaults={"usage_count": 0}
-        )
-        usage.usage_count += 1
-        usage.save()
-        return usage.usage_count
+        return usage_counter.increment(brand, service, date=date)
 
     @classmethod
     def check_limit(cls, brand, service, date=None):
         """Check if usage is within limits for a brand and service"""
-        if date is None:
-            date = timezone.now().date()
+        from website.services.ai_usage import usage_counter
 
-        current_usage = cls.get_daily_usage(brand, service, date)
-        limit = AIServiceLimit.get_limit(service)
-
-        return current_usage < limit, current_usage, limit
+        return usage_counter.check(brand, service, date)
 
 
 class AIServiceLimit(models.Model):
@@ -4959,6 +5137,174 @@ class AIServiceLimit(models.Model):
         return limit
 
 
+class ImageGenerationJob(models.Model):
+    """AI image generation request run by the image worker pool"""
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="image_generation_jobs",
+    )
+    operation = models.CharField(
+        max_length=50, help_text="Image endpoint the job runs, e.g. gpt_image_inpainting"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    params = models.JSONField(
+        default=dict, blank=True, help_text="Form fields of the request (no files)"
+    )
+    result = models.JSONField(null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "status"]),
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} ({self.status}) - {self.pk}"
+
+    @property
+    def is_finished(self):
+        return self.status in ("completed", "failed")
+
+    def mark_running(self):
+        self.status = "running"
+        self.started_at = timezone.now()
+        self.save(update_fields=["status", "started_at"])
+
+    def mark_finished(self, result, response_status):
+        """Store the endpoint's response; error responses fail the job"""
+        self.result = result
+        self.response_status = response_status
+        if response_status >= 400:
+            self.status = "failed"
+            if isinstance(result, dict):
+                self.error_message = str(result.get("error", ""))
+        else:
+            self.status = "completed"
+        self.completed_at = timezone.now()
+        self.save(
+            update_fields=[
+                "result",
+                "response_status",
+                "status",
+                "error_message",
+                "completed_at",
+            ]
+        )
+
+    def mark_failed(self, error_message):
+        self.status = "failed"
+        self.error_message = error_message
+        self.completed_at = timezone.now()
+        self.save(update_fields=["status", "error_message", "completed_at"])
+
+    def to_dict(self):
+        return {
+            "job_id": str(self.pk),
+            "operation": self.operation,
+            "status": self.status,
+            "result": self.result,
+            "response_status": self.response_status,
+            "error": self.error_message or None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+
+class VideoGenerationTask(models.Model):
+    """In-flight provider video task checked by the background video poller"""
+
+    PROVIDER_CHOICES = [
+        ("runware", "Runware"),
+        ("kling", "Kling AI"),
+        ("veo", "Veo 3.1"),
+        ("sora", "Sora 2"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    task_id = models.CharField(max_length=255, help_text="Provider task/generation ID")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="video_generation_tasks",
+    )
+    instagram_post = models.ForeignKey(
+        "BrandInstagramPost",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="video_generation_tasks",
+        help_text="Post the finished video is saved to",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    video_url = models.URLField(max_length=2000, blank=True)
+    error_message = models.TextField(blank=True)
+    result = models.JSONField(
+        null=True, blank=True, help_text="Latest status payload from the provider"
+    )
+    poll_count = models.PositiveIntegerField(default=0)
+    next_poll_at = models.DateTimeField(default=timezone.now)
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ["provider", "task_id"]
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_poll_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_provider_display()} {self.task_id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ("completed", "failed")
+
+    def to_dict(self):
+        return {
+            "provider": self.provider,
+            "task_id": self.task_id,
+            "status": self.status,
+            "video_url": self.video_url or None,
+            "error": self.error_message or None,
+            "post_id": self.instagram_post_id,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+
 class WebLog(models.Model):
     """Model for logging web activities including minute tasks, deployments, and system events"""
 
@@ -6387,6 +6733,58 @@ class CreditTransaction(models.Model):
         return self.amount < 0
 
 
+class CreditReservation(models.Model):
+    """Credits held against a brand's balance while an AI job runs.
+
+    The amount leaves ``Brand.credits_balance`` when the hold is placed and
+    is either captured as a usage transaction or released back when the job
+    finishes. See ``website.services.credit_ledger``.
+    """
+
+    STATUS_CHOICES = [
+        ("held", "Held"),
+        ("captured", "Captured"),
+        ("released", "Released"),
+    ]
+
+    brand = models.ForeignKey(
+        Brand, on_delete=models.CASCADE, related_name="credit_reservations"
+    )
+    amount = models.DecimalField(
+        max_digits=10, decimal_places=2, help_text="Credits held for the job"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="held")
+    description = models.TextField(blank=True)
+    service_used = models.CharField(max_length=100, blank=True)
+    api_request_id = models.CharField(max_length=255, blank=True)
+    transaction = models.OneToOneField(
+        CreditTransaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reservation",
+        help_text="Usage transaction written when the hold was captured",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        help_text="Holds still open after this are released automatically"
+    )
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Credit Reservation"
+        verbose_name_plural = "Credit Reservations"
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+            models.Index(fields=["brand", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.brand.name}: {self.amount} credits ({self.status})"
+
+
 class CreditPackage(models.Model):
     """Model for predefined credit packages that brands can purchase"""
 
@@ -19,6 +19,9 @@ from organizations.models import (
 from .models import User, Brand, OrganizationInvitation, BrandTweet
 from website.forms import CustomOrganizationForm
 import tweepy
+from .services import credit_ledger
+from .services.api_clients import brand_twitter_client
+from .services.rate_limits import governed_twitter_api
 from django.views.decorators.http import require_POST, require_http_methods
 from website.utils.credit_manager import CreditManager
 import json
@@ -608,7 +611,7 @@ def organization_brand_connect_twitter(request, organization_pk, brand_pk):
                 # Test Twitter connection
                 auth = tweepy.OAuthHandler(api_key, api_secret)
                 auth.set_access_token(access_token, access_token_secret)
-                api = tweepy.API(auth)
+                api = governed_twitter_api(auth)
 
                 # Verify credentials and get username
                 twitter_user = api.verify_credentials()
@@ -674,14 +677,7 @@ def organization_brand_test_tweet(request, organization_pk, brand_pk):
 
         try:
             # Setup Twitter API v2 client
-            client = tweepy.Client(
-                bearer_token=brand.twitter_bearer_token,
-                consumer_key=brand.twitter_api_key,
-                consumer_secret=brand.twitter_api_secret,
-                access_token=brand.twitter_access_token,
-                access_token_secret=brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(brand)
 
             # First verify credentials
             try:
@@ -2946,8 +2942,7 @@ def brand_tweet_generate_ai_text(request, organization_pk, brand_pk, tweet_id):
 @require_POST
 def brand_tweet_generate_ai_from_website(request, organization_pk, brand_pk):
     """Generate AI tweet content based on brand website content for inline form"""
-    import requests
-    from bs4 import BeautifulSoup
+    from .services.website_content import get_website_text
     import logging
 
     logger = logging.getLogger(__name__)
@@ -2961,51 +2956,11 @@ def brand_tweet_generate_ai_from_website(request, organization_pk, brand_pk):
         return JsonResponse({"success": False, "error": "Permission denied"})
 
     try:
-        # Fetch content from brand website
-        website_content = ""
-        if brand.url:
-            try:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                response = requests.get(brand.url, headers=headers, timeout=10)
-                response.raise_for_status()
-
-                # Parse HTML content
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-
-                # Extract text content
-                text = soup.get_text()
-
-                # Clean up text
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (
-                    phrase.strip() for line in lines for phrase in line.split("  ")
-                )
-                website_content = " ".join(chunk for chunk in chunks if chunk)
-
-                # Limit content length for API efficiency
-                website_content = (
-                    website_content[:2000]
-                    if len(website_content) > 2000
-                    else website_content
-                )
-
-            except Exception as web_error:
-                logger.warning(
-                    f"Failed to scrape website {brand.url}: {str(web_error)}"
-                )
-                # If website scraping fails, use brand description as fallback
-                website_content = (
-                    brand.description
-                    if brand.description
-                    else f"Content about {brand.name}"
-                )
-        else:
+        # Fetch content from brand website (cached and shared per URL;
+        # limited in length for API efficiency)
+        website_content = get_website_text(brand.url, max_chars=2000)
+        if not website_content:
+            # If website scraping fails, use brand description as fallback
             website_content = (
                 brand.description
                 if brand.description
@@ -3122,8 +3077,7 @@ Create a tweet that would make people want to learn more about {brand.name}."""
 @require_POST
 def brand_instagram_generate_ai_from_website(request, organization_pk, brand_pk):
     """Generate AI Instagram post content based on brand website content"""
-    import requests
-    from bs4 import BeautifulSoup
+    from .services.website_content import get_website_text
     import logging
 
     logger = logging.getLogger(__name__)
@@ -3137,51 +3091,11 @@ def brand_instagram_generate_ai_from_website(request, organization_pk, brand_pk)
         return JsonResponse({"success": False, "error": "Permission denied"})
 
     try:
-        # Fetch content from brand website
-        website_content = ""
-        if brand.url:
-            try:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                response = requests.get(brand.url, headers=headers, timeout=10)
-                response.raise_for_status()
-
-                # Parse HTML content
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-
-                # Extract text content
-                text = soup.get_text()
-
-                # Clean up text
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (
-                    phrase.strip() for line in lines for phrase in line.split("  ")
-                )
-                website_content = " ".join(chunk for chunk in chunks if chunk)
-
-                # Limit content length for API efficiency
-                website_content = (
-                    website_content[:3000]
-                    if len(website_content) > 3000
-                    else website_content
-                )
-
-            except Exception as web_error:
-                logger.warning(
-                    f"Failed to scrape website {brand.url}: {str(web_error)}"
-                )
-                # If website scraping fails, use brand description as fallback
-                website_content = (
-                    brand.description
-                    if brand.description
-                    else f"Content about {brand.name}"
-                )
-        else:
+        # Fetch content from brand website (cached and shared per URL;
+        # limited in length for API efficiency)
+        website_content = get_website_text(brand.url, max_chars=3000)
+        if not website_content:
+            # If website scraping fails, use brand description as fallback
             website_content = (
                 brand.description
                 if brand.description
@@ -3500,26 +3414,22 @@ def brand_tweet_generate_image(request, organization_pk, brand_pk, tweet_id):
                     {"success": False, "error": "Runware API key not configured in env"}
                 )
 
-            # Check credit balance before making API call
-            from website.models import RunwarePricingData
-            from decimal import Decimal
-
-            # Get pricing for Runware image generation
+            # Get pricing for Runware image generation (served from memory)
             try:
-                pricing = RunwarePricingData.objects.filter(
-                    service_name__icontains="Image Generation", is_active=True
-                ).first()
-
-                if pricing and pricing.gemnar_price:
-                    credit_cost = pricing.gemnar_price
-                else:
-                    # Fallback default cost if no pricing data
-                    credit_cost = Decimal("0.02")  # $0.02 per image
+                credit_cost = CreditManager.get_service_cost("Image Generation")
 
                 logger.info(f"Runware image generation cost: {credit_cost} credits")
 
-                # Check if brand has sufficient credits
-                if not brand.has_sufficient_credits(credit_cost):
+                # Hold the credits while Runware runs; parallel generations
+                # for the brand can't spend the same balance twice
+                reservation = credit_ledger.reserve(
+                    brand,
+                    credit_cost,
+                    description=f"Runware image generation for tweet {tweet.id}",
+                    service_used="runware_image_generation",
+                )
+                if reservation is None:
+                    brand.refresh_from_db(fields=["credits_balance"])
                     return JsonResponse(
                         {
                             "success": False,
@@ -3538,184 +3448,178 @@ def brand_tweet_generate_image(request, organization_pk, brand_pk, tweet_id):
                     }
                 )
 
-            logger.info(f"Using Runware API with key: {api_key[:10]}...")
-
-            # Prepare Runware payload
-            task_uuid = str(uuid.uuid4())
-            payload = [
-                {
-                    "taskType": "imageInference",
-                    "taskUUID": task_uuid,
-                    "model": "runware:101@1",
-                    "positivePrompt": prompt,
-                    "width": 1024,
-                    "height": 1024,
-                    "steps": 30,
-                }
-            ]
-
-            # Make request to Runware API
-            logger.info(
-                f"Making Runware API request with payload: {json.dumps(payload)}"
-            )
-            response = requests.post(
-                "https://api.runware.ai/v1",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json=payload,
-                timeout=120,
-            )
-            logger.info(f"Runware API response status: {response.status_code}")
-
-            if response.status_code != 200:
-                error_message = "AI image generation failed"
-                try:
-                    error_data = response.json()
-                    error_message = error_data.get("error", error_message)
-                except (json.JSONDecodeError, ValueError):
-                    error_message = f"API error: {response.status_code}"
+            try:
+                logger.info(f"Using Runware API with key: {api_key[:10]}...")
 
-                return JsonResponse({"success": False, "error": error_message})
+                # Prepare Runware payload
+                task_uuid = str(uuid.uuid4())
+                payload = [
+                    {
+                        "taskType": "imageInference",
+                        "taskUUID": task_uuid,
+                        "model": "runware:101@1",
+                        "positivePrompt": prompt,
+                        "width": 1024,
+                        "height": 1024,
+                        "steps": 30,
+                    }
+                ]
 
-            try:
-                response_data = response.json()
-                logger.info(f"Runware API response type: {type(response_data)}")
+                # Make request to Runware API
                 logger.info(
-                    f"Runware API response structure: {json.dumps(response_data, indent=2)[:1000]}..."
+                    f"Making Runware API request with payload: {json.dumps(payload)}"
                 )
-            except json.JSONDecodeError:
-                logger.error(
-                    f"Failed to parse Runware API response as JSON: {response.text[:500]}"
-                )
-                return JsonResponse(
-                    {"success": False, "error": "Invalid response from AI service"}
+                response = requests.post(
+                    "https://api.runware.ai/v1",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json=payload,
+                    timeout=120,
                 )
+                logger.info(f"Runware API response status: {response.status_code}")
+
+                if response.status_code != 200:
+                    error_message = "AI image generation failed"
+                    try:
+                        error_data = response.json()
+                        error_message = error_data.get("error", error_message)
+                    except (json.JSONDecodeError, ValueError):
+                        error_message = f"API error: {response.status_code}"
 
-            # Handle different response formats from Runware API
-            image_url = None
+                    return JsonResponse({"success": False, "error": error_message})
+
+                try:
+                    response_data = response.json()
+                    logger.info(f"Runware API response type: {type(response_data)}")
+                    logger.info(
+                        f"Runware API response structure: {json.dumps(response_data, indent=2)[:1000]}..."
+                    )
+                except json.JSONDecodeError:
+                    logger.error(
+                        f"Failed to parse Runware API response as JSON: {response.text[:500]}"
+                    )
+                    return JsonResponse(
+                        {"success": False, "error": "Invalid response from AI service"}
+                    )
 
-            # Case 1: Response is a list with results
-            if isinstance(response_data, list) and len(response_data) > 0:
-                result = response_data[0]
-                if isinstance(result, dict):
+                # Handle different response formats from Runware API
+                image_url = None
+
+                # Case 1: Response is a list with results
+                if isinstance(response_data, list) and len(response_data) > 0:
+                    result = response_data[0]
+                    if isinstance(result, dict):
+                        if (
+                            result.get("taskType") == "imageInference"
+                            and "imageURL" in result
+                        ):
+                            image_url = result["imageURL"]
+                            result.get("taskUUID")
+                        elif "imageURL" in result:
+                            # Sometimes the response might not have taskType but still has imageURL
+                            image_url = result["imageURL"]
+                            result.get("taskUUID")
+
+                # Case 2: Response is a dict with nested data
+                elif isinstance(response_data, dict):
+                    # Check if there's a data field with results
                     if (
-                        result.get("taskType") == "imageInference"
-                        and "imageURL" in result
+                        "data" in response_data
+                        and isinstance(response_data["data"], list)
+                        and len(response_data["data"]) > 0
                     ):
-                        image_url = result["imageURL"]
-                        result.get("taskUUID")
-                    elif "imageURL" in result:
-                        # Sometimes the response might not have taskType but still has imageURL
-                        image_url = result["imageURL"]
-                        result.get("taskUUID")
-
-            # Case 2: Response is a dict with nested data
-            elif isinstance(response_data, dict):
-                # Check if there's a data field with results
-                if (
-                    "data" in response_data
-                    and isinstance(response_data["data"], list)
-                    and len(response_data["data"]) > 0
-                ):
-                    result = response_data["data"][0]
-                    if isinstance(result, dict) and "imageURL" in result:
-                        image_url = result["imageURL"]
-                        result.get("taskUUID")
-                # Check if the dict itself contains the image URL
-                elif "imageURL" in response_data:
-                    image_url = response_data["imageURL"]
-                    response_data.get("taskUUID")
-
-            if image_url:
-                # Download the image and save it
-                logger.info(f"Downloading image from: {image_url}")
-                try:
-                    image_response = requests.get(image_url, timeout=30)
-                    if image_response.status_code == 200:
-                        # Create filename
-                        filename = f"brand_tweet_{tweet.id}_{uuid.uuid4().hex}.png"
-
-                        # Save image to media storage
-                        content = ContentFile(image_response.content)
-                        saved_path = default_storage.save(
-                            f"brand_tweets/{filename}", content
-                        )
+                        result = response_data["data"][0]
+                        if isinstance(result, dict) and "imageURL" in result:
+                            image_url = result["imageURL"]
+                            result.get("taskUUID")
+                    # Check if the dict itself contains the image URL
+                    elif "imageURL" in response_data:
+                        image_url = response_data["imageURL"]
+                        response_data.get("taskUUID")
+
+                if image_url:
+                    # Download the image and save it
+                    logger.info(f"Downloading image from: {image_url}")
+                    try:
+                        image_response = requests.get(image_url, timeout=30)
+                        if image_response.status_code == 200:
+                            # Create filename
+                            filename = f"brand_tweet_{tweet.id}_{uuid.uuid4().hex}.png"
+
+                            # Save image to media storage
+                            content = ContentFile(image_response.content)
+                            saved_path = default_storage.save(
+                                f"brand_tweets/{filename}", content
+                            )
 
-                        # Update tweet with image
-                        tweet.image = saved_path
-                        tweet.save()
+                            # Update tweet with image
+                            tweet.image = saved_path
+                            tweet.save()
 
-                        # Deduct credits for successful image generation
-                        try:
-                            success, message = brand.deduct_credits(
-                                credit_cost,
-                                f"Runware image generation for tweet {tweet.id}",
-                                "usage",
+                            # Charge the held credits now the image is saved
+                            credit_ledger.capture(reservation)
+                            logger.info(
+                                f"Credits captured: {credit_cost}. New balance: {brand.credits_balance}"
                             )
-                            if success:
-                                logger.info(
-                                    f"Credits deducted: {credit_cost}. New balance: {brand.credits_balance}"
-                                )
-                            else:
-                                logger.error(f"Failed to deduct credits: {message}")
-                        except Exception as e:
-                            logger.error(f"Error deducting credits: {str(e)}")
 
+                            return JsonResponse(
+                                {
+                                    "success": True,
+                                    "message": "Image generated successfully!",
+                                    "image_url": default_storage.url(saved_path),
+                                    "prompt": prompt,
+                                    "service": "Runware AI",
+                                    "credits_used": str(credit_cost),
+                                    "credits_remaining": str(brand.credits_balance),
+                                }
+                            )
+                        else:
+                            logger.error(
+                                f"Failed to download image: HTTP {image_response.status_code}"
+                            )
+                            return JsonResponse(
+                                {
+                                    "success": False,
+                                    "error": f"Failed to download generated image (HTTP {image_response.status_code})",
+                                }
+                            )
+                    except requests.exceptions.Timeout:
+                        logger.error("Timeout downloading image")
                         return JsonResponse(
                             {
-                                "success": True,
-                                "message": "Image generated successfully!",
-                                "image_url": default_storage.url(saved_path),
-                                "prompt": prompt,
-                                "service": "Runware AI",
-                                "credits_used": str(credit_cost),
-                                "credits_remaining": str(brand.credits_balance),
+                                "success": False,
+                                "error": "Timeout downloading generated image",
                             }
                         )
-                    else:
-                        logger.error(
-                            f"Failed to download image: HTTP {image_response.status_code}"
-                        )
+                    except requests.exceptions.RequestException as e:
+                        logger.error(f"Request error downloading image: {e}")
                         return JsonResponse(
                             {
                                 "success": False,
-                                "error": f"Failed to download generated image (HTTP {image_response.status_code})",
+                                "error": f"Failed to download image: {str(e)}",
                             }
                         )
-                except requests.exceptions.Timeout:
-                    logger.error("Timeout downloading image")
-                    return JsonResponse(
-                        {
-                            "success": False,
-                            "error": "Timeout downloading generated image",
-                        }
+                else:
+                    # Log the full response for debugging
+                    logger.error(
+                        f"No image URL found in response. Full response: {json.dumps(response_data, indent=2)}"
                     )
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Request error downloading image: {e}")
                     return JsonResponse(
                         {
                             "success": False,
-                            "error": f"Failed to download image: {str(e)}",
+                            "error": "No image URL found in AI service response",
+                            "debug_response": (
+                                response_data
+                                if len(str(response_data)) < 1000
+                                else "Response too large to include"
+                            ),
                         }
                     )
-            else:
-                # Log the full response for debugging
-                logger.error(
-                    f"No image URL found in response. Full response: {json.dumps(response_data, indent=2)}"
-                )
-                return JsonResponse(
-                    {
-                        "success": False,
-                        "error": "No image URL found in AI service response",
-                        "debug_response": (
-                            response_data
-                            if len(str(response_data)) < 1000
-                            else "Response too large to include"
-                        ),
-                    }
-                )
+            finally:
+                # No-op once captured; frees the hold on every failure path
+                credit_ledger.release(reservation)
         else:
             return JsonResponse(
                 {
@@ -4150,7 +4054,9 @@ def brand_tweet_schedule_next_slot(request, organization_pk, brand_pk, tweet_id)
             )
 
         # Get the next available time slot
-        next_slot = brand.get_next_available_time_slot()
+        next_slot = brand.get_next_available_time_slot(
+            exclude_tweet=tweet, daily_limit=daily_limit
+        )
         if not next_slot:
             return JsonResponse(
                 {
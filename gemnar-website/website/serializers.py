@@ -714,6 +714,7 @@ class BrandInstagramPostSerializer(serializers.ModelSerializer):
             "video_quality",
             "video_generation_task_uuid",
             "video_generation_status",
+            "publish_stage",
             "created_at",
             "updated_at",
         ]
@@ -724,6 +725,7 @@ class BrandInstagramPostSerializer(serializers.ModelSerializer):
             "posted_at",
             "video_generation_task_uuid",
             "video_generation_status",
+            "publish_stage",
             "created_at",
             "updated_at",
         ]
@@ -0,0 +1,225 @@
+"""
+AI Service Usage Counters
+
+``AIServiceUsage`` keeps one row per brand, service and day. Incrementing it
+used to be ``get_or_create`` + ``save()``, which loses increments when two
+generations finish together, and every limit check cost another
+``get_or_create`` plus an ``AIServiceLimit`` query.
+
+``UsageCounter`` replaces both paths:
+
+- Increments are atomic upserts: ``UPDATE ... SET usage_count = usage_count
+  + n`` and an INSERT only when the day's row doesn't exist yet.
+- Limits are cached in-process for ``AI_USAGE_LIMIT_TTL`` seconds and
+  dropped when an ``AIServiceLimit`` is saved (see ``website.signals``).
+- Counts are cached for ``AI_USAGE_COUNT_TTL`` seconds and bumped in place by
+  this process's own increments, so a limit check is a dict lookup on the
+  hot path. The TTL bounds how far behind other processes' usage it can be.
+- With ``AI_USAGE_WRITE_BEHIND`` enabled, increments are aggregated in memory
+  and flushed once ``AI_USAGE_FLUSH_THRESHOLD`` have accumulated or the
+  oldest is ``AI_USAGE_FLUSH_SECONDS`` old (and at exit), turning a burst
+  of generations into one UPDATE per brand and service.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import AIServiceLimit, AIServiceUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT_TTL = 60
+DEFAULT_COUNT_TTL = 5
+DEFAULT_FLUSH_THRESHOLD = 50
+DEFAULT_FLUSH_SECONDS = 10
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def apply_increment(brand_id, service, date, amount):
+    """Add ``amount`` to the day's row, creating it if needed"""
+    now = timezone.now()
+    rows = AIServiceUsage.objects.filter(
+        brand_id=brand_id, service=service, usage_date=date
+    )
+    if rows.update(usage_count=F("usage_count") + amount, last_used=now):
+        return
+
+    usage = AIServiceUsage(
+        brand_id=brand_id,
+        service=service,
+        usage_date=date,
+        usage_count=amount,
+        last_used=now,
+    )
+    try:
+        with transaction.atomic():
+            # usage_date is auto_now_add; a raw save inserts the row on ``date``
+            # itself, so a back-dated day can't collide with today's row
+            usage.save_base(raw=True, force_insert=True)
+    except IntegrityError:
+        # Another process created the row first
+        rows.update(usage_count=F("usage_count") + amount, last_used=now)
+
+
+class UsageCounter:
+    """Thread-safe usage counts and limits with optional write-behind"""
+
+    def __init__(self):
+        # service -> (expires at, daily limit)
+        self._limits = {}
+        # (brand id, service, date) -> (expires at, count)
+        self._counts = {}
+        # (brand id, service, date) -> increments not yet written
+        self._pending = {}
+        self._pending_since = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.flushes = 0
+
+    def limit(self, service):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._limits.get(service)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        daily_limit = AIServiceLimit.get_limit(service)
+        with self._lock:
+            self._limits[service] = (
+                now + _setting("AI_USAGE_LIMIT_TTL", DEFAULT_LIMIT_TTL),
+                daily_limit,
+            )
+        return daily_limit
+
+    def count(self, brand, service, date=None):
+        """Usage so far today, including increments not yet flushed"""
+        key = (brand.pk, service, date or timezone.now().date())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            pending = self._pending.get(key, 0)
+
+        stored = (
+            AIServiceUsage.objects.filter(
+                brand_id=key[0], service=service, usage_date=key[2]
+            )
+            .values_list("usage_count", flat=True)
+            .first()
+            or 0
+        )
+        with self._lock:
+            self._counts[key] = (
+                now + _setting("AI_USAGE_COUNT_TTL", DEFAULT_COUNT_TTL),
+                stored + pending,
+            )
+        return stored + pending
+
+    def check(self, brand, service, date=None):
+        """``(within limit, current usage, daily limit)``"""
+        current = self.count(brand, service, date)
+        daily_limit = self.limit(service)
+        return current < daily_limit, current, daily_limit
+
+    def increment(self, brand, service, amount=1, date=None):
+        """Record ``amount`` uses and return the new count"""
+        key = (brand.pk, service, date or timezone.now().date())
+
+        if _setting("AI_USAGE_WRITE_BEHIND", False):
+            with self._lock:
+                self._pending[key] = self._pending.get(key, 0) + amount
+                if self._pending_since is None:
+                    self._pending_since = time.monotonic()
+            if self._flush_due():
+                self.flush()
+        else:
+            apply_increment(key[0], service, key[2], amount)
+
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None:
+                self._counts[key] = (entry[0], entry[1] + amount)
+                return entry[1] + amount
+        return self.count(brand, service, key[2])
+
+    def _flush_due(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            return sum(self._pending.values()) >= _setting(
+                "AI_USAGE_FLUSH_THRESHOLD", DEFAULT_FLUSH_THRESHOLD
+            ) or time.monotonic() - self._pending_since >= _setting(
+                "AI_USAGE_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS
+            )
+
+    def flush(self):
+        """Write buffered increments; returns how many rows were updated"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_since = None
+
+            written = 0
+            for (brand_id, service, date), amount in pending.items():
+                try:
+                    apply_increment(brand_id, service, date, amount)
+                    written += 1
+                except Exception as e:
+                    logger.error(
+                        f"Failed to flush {amount} {service} uses for brand "
+                        f"{brand_id}: {str(e)}"
+                    )
+                    with self._lock:
+                        key = (brand_id, service, date)
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                        if self._pending_since is None:
+                            self._pending_since = time.monotonic()
+            if written:
+                self.flushes += 1
+            return written
+
+    def invalidate_limits(self, service=None):
+        with self._lock:
+            if service is None:
+                self._limits.clear()
+            else:
+                self._limits.pop(service, None)
+
+    def clear(self):
+        """Drop cached limits, counts and any unflushed increments"""
+        with self._lock:
+            self._limits.clear()
+            self._counts.clear()
+            self._pending.clear()
+            self._pending_since = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached_limits": len(self._limits),
+                "cached_counts": len(self._counts),
+                "pending": sum(self._pending.values()),
+                "flushes": self.flushes,
+            }
+
+
+usage_counter = UsageCounter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        usage_counter.flush()
+    except Exception:
+        pass
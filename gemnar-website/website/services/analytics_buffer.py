@@ -0,0 +1,338 @@
+"""
+Analytics Ingestion Buffer
+
+Every tracked click used to be an ``AnalyticsEvent`` INSERT inside the
+request, so ingest latency rose and fell with whatever else Postgres was
+doing, dashboard queries included. With ``ANALYTICS_WRITE_BEHIND`` enabled
+the ingest endpoints only validate the tracking code, hand their messages to
+``ingest_buffer`` and answer 204 straight away.
+
+Write-behind is opt-in: queued messages are acknowledged before they are
+stored, so it is on by default only when ``ANALYTICS_SPOOL_DIR`` is set.
+Messages are appended to a per-process spool file there so they survive a
+restart; with ``ANALYTICS_WRITE_BEHIND`` forced on and no spool directory
+they are kept in memory and lost if the worker exits. A daemon thread
+flushes them through ``BatchIngest`` (one set of ``bulk_create``/
+``bulk_update`` calls per project) once ``ANALYTICS_BUFFER_FLUSH_SIZE``
+messages are waiting or every ``ANALYTICS_BUFFER_FLUSH_SECONDS``.
+
+When ``ANALYTICS_BUFFER_MAX_MESSAGES`` (or ``ANALYTICS_SPOOL_MAX_BYTES`` of
+spool) are waiting, new messages are refused and counted as dropped, and the
+endpoints answer 503 with ``Retry-After``. A tracker never waits on the
+database.
+
+Events can reach one worker before the pageview they belong to has been
+flushed by another. Messages whose pageview isn't found yet are re-queued
+and retried for up to ``ANALYTICS_BUFFER_RETRIES`` flushes.
+
+Each project's messages are written in their own transaction. A project
+whose write raises is re-queued on its own under the same retry cap and then
+counted as rejected, so one bad message can't hold up other projects or
+stop the buffer from draining.
+
+``flush_analytics_spool`` drains spool files left behind by processes that
+exited before flushing.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from ..analytics_models import AnalyticsProject
+from .analytics_ingest import BatchIngest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 2
+DEFAULT_MAX_MESSAGES = 20000
+DEFAULT_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_RETRIES = 3
+RETRY_AFTER_SECONDS = 5
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def drain_spool_dir(spool_dir, min_age=60):
+    """Ingest spool files no live process is still writing.
+
+    Files are picked up once they are ``min_age`` seconds old: the owning
+    worker would have flushed them well before that if it were still running.
+    Returns ``(written, rejected)``; retries are spooled again by this process.
+    """
+    written = rejected = 0
+    if not os.path.isdir(spool_dir):
+        return written, rejected
+
+    cutoff = time.time() - min_age
+    for name in sorted(os.listdir(spool_dir)):
+        path = os.path.join(spool_dir, name)
+        if not name.startswith("ingest-") or os.path.getmtime(path) > cutoff:
+            continue
+        taken = path if name.endswith(".flushing") else f"{path}.drain.flushing"
+        try:
+            if taken != path:
+                os.replace(path, taken)
+            stored, dropped, retry = ingest_entries(
+                read_spool(taken),
+                _setting("ANALYTICS_BUFFER_RETRIES", DEFAULT_RETRIES),
+            )
+        except Exception as e:
+            # Left in place for the next run; later files still get drained
+            logger.error(f"Failed to drain analytics spool {taken}: {str(e)}")
+            continue
+        written += stored
+        rejected += dropped
+        for project_id, messages, attempts in retry:
+            ingest_buffer.submit(project_id, messages, attempts)
+        os.remove(taken)
+    return written, rejected
+
+
+def write_behind_enabled():
+    """``ANALYTICS_WRITE_BEHIND``, defaulting to on only with a spool dir"""
+    enabled = _setting("ANALYTICS_WRITE_BEHIND", None)
+    if enabled is None:
+        return bool(_setting("ANALYTICS_SPOOL_DIR", None))
+    return enabled
+
+
+def read_spool(path):
+    """Entries ``(project id, messages, attempts)`` from a spool file"""
+    entries = []
+    with open(path, encoding="utf-8") as spool:
+        for line in spool:
+            try:
+                project_id, messages, attempts = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                logger.warning(f"Skipping unreadable analytics spool line in {path}")
+                continue
+            entries.append((project_id, messages, attempts))
+    return entries
+
+
+def ingest_entries(entries, max_retries=DEFAULT_RETRIES):
+    """Write buffered entries, grouped by project in arrival order.
+
+    Returns ``(written, rejected, retry)`` where ``retry`` holds entries to
+    queue again because their pageview hasn't been stored yet, or because
+    their project's write failed.
+    """
+    by_project = {}
+    for project_id, messages, attempts in entries:
+        by_project.setdefault(project_id, []).append((messages, attempts))
+
+    projects = {
+        str(pk): project
+        for pk, project in AnalyticsProject.objects.filter(is_active=True)
+        .in_bulk(list(by_project))
+        .items()
+    }
+
+    written = rejected = 0
+    retry = []
+    for project_id, batches in by_project.items():
+        messages = [message for batch, _attempts in batches for message in batch]
+        project = projects.get(project_id)
+        if project is None:
+            rejected += len(messages)
+            continue
+
+        attempts = max(attempts for _batch, attempts in batches) + 1
+        ingest = BatchIngest(project, messages)
+        try:
+            ingest.run()
+        except Exception as e:
+            logger.error(
+                f"Failed to ingest {len(messages)} analytics messages for "
+                f"project {project_id}: {str(e)}"
+            )
+            if not ingest.committed:
+                if attempts > max_retries:
+                    rejected += len(messages)
+                else:
+                    retry.append((project_id, messages, attempts))
+                continue
+        written += len(messages) - len(ingest.errors) - ingest.skipped
+        rejected += len(ingest.errors) - len(ingest.unresolved)
+
+        if ingest.unresolved:
+            if attempts > max_retries:
+                rejected += len(ingest.unresolved)
+            else:
+                retry.append((project_id, ingest.unresolved, attempts))
+    return written, rejected, retry
+
+
+class IngestBuffer:
+    """Per-process write-behind queue for tracker messages"""
+
+    def __init__(self):
+        self._entries = deque()
+        self._pending = 0
+        self._spool_bytes = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.rejected = 0
+        self.retried = 0
+        self.flushes = 0
+
+    def spool_path(self):
+        spool_dir = _setting("ANALYTICS_SPOOL_DIR", None)
+        if not spool_dir:
+            return None
+        return os.path.join(spool_dir, f"ingest-{os.getpid()}.jsonl")
+
+    def submit(self, project_id, messages, attempts=0):
+        """Queue ``messages`` for ``project_id``; ``False`` if saturated"""
+        if not messages:
+            return True
+        project_id = str(project_id)
+        spool_path = self.spool_path()
+
+        with self._lock:
+            if spool_path:
+                line = json.dumps([project_id, messages, attempts]) + "\n"
+                limit = _setting("ANALYTICS_SPOOL_MAX_BYTES", DEFAULT_SPOOL_MAX_BYTES)
+                if self._spool_bytes + len(line) > limit:
+                    self.dropped += len(messages)
+                    return False
+                os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+                with open(spool_path, "a", encoding="utf-8") as spool:
+                    spool.write(line)
+                self._spool_bytes += len(line)
+            else:
+                limit = _setting("ANALYTICS_BUFFER_MAX_MESSAGES", DEFAULT_MAX_MESSAGES)
+                if self._pending + len(messages) > limit:
+                    self.dropped += len(messages)
+                    return False
+                self._entries.append((project_id, messages, attempts))
+            self._pending += len(messages)
+            if not attempts:
+                self.accepted += len(messages)
+            flush_due = self._pending >= _setting(
+                "ANALYTICS_BUFFER_FLUSH_SIZE", DEFAULT_FLUSH_SIZE
+            )
+
+        self._ensure_flusher()
+        if flush_due:
+            self._wake.set()
+        return True
+
+    def _take(self):
+        """Detach everything queued so far"""
+        spool_path = self.spool_path()
+        with self._lock:
+            entries = list(self._entries)
+            self._entries.clear()
+            self._pending = 0
+            if not spool_path or not os.path.exists(spool_path):
+                return entries, None
+            # Writers reopen the spool by name, so new lines go to a new file
+            taken = f"{spool_path}.{time.time_ns()}.flushing"
+            os.replace(spool_path, taken)
+            self._spool_bytes = 0
+        return entries + read_spool(taken), taken
+
+    def flush(self):
+        """Write everything queued; returns how many messages were stored"""
+        with self._flush_lock:
+            entries, taken = self._take()
+            if not entries:
+                return 0
+
+            try:
+                written, rejected, retry = ingest_entries(
+                    entries, _setting("ANALYTICS_BUFFER_RETRIES", DEFAULT_RETRIES)
+                )
+            except Exception as e:
+                logger.error(f"Failed to flush analytics buffer: {str(e)}")
+                with self._lock:
+                    # Keep the messages for the next attempt; the spool file
+                    # stays on disk for flush_analytics_spool
+                    if taken is None:
+                        self._entries.extendleft(reversed(entries))
+                        self._pending += sum(len(e[1]) for e in entries)
+                return 0
+
+            if taken:
+                os.remove(taken)
+            for project_id, messages, attempts in retry:
+                if self.submit(project_id, messages, attempts):
+                    self.retried += len(messages)
+
+            with self._lock:
+                self.written += written
+                self.rejected += rejected
+                self.flushes += 1
+            return written
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="analytics-ingest-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(
+                _setting("ANALYTICS_BUFFER_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+            )
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Analytics flusher error: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def clear(self):
+        """Drop queued in-memory messages and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._pending = 0
+            self.accepted = self.dropped = self.written = 0
+            self.rejected = self.retried = self.flushes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "accepted": self.accepted,
+                "dropped": self.dropped,
+                "written": self.written,
+                "rejected": self.rejected,
+                "retried": self.retried,
+                "flushes": self.flushes,
+            }
+
+
+ingest_buffer = IngestBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        ingest_buffer.flush()
+    except Exception:
+        pass
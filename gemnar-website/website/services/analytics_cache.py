@@ -0,0 +1,204 @@
+"""
+Analytics Ingest Lookup Cache
+
+Each ingest call authorised its write with a query before doing any work:
+``AnalyticsProject.objects.get`` by tracking code, or a pageview fetched
+through a ``session__project`` join just to compare tracking codes, and
+``analytics_pageview`` ran a session ``get_or_create`` on top. The answers
+hardly ever change, so ``analytics_lookups`` keeps them in per-process LRUs
+with a TTL:
+
+- tracking code -> active ``AnalyticsProject`` (unknown or inactive codes
+  are remembered for ``ANALYTICS_CACHE_MISS_TTL`` seconds);
+- pageview ID -> ``PageviewRef`` (project, session and session start, plus
+  the URL, path and address shown on the live stream);
+- (project, client session ID) -> ``SessionRef`` (session, start time and
+  the fields shown on the live stream).
+
+Pageviews and sessions are remembered as they are created, so the metrics
+and event calls that follow a pageview find them without a query. Saving or
+deleting a project drops everything cached for it in this process (see
+``website.signals``), and ``ANALYTICS_CACHE_TTL`` bounds how long other
+processes keep serving a deactivated project.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from ..analytics_models import AnalyticsPageView, AnalyticsProject
+
+DEFAULT_TTL = 300
+DEFAULT_MISS_TTL = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+PageviewRef = namedtuple(
+    "PageviewRef", "project_id session_pk session_started_at url path ip_address"
+)
+SessionRef = namedtuple("SessionRef", "pk started_at ip_address browser device_type")
+
+_MISSING = object()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LRU:
+    """Thread-safe TTL + LRU map"""
+
+    def __init__(self):
+        # key -> (expires at, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = _setting("ANALYTICS_CACHE_TTL", DEFAULT_TTL)
+        max_entries = _setting("ANALYTICS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [
+                key
+                for key, (_expires, value) in self._entries.items()
+                if predicate(key, value)
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class AnalyticsLookups:
+    """Cached answers to "which project is this write for?"."""
+
+    def __init__(self):
+        self.projects = LRU()
+        self.pageviews = LRU()
+        self.sessions = LRU()
+
+    def project(self, tracking_code):
+        """The active project for ``tracking_code``, or ``None``"""
+        if not tracking_code:
+            return None
+        project = self.projects.get(tracking_code, _MISSING)
+        if project is not _MISSING:
+            return project
+
+        project = AnalyticsProject.objects.filter(
+            tracking_code=tracking_code, is_active=True
+        ).first()
+        self.projects.set(
+            tracking_code,
+            project,
+            ttl=None
+            if project
+            else _setting("ANALYTICS_CACHE_MISS_TTL", DEFAULT_MISS_TTL),
+        )
+        return project
+
+    def pageview(self, project, page_view_id):
+        """``PageviewRef`` if the pageview belongs to ``project``, else ``None``"""
+        key = str(page_view_id)
+        ref = self.pageviews.get(key)
+        if ref is None:
+            row = (
+                AnalyticsPageView.objects.filter(id=page_view_id)
+                .values_list(
+                    "session__project_id",
+                    "session_id",
+                    "session__started_at",
+                    "url",
+                    "path",
+                    "session__ip_address",
+                )
+                .first()
+            )
+            if row is None:
+                # Not cached: the pageview may still be in a write-behind buffer
+                return None
+            ref = PageviewRef(*row)
+            self.pageviews.set(key, ref)
+        return ref if ref.project_id == project.id else None
+
+    def remember_pageview(self, project_id, pageview, session):
+        self.pageviews.set(
+            str(pageview.id),
+            PageviewRef(
+                project_id,
+                session.pk,
+                session.started_at,
+                pageview.url,
+                pageview.path,
+                session.ip_address,
+            ),
+        )
+
+    def session(self, project_id, session_id):
+        """``SessionRef`` for a client session already seen here, or ``None``"""
+        return self.sessions.get((project_id, session_id))
+
+    def remember_session(self, project_id, session_id, session):
+        self.sessions.set(
+            (project_id, session_id),
+            SessionRef(
+                session.pk,
+                session.started_at,
+                session.ip_address,
+                session.browser,
+                session.device_type,
+            ),
+        )
+
+    def invalidate_project(self, project):
+        """Forget ``project`` under any tracking code, with its pageviews"""
+        self.projects.discard_where(
+            lambda code, cached: code == project.tracking_code
+            or (cached is not None and cached.pk == project.pk)
+        )
+        self.pageviews.discard_where(lambda _key, ref: ref.project_id == project.pk)
+        self.sessions.discard_where(lambda key, _ref: key[0] == project.pk)
+
+    def clear(self):
+        self.projects.clear()
+        self.pageviews.clear()
+        self.sessions.clear()
+
+    def stats(self):
+        return {
+            name: {"size": len(lru), "hits": lru.hits, "misses": lru.misses}
+            for name, lru in (
+                ("projects", self.projects),
+                ("pageviews", self.pageviews),
+                ("sessions", self.sessions),
+            )
+        }
+
+
+analytics_lookups = AnalyticsLookups()
@@ -0,0 +1,471 @@
+"""
+Batched Analytics Ingestion
+
+The tracker used to send one POST per pageview, event, load-metrics update,
+metrics report and recording, and every one of them re-validated the
+tracking code with a join before touching a single row. ``ingest_batch``
+takes an ordered list of mixed messages for one project instead:
+
+- the tracking code is checked once per batch;
+- every pageview a batch refers to is fetched in one query, sessions in
+  another, and existing recordings in a third;
+- messages are applied in order to in-memory rows, which are then written
+  with ``bulk_create`` / ``bulk_update`` in one transaction.
+
+Pageview messages may carry a client-generated ``page_view_id`` (a UUID), so
+later messages in the same batch, and later batches, can refer to the view
+without waiting for the server to answer. A replayed pageview whose ID is
+already stored is skipped, which makes retried beacons harmless.
+
+Per-message problems are reported by index and never fail the whole batch:
+client values are checked against their columns before anything is written,
+strings are cut to the column's length and a number that can't be stored
+rejects just its message.
+Stored pageviews and events are published to the project's live streams
+once the transaction commits.
+"""
+
+import gzip
+import logging
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+
+from ..analytics_models import (
+    AnalyticsEvent,
+    AnalyticsPageView,
+    AnalyticsRecording,
+    AnalyticsSession,
+)
+from . import analytics_live
+from .analytics_cache import analytics_lookups
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGES = 200
+MAX_PAGE_SECONDS = 3600
+MAX_SESSION_SECONDS = 86400
+
+PAGEVIEW_FIELDS = [
+    "url",
+    "title",
+    "path",
+    "query_params",
+    "viewport_width",
+    "viewport_height",
+    "screen_width",
+    "screen_height",
+]
+LOAD_METRIC_FIELDS = [
+    "load_time_ms",
+    "dom_content_loaded_ms",
+    "first_paint_ms",
+    "largest_contentful_paint_ms",
+    "first_input_delay_ms",
+]
+TEXT_FIELDS = {"url", "title", "path", "query_params"}
+METRIC_FIELDS = ["scroll_depth_percentage", "clicks_count", "form_interactions"]
+EVENT_FIELDS = [
+    "element_tag",
+    "element_classes",
+    "element_id",
+    "element_text",
+    "x_coordinate",
+    "y_coordinate",
+]
+EVENT_TEXT_FIELDS = ["element_tag", "element_classes", "element_id", "element_text"]
+MESSAGE_TYPES = {"pageview", "event", "update_pageview", "metrics", "recording"}
+MAX_INTEGER = 2**31 - 1
+
+
+class MessageError(Exception):
+    pass
+
+
+def parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def field_value(model, name, value):
+    """``value`` as ``model.name`` can store it; ``MessageError`` if it can't"""
+    if value is None:
+        return None
+    field = model._meta.get_field(name)
+    if isinstance(field, (models.CharField, models.TextField)):
+        value = str(value)
+        return value[: field.max_length] if field.max_length else value
+    if isinstance(field, (models.IntegerField, models.FloatField)):
+        try:
+            value = field.to_python(value)
+        except (ValidationError, OverflowError):
+            raise MessageError(f"Invalid {name}") from None
+        if isinstance(field, models.IntegerField) and abs(value) > MAX_INTEGER:
+            raise MessageError(f"Invalid {name}")
+    return value
+
+
+def clamp(seconds, upper):
+    try:
+        seconds = int(seconds or 0)
+    except (TypeError, ValueError):
+        return 0
+    return max(0, min(seconds, upper))
+
+
+def session_duration(session, now):
+    if session.started_at is None:
+        return 0
+    return clamp((now - session.started_at).total_seconds(), MAX_SESSION_SECONDS)
+
+
+class BatchIngest:
+    """Applies one batch of tracker messages for ``project``"""
+
+    def __init__(self, project, messages, ip_address="", user_agent_parser=None):
+        self.project = project
+        self.messages = messages
+        self.ip_address = ip_address
+        if user_agent_parser is None:
+            from ..analytics_api import parse_user_agent as user_agent_parser
+        self.parse_user_agent = user_agent_parser
+        self.now = timezone.now()
+
+        self.pageviews = {}  # pageview id -> AnalyticsPageView
+        self.sessions = {}  # client session id -> AnalyticsSession
+        self.recordings = {}  # pageview id -> AnalyticsRecording
+
+        self.new_sessions = []
+        self.new_pageviews = []
+        self.new_events = []
+        self.new_recordings = []
+        self.dirty_sessions = set()
+        # Sessions only touched by events, load metrics or recordings
+        self.active_sessions = set()
+        self.dirty_pageviews = {}  # pageview id -> set of changed fields
+        self.dirty_recordings = set()
+
+        self.page_view_ids = []
+        self.errors = []
+        # Messages whose pageview wasn't found; a buffered flush retries them
+        self.unresolved = []
+        self.skipped = 0
+        # Set once save() has committed, so a caller never replays the batch
+        self.committed = False
+
+    # Lookups: one query per kind of row, whatever the batch size
+
+    def load(self):
+        referenced = {
+            parse_uuid(message.get("page_view_id"))
+            for message in self.messages
+            if isinstance(message, dict)
+        }
+        referenced.discard(None)
+        if referenced:
+            for pageview in AnalyticsPageView.objects.select_related("session").filter(
+                id__in=referenced, session__project=self.project
+            ):
+                self.pageviews[pageview.id] = pageview
+
+        session_ids = {
+            str(message.get("session_id"))
+            for message in self.messages
+            if isinstance(message, dict)
+            and message.get("type") == "pageview"
+            and message.get("session_id")
+        }
+        if session_ids:
+            for session in AnalyticsSession.objects.filter(
+                project=self.project, session_id__in=session_ids
+            ).order_by("started_at"):
+                self.sessions.setdefault(session.session_id, session)
+
+        if self.project.record_mouse_movements and self.pageviews:
+            recorded = [
+                parse_uuid(message.get("page_view_id"))
+                for message in self.messages
+                if isinstance(message, dict) and message.get("type") == "recording"
+            ]
+            for recording in AnalyticsRecording.objects.filter(
+                pageview_id__in=[pk for pk in recorded if pk in self.pageviews]
+            ):
+                self.recordings[recording.pageview_id] = recording
+
+    # Message handlers mutate in-memory rows; nothing is written until save()
+
+    def pageview_for(self, message):
+        pageview = self.pageviews.get(parse_uuid(message.get("page_view_id")))
+        if pageview is None:
+            self.unresolved.append(message)
+            raise MessageError("Invalid page view")
+        return pageview
+
+    def touch(self, pageview, *fields):
+        if pageview._state.adding:
+            return
+        self.dirty_pageviews.setdefault(pageview.id, set()).update(fields)
+
+    def mark_active(self, pageview):
+        """Bump the session's ``last_activity`` so the rollups see the write"""
+        if not pageview.session._state.adding:
+            self.active_sessions.add(pageview.session.pk)
+
+    def handle_pageview(self, message):
+        session_key = message.get("session_id")
+        if not session_key:
+            raise MessageError("Missing session_id")
+        session_key = str(session_key)[:64]
+
+        page_view_id = message.get("page_view_id")
+        if page_view_id is not None:
+            page_view_id = parse_uuid(page_view_id)
+            if page_view_id is None:
+                raise MessageError("Invalid page view ID format")
+            if page_view_id in self.pageviews:
+                # Replayed beacon for a view that is already stored
+                self.skipped += 1
+                self.page_view_ids.append(str(page_view_id))
+                return
+
+        # Checked before the session is counted, so a bad message changes nothing
+        fields = {
+            field: field_value(AnalyticsPageView, field, message.get(field))
+            for field in PAGEVIEW_FIELDS + LOAD_METRIC_FIELDS
+            if message.get(field) is not None
+        }
+        for field in TEXT_FIELDS:
+            fields.setdefault(field, "")
+
+        session = self.sessions.get(session_key)
+        if session is None:
+            user_agent = (
+                field_value(AnalyticsSession, "user_agent", message.get("user_agent"))
+                or ""
+            )
+            agent = self.parse_user_agent(user_agent)
+            session = AnalyticsSession(
+                project=self.project,
+                session_id=session_key,
+                ip_address=message.get("ip_address") or self.ip_address,
+                user_agent=user_agent,
+                referrer=field_value(
+                    AnalyticsSession, "referrer", message.get("referrer")
+                )
+                or "",
+                browser=agent["browser"],
+                os=agent["os"],
+                device_type=agent["device_type"],
+                duration_seconds=0,
+            )
+            self.sessions[session_key] = session
+            self.new_sessions.append(session)
+        else:
+            # Same counting as the single pageview endpoint
+            session.page_views += 1
+            if session.page_views > 1:
+                session.is_bounce = False
+            session.duration_seconds = session_duration(session, self.now)
+            if not session._state.adding:
+                self.dirty_sessions.add(session)
+
+        pageview = AnalyticsPageView(
+            id=page_view_id or uuid.uuid4(), session=session, **fields
+        )
+        self.pageviews[pageview.id] = pageview
+        self.new_pageviews.append(pageview)
+        self.page_view_ids.append(str(pageview.id))
+
+    def handle_event(self, message):
+        pageview = self.pageview_for(message)
+        event_type = (
+            field_value(AnalyticsEvent, "event_type", message.get("event_type"))
+            or "custom"
+        )
+        fields = {
+            field: field_value(AnalyticsEvent, field, message.get(field))
+            for field in EVENT_FIELDS
+        }
+        for field in EVENT_TEXT_FIELDS:
+            fields[field] = fields[field] or ""
+        self.new_events.append(
+            AnalyticsEvent(
+                pageview=pageview,
+                event_type=event_type,
+                data=message.get("data", {}),
+                **fields,
+            )
+        )
+        self.mark_active(pageview)
+        if event_type == "click":
+            pageview.clicks_count += 1
+            self.touch(pageview, "clicks_count")
+        elif event_type in ["form_focus", "form_submit"]:
+            pageview.form_interactions += 1
+            self.touch(pageview, "form_interactions")
+
+    def handle_update_pageview(self, message):
+        pageview = self.pageview_for(message)
+        metrics = {
+            field: field_value(AnalyticsPageView, field, message.get(field))
+            for field in LOAD_METRIC_FIELDS
+            if message.get(field) is not None
+        }
+        for field, value in metrics.items():
+            setattr(pageview, field, value)
+            self.touch(pageview, field)
+        if metrics:
+            self.mark_active(pageview)
+
+    def handle_metrics(self, message):
+        pageview = self.pageview_for(message)
+        counters = {
+            field: field_value(AnalyticsPageView, field, message.get(field)) or 0
+            for field in METRIC_FIELDS
+        }
+        pageview.duration_seconds = clamp(
+            message.get("duration_seconds", 0), MAX_PAGE_SECONDS
+        )
+        for field, value in counters.items():
+            setattr(pageview, field, value)
+        changed = ["duration_seconds", *METRIC_FIELDS]
+        if message.get("is_final_update"):
+            pageview.ended_at = self.now
+            changed.append("ended_at")
+        self.touch(pageview, *changed)
+
+        session = pageview.session
+        session.duration_seconds = session_duration(session, self.now)
+        if not session._state.adding:
+            self.dirty_sessions.add(session)
+
+    def handle_recording(self, message):
+        pageview = self.pageview_for(message)
+        if not self.project.record_mouse_movements:
+            return
+
+        duration = field_value(
+            AnalyticsRecording, "recording_duration", message.get("recording_duration")
+        )
+        compressed = gzip.compress(
+            str(message.get("mouse_movements", "")).encode("utf-8")
+        )
+        recording = self.recordings.get(pageview.id)
+        if recording is None:
+            recording = AnalyticsRecording(pageview=pageview, compression_type="gzip")
+            self.recordings[pageview.id] = recording
+            self.new_recordings.append(recording)
+        elif not recording._state.adding:
+            self.dirty_recordings.add(recording)
+        recording.mouse_movements = compressed
+        recording.recording_duration = duration or 0
+        recording.data_size_bytes = len(compressed)
+        self.mark_active(pageview)
+
+    def apply(self):
+        for index, message in enumerate(self.messages):
+            try:
+                if not isinstance(message, dict):
+                    raise MessageError("Message must be an object")
+                kind = message.get("type")
+                if kind not in MESSAGE_TYPES:
+                    raise MessageError(f"Unknown message type: {kind}")
+                getattr(self, f"handle_{kind}")(message)
+            except MessageError as e:
+                self.errors.append({"index": index, "error": str(e)})
+
+    def save(self):
+        with transaction.atomic():
+            AnalyticsSession.objects.bulk_create(self.new_sessions)
+            AnalyticsPageView.objects.bulk_create(self.new_pageviews)
+            if self.dirty_sessions:
+                AnalyticsSession.objects.bulk_update(
+                    list(self.dirty_sessions),
+                    ["page_views", "is_bounce", "duration_seconds", "last_activity"],
+                )
+            active = self.active_sessions - {s.pk for s in self.dirty_sessions}
+            if active:
+                AnalyticsSession.objects.filter(pk__in=active).update(
+                    last_activity=self.now
+                )
+
+            by_fields = {}
+            for pageview_id, fields in self.dirty_pageviews.items():
+                by_fields.setdefault(tuple(sorted(fields)), []).append(
+                    self.pageviews[pageview_id]
+                )
+            for fields, pageviews in by_fields.items():
+                AnalyticsPageView.objects.bulk_update(pageviews, list(fields))
+
+            AnalyticsEvent.objects.bulk_create(self.new_events)
+            AnalyticsRecording.objects.bulk_create(self.new_recordings)
+            if self.dirty_recordings:
+                AnalyticsRecording.objects.bulk_update(
+                    list(self.dirty_recordings),
+                    ["mouse_movements", "recording_duration", "data_size_bytes"],
+                )
+
+    def remember(self):
+        """Let the single-message endpoints find what this batch created"""
+        for session in self.new_sessions:
+            analytics_lookups.remember_session(
+                self.project.pk, session.session_id, session
+            )
+        for pageview in self.new_pageviews:
+            analytics_lookups.remember_pageview(
+                self.project.pk, pageview, pageview.session
+            )
+
+    def announce(self):
+        analytics_live.publish(
+            self.project.pk,
+            analytics_live.PAGEVIEWS,
+            [
+                analytics_live.pageview_payload(pageview, pageview.session)
+                for pageview in self.new_pageviews
+            ],
+        )
+        analytics_live.publish(
+            self.project.pk,
+            analytics_live.EVENTS,
+            [analytics_live.stored_event_payload(event) for event in self.new_events],
+        )
+
+    def run(self):
+        self.load()
+        self.apply()
+        for session in self.dirty_sessions:
+            session.last_activity = self.now
+        self.save()
+        self.committed = True
+        self.remember()
+        self.announce()
+        return {
+            "processed": len(self.messages) - len(self.errors) - self.skipped,
+            "skipped": self.skipped,
+            "page_view_ids": self.page_view_ids,
+            "errors": self.errors,
+        }
+
+
+def stamp_messages(messages, ip_address):
+    """Record the sender's address on each message, overriding any sent value"""
+    for message in messages:
+        if isinstance(message, dict):
+            message["ip_address"] = ip_address
+    return messages
+
+
+def ingest_batch(project, messages, ip_address="", user_agent_parser=None):
+    """Apply tracker ``messages`` for ``project``; returns a summary dict"""
+    if len(messages) > MAX_MESSAGES:
+        raise MessageError(f"At most {MAX_MESSAGES} messages per batch")
+    return BatchIngest(
+        project,
+        stamp_messages(messages, ip_address),
+        user_agent_parser=user_agent_parser,
+    ).run()
@@ -0,0 +1,241 @@
+"""
+Live Analytics Streams
+
+The live pageview and event feeds were synchronous generators that queried
+the newest row and slept for a second or two, forever. Every open tab held
+a worker and ran a query per second whether or not anything had happened.
+
+Ingest now publishes what it stores to per-project channel-layer groups
+(one per stream) once the write has committed, and ``sse_stream`` is an
+async subscriber: it costs no worker and no query while waiting, only a
+keepalive comment every ``ANALYTICS_LIVE_HEARTBEAT_SECONDS``.
+
+Each message carries the row's UUID as its SSE ``id``. A client that
+reconnects with ``Last-Event-ID`` (or ``?last_event_id=``) is first sent
+up to ``ANALYTICS_LIVE_REPLAY_LIMIT`` rows stored after that one, fetched
+in a single query; a fresh connection gets the latest row, as the polling
+feed used to send. Deliveries across processes need a shared channel layer
+such as Redis; the in-memory layer only reaches subscribers in the
+publishing process.
+
+Publishes can come from threads without an event loop of their own, such
+as the ingest buffer's flusher. ``async_to_sync`` would run them on a
+throwaway loop, touching the in-memory layer's queues from the wrong loop
+and thread without waking the waiting subscriber. Once a stream has
+subscribed, publishes are therefore handed to the server's loop instead.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+from ..analytics_models import AnalyticsEvent, AnalyticsPageView
+
+logger = logging.getLogger(__name__)
+
+PAGEVIEWS = "pageviews"
+EVENTS = "events"
+
+DEFAULT_HEARTBEAT_SECONDS = 15
+DEFAULT_REPLAY_LIMIT = 100
+PUBLISH_CHUNK = 100
+
+# The event loop serving the streams, captured by the first subscriber
+_server_loop = None
+_server_loop_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def group_name(project_id, stream):
+    return f"analytics_live_{project_id}_{stream}"
+
+
+def pageview_payload(pageview, session):
+    """Live feed entry; ``session`` may be a model or a cached ``SessionRef``"""
+    return {
+        "id": str(pageview.id),
+        "url": pageview.url,
+        "title": pageview.title,
+        "path": pageview.path,
+        "timestamp": pageview.started_at.isoformat(),
+        "session_id": str(session.pk),
+        "ip_address": session.ip_address,
+        "browser": session.browser,
+        "device_type": session.device_type,
+    }
+
+
+def event_payload(event, page_url, page_path, session_pk, ip_address):
+    return {
+        "id": str(event.id),
+        "event_type": event.event_type,
+        "timestamp": event.timestamp.isoformat(),
+        "element_tag": event.element_tag,
+        "element_classes": event.element_classes,
+        "element_id": event.element_id,
+        "element_text": event.element_text[:50] if event.element_text else "",
+        "x_coordinate": event.x_coordinate,
+        "y_coordinate": event.y_coordinate,
+        "page_url": page_url,
+        "page_path": page_path,
+        "session_id": str(session_pk),
+        "ip_address": ip_address,
+    }
+
+
+def stored_event_payload(event):
+    """``event_payload`` for an event with its pageview and session loaded"""
+    pageview = event.pageview
+    return event_payload(
+        event,
+        pageview.url,
+        pageview.path,
+        pageview.session.pk,
+        pageview.session.ip_address,
+    )
+
+
+def remember_server_loop():
+    global _server_loop
+    loop = asyncio.get_running_loop()
+    with _server_loop_lock:
+        if _server_loop is None or _server_loop.is_closed():
+            _server_loop = loop
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Failed to publish live analytics: {future.exception()}")
+
+
+async def _group_send(channel_layer, group, chunks):
+    for items in chunks:
+        await channel_layer.group_send(
+            group, {"type": "analytics.live", "items": items}
+        )
+
+
+def send(project_id, stream, payloads):
+    """Push ``payloads`` to the stream's subscribers; never raises"""
+    if not payloads:
+        return
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        chunks = [
+            payloads[start : start + PUBLISH_CHUNK]
+            for start in range(0, len(payloads), PUBLISH_CHUNK)
+        ]
+        group = group_name(project_id, stream)
+
+        loop = _server_loop
+        if loop is not None and loop.is_running():
+            # Safe from any thread; the caller doesn't wait for delivery
+            asyncio.run_coroutine_threadsafe(
+                _group_send(channel_layer, group, chunks), loop
+            ).add_done_callback(_log_failure)
+        else:
+            # No stream has subscribed in this process; a shared layer may
+            # still have subscribers elsewhere
+            async_to_sync(_group_send)(channel_layer, group, chunks)
+    except Exception as e:
+        logger.error(f"Failed to publish live analytics: {e}")
+
+
+def publish(project_id, stream, payloads):
+    """``send`` once the current transaction commits"""
+    if payloads:
+        transaction.on_commit(lambda: send(project_id, stream, payloads))
+
+
+async def replay_pageviews(project_id, last_event_id, limit):
+    pageviews = AnalyticsPageView.objects.filter(
+        session__project_id=project_id
+    ).select_related("session")
+    rows = await _replay(pageviews, "started_at", last_event_id, limit)
+    return [pageview_payload(pageview, pageview.session) for pageview in rows]
+
+
+async def replay_events(project_id, last_event_id, limit):
+    events = AnalyticsEvent.objects.filter(
+        pageview__session__project_id=project_id
+    ).select_related("pageview", "pageview__session")
+    rows = await _replay(events, "timestamp", last_event_id, limit)
+    return [stored_event_payload(event) for event in rows]
+
+
+async def _replay(queryset, order_field, last_event_id, limit):
+    """Rows stored after ``last_event_id`` (newest ``limit``), oldest first"""
+    anchor = None
+    try:
+        anchor = (
+            await queryset.filter(id=uuid.UUID(str(last_event_id)))
+            .values_list(order_field, flat=True)
+            .afirst()
+        )
+    except ValueError:
+        # No ID, or not one of ours: start from the latest row
+        pass
+    if anchor is None:
+        limit = 1
+    else:
+        queryset = queryset.filter(**{f"{order_field}__gt": anchor})
+    rows = [row async for row in queryset.order_by(f"-{order_field}")[:limit]]
+    return rows[::-1]
+
+
+REPLAYS = {PAGEVIEWS: replay_pageviews, EVENTS: replay_events}
+
+
+def sse_message(payload):
+    return f"id: {payload['id']}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def sse_stream(project_id, stream, last_event_id=None):
+    """Server-sent events for ``stream``: the catch-up, then live pushes"""
+    remember_server_loop()
+    channel_layer = get_channel_layer()
+    group = group_name(project_id, stream)
+    channel = await channel_layer.new_channel()
+    # Subscribe before replaying so nothing stored in between is missed
+    await channel_layer.group_add(group, channel)
+    try:
+        replayed = set()
+        for payload in await REPLAYS[stream](
+            project_id,
+            last_event_id,
+            _setting("ANALYTICS_LIVE_REPLAY_LIMIT", DEFAULT_REPLAY_LIMIT),
+        ):
+            replayed.add(payload["id"])
+            yield sse_message(payload)
+
+        heartbeat = _setting(
+            "ANALYTICS_LIVE_HEARTBEAT_SECONDS", DEFAULT_HEARTBEAT_SECONDS
+        )
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    channel_layer.receive(channel), heartbeat
+                )
+            except TimeoutError:
+                # Keeps proxies from closing an idle stream, and renews the
+                # membership before the layer's group expiry drops it
+                await channel_layer.group_add(group, channel)
+                yield ": keepalive\n\n"
+                continue
+            for payload in message.get("items", []):
+                if payload["id"] not in replayed:
+                    yield sse_message(payload)
+    finally:
+        await channel_layer.group_discard(group, channel)
@@ -0,0 +1,476 @@
+"""
+Analytics Daily Rollups
+
+The dashboards computed everything from raw ``AnalyticsPageView`` and
+``AnalyticsSession`` rows on every load: a count query per day for the
+traffic chart, a dozen aggregates plus 24 hourly and 30 daily counts on the
+page detail view. Their cost grew with a brand's traffic.
+
+``rollup`` keeps two tables up to date instead:
+
+- ``AnalyticsDailyStats``: per project and day, session and pageview
+  totals, bounce and duration sums, load-time sums and device/browser
+  counts;
+- ``AnalyticsDailyPageStats``: the same per path, with exits, the other
+  load metrics, engagement sums and hourly, device, browser and referrer
+  counts.
+
+Sums are stored with their counts so averages over any range stay exact.
+Distinct session counts are per day, so a session that spans midnight
+counts once for each day it was active.
+
+The job is incremental. Every ingest write (pageviews, metrics, events,
+load-time updates and recordings, single or batched) bumps its session's
+``last_activity``, so the (project, day) pairs touched since the previous
+run are found from sessions active after the last ``computed_at`` (less
+a small margin for writes still in flight). Only those days are
+re-aggregated, and each is replaced in a single transaction. The first
+run covers ``ANALYTICS_ROLLUP_BACKFILL_DAYS``. Dashboards lag ingest by at
+most the job's interval.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from ..analytics_models import (
+    AnalyticsDailyPageStats,
+    AnalyticsDailyStats,
+    AnalyticsPageView,
+    AnalyticsSession,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKFILL_DAYS = 90
+WATERMARK_MARGIN = timedelta(minutes=2)
+MAX_REFERRERS = 20
+
+MAX_SESSION_SECONDS = 86400
+MAX_PAGE_SECONDS = 3600
+MAX_LOAD_MS = 30000
+
+PAGE_SUM_FIELDS = [
+    "views",
+    "sessions",
+    "exits",
+    "duration_sum",
+    "duration_count",
+    "load_time_sum",
+    "load_time_count",
+    "dom_loaded_sum",
+    "dom_loaded_count",
+    "first_paint_sum",
+    "first_paint_count",
+    "lcp_sum",
+    "lcp_count",
+    "fid_sum",
+    "fid_count",
+    "load_fast",
+    "load_average",
+    "load_slow",
+    "scroll_depth_sum",
+    "clicks",
+    "form_interactions",
+]
+
+
+def _sum_count(prefix, field, condition):
+    return {
+        f"{prefix}_sum": Sum(field, filter=condition, default=0),
+        f"{prefix}_count": Count("id", filter=condition),
+    }
+
+
+def _counts(queryset, key_fields, value_field, top=None):
+    """``{key: {value: count}}`` for a grouped count, optionally top-N"""
+    counts = defaultdict(Counter)
+    rows = queryset.values(*key_fields, value=F(value_field)).annotate(n=Count("id"))
+    for row in rows:
+        key = tuple(row[field] for field in key_fields)
+        value = "" if row["value"] is None else str(row["value"])
+        counts[key][value] += row["n"]
+    return {
+        key: dict(counter.most_common(top) if top else counter)
+        for key, counter in counts.items()
+    }
+
+
+def project_rows(day, project_ids):
+    """Daily project stats keyed by project ID"""
+    rows = defaultdict(dict)
+
+    sessions = AnalyticsSession.objects.filter(
+        started_at__date=day, project_id__in=project_ids
+    )
+    for row in sessions.values("project_id").annotate(
+        total=Count("id"),
+        bounced=Count("id", filter=Q(is_bounce=True)),
+        **_sum_count(
+            "session_duration",
+            "duration_seconds",
+            Q(duration_seconds__gt=0, duration_seconds__lt=MAX_SESSION_SECONDS),
+        ),
+    ):
+        rows[row["project_id"]].update(
+            sessions=row["total"],
+            bounced_sessions=row["bounced"],
+            session_duration_sum=row["session_duration_sum"],
+            session_duration_count=row["session_duration_count"],
+        )
+
+    # The dashboard falls back to activity spans when no duration was stored
+    activity = (
+        sessions.annotate(
+            span=ExpressionWrapper(
+                F("last_activity") - F("started_at"), output_field=DurationField()
+            )
+        )
+        .filter(
+            span__gte=timedelta(seconds=1),
+            span__lte=timedelta(seconds=MAX_SESSION_SECONDS),
+        )
+        .values("project_id")
+        .annotate(total=Sum("span"), count=Count("id"))
+    )
+    for row in activity:
+        rows[row["project_id"]].update(
+            activity_duration_sum=row["total"].total_seconds(),
+            activity_duration_count=row["count"],
+        )
+
+    for field, column in (("devices", "device_type"), ("browsers", "browser")):
+        for (project_id,), counts in _counts(sessions, ["project_id"], column).items():
+            rows[project_id][field] = counts
+
+    pageviews = AnalyticsPageView.objects.filter(
+        started_at__date=day, session__project_id__in=project_ids
+    )
+    for row in pageviews.values(project=F("session__project_id")).annotate(
+        total=Count("id"),
+        **_sum_count(
+            "load_time",
+            "load_time_ms",
+            Q(load_time_ms__gt=0, load_time_ms__lt=MAX_LOAD_MS),
+        ),
+    ):
+        rows[row["project"]].update(
+            pageviews=row["total"],
+            load_time_sum=row["load_time_sum"],
+            load_time_count=row["load_time_count"],
+        )
+    return rows
+
+
+def page_rows(day, project_ids):
+    """Daily path stats keyed by ``(project ID, path)``"""
+    rows = defaultdict(dict)
+    pageviews = AnalyticsPageView.objects.filter(
+        started_at__date=day, session__project_id__in=project_ids
+    ).annotate(project=F("session__project_id"))
+
+    for row in pageviews.values("project", "path").annotate(
+        sample_url=Max("url"),
+        total=Count("id"),
+        distinct_sessions=Count("session", distinct=True),
+        **_sum_count(
+            "duration",
+            "duration_seconds",
+            Q(duration_seconds__gt=0, duration_seconds__lt=MAX_PAGE_SECONDS),
+        ),
+        **_sum_count(
+            "load_time",
+            "load_time_ms",
+            Q(load_time_ms__gt=0, load_time_ms__lt=MAX_LOAD_MS),
+        ),
+        **_sum_count(
+            "dom_loaded", "dom_content_loaded_ms", Q(dom_content_loaded_ms__gt=0)
+        ),
+        **_sum_count("first_paint", "first_paint_ms", Q(first_paint_ms__gt=0)),
+        **_sum_count(
+            "lcp", "largest_contentful_paint_ms", Q(largest_contentful_paint_ms__gt=0)
+        ),
+        **_sum_count(
+            "fid", "first_input_delay_ms", Q(first_input_delay_ms__isnull=False)
+        ),
+        fast=Count("id", filter=Q(load_time_ms__lt=1000)),
+        average=Count("id", filter=Q(load_time_ms__gte=1000, load_time_ms__lt=3000)),
+        slow=Count("id", filter=Q(load_time_ms__gte=3000)),
+        scroll_total=Sum("scroll_depth_percentage", default=0),
+        clicks_total=Sum("clicks_count", default=0),
+        forms_total=Sum("form_interactions", default=0),
+    ):
+        key = (row.pop("project"), row.pop("path"))
+        rows[key].update(
+            url=row.pop("sample_url") or "",
+            views=row.pop("total"),
+            sessions=row.pop("distinct_sessions"),
+            load_fast=row.pop("fast"),
+            load_average=row.pop("average"),
+            load_slow=row.pop("slow"),
+            scroll_depth_sum=row.pop("scroll_total"),
+            clicks=row.pop("clicks_total"),
+            form_interactions=row.pop("forms_total"),
+            **row,
+        )
+
+    # A view is an exit when it is the last one of its session
+    last_view = (
+        AnalyticsPageView.objects.filter(session_id=OuterRef("session_id"))
+        .order_by("-started_at")
+        .values("id")[:1]
+    )
+    for row in (
+        pageviews.filter(id=Subquery(last_view))
+        .values("project", "path")
+        .annotate(n=Count("id"))
+    ):
+        rows[(row["project"], row["path"])]["exits"] = row["n"]
+
+    hourly = pageviews.annotate(hour=ExtractHour("started_at"))
+    breakdowns = (
+        ("hourly", hourly, "hour", None),
+        ("devices", pageviews, "session__device_type", None),
+        ("browsers", pageviews, "session__browser", None),
+        (
+            "referrers",
+            pageviews.exclude(session__referrer=""),
+            "session__referrer",
+            MAX_REFERRERS,
+        ),
+    )
+    for field, queryset, column, top in breakdowns:
+        for key, counts in _counts(
+            queryset, ["project", "path"], column, top=top
+        ).items():
+            if key in rows:
+                rows[key][field] = counts
+    return rows
+
+
+def rollup_day(day, project_ids, computed_at=None):
+    """Rebuild both rollups for ``day`` and the given projects"""
+    computed_at = computed_at or timezone.now()
+    project_ids = list(project_ids)
+
+    daily = [
+        AnalyticsDailyStats(
+            project_id=project_id, date=day, computed_at=computed_at, **fields
+        )
+        for project_id, fields in project_rows(day, project_ids).items()
+    ]
+    pages = [
+        AnalyticsDailyPageStats(
+            project_id=project_id,
+            date=day,
+            path=path,
+            computed_at=computed_at,
+            **fields,
+        )
+        for (project_id, path), fields in page_rows(day, project_ids).items()
+    ]
+
+    with transaction.atomic():
+        AnalyticsDailyStats.objects.filter(
+            date=day, project_id__in=project_ids
+        ).delete()
+        AnalyticsDailyPageStats.objects.filter(
+            date=day, project_id__in=project_ids
+        ).delete()
+        AnalyticsDailyStats.objects.bulk_create(daily)
+        AnalyticsDailyPageStats.objects.bulk_create(pages, batch_size=500)
+    return len(daily), len(pages)
+
+
+def dirty_days(since):
+    """``{day: {project IDs}}`` with activity since ``since``"""
+    touched = defaultdict(set)
+    sessions = AnalyticsSession.objects.filter(last_activity__gte=since)
+    for project_id, day in (
+        sessions.annotate(day=TruncDate("started_at"))
+        .values_list("project_id", "day")
+        .distinct()
+    ):
+        touched[day].add(project_id)
+    # Pageviews of a session that started on an earlier day
+    for project_id, day in (
+        AnalyticsPageView.objects.filter(session__last_activity__gte=since)
+        .annotate(day=TruncDate("started_at"))
+        .values_list("session__project_id", "day")
+        .distinct()
+    ):
+        touched[day].add(project_id)
+    return touched
+
+
+def rollup(since=None, now=None):
+    """Re-aggregate every (project, day) touched since the last run.
+
+    Returns the number of (project, day) pairs rebuilt.
+    """
+    now = now or timezone.now()
+    if since is None:
+        last_run = AnalyticsDailyStats.objects.aggregate(last=Max("computed_at"))[
+            "last"
+        ]
+        if last_run is None:
+            backfill = getattr(
+                settings, "ANALYTICS_ROLLUP_BACKFILL_DAYS", DEFAULT_BACKFILL_DAYS
+            )
+            since = now - timedelta(days=backfill)
+        else:
+            since = last_run - WATERMARK_MARGIN
+
+    rebuilt = 0
+    for day, project_ids in sorted(dirty_days(since).items()):
+        rollup_day(day, project_ids, computed_at=now)
+        rebuilt += len(project_ids)
+    return rebuilt
+
+
+# Readers used by the dashboards
+
+
+def _avg(total, count):
+    return total / count if count else None
+
+
+def daily_traffic(project, start_day, days):
+    """Sessions and pageviews for each of ``days`` days from ``start_day``"""
+    rows = {
+        date: (sessions, pageviews)
+        for date, sessions, pageviews in project.daily_stats.filter(
+            date__gte=start_day, date__lt=start_day + timedelta(days=days)
+        ).values_list("date", "sessions", "pageviews")
+    }
+    traffic = []
+    for i in range(days):
+        date = start_day + timedelta(days=i)
+        sessions, pageviews = rows.get(date, (0, 0))
+        traffic.append(
+            {
+                "date": date.strftime("%Y-%m-%d"),
+                "sessions": sessions,
+                "pageviews": pageviews,
+            }
+        )
+    return traffic
+
+
+def project_summary(project, start_day):
+    """Headline numbers and breakdowns over the days since ``start_day``"""
+    rows = list(project.daily_stats.filter(date__gte=start_day))
+    total = Counter()
+    devices, browsers = Counter(), Counter()
+    for row in rows:
+        for field in (
+            "sessions",
+            "bounced_sessions",
+            "session_duration_sum",
+            "session_duration_count",
+            "activity_duration_sum",
+            "activity_duration_count",
+            "pageviews",
+            "load_time_sum",
+            "load_time_count",
+        ):
+            total[field] += getattr(row, field)
+        devices.update(row.devices)
+        browsers.update(row.browsers)
+
+    avg_duration = _avg(total["session_duration_sum"], total["session_duration_count"])
+    if not avg_duration:
+        avg_duration = _avg(
+            total["activity_duration_sum"], total["activity_duration_count"]
+        )
+    return {
+        "total_sessions": total["sessions"],
+        "total_pageviews": total["pageviews"],
+        "avg_session_duration": avg_duration or 0,
+        "bounce_rate": (
+            total["bounced_sessions"] / total["sessions"] * 100
+            if total["sessions"]
+            else 0
+        ),
+        "avg_page_load_time": _avg(total["load_time_sum"], total["load_time_count"])
+        or 0,
+        "device_breakdown": [
+            {"device_type": device, "count": count}
+            for device, count in devices.most_common()
+        ],
+        "browser_breakdown": [
+            {"browser": browser, "count": count}
+            for browser, count in browsers.most_common(5)
+        ],
+    }
+
+
+def page_summary(totals):
+    """Averages and totals for one path from summed rollup columns"""
+    return {
+        "views": totals["views"],
+        "sessions": totals["sessions"],
+        "exits": totals["exits"],
+        "avg_duration": _avg(totals["duration_sum"], totals["duration_count"]),
+        "avg_load_time": _avg(totals["load_time_sum"], totals["load_time_count"]),
+        "avg_dom_loaded": _avg(totals["dom_loaded_sum"], totals["dom_loaded_count"]),
+        "avg_first_paint": _avg(totals["first_paint_sum"], totals["first_paint_count"]),
+        "avg_lcp": _avg(totals["lcp_sum"], totals["lcp_count"]),
+        "avg_fid": _avg(totals["fid_sum"], totals["fid_count"]),
+        "samples": totals["load_time_count"],
+        "avg_scroll_depth": _avg(totals["scroll_depth_sum"], totals["views"]),
+        "total_clicks": totals["clicks"],
+        "total_form_interactions": totals["form_interactions"],
+        "load_fast": totals["load_fast"],
+        "load_average": totals["load_average"],
+        "load_slow": totals["load_slow"],
+    }
+
+
+def top_pages(project, start_day, limit=10, order="views", **filters):
+    """Per-path summaries since ``start_day``, busiest first"""
+    rows = (
+        project.daily_page_stats.filter(date__gte=start_day, **filters)
+        .values("path")
+        .annotate(
+            sample_url=Max("url"),
+            **{f"total_{field}": Sum(field) for field in PAGE_SUM_FIELDS},
+        )
+        .order_by(f"-total_{order}", "path")[:limit]
+    )
+    pages = []
+    for row in rows:
+        totals = {field: row[f"total_{field}"] or 0 for field in PAGE_SUM_FIELDS}
+        pages.append(
+            {"path": row["path"], "url": row["sample_url"], **page_summary(totals)}
+        )
+    return pages
+
+
+def session_total(project, start_day, end_day):
+    rows = project.daily_stats.filter(date__gte=start_day, date__lte=end_day)
+    return rows.aggregate(total=Sum("sessions", default=0))["total"]
+
+
+def path_sessions(project, start_day, end_day, paths):
+    """Sessions (summed per day and path) that viewed any of ``paths``"""
+    rows = project.daily_page_stats.filter(
+        date__gte=start_day, date__lte=end_day, path__in=paths
+    )
+    return rows.aggregate(total=Sum("sessions", default=0))["total"]
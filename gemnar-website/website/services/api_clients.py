@@ -0,0 +1,198 @@
+"""
+Pooled API Clients
+
+Keeps authenticated tweepy clients, OpenAI clients and keep-alive
+``requests`` sessions for the Graph API alive between calls, keyed by a
+fingerprint of the credentials they were built with. Reusing them saves the
+TLS handshake and connection setup that otherwise dominates short Twitter
+and Graph calls during posting bursts.
+
+The registry is a bounded LRU. Entries built for a brand are tagged with it
+and dropped as soon as that brand's credentials change (see the ``Brand``
+``post_save`` handler in ``website.signals``); a changed credential also
+changes the fingerprint, so a stale client is never handed out.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .rate_limits import (
+    credential_fingerprint,
+    governed_twitter_api,
+    governed_twitter_client,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 128
+
+TWITTER_CREDENTIAL_FIELDS = (
+    "twitter_bearer_token",
+    "twitter_api_key",
+    "twitter_api_secret",
+    "twitter_access_token",
+    "twitter_access_token_secret",
+)
+
+INSTAGRAM_CREDENTIAL_FIELDS = (
+    "instagram_user_id",
+    "instagram_access_token",
+    "instagram_user_token",
+    "instagram_app_id",
+    "instagram_app_secret",
+)
+
+
+class ClientRegistry:
+    """Thread-safe LRU of API clients with per-tag invalidation"""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or getattr(
+            settings, "API_CLIENT_POOL_SIZE", DEFAULT_POOL_SIZE
+        )
+        self._entries = OrderedDict()
+        # tag -> (credential fingerprint, keys built for it)
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_create(self, key, factory, tag=None, tag_fingerprint=None):
+        with self._lock:
+            if tag is not None:
+                self._sync_tag(tag, tag_fingerprint)
+            client = self._entries.get(key)
+            if client is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return client
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss just builds a spare
+        client = factory()
+
+        with self._lock:
+            client = self._entries.setdefault(key, client)
+            self._entries.move_to_end(key)
+            if tag is not None:
+                self._tags.setdefault(tag, (tag_fingerprint, set()))[1].add(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return client
+
+    def _sync_tag(self, tag, fingerprint):
+        current = self._tags.get(tag)
+        if current is not None and current[0] != fingerprint:
+            self._drop_tag(tag)
+
+    def _drop_tag(self, tag):
+        _, keys = self._tags.pop(tag, (None, set()))
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def sync_tag(self, tag, fingerprint):
+        """Drop ``tag``'s clients if they were built from other credentials"""
+        with self._lock:
+            self._sync_tag(tag, fingerprint)
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            self._drop_tag(tag)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+registry = ClientRegistry()
+
+
+def brand_tag(brand):
+    return f"brand:{brand.pk}"
+
+
+def brand_credentials_fingerprint(brand):
+    """Changes whenever any Twitter or Instagram credential of ``brand`` does"""
+    return credential_fingerprint(
+        *(
+            getattr(brand, field, "")
+            for field in TWITTER_CREDENTIAL_FIELDS + INSTAGRAM_CREDENTIAL_FIELDS
+        )
+    )
+
+
+def brand_twitter_client(brand):
+    """Pooled, rate-governed ``tweepy.Client`` for a brand's credentials"""
+    credentials = [getattr(brand, field) for field in TWITTER_CREDENTIAL_FIELDS]
+    return registry.get_or_create(
+        ("twitter_client", credential_fingerprint(*credentials)),
+        lambda: governed_twitter_client(*credentials),
+        tag=brand_tag(brand),
+        tag_fingerprint=brand_credentials_fingerprint(brand),
+    )
+
+
+def brand_twitter_api(brand):
+    """Pooled, rate-governed ``tweepy.API`` (v1.1 media upload) for a brand"""
+    import tweepy
+
+    credentials = [getattr(brand, field) for field in TWITTER_CREDENTIAL_FIELDS[1:]]
+    return registry.get_or_create(
+        ("twitter_api", credential_fingerprint(*credentials)),
+        lambda: governed_twitter_api(tweepy.OAuth1UserHandler(*credentials)),
+        tag=brand_tag(brand),
+        tag_fingerprint=brand_credentials_fingerprint(brand),
+    )
+
+
+def _build_graph_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    return session
+
+
+def graph_session(brand):
+    """Keep-alive ``requests.Session`` for a brand's Graph API calls"""
+    credentials = [getattr(brand, field) for field in INSTAGRAM_CREDENTIAL_FIELDS]
+    return registry.get_or_create(
+        ("graph_session", credential_fingerprint(*credentials)),
+        _build_graph_session,
+        tag=brand_tag(brand),
+        tag_fingerprint=brand_credentials_fingerprint(brand),
+    )
+
+
+def openai_client(api_key):
+    """Shared ``OpenAI`` client for ``api_key``.
+
+    The client is thread-safe and keeps its HTTP connection pool, so one per
+    key is reused across requests. A rotated key gets a fresh client; the
+    old one ages out of the LRU.
+    """
+    from openai import OpenAI
+
+    return registry.get_or_create(
+        ("openai", credential_fingerprint(api_key)),
+        lambda: OpenAI(api_key=api_key),
+    )
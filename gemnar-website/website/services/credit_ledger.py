@@ -0,0 +1,189 @@
+"""
+Credit Ledger
+
+Balance changes used to read ``Brand.credits_balance`` in Python, subtract
+and ``save()`` the brand, so two generations finishing together could both
+pass the balance check and one deduction would overwrite the other. Every
+change here is a single conditional ``UPDATE`` on the brand row instead::
+
+    UPDATE website_brand SET credits_balance = credits_balance - x
+    WHERE id = %s AND credits_balance >= x
+
+The ledger row is written in the same short transaction, so the brand row is
+only locked for a couple of statements rather than a whole API call.
+
+AI jobs reserve credits before they call a provider. The hold leaves the
+balance straight away so parallel jobs can't overspend, and is captured as a
+usage transaction (optionally for less than was held) or released back when
+the job finishes. Holds that are never settled expire after
+``CREDIT_HOLD_SECONDS`` and are released by ``release_expired``.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Brand, CreditReservation, CreditTransaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOLD_SECONDS = 30 * 60
+
+
+def hold_seconds():
+    return getattr(settings, "CREDIT_HOLD_SECONDS", DEFAULT_HOLD_SECONDS)
+
+
+def _balance(brand_id):
+    return Brand.objects.values_list("credits_balance", flat=True).get(pk=brand_id)
+
+
+def _debit(brand_id, amount):
+    """Take ``amount`` if the balance covers it; the new balance or ``None``"""
+    updated = Brand.objects.filter(pk=brand_id, credits_balance__gte=amount).update(
+        credits_balance=F("credits_balance") - amount
+    )
+    return _balance(brand_id) if updated else None
+
+
+def _credit(brand_id, amount):
+    Brand.objects.filter(pk=brand_id).update(
+        credits_balance=F("credits_balance") + amount
+    )
+    return _balance(brand_id)
+
+
+def _settle(reservation, status):
+    """Move a held reservation to ``status``; False if it was already settled"""
+    now = timezone.now()
+    settled = CreditReservation.objects.filter(
+        pk=reservation.pk, status="held"
+    ).update(status=status, settled_at=now)
+    if settled:
+        reservation.status = status
+        reservation.settled_at = now
+    return bool(settled)
+
+
+def deduct(
+    brand,
+    amount,
+    description="",
+    service_used="",
+    api_request_id="",
+    transaction_type="usage",
+):
+    """Charge ``brand`` at once; the ``CreditTransaction`` or ``None``"""
+    amount = Decimal(str(amount))
+    with transaction.atomic():
+        balance = _debit(brand.pk, amount)
+        if balance is None:
+            return None
+        entry = CreditTransaction.objects.create(
+            brand=brand,
+            transaction_type=transaction_type,
+            amount=-amount,
+            description=description,
+            balance_after=balance,
+            service_used=service_used,
+            api_request_id=api_request_id,
+        )
+    brand.credits_balance = balance
+    return entry
+
+
+def add(brand, amount, description="", transaction_type="purchase", **fields):
+    """Credit ``brand``; returns the ``CreditTransaction``"""
+    amount = Decimal(str(amount))
+    with transaction.atomic():
+        balance = _credit(brand.pk, amount)
+        entry = CreditTransaction.objects.create(
+            brand=brand,
+            transaction_type=transaction_type,
+            amount=amount,
+            description=description,
+            balance_after=balance,
+            **fields,
+        )
+    brand.credits_balance = balance
+    return entry
+
+
+def reserve(brand, amount, description="", service_used="", api_request_id=""):
+    """Hold ``amount`` for a job; the ``CreditReservation`` or ``None``"""
+    amount = Decimal(str(amount))
+    with transaction.atomic():
+        balance = _debit(brand.pk, amount)
+        if balance is None:
+            return None
+        reservation = CreditReservation.objects.create(
+            brand=brand,
+            amount=amount,
+            description=description,
+            service_used=service_used,
+            api_request_id=api_request_id,
+            expires_at=timezone.now() + timedelta(seconds=hold_seconds()),
+        )
+    brand.credits_balance = balance
+    return reservation
+
+
+def capture(reservation, amount=None):
+    """Charge a held reservation and refund whatever wasn't used.
+
+    ``amount`` defaults to the full hold and is capped at it. Returns the
+    usage ``CreditTransaction``, or ``None`` if the hold was already settled.
+    """
+    held = reservation.amount
+    amount = held if amount is None else min(Decimal(str(amount)), held)
+    with transaction.atomic():
+        if not _settle(reservation, "captured"):
+            return None
+        refund = held - amount
+        balance = (
+            _credit(reservation.brand_id, refund)
+            if refund
+            else _balance(reservation.brand_id)
+        )
+        entry = CreditTransaction.objects.create(
+            brand_id=reservation.brand_id,
+            transaction_type="usage",
+            amount=-amount,
+            description=reservation.description,
+            balance_after=balance,
+            service_used=reservation.service_used,
+            api_request_id=reservation.api_request_id,
+        )
+        CreditReservation.objects.filter(pk=reservation.pk).update(transaction=entry)
+    reservation.transaction = entry
+    return entry
+
+
+def release(reservation):
+    """Return a held reservation to the balance; False if already settled"""
+    with transaction.atomic():
+        if not _settle(reservation, "released"):
+            return False
+        _credit(reservation.brand_id, reservation.amount)
+    return True
+
+
+def release_expired(now=None):
+    """Release holds whose job never settled them; returns how many"""
+    expired = CreditReservation.objects.filter(
+        status="held", expires_at__lte=now or timezone.now()
+    )
+    released = 0
+    for reservation in expired.iterator():
+        if release(reservation):
+            released += 1
+            logger.warning(
+                f"Released expired credit hold {reservation.pk} of "
+                f"{reservation.amount} for brand {reservation.brand_id}"
+            )
+    return released
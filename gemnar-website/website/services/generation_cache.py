@@ -0,0 +1,152 @@
+"""
+LLM Generation Cache
+
+Content-addressed cache for the tweet and caption generators. A completion
+is keyed by a hash of the model, the messages (whitespace-normalized) and
+the sampling parameters, so identical brand/strategy/prompt inputs —
+regenerate clicks, client retries, several users on the same brand — are
+answered from memory instead of another OpenAI call.
+
+Entries live for ``LLM_CACHE_TTL`` seconds in a per-process LRU bounded by
+``LLM_CACHE_MAX_ENTRIES``. Callers pass ``bypass=True`` to force a fresh
+completion; its result replaces the cached one. Strategy tweets and queue
+batches, which save a new draft per call, always bypass, and "generate
+again" in the UI sends ``bypass_cache``. ``LLM_CACHE_ENABLED=False`` turns
+caching off entirely.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_text(text):
+    return " ".join(str(text or "").split())
+
+
+def generation_key(model, messages, **params):
+    """Stable hash of everything that determines a completion"""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": m.get("role"), "content": normalize_text(m.get("content"))}
+            for m in messages
+        ],
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class GenerationCache:
+    """Thread-safe TTL + LRU store of generated completions"""
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires at, content)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "LLM_CACHE_TTL", DEFAULT_TTL)
+
+    def get_max_entries(self):
+        if self.max_entries is not None:
+            return self.max_entries
+        return getattr(settings, "LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, content):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.get_ttl(), content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.get_max_entries():
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.bypasses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.get_max_entries(),
+            "ttl": self.get_ttl(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+generation_cache = GenerationCache()
+
+
+def cached_chat_completion(client, model, messages, bypass=False, **params):
+    """Text of a chat completion, served from the cache when possible.
+
+    ``params`` are passed through to ``client.chat.completions.create`` and
+    are part of the cache key. Returns ``(content, cached)``.
+    """
+    enabled = getattr(settings, "LLM_CACHE_ENABLED", True)
+    key = generation_key(model, messages, **params)
+
+    if enabled and not bypass:
+        content = generation_cache.get(key)
+        if content is not None:
+            logger.debug(f"LLM generation cache hit for {model}")
+            return content, True
+    elif bypass:
+        generation_cache.record_bypass()
+
+    response = client.chat.completions.create(
+        model=model, messages=messages, **params
+    )
+    content = response.choices[0].message.content.strip()
+
+    if enabled and content:
+        generation_cache.set(key, content)
+    return content, False
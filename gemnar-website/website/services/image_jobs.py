@@ -0,0 +1,188 @@
+"""
+AI Image Generation Jobs
+
+Runs the image generation endpoints on a bounded worker pool instead of the
+request thread. A request opting in gets an ``ImageGenerationJob`` back at
+once; a pool thread replays the endpoint against a detached copy of the
+request and stores its response on the job. Clients poll the job status
+endpoint or listen on their ``user_<id>`` notification socket.
+
+Uploaded files are copied into memory when the job is queued, so the worker
+never touches the original request after it has been answered. Because of
+that, only signed-in users can queue jobs, each limited to
+``IMAGE_GENERATION_MAX_ACTIVE_PER_USER`` unfinished ones.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections, connections, transaction
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+
+from ..models import ImageGenerationJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ACTIVE_PER_USER = 4
+# Jobs still running this long after they started were lost with their
+# process; queued jobs get longer, as they may be waiting for a free worker
+STALE_AFTER = timedelta(minutes=15)
+QUEUED_STALE_AFTER = timedelta(hours=2)
+
+# operation name -> undecorated endpoint function
+OPERATIONS = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register_operation(name, func):
+    OPERATIONS[name] = func
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(
+                    settings, "IMAGE_GENERATION_WORKERS", DEFAULT_WORKERS
+                ),
+                thread_name_prefix="image-job",
+            )
+        return _executor
+
+
+class JobRequest:
+    """Detached copy of the parts of a request the image endpoints read"""
+
+    def __init__(self, user, data, files):
+        self.user = user
+        self.FILES = files
+        self.data = data
+
+    @classmethod
+    def from_request(cls, request):
+        files = MultiValueDict()
+        for key, uploads in request.FILES.lists():
+            for upload in uploads:
+                upload.seek(0)
+                files.appendlist(
+                    key,
+                    SimpleUploadedFile(
+                        upload.name, upload.read(), content_type=upload.content_type
+                    ),
+                )
+
+        data = QueryDict(mutable=True)
+        if hasattr(request.data, "lists"):
+            for key, values in request.data.lists():
+                if key not in request.FILES:
+                    data.setlist(key, values)
+        else:
+            data.update(request.data)
+        params = {key: data.get(key) for key in data}
+        # Endpoints read uploads through request.data as well, like DRF does
+        data.update(files)
+        return cls(request.user, data, files), params
+
+
+def active_job_count(user):
+    return ImageGenerationJob.objects.filter(
+        user=user, status__in=["queued", "running"]
+    ).count()
+
+
+def has_capacity(user):
+    limit = getattr(
+        settings,
+        "IMAGE_GENERATION_MAX_ACTIVE_PER_USER",
+        DEFAULT_MAX_ACTIVE_PER_USER,
+    )
+    return active_job_count(user) < limit
+
+
+def submit_job(request, operation):
+    """Queue ``operation`` for ``request`` and return the new job"""
+    job_request, params = JobRequest.from_request(request)
+    job = ImageGenerationJob.objects.create(
+        user=request.user,
+        operation=operation,
+        params=params,
+    )
+    # The worker must not pick the job up before it is visible to it
+    transaction.on_commit(
+        lambda: get_executor().submit(_work, job.pk, job_request)
+    )
+    return job
+
+
+def _work(job_id, job_request):
+    close_old_connections()
+    try:
+        run_job(job_id, job_request)
+    finally:
+        connections.close_all()
+
+
+def _jsonable(data):
+    return json.loads(json.dumps(data, default=str))
+
+
+def run_job(job_id, job_request):
+    """Run a queued job's endpoint and record its response"""
+    job = ImageGenerationJob.objects.get(pk=job_id)
+    func = OPERATIONS.get(job.operation)
+    if func is None:
+        job.mark_failed(f"Unknown image operation: {job.operation}")
+        notify(job)
+        return job
+
+    job.mark_running()
+    notify(job)
+    try:
+        response = func(job_request)
+        job.mark_finished(_jsonable(response.data), response.status_code)
+    except Exception as e:
+        logger.exception(f"Image generation job {job.pk} failed")
+        job.mark_failed(str(e))
+    notify(job)
+    return job
+
+
+def expire_stale_job(job, now=None):
+    """Fail a job whose worker died with its process"""
+    now = now or timezone.now()
+    if job.status == "running":
+        stale = (job.started_at or job.created_at) < now - STALE_AFTER
+    else:
+        stale = job.status == "queued" and job.created_at < now - QUEUED_STALE_AFTER
+    if stale:
+        job.mark_failed("Image generation was interrupted. Please try again.")
+    return job
+
+
+def notify(job):
+    """Push the job's state to its owner's notification socket"""
+    if not job.user_id:
+        return
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                f"user_{job.user_id}",
+                {"type": "image_job_update", "job": job.to_dict()},
+            )
+    except Exception as e:
+        logger.error(f"Failed to send image job notification: {e}")
@@ -0,0 +1,232 @@
+"""
+Instagram Publish Poller
+
+Advances Reels through the staged publish flow without sleeping:
+
+    container_created -> processing -> ready -> published
+
+``BrandInstagramPost.post_to_instagram`` stops once the media container for a
+video exists. Every tick, ``advance_pending_containers`` looks up the status of
+all pending containers in one pass (batched per Graph host and access token),
+then publishes the ones Instagram has finished processing.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import requests
+from django.utils import timezone
+
+from ..models import BrandInstagramPost
+from .api_clients import graph_session
+from .rate_limits import RateLimited
+
+logger = logging.getLogger(__name__)
+
+# Stages that still need a container status lookup
+POLL_STAGES = ("container_created", "processing")
+
+# Graph API multi-ID lookups accept up to 50 IDs per request
+MAX_IDS_PER_REQUEST = 50
+
+# Give up on containers that never finish processing
+CONTAINER_TIMEOUT = timedelta(minutes=30)
+
+REQUEST_TIMEOUT = 15
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def fetch_container_statuses(
+    session, api_base, access_token, container_ids
+) -> Dict[str, str]:
+    """Return ``{container_id: status_code}`` for a batch of containers.
+
+    Uses a single ``?ids=`` lookup; if the host rejects it, falls back to one
+    request per container. Containers whose status could not be read are
+    omitted from the result.
+    """
+    version = BrandInstagramPost.GRAPH_API_VERSION
+    statuses = {}
+
+    try:
+        response = session.get(
+            f"{api_base}/{version}/",
+            params={
+                "ids": ",".join(container_ids),
+                "fields": "status_code",
+                "access_token": access_token,
+            },
+            timeout=REQUEST_TIMEOUT,
+        )
+        if response.status_code == 200:
+            for container_id, data in response.json().items():
+                if isinstance(data, dict) and data.get("status_code"):
+                    statuses[str(container_id)] = data["status_code"]
+            return statuses
+        logger.info(
+            f"Batch container lookup on {api_base} returned "
+            f"{response.status_code}; falling back to single lookups"
+        )
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Batch container lookup on {api_base} failed: {str(e)}")
+
+    for container_id in container_ids:
+        try:
+            response = session.get(
+                f"{api_base}/{version}/{container_id}",
+                params={"fields": "status_code", "access_token": access_token},
+                timeout=REQUEST_TIMEOUT,
+            )
+            if response.status_code == 200:
+                status_code = response.json().get("status_code")
+                if status_code:
+                    statuses[container_id] = status_code
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Container lookup for {container_id} failed: {str(e)}")
+
+    return statuses
+
+
+def _mark_failed(post, error_msg):
+    post.status = "failed"
+    post.publish_stage = "failed"
+    post.error_message = error_msg
+    post.save()
+    post._send_websocket_notification(
+        "instagram_post_failed",
+        {"post_id": post.id, "error_message": error_msg},
+    )
+
+
+def _apply_status(post, status_code, now, dry_run=False):
+    """Move a polled post to its next stage. Returns the new stage.
+
+    With ``dry_run`` nothing is saved; the stage it would move to is returned.
+    """
+    error_msg = None
+    if status_code == "FINISHED":
+        stage = "ready"
+    elif status_code in ("ERROR", "EXPIRED"):
+        error_msg = (
+            f"Instagram video processing failed. Container status: {status_code}"
+        )
+    elif (
+        post.container_created_at
+        and now - post.container_created_at > CONTAINER_TIMEOUT
+    ):
+        error_msg = (
+            "Instagram video processing timeout. Container not ready after "
+            f"{int(CONTAINER_TIMEOUT.total_seconds() // 60)} minutes. This may be "
+            "due to large file size or Instagram server issues."
+        )
+    else:
+        stage = "processing"
+
+    if error_msg:
+        if dry_run:
+            logger.info(f"DRY RUN: Would fail Instagram post {post.id}: {error_msg}")
+        else:
+            _mark_failed(post, error_msg)
+        return "failed"
+    if dry_run:
+        return stage
+
+    post.publish_stage = stage
+    post.container_checked_at = now
+    post.save(update_fields=["publish_stage", "container_checked_at", "updated_at"])
+    return stage
+
+
+def advance_pending_containers(dry_run=False) -> Dict[str, Any]:
+    """Poll every pending Reel container once and publish the finished ones
+
+    With ``dry_run`` the containers are still looked up, but nothing is saved
+    or published; the summary counts what would have happened.
+    """
+    now = timezone.now()
+    summary = {"checked": 0, "ready": 0, "published": 0, "failed": 0, "deferred": 0}
+
+    pending = list(
+        BrandInstagramPost.objects.filter(
+            status="publishing",
+            publish_stage__in=POLL_STAGES + ("ready",),
+        )
+        .select_related("brand")
+        .order_by("container_created_at")
+    )
+    if not pending:
+        return summary
+
+    # Group containers that can share one lookup request
+    groups: Dict[tuple, List[BrandInstagramPost]] = {}
+    ready_posts = []
+    for post in pending:
+        if post.publish_stage == "ready":
+            ready_posts.append(post)
+            continue
+        access_token, _ = post.get_publish_access_token()
+        key = (post.container_api_base or "https://graph.instagram.com", access_token)
+        groups.setdefault(key, []).append(post)
+
+    for (api_base, access_token), posts in groups.items():
+        # Pooled keep-alive session for the account these containers belong to
+        session = graph_session(posts[0].brand)
+        for batch in _chunks(posts, MAX_IDS_PER_REQUEST):
+            statuses = fetch_container_statuses(
+                session, api_base, access_token, [p.container_id for p in batch]
+            )
+            for post in batch:
+                summary["checked"] += 1
+                stage = _apply_status(
+                    post, statuses.get(post.container_id), now, dry_run
+                )
+                if stage == "ready":
+                    summary["ready"] += 1
+                    ready_posts.append(post)
+                elif stage == "failed":
+                    summary["failed"] += 1
+
+    worker_id = BrandInstagramPost.default_worker_id()
+    for post in ready_posts:
+        if dry_run:
+            logger.info(
+                f"DRY RUN: Would publish Instagram container {post.container_id}"
+            )
+            continue
+        # Another scheduler may be publishing the same container
+        if not post.claim(worker_id, status="publishing", publish_stage="ready"):
+            continue
+        try:
+            access_token, token_field = post.get_publish_access_token()
+            success, error = post._publish_container(
+                post.container_id,
+                post.container_api_base or "https://graph.instagram.com",
+                access_token,
+                token_field,
+            )
+        except RateLimited as e:
+            # Publish limit used up; the container stays ready for a later tick
+            summary["deferred"] += 1
+            logger.info(f"Deferring Instagram post {post.id}: {str(e)}")
+            continue
+        except Exception as e:
+            success, error = False, str(e)
+            _mark_failed(post, error)
+        finally:
+            post.release_claim()
+
+        if success:
+            summary["published"] += 1
+        else:
+            if post.publish_stage != "failed":
+                post.publish_stage = "failed"
+                post.save(update_fields=["publish_stage", "updated_at"])
+            summary["failed"] += 1
+            logger.error(f"Failed to publish Instagram post {post.id}: {error}")
+
+    return summary
@@ -0,0 +1,153 @@
+"""
+Streaming Media Downloads
+
+Generated videos used to be fetched with a single ``requests.get`` and held
+in memory while they were saved, then downloaded a second time for the
+thumbnail. ``stream_download`` writes the response to a temporary file in
+chunks instead, hashing it on the way, so a worker only ever holds one
+chunk of a Reel in memory. Thumbnail extraction and ffprobe metadata run on
+that local copy, and storage backends read it back from disk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+
+import requests
+from django.core.files import File
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 120)
+# Generated clips are a few dozen MB; anything far beyond is not a video
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+class DownloadTooLarge(Exception):
+    pass
+
+
+class DownloadedMedia:
+    """A downloaded file on local disk; delete it with ``cleanup``"""
+
+    def __init__(self, path, size, sha256, content_type=""):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.content_type = content_type
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+    def open(self, name):
+        """A Django ``File`` over the local copy, for ``FieldFile.save``"""
+        return File(open(self.path, "rb"), name=name)
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def stream_download(url, suffix=".mp4", max_bytes=DEFAULT_MAX_BYTES):
+    """Download ``url`` to a temporary file in chunks.
+
+    Returns a ``DownloadedMedia`` with the file's size and SHA-256. The
+    partial file is removed if the download fails.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            with os.fdopen(fd, "wb") as out:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        raise DownloadTooLarge(
+                            f"Download from {url} exceeds {max_bytes} bytes"
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return DownloadedMedia(path, size, digest.hexdigest(), content_type)
+
+
+def extract_thumbnail(video_path, name="thumbnail.jpg"):
+    """First frame of a local video as a JPEG ``ContentFile``, or ``None``"""
+    thumbnail_path = f"{os.path.splitext(video_path)[0]}_thumb.jpg"
+    try:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                video_path,
+                "-vframes",
+                "1",
+                "-vf",
+                "scale=512:512:force_original_aspect_ratio=decrease",
+                thumbnail_path,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        with open(thumbnail_path, "rb") as f:
+            return ContentFile(f.read(), name=name)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        logger.warning("ffmpeg not available, skipping thumbnail generation")
+        return None
+    finally:
+        if os.path.exists(thumbnail_path):
+            os.unlink(thumbnail_path)
+
+
+def probe_video(video_path):
+    """Duration and dimensions of a local video via ffprobe ({} if unavailable)"""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "stream=width,height:format=duration",
+                "-of",
+                "json",
+                video_path,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        data = json.loads(result.stdout or "{}")
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return {}
+
+    stream = (data.get("streams") or [{}])[0]
+    metadata = {"width": stream.get("width"), "height": stream.get("height")}
+    duration = (data.get("format") or {}).get("duration")
+    if duration:
+        metadata["duration"] = float(duration)
+    return {k: v for k, v in metadata.items() if v is not None}
@@ -0,0 +1,103 @@
+"""
+Tweet Media Pre-upload
+
+Uploads the images of tweets due in the next few minutes ahead of time and
+stores the returned media ID with its expiry on the ``BrandTweet``. When the
+tweet comes due, posting is a single ``create_tweet`` call; the slow v1.1
+media upload is off the critical path.
+
+Only brands with Twitter credentials are considered, and tweets more than
+``OVERDUE_AFTER`` past their slot are left to the posting step. A failed
+upload is retried after a backoff that doubles with each failure, so tweets
+that keep failing don't hold the head of the window ahead of ones that are
+actually coming due.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import BrandTweet
+from .queue_health import twitter_configured_brands
+from .rate_limits import RateLimited
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON = timedelta(minutes=120)
+# Tweets this far past due are uploaded inline when they're finally posted
+OVERDUE_AFTER = timedelta(minutes=15)
+RETRY_BACKOFF = timedelta(minutes=5)
+MAX_RETRY_BACKOFF = timedelta(hours=1)
+
+
+def tweets_needing_media(horizon=DEFAULT_HORIZON, now=None):
+    """Approved tweets with an image due within ``horizon`` and no usable upload"""
+    now = now or timezone.now()
+    margin = timedelta(seconds=BrandTweet.MEDIA_EXPIRY_MARGIN_SECONDS)
+    return (
+        BrandTweet.objects.filter(
+            status="approved",
+            scheduled_for__gte=now - OVERDUE_AFTER,
+            scheduled_for__lte=now + horizon,
+            brand__in=twitter_configured_brands(),
+        )
+        .filter(
+            Q(twitter_media_retry_at__isnull=True) | Q(twitter_media_retry_at__lte=now)
+        )
+        .exclude(image="")
+        .exclude(image__isnull=True)
+        # Skip tweets a posting worker currently holds
+        .exclude(claimed_until__gt=now)
+        .filter(
+            Q(twitter_media_id="")
+            | ~Q(twitter_media_source=F("image"))
+            | Q(twitter_media_expires_at__isnull=True)
+            | Q(twitter_media_expires_at__lt=F("scheduled_for") + margin)
+        )
+        .select_related("brand")
+        .order_by("scheduled_for", "pk")
+    )
+
+
+def record_failure(tweet, now=None):
+    """Back off before the next pre-upload attempt for ``tweet``"""
+    now = now or timezone.now()
+    failures = tweet.twitter_media_failures + 1
+    backoff = min(RETRY_BACKOFF * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+    BrandTweet.objects.filter(pk=tweet.pk).update(
+        twitter_media_failures=failures, twitter_media_retry_at=now + backoff
+    )
+
+
+def preupload_due_media(horizon=DEFAULT_HORIZON, limit=50, dry_run=False):
+    """Upload media for the next ``limit`` tweets due within ``horizon``.
+
+    Failures are logged, backed off and left for the posting step, which
+    uploads inline when no usable media ID is stored. A rate-limited brand
+    is skipped for the rest of the run.
+    """
+    summary = {"uploaded": 0, "failed": 0, "deferred": 0}
+    limited_brands = set()
+
+    for tweet in tweets_needing_media(horizon)[:limit]:
+        if tweet.brand_id in limited_brands:
+            continue
+        if dry_run:
+            logger.info(f"DRY RUN: Would pre-upload media for tweet {tweet.id}")
+            summary["uploaded"] += 1
+            continue
+        try:
+            tweet.upload_media()
+            summary["uploaded"] += 1
+        except RateLimited as e:
+            limited_brands.add(tweet.brand_id)
+            summary["deferred"] += 1
+            logger.info(f"Deferring media pre-upload for {tweet.brand.name}: {str(e)}")
+        except Exception as e:
+            summary["failed"] += 1
+            record_failure(tweet)
+            logger.warning(f"Media pre-upload failed for tweet {tweet.id}: {str(e)}")
+
+    return summary
@@ -0,0 +1,132 @@
+"""
+AI Service Pricing Table
+
+``CreditManager.get_service_cost`` sits in front of every generation endpoint
+and used to run an ``icontains`` query against ``RunwarePricingData`` each
+time, while the pricing page re-read every row per render. Prices only
+change when ``scrape_runware_pricing`` runs or an admin edits a row, so all
+active rows are loaded into memory at once and served from there.
+
+The table is versioned by the latest scrape and update timestamps. Once
+``PRICING_CACHE_TTL`` seconds have passed, one aggregate query checks the
+version and the rows are only re-read if it moved. Saving or deleting a row
+in this process drops the table immediately (see ``website.signals``).
+"""
+
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from ..models import RunwarePricingData
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+
+# Used when no scraped row matches the service
+DEFAULT_COSTS = {
+    "Image Generation": Decimal("0.02"),
+    "Text Generation": Decimal("0.001"),
+    "Image Upscaling": Decimal("0.005"),
+    "Background Removal": Decimal("0.003"),
+}
+FALLBACK_COST = Decimal("0.01")
+
+
+def current_version():
+    active = RunwarePricingData.objects.filter(is_active=True)
+    version = active.aggregate(
+        scraped=Max("last_scraped"), updated=Max("updated_at"), rows=Count("id")
+    )
+    return (version["scraped"], version["updated"], version["rows"])
+
+
+class PricingTable:
+    """Thread-safe in-memory copy of the active pricing rows"""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._rows = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "PRICING_CACHE_TTL", DEFAULT_TTL)
+
+    def rows(self):
+        """Active ``RunwarePricingData`` rows ordered by service name"""
+        with self._lock:
+            if (
+                self._rows is not None
+                and time.monotonic() - self._checked_at < self.get_ttl()
+            ):
+                return self._rows
+
+            version = current_version()
+            if self._rows is None or version != self._version:
+                self._rows = list(
+                    RunwarePricingData.objects.filter(is_active=True).order_by(
+                        "service_name"
+                    )
+                )
+                self._version = version
+                self.loads += 1
+            self._checked_at = time.monotonic()
+            return self._rows
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+            self._version = None
+
+    def cost(self, service_name):
+        """Per-unit credit cost of a service, matched by name like before"""
+        needle = service_name.lower()
+        # The first row by name decides, as the old ``icontains().first()`` did
+        pricing = next(
+            (row for row in self.rows() if needle in row.service_name.lower()), None
+        )
+        if pricing and pricing.gemnar_price:
+            return pricing.gemnar_price
+
+        for key, value in DEFAULT_COSTS.items():
+            if key.lower() in needle:
+                return value
+        return FALLBACK_COST
+
+    def estimate(self, items):
+        """Cost of a multi-asset job.
+
+        ``items`` maps service names to quantities (or is an iterable of
+        ``(service_name, quantity)`` pairs). Returns the total and a line per
+        service.
+        """
+        if isinstance(items, dict):
+            items = items.items()
+
+        lines = []
+        total = Decimal("0")
+        for service_name, quantity in items:
+            unit_cost = self.cost(service_name)
+            cost = unit_cost * quantity
+            lines.append(
+                {
+                    "service": service_name,
+                    "quantity": quantity,
+                    "unit_cost": unit_cost,
+                    "cost": cost,
+                }
+            )
+            total += cost
+        return {"total": total, "lines": lines}
+
+
+pricing_table = PricingTable()
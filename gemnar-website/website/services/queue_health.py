@@ -0,0 +1,120 @@
+"""
+Tweet Queue Health
+
+Computes, for every brand with Twitter credentials, how many tweets are ready
+to post and how deep the queue is over the next day, three days and week, all
+in a single annotated query. The tick planner in ``send_brand_tweets`` uses it
+to pick ready brands and the Slack queue alerts read the same snapshot.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from ..models import Brand, BrandTweet
+
+PENDING_STATUSES = ["approved", "draft"]
+
+TWITTER_CREDENTIAL_FIELDS = [
+    "twitter_api_key",
+    "twitter_api_secret",
+    "twitter_access_token",
+    "twitter_access_token_secret",
+]
+
+
+def twitter_configured_brands():
+    """Brands with every Twitter credential needed for posting filled in"""
+    queryset = Brand.objects.all()
+    for field in TWITTER_CREDENTIAL_FIELDS:
+        queryset = queryset.filter(**{f"{field}__isnull": False}).exclude(
+            **{field: ""}
+        )
+    return queryset
+
+
+@dataclass(frozen=True)
+class BrandQueueHealth:
+    """Queue depth for one brand at the time the snapshot was taken"""
+
+    brand: Brand
+    ready: int
+    next_24h: int
+    next_3_days: int
+    next_week: int
+    total_pending: int
+
+    @property
+    def alert_level(self) -> Optional[str]:
+        """``empty``, ``no_24h`` or ``low`` when the queue needs attention"""
+        if self.total_pending == 0:
+            return "empty"
+        if self.next_24h == 0:
+            return "no_24h"
+        if self.next_3_days <= 2:
+            return "low"
+        return None
+
+
+def queue_health_snapshot(
+    now=None, ready_only=False, brand_ids=None
+) -> Dict[int, BrandQueueHealth]:
+    """Return ``{brand_id: BrandQueueHealth}`` for Twitter-configured brands.
+
+    Runs one query regardless of how many brands there are. With
+    ``ready_only`` only brands that have claimable tweets due are returned;
+    ``brand_ids`` restricts the snapshot to the given brands.
+    """
+    now = now or timezone.now()
+    pending = Q(brand_tweets__status__in=PENDING_STATUSES)
+
+    def upcoming(delta):
+        return pending & Q(
+            brand_tweets__scheduled_for__gte=now,
+            brand_tweets__scheduled_for__lte=now + delta,
+        )
+
+    queryset = (
+        twitter_configured_brands()
+        .select_related("owner")
+        .annotate(
+            has_ready=Exists(
+                BrandTweet.claimable(now).filter(brand=OuterRef("pk"))
+            ),
+            ready_count=Count(
+                "brand_tweets",
+                filter=Q(
+                    brand_tweets__status="approved",
+                    brand_tweets__scheduled_for__lte=now,
+                )
+                & (
+                    Q(brand_tweets__claimed_until__isnull=True)
+                    | Q(brand_tweets__claimed_until__lt=now)
+                ),
+            ),
+            next_24h_count=Count("brand_tweets", filter=upcoming(timedelta(hours=24))),
+            next_3_days_count=Count("brand_tweets", filter=upcoming(timedelta(days=3))),
+            next_week_count=Count("brand_tweets", filter=upcoming(timedelta(days=7))),
+            total_pending_count=Count("brand_tweets", filter=pending),
+        )
+        .order_by("pk")
+    )
+    if ready_only:
+        queryset = queryset.filter(has_ready=True)
+    if brand_ids is not None:
+        queryset = queryset.filter(pk__in=brand_ids)
+
+    return {
+        brand.pk: BrandQueueHealth(
+            brand=brand,
+            ready=brand.ready_count,
+            next_24h=brand.next_24h_count,
+            next_3_days=brand.next_3_days_count,
+            next_week=brand.next_week_count,
+            total_pending=brand.total_pending_count,
+        )
+        for brand in queryset
+    }
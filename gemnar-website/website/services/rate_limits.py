@@ -0,0 +1,317 @@
+"""
+API Rate-Limit Governor
+
+Token buckets for outbound Twitter and Instagram Graph calls, keyed by the
+credential making the call and the endpoint family being called. The buckets
+are refilled locally; once a limit is exhausted the key is blocked until the
+advertised reset, shared between processes through the Django cache.
+
+Twitter's ``x-rate-limit-*`` headers describe the endpoint that answered,
+not the family, so they block only that endpoint (its path with numeric IDs
+generalised). A 429 without them, and Graph usage headers, block the family.
+
+Callers never sleep on a limit. ``RateLimitGovernor.acquire`` raises
+``RateLimited`` with the time the call may be retried, so web requests can
+answer immediately and queue workers can leave the item for a later tick.
+
+``governed_twitter_client`` / ``governed_twitter_api`` return tweepy clients
+whose HTTP session goes through the governor, so existing call sites keep
+using the normal tweepy methods.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# (requests, window in seconds) per credential. Deliberately at or below the
+# documented per-user limits; override with settings.API_RATE_LIMITS.
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "twitter_write": (100, 15 * 60),
+    "twitter_read": (300, 15 * 60),
+    "twitter_media": (400, 15 * 60),
+    "graph_publish": (50, 24 * 60 * 60),
+    "graph": (200, 60 * 60),
+}
+
+# Block this long after a 429 that carries no reset information
+DEFAULT_BACKOFF_SECONDS = 60
+
+# Graph usage headers report percentages; back off before reaching 100
+GRAPH_USAGE_THRESHOLD = 95
+
+CACHE_PREFIX = "ratelimit"
+
+
+class RateLimited(Exception):
+    """Raised instead of sleeping when a credential has no calls left"""
+
+    def __init__(self, key, family, retry_at):
+        self.key = key
+        self.family = family
+        self.retry_at = retry_at
+        super().__init__(
+            f"Rate limit for {family} reached; retry after "
+            f"{self.retry_at_datetime.isoformat()}"
+        )
+
+    @property
+    def retry_after(self) -> int:
+        return max(0, int(self.retry_at - time.time()) + 1)
+
+    @property
+    def retry_at_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.retry_at, tz=dt_timezone.utc)
+
+
+def find_rate_limited(exc) -> Optional[RateLimited]:
+    """Return the ``RateLimited`` behind ``exc``, if any.
+
+    tweepy.API wraps exceptions raised by its session in ``TweepyException``,
+    so the original is only reachable through the exception context.
+    """
+    while exc is not None:
+        if isinstance(exc, RateLimited):
+            return exc
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def credential_fingerprint(*parts) -> str:
+    """Stable, non-reversible key for a set of credentials"""
+    digest = hashlib.sha256("\x1f".join(str(p or "") for p in parts).encode())
+    return digest.hexdigest()[:24]
+
+
+def endpoint_family(method, url) -> str:
+    """Classify an outbound request into a rate-limit family"""
+    parts = urlsplit(url)
+    host, path = parts.netloc, parts.path
+    if "twitter.com" in host or "x.com" in host:
+        if host.startswith("upload.") or "/media" in path:
+            return "twitter_media"
+        if method.upper() in ("POST", "DELETE", "PUT"):
+            return "twitter_write"
+        return "twitter_read"
+    if path.rstrip("/").endswith("/media_publish"):
+        return "graph_publish"
+    return "graph"
+
+
+def endpoint_path(url) -> str:
+    """Path of ``url`` with numeric IDs generalised, e.g. ``/2/tweets/:id``"""
+    segments = urlsplit(url).path.rstrip("/").split("/")
+    # The first segment is the API version ("2", "1.1", "v18.0")
+    return "/".join(
+        ":id" if index > 1 and segment.isdigit() else segment
+        for index, segment in enumerate(segments)
+    )
+
+
+def limit_scope(family, endpoint=None) -> str:
+    """What a block applies to: a whole family, or one of its endpoints"""
+    return f"{family} {endpoint}" if endpoint else family
+
+
+class RateLimitGovernor:
+    """Per-(credential, family) token buckets with header-driven blocking"""
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or getattr(settings, "API_RATE_LIMITS", {}))
+        self._buckets: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, key, family):
+        return f"{CACHE_PREFIX}:{family}:{key}"
+
+    def blocked_until(self, key, family) -> Optional[float]:
+        """Epoch seconds until which ``key`` may not call ``family``"""
+        retry_at = cache.get(self._cache_key(key, family))
+        if retry_at and retry_at > time.time():
+            return retry_at
+        return None
+
+    def block(self, key, family, retry_at):
+        """Refuse calls for ``key``/``family`` until ``retry_at`` (epoch)"""
+        timeout = max(1, int(retry_at - time.time()) + 1)
+        cache.set(self._cache_key(key, family), retry_at, timeout=timeout)
+        with self._lock:
+            bucket = self._buckets.get((key, family))
+            if bucket:
+                bucket[0] = 0.0
+        logger.warning(
+            f"Rate limit reached for {family} ({key[:8]}); "
+            f"deferring calls for {timeout}s"
+        )
+
+    def acquire(self, key, family, endpoint=None):
+        """Take one call from the bucket or raise ``RateLimited``"""
+        for scope in {family, limit_scope(family, endpoint)}:
+            retry_at = self.blocked_until(key, scope)
+            if retry_at:
+                raise RateLimited(key, scope, retry_at)
+
+        capacity, window = self.limits.get(family, self.limits["graph"])
+        rate = capacity / window
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get((key, family), (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self._buckets[(key, family)] = [tokens, now]
+                raise RateLimited(key, family, time.time() + (1 - tokens) / rate)
+            self._buckets[(key, family)] = [tokens - 1, now]
+
+    def record_response(self, key, family, response, endpoint=None):
+        """Update the bucket from a response's rate-limit headers.
+
+        ``endpoint`` (see ``endpoint_path``) scopes Twitter's per-endpoint
+        headers; without it they apply to the whole family.
+        """
+        headers = response.headers
+        retry_at = None
+        scope = family
+
+        remaining = headers.get("x-rate-limit-remaining")
+        reset = headers.get("x-rate-limit-reset")
+        if remaining is not None:
+            try:
+                remaining = int(remaining)
+                with self._lock:
+                    bucket = self._buckets.get((key, limit_scope(family, endpoint)))
+                    if bucket:
+                        bucket[0] = min(bucket[0], remaining)
+                if remaining <= 0 and reset:
+                    retry_at = float(reset)
+                    scope = limit_scope(family, endpoint)
+            except ValueError:
+                pass
+
+        usage = self._graph_usage(headers)
+        if usage is not None:
+            percent, regain_minutes = usage
+            if percent >= GRAPH_USAGE_THRESHOLD:
+                retry_at = time.time() + max(regain_minutes, 1) * 60
+
+        if response.status_code == 429 or (
+            response.status_code == 400 and usage is not None and usage[0] >= 100
+        ):
+            if retry_at is None:
+                if reset:
+                    retry_at = float(reset)
+                    scope = limit_scope(family, endpoint)
+                elif headers.get("retry-after", "").isdigit():
+                    retry_at = time.time() + int(headers["retry-after"])
+                else:
+                    retry_at = time.time() + DEFAULT_BACKOFF_SECONDS
+
+        if retry_at and retry_at > time.time():
+            self.block(key, scope, retry_at)
+
+    @staticmethod
+    def _graph_usage(headers) -> Optional[Tuple[float, float]]:
+        """Highest usage percentage and minutes to regain access, if reported"""
+        percent = None
+        regain = 0.0
+        for name in ("x-app-usage", "x-business-use-case-usage"):
+            raw = headers.get(name)
+            if not raw:
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            # Business use case usage is keyed by object ID with a list of entries
+            entries = [data]
+            if name == "x-business-use-case-usage":
+                entries = [e for items in data.values() for e in items]
+            for entry in entries:
+                for field in ("call_count", "total_time", "total_cputime"):
+                    value = entry.get(field)
+                    if isinstance(value, (int, float)):
+                        percent = max(percent or 0, value)
+                regain = max(regain, entry.get("estimated_time_to_regain_access") or 0)
+        if percent is None:
+            return None
+        return percent, regain
+
+
+governor = RateLimitGovernor()
+
+
+class GovernedSession(requests.Session):
+    """A requests session whose calls are metered by the governor"""
+
+    def __init__(self, key, limiter=None):
+        super().__init__()
+        self.rate_limit_key = key
+        self.limiter = limiter or governor
+
+    def request(self, method, url, *args, **kwargs):
+        family = endpoint_family(method, url)
+        endpoint = endpoint_path(url)
+        self.limiter.acquire(self.rate_limit_key, family, endpoint)
+        response = super().request(method, url, *args, **kwargs)
+        self.limiter.record_response(self.rate_limit_key, family, response, endpoint)
+        return response
+
+
+def twitter_credential_key(consumer_key, access_token) -> str:
+    """Twitter user-context limits apply per app and user"""
+    return credential_fingerprint("twitter", consumer_key, access_token)
+
+
+def instagram_credential_key(brand) -> str:
+    """Graph limits apply per app and Instagram account"""
+    return credential_fingerprint("instagram", brand.instagram_user_id)
+
+
+def governed_twitter_client(
+    bearer_token=None,
+    consumer_key=None,
+    consumer_secret=None,
+    access_token=None,
+    access_token_secret=None,
+    **kwargs,
+):
+    """``tweepy.Client`` that raises ``RateLimited`` instead of sleeping"""
+    import tweepy
+
+    kwargs["wait_on_rate_limit"] = False
+    client = tweepy.Client(
+        bearer_token=bearer_token,
+        consumer_key=consumer_key,
+        consumer_secret=consumer_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret,
+        **kwargs,
+    )
+    client.session = GovernedSession(
+        twitter_credential_key(consumer_key or bearer_token, access_token)
+    )
+    return client
+
+
+def governed_twitter_api(auth, **kwargs):
+    """``tweepy.API`` (v1.1, used for media upload) metered by the governor"""
+    import tweepy
+
+    kwargs["wait_on_rate_limit"] = False
+    api = tweepy.API(auth, **kwargs)
+    api.session = GovernedSession(
+        twitter_credential_key(
+            getattr(auth, "consumer_key", None), getattr(auth, "access_token", None)
+        )
+    )
+    return api
@@ -0,0 +1,77 @@
+"""
+Decrypted Secret Store
+
+Process-wide cache of decrypted ``EncryptedVariable`` values. Reading a
+variable costs a database query plus an AES-GCM decryption, and API keys
+are read on every tweet, caption and image generation, so decrypted values
+are kept in memory for ``SECRETS_CACHE_TTL`` seconds.
+
+Saving or deleting a variable drops its entry straight away (see the
+``EncryptedVariable`` handlers in ``website.signals``); the TTL only bounds
+how long other processes keep serving a value changed elsewhere. Missing
+keys are cached too, so a key that is not configured doesn't cost a query
+per call either.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_TTL = 300
+
+_MISSING = object()
+
+
+class SecretStore:
+    """Thread-safe TTL cache of decrypted variable values"""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        # key -> (expires at, value or _MISSING)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "SECRETS_CACHE_TTL", DEFAULT_TTL)
+
+    def get(self, key, loader, default=None):
+        """Return the cached value for ``key``, calling ``loader`` on a miss.
+
+        ``loader`` returns the decrypted value, or ``None`` when the variable
+        does not exist or is inactive.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                value = entry[1]
+                return default if value is _MISSING else value
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (
+                now + self.get_ttl(),
+                _MISSING if value is None else value,
+            )
+        return default if value is None else value
+
+    def invalidate(self, key=None):
+        """Forget ``key``, or every cached value when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+secret_store = SecretStore()
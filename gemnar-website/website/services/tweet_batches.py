@@ -0,0 +1,220 @@
+"""
+Batch Tweet Generation
+
+Strategy-based generation made one completion per tweet, so filling a week
+of a brand's queue took dozens of sequential OpenAI calls. ``generate_batch``
+writes up to ``TWEET_BATCH_SIZE`` tweets per completion instead: every
+requested tweet is listed with its strategy's formatted prompt and the model
+answers with a JSON object holding one tweet per entry.
+
+Tweets that come back empty or too long to fit alongside the tracking link
+are rejected rather than truncated. The accepted ones are created as drafts
+in one transaction, each given the next free slot from the brand's
+``TweetSlotIndex`` so the batch honours the plan's daily limit. Tweets
+beyond the free slots in the 30-day window stay unscheduled drafts.
+"""
+
+import json
+import logging
+import secrets
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Brand, BrandTweet, TweetStrategy
+from .generation_cache import cached_chat_completion
+from .tweet_slots import TweetSlotIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_BATCH_SIZE = 10
+MAX_TWEETS = 50
+MAX_TWEET_LENGTH = 280
+# Appended tracking links count as a t.co URL (23) plus the blank line
+TRACKING_LINK_LENGTH = 25
+
+SYSTEM_PROMPT = (
+    "You are an expert social media manager. Generate engaging, authentic "
+    "tweets that align with the brand's voice and values. Each tweet must be "
+    f"under {MAX_TWEET_LENGTH - TRACKING_LINK_LENGTH} characters, actionable "
+    "and distinct from the others. Respond with a JSON object of the form "
+    '{"tweets": [{"index": 1, "content": "..."}]} containing exactly one '
+    "tweet per numbered request."
+)
+
+
+class _KeepMissing(dict):
+    """Leaves unknown ``{placeholders}`` in a strategy template untouched"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def format_prompt(strategy, brand, context):
+    values = _KeepMissing(
+        brand_name=brand.name,
+        brand_description=brand.description or "",
+        **context,
+    )
+    return strategy.prompt_template.format_map(values)
+
+
+def build_messages(brand, prompts):
+    requests = "\n\n".join(
+        f"{number}. {prompt}" for number, prompt in enumerate(prompts, start=1)
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"Write {len(prompts)} tweets for {brand.name}, one for each "
+                f"request below.\n\n{requests}"
+            ),
+        },
+    ]
+
+
+def parse_tweets(raw, expected):
+    """Tweet texts by position from a JSON batch response (``None`` if missing)"""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        logger.warning("Batch tweet response was not valid JSON")
+        return [None] * expected
+
+    items = data.get("tweets", []) if isinstance(data, dict) else data
+    tweets = [None] * expected
+    for position, item in enumerate(items if isinstance(items, list) else []):
+        if isinstance(item, dict):
+            index = item.get("index", position + 1)
+            content = item.get("content")
+        else:
+            index, content = position + 1, item
+        if not isinstance(index, int) or not 1 <= index <= expected:
+            continue
+        if tweets[index - 1] is None and isinstance(content, str):
+            tweets[index - 1] = content
+    return tweets
+
+
+def validate_tweet(content):
+    """Cleaned tweet text, or ``None`` if it is empty or too long"""
+    if not content:
+        return None
+    content = content.strip().strip('"').strip()
+    if not content or len(content) > MAX_TWEET_LENGTH - TRACKING_LINK_LENGTH:
+        return None
+    return content
+
+
+def generate_batch(
+    brand,
+    strategies,
+    count,
+    context=None,
+    user=None,
+    schedule=True,
+    client=None,
+):
+    """Generate ``count`` tweets for ``brand``, cycling through ``strategies``.
+
+    Returns ``{"tweets", "rejected", "unscheduled", "calls"}`` where
+    ``tweets`` are the created ``BrandTweet`` drafts.
+    """
+    from django.core.exceptions import ValidationError
+    from website.utils import get_openai_client, process_tweet_mentions
+
+    if not strategies:
+        raise ValidationError("At least one strategy is required")
+    count = max(1, min(int(count), MAX_TWEETS))
+    context = context or {}
+
+    client = client or get_openai_client()
+    if not client:
+        raise ValidationError("OpenAI API key is missing")
+
+    model = getattr(settings, "TWEET_BATCH_MODEL", DEFAULT_MODEL)
+    batch_size = getattr(settings, "TWEET_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+    assigned = [strategies[i % len(strategies)] for i in range(count)]
+    prompts = [format_prompt(strategy, brand, context) for strategy in assigned]
+
+    accepted, rejected, calls = [], [], 0
+    for start in range(0, count, batch_size):
+        chunk = prompts[start : start + batch_size]
+        raw, _cached = cached_chat_completion(
+            client,
+            model=model,
+            messages=build_messages(brand, chunk),
+            # Queue-filling saves every tweet as a new draft, so a repeated
+            # request must never reuse an earlier completion
+            bypass=True,
+            response_format={"type": "json_object"},
+            max_tokens=120 * len(chunk),
+            temperature=0.8,
+        )
+        calls += 1
+        for offset, content in enumerate(parse_tweets(raw, len(chunk))):
+            strategy, prompt = assigned[start + offset], chunk[offset]
+            tweet = validate_tweet(content)
+            if tweet is None:
+                rejected.append({"strategy": strategy.name, "content": content or ""})
+            else:
+                accepted.append((strategy, prompt, tweet))
+
+    # The plan lookup may call Stripe, so it happens before any row is locked
+    daily_limit = brand.get_daily_tweet_limit() if schedule and accepted else 0
+
+    with transaction.atomic():
+        slots = []
+        if daily_limit:
+            # Serialises slot assignment per brand so two batches can't both
+            # take the same free hours
+            Brand.objects.select_for_update().filter(pk=brand.pk).first()
+            index = TweetSlotIndex(brand, daily_limit=daily_limit)
+            slots = index.next_free_slots(len(accepted))
+
+        tweets = []
+        for position, (strategy, prompt, content) in enumerate(accepted):
+            tweet = BrandTweet(
+                brand=brand,
+                content=content,
+                ai_prompt=prompt,
+                status="draft",
+                strategy=strategy,
+                scheduled_for=slots[position] if position < len(slots) else None,
+                # Set up front so bulk_create needn't go through save()
+                tracking_token=secrets.token_urlsafe(24),
+            )
+            tracking_url = tweet.get_tracking_url()
+            if tracking_url:
+                tweet.content = f"{content}\n\n{tracking_url}"
+                tweet.tracking_link = tracking_url
+            tweets.append(tweet)
+
+        tweets = BrandTweet.objects.bulk_create(tweets)
+
+        used = {}
+        for strategy, _prompt, _content in accepted:
+            used[strategy.pk] = used.get(strategy.pk, 0) + 1
+        for strategy_pk, uses in used.items():
+            TweetStrategy.objects.filter(pk=strategy_pk).update(
+                usage_count=F("usage_count") + uses
+            )
+
+        for tweet in tweets:
+            process_tweet_mentions(tweet, brand.organization, user=user)
+
+    logger.info(
+        f"Generated {len(tweets)} tweets for brand {brand.id} in {calls} "
+        f"completions ({len(rejected)} rejected)"
+    )
+    return {
+        "tweets": tweets,
+        "rejected": rejected,
+        "unscheduled": max(0, len(tweets) - len(slots)) if schedule else len(tweets),
+        "calls": calls,
+    }
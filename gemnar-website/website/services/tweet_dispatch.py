@@ -0,0 +1,119 @@
+"""
+Brand Dispatch Service
+
+Fans brand queue processing out across a bounded thread pool. Each brand is
+handled by a single worker at a time so its tweets keep their scheduled order,
+while the pool size caps how many brands are worked on concurrently.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Brands currently being processed in this process. Shared across dispatcher
+# instances so overlapping ticks never work on the same brand twice.
+_active_brand_ids = set()
+_active_brand_lock = threading.Lock()
+
+
+@dataclass
+class BrandResult:
+    """Outcome of processing a single brand"""
+
+    brand_id: int
+    brand_name: str
+    success: bool = False
+    skipped: bool = False
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+def _claim_brand(brand_id):
+    with _active_brand_lock:
+        if brand_id in _active_brand_ids:
+            return False
+        _active_brand_ids.add(brand_id)
+        return True
+
+
+def _release_brand(brand_id):
+    with _active_brand_lock:
+        _active_brand_ids.discard(brand_id)
+
+
+class BrandDispatcher:
+    """Run a per-brand callable for many brands with bounded concurrency"""
+
+    def __init__(
+        self,
+        process_brand: Callable[[Any], Any],
+        max_workers: int = 4,
+        on_result: Optional[Callable[[BrandResult], None]] = None,
+    ):
+        """
+        Args:
+            process_brand: Callable taking a brand and returning a truthy
+                value on success. Exceptions are captured per brand.
+            max_workers: Global limit on brands processed concurrently.
+            on_result: Called in the dispatching thread as each brand
+                finishes, e.g. to update a WebLog entry.
+        """
+        self.process_brand = process_brand
+        self.max_workers = max(1, int(max_workers))
+        self.on_result = on_result
+
+    def _run(self, brand) -> BrandResult:
+        result = BrandResult(brand_id=brand.pk, brand_name=brand.name)
+
+        if not _claim_brand(brand.pk):
+            result.skipped = True
+            result.error = "Brand is already being processed"
+            return result
+
+        started = time.monotonic()
+        try:
+            outcome = self.process_brand(brand)
+            result.success = bool(outcome)
+            if isinstance(outcome, dict):
+                result.details = outcome
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"Error processing brand {brand.name}: {str(e)}")
+        finally:
+            result.duration_seconds = time.monotonic() - started
+            _release_brand(brand.pk)
+            # Worker threads get their own DB connections; don't leak them
+            connections.close_all()
+
+        return result
+
+    def dispatch(self, brands: Iterable[Any]) -> List[BrandResult]:
+        """Process every brand and return results in completion order"""
+        brands = list(brands)
+        results = []
+        if not brands:
+            return results
+
+        workers = min(self.max_workers, len(brands))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="brand-dispatch"
+        ) as executor:
+            futures = {executor.submit(self._run, brand): brand for brand in brands}
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if self.on_result:
+                    try:
+                        self.on_result(result)
+                    except Exception as e:
+                        logger.warning(f"Dispatch progress callback failed: {str(e)}")
+
+        return results
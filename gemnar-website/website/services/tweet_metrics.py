@@ -0,0 +1,172 @@
+"""
+Tweet Metrics Refresh
+
+Refreshes public metrics for posted brand tweets in bulk. Tweets are grouped by
+the brand's Twitter credentials so each ``get_tweets`` call looks up as many
+as 100 IDs, and the results are written back with one ``bulk_update``.
+"""
+
+import logging
+import math
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.utils import timezone
+
+from ..models import BrandTweet
+from .api_clients import brand_twitter_client
+from .rate_limits import RateLimited
+
+logger = logging.getLogger(__name__)
+
+# Twitter API v2 accepts up to 100 IDs per tweet lookup
+MAX_IDS_PER_REQUEST = 100
+
+# Skip tweets whose metrics were fetched more recently than this
+MIN_REFRESH_INTERVAL = timedelta(minutes=5)
+
+METRIC_FIELDS = [
+    "like_count",
+    "retweet_count",
+    "reply_count",
+    "quote_count",
+    "bookmark_count",
+]
+
+
+def credentials_key(brand):
+    """Tweets whose brands share this key can share one API client"""
+    return (
+        brand.twitter_bearer_token,
+        brand.twitter_api_key,
+        brand.twitter_api_secret,
+        brand.twitter_access_token,
+        brand.twitter_access_token_secret,
+    )
+
+
+def build_client(brand):
+    """Pooled, rate-governed client for the brand's credentials"""
+    return brand_twitter_client(brand)
+
+
+def refreshable_tweets(
+    posted_within=None, brand=None, min_interval=MIN_REFRESH_INTERVAL
+):
+    """Posted tweets due a metrics refresh, most recently posted first"""
+    now = timezone.now()
+    queryset = BrandTweet.objects.filter(status="posted").exclude(tweet_id__isnull=True)
+    queryset = queryset.exclude(tweet_id="")
+    if posted_within is not None:
+        queryset = queryset.filter(posted_at__gte=now - posted_within)
+    if brand is not None:
+        queryset = queryset.filter(brand=brand)
+    if min_interval:
+        queryset = queryset.exclude(metrics_last_updated__gt=now - min_interval)
+    return queryset.select_related("brand").order_by("-posted_at", "-pk")
+
+
+def fetch_public_metrics(client, tweet_ids) -> Dict[str, Dict[str, int]]:
+    """Return ``{tweet_id: public_metrics}`` for up to 100 tweet IDs"""
+    response = client.get_tweets(ids=list(tweet_ids), tweet_fields=["public_metrics"])
+    return {
+        str(tweet.id): tweet.public_metrics or {} for tweet in (response.data or [])
+    }
+
+
+def refresh_tweet_metrics(
+    tweets: Iterable[BrandTweet], dry_run=False, client_factory=None
+) -> Dict[str, Any]:
+    """Fetch public metrics for ``tweets`` in batches and bulk-save them.
+
+    Tweets without a complete Twitter configuration are skipped. A rate-limit
+    or auth error stops the affected credential group only; the remaining
+    groups are still refreshed.
+    """
+    import tweepy
+
+    client_factory = client_factory or build_client
+    summary = {
+        "requested": 0,
+        "updated": 0,
+        "missing": 0,
+        "skipped": 0,
+        "api_calls": 0,
+        "failed_groups": 0,
+        "errors": [],
+    }
+
+    groups: Dict[tuple, List[BrandTweet]] = {}
+    for tweet in tweets:
+        summary["requested"] += 1
+        if not tweet.brand.has_twitter_config:
+            summary["skipped"] += 1
+            continue
+        groups.setdefault(credentials_key(tweet.brand), []).append(tweet)
+
+    if dry_run:
+        summary["api_calls"] = sum(
+            math.ceil(len(group) / MAX_IDS_PER_REQUEST) for group in groups.values()
+        )
+        return summary
+
+    updated: List[BrandTweet] = []
+    now = timezone.now()
+    for group in groups.values():
+        client = client_factory(group[0].brand)
+        for start in range(0, len(group), MAX_IDS_PER_REQUEST):
+            batch = group[start : start + MAX_IDS_PER_REQUEST]
+            try:
+                summary["api_calls"] += 1
+                metrics_by_id = fetch_public_metrics(
+                    client, [t.tweet_id for t in batch]
+                )
+            except (
+                RateLimited,
+                tweepy.TooManyRequests,
+                tweepy.Unauthorized,
+                tweepy.Forbidden,
+            ) as e:
+                # Further calls with these credentials would fail the same way
+                logger.warning(
+                    f"Stopping metrics refresh for brand {group[0].brand.name}: "
+                    f"{str(e)}"
+                )
+                summary["failed_groups"] += 1
+                summary["errors"].append(str(e))
+                break
+            except Exception as e:
+                logger.error(
+                    f"Metrics lookup failed for brand {group[0].brand.name}: {str(e)}"
+                )
+                summary["failed_groups"] += 1
+                summary["errors"].append(str(e))
+                break
+
+            for tweet in batch:
+                metrics = metrics_by_id.get(str(tweet.tweet_id))
+                if metrics is None:
+                    # Deleted, protected or otherwise unavailable
+                    summary["missing"] += 1
+                    continue
+                for field in METRIC_FIELDS:
+                    setattr(tweet, field, metrics.get(field, 0))
+                tweet.metrics_last_updated = now
+                updated.append(tweet)
+
+    if updated:
+        BrandTweet.objects.bulk_update(
+            updated, METRIC_FIELDS + ["metrics_last_updated"], batch_size=500
+        )
+    summary["updated"] = len(updated)
+    return summary
+
+
+def refresh_recent_tweet_metrics(
+    posted_within: Optional[timedelta] = None, limit=None, brand=None, dry_run=False
+) -> Dict[str, Any]:
+    """Refresh the most recently posted tweets first, up to ``limit`` tweets"""
+    queryset = refreshable_tweets(posted_within=posted_within, brand=brand)
+    if limit:
+        queryset = queryset[:limit]
+    return refresh_tweet_metrics(list(queryset), dry_run=dry_run)
@@ -0,0 +1,117 @@
+"""
+Tweet Slot Index
+
+In-memory occupancy calendar of a brand's scheduled tweets. One query loads
+every draft or approved tweet in the window; "next free slot" and "next K
+free slots" are then answered without further database access.
+
+Slots are whole hours between 9 AM and 8 PM. A slot is free when no other
+draft or approved tweet is scheduled in that hour and the day is still below
+the brand's daily plan limit.
+"""
+
+import datetime
+import logging
+from collections import Counter
+
+from django.utils import timezone
+
+from ..models import BrandTweet
+
+logger = logging.getLogger(__name__)
+
+FIRST_SLOT_HOUR = 9
+LAST_SLOT_HOUR = 20
+DEFAULT_WINDOW_DAYS = 30
+OCCUPYING_STATUSES = ["draft", "approved"]
+
+
+class TweetSlotIndex:
+    """Scheduled-tweet occupancy of one brand for ``days`` days from ``now``"""
+
+    def __init__(
+        self, brand, now=None, days=DEFAULT_WINDOW_DAYS, daily_limit=None, exclude=()
+    ):
+        self.brand = brand
+        self.now = now or timezone.now()
+        self.daily_limit = (
+            brand.get_daily_tweet_limit() if daily_limit is None else daily_limit
+        )
+        self.start_date = timezone.localtime(self.now).date()
+        self.end_date = self.start_date + datetime.timedelta(days=days)
+        self.per_day = Counter()
+        self.taken = set()
+        self._load(exclude)
+
+    def _load(self, exclude):
+        window_start = timezone.make_aware(
+            datetime.datetime.combine(self.start_date, datetime.time.min)
+        )
+        window_end = timezone.make_aware(
+            datetime.datetime.combine(self.end_date, datetime.time.min)
+        )
+        scheduled = (
+            BrandTweet.objects.filter(
+                brand=self.brand,
+                status__in=OCCUPYING_STATUSES,
+                scheduled_for__gte=window_start,
+                scheduled_for__lt=window_end,
+            )
+            .exclude(pk__in=[pk for pk in exclude if pk])
+            .values_list("scheduled_for", flat=True)
+        )
+        for scheduled_for in scheduled:
+            self._occupy(timezone.localtime(scheduled_for))
+
+    def _occupy(self, local_time):
+        self.per_day[local_time.date()] += 1
+        self.taken.add((local_time.date(), local_time.hour))
+
+    def scheduled_on(self, date):
+        return self.per_day[date]
+
+    def is_free(self, slot):
+        local = timezone.localtime(slot)
+        return (
+            self.per_day[local.date()] < self.daily_limit
+            and (local.date(), local.hour) not in self.taken
+        )
+
+    def reserve(self, slot):
+        """Mark ``slot`` as taken so later lookups skip it"""
+        self._occupy(timezone.localtime(slot))
+
+    def iter_free_slots(self, after=None):
+        """Yield free slots strictly after ``after`` in chronological order"""
+        after = after or self.now
+        date = max(self.start_date, timezone.localtime(after).date())
+        while date < self.end_date:
+            if self.per_day[date] < self.daily_limit:
+                for hour in range(FIRST_SLOT_HOUR, LAST_SLOT_HOUR + 1):
+                    if (date, hour) in self.taken:
+                        continue
+                    slot = timezone.make_aware(
+                        datetime.datetime.combine(date, datetime.time(hour, 0))
+                    )
+                    if slot > after:
+                        yield slot
+            date += datetime.timedelta(days=1)
+
+    def next_free_slot(self, after=None):
+        return next(self.iter_free_slots(after), None)
+
+    def next_free_slots(self, count, after=None):
+        """Up to ``count`` distinct free slots, each reserved as it is handed out
+
+        Reserving keeps the daily limit honoured across the returned slots, so
+        the result can be assigned to a batch of tweets as-is.
+        """
+        slots = []
+        while len(slots) < count:
+            slot = self.next_free_slot(after)
+            if slot is None:
+                break
+            self.reserve(slot)
+            slots.append(slot)
+            after = slot
+        return slots
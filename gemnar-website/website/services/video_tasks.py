@@ -0,0 +1,445 @@
+"""
+Video Generation Task Poller
+
+Tracks in-flight Runware, Kling, Veo and Sora tasks as
+``VideoGenerationTask`` rows and checks them from one background loop
+instead of sleeping request threads or per-browser status polling.
+
+Each pass claims the tasks that are due, groups them by provider and checks
+every group in one go (Runware accepts many ``getResponse`` tasks in a single
+request; the other providers are checked one ID at a time over a shared
+client). Tasks that are still running are pushed back with an exponential
+backoff per provider. Finished tasks are saved to their Instagram post with
+``complete_video_generation`` and pushed to the owner's ``user_<id>``
+notification socket.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import requests
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import VideoGenerationTask
+
+logger = logging.getLogger(__name__)
+
+RUNWARE_API_URL = "https://api.runware.ai/v1"
+
+# provider -> (first delay, longest delay) in seconds between checks
+POLL_INTERVALS = {
+    "runware": (5, 60),
+    "kling": (10, 120),
+    "veo": (15, 120),
+    "sora": (10, 120),
+}
+BACKOFF_FACTOR = 1.5
+# Tasks still unfinished after this long are given up on
+TASK_TIMEOUT = timedelta(minutes=30)
+# How long a claimed batch is hidden from other pollers
+CLAIM_SECONDS = 120
+DEFAULT_BATCH_SIZE = 50
+
+ACTIVE_STATUSES = ["pending", "processing"]
+
+
+def track_task(provider, task_id, user=None, instagram_post=None):
+    """Start polling a provider task; returns the ``VideoGenerationTask``"""
+    task, _ = VideoGenerationTask.objects.get_or_create(
+        provider=provider,
+        task_id=task_id,
+        defaults={
+            "user": user if user is not None and user.is_authenticated else None,
+            "instagram_post": instagram_post,
+            "next_poll_at": timezone.now() + timedelta(seconds=next_delay(provider, 0)),
+        },
+    )
+    return task
+
+
+def get_tracked_task(provider, task_id):
+    return VideoGenerationTask.objects.filter(
+        provider=provider, task_id=task_id
+    ).first()
+
+
+def tracked_status(provider, task_id, now=None):
+    """The poller's last provider payload for a task, if it is current.
+
+    Status endpoints answer from this instead of asking the provider on
+    every browser poll. An unfinished task whose next check is overdue by
+    more than the provider's longest interval (no poller running) gets
+    ``None``, so the endpoint asks the provider itself.
+    """
+    task = get_tracked_task(provider, task_id)
+    if task is None or task.result is None:
+        return None
+    if task.status in ACTIVE_STATUSES:
+        now = now or timezone.now()
+        _first, longest = POLL_INTERVALS.get(provider, (10, 120))
+        if now - task.next_poll_at > timedelta(seconds=longest):
+            return None
+    return task.result
+
+
+def next_delay(provider, poll_count):
+    first, longest = POLL_INTERVALS.get(provider, (10, 120))
+    return min(first * BACKOFF_FACTOR**poll_count, longest)
+
+
+def claim_due_tasks(limit=DEFAULT_BATCH_SIZE, now=None):
+    """Claim due tasks by pushing their ``next_poll_at`` past the claim window.
+
+    Rows locked by another poller's transaction are skipped, and the UPDATE
+    re-checks ``next_poll_at`` so backends without row locks (SQLite) can't
+    hand the same task to two pollers either.
+    """
+    now = now or timezone.now()
+    claimed_until = now + timedelta(seconds=CLAIM_SECONDS)
+    due = VideoGenerationTask.objects.filter(
+        status__in=ACTIVE_STATUSES, next_poll_at__lte=now
+    )
+    with transaction.atomic():
+        candidates = due.select_for_update(skip_locked=True).order_by(
+            "next_poll_at", "pk"
+        )
+        ids = list(candidates[:limit].values_list("pk", flat=True))
+        if not ids:
+            return []
+        due.filter(pk__in=ids).update(next_poll_at=claimed_until)
+
+    return list(
+        VideoGenerationTask.objects.filter(pk__in=ids, next_poll_at=claimed_until)
+        .select_related("instagram_post")
+        .order_by("pk")
+    )
+
+
+def poll_due_tasks(limit=DEFAULT_BATCH_SIZE, now=None):
+    """Check every due task once, batched per provider; returns a summary"""
+    now = now or timezone.now()
+    tasks = claim_due_tasks(limit=limit, now=now)
+    summary = {
+        "checked": len(tasks),
+        "completed": 0,
+        "failed": 0,
+        "pending": 0,
+        "api_errors": 0,
+        "errors": [],
+    }
+
+    by_provider = defaultdict(list)
+    for task in tasks:
+        by_provider[task.provider].append(task)
+
+    for provider, group in by_provider.items():
+        checker = CHECKERS.get(provider)
+        try:
+            if checker is None:
+                raise ValueError(f"Unknown video provider: {provider}")
+            results = checker([task.task_id for task in group])
+        except Exception as e:
+            logger.error(f"Failed to check {provider} video tasks: {str(e)}")
+            summary["api_errors"] += 1
+            summary["errors"].append(f"{provider}: {str(e)}")
+            results = {}
+
+        for task in group:
+            result = results.get(task.task_id)
+            apply_result(task, result, now=now)
+            if task.status == "completed":
+                summary["completed"] += 1
+            elif task.status == "failed":
+                summary["failed"] += 1
+            else:
+                summary["pending"] += 1
+
+    return summary
+
+
+def apply_result(task, result, now=None):
+    """Record one provider check on ``task``.
+
+    ``result`` is a dict with ``status`` ("processing", "completed" or
+    "failed"), ``video_url``, ``error`` and the raw ``payload``; ``None``
+    means the provider could not be asked and the task is retried later.
+    """
+    now = now or timezone.now()
+    previous_status = task.status
+    task.poll_count += 1
+    task.last_polled_at = now
+
+    if result is not None:
+        task.result = result.get("payload")
+
+    if result and result["status"] == "completed":
+        finish_task(task, result.get("video_url"))
+    elif result and result["status"] == "failed":
+        fail_task(task, result.get("error") or "Video generation failed")
+    elif now - task.created_at > TASK_TIMEOUT:
+        fail_task(task, "Video generation timed out")
+    else:
+        if result is not None:
+            task.status = "processing"
+        task.next_poll_at = now + timedelta(
+            seconds=next_delay(task.provider, task.poll_count)
+        )
+        task.save()
+        if result is not None and task.instagram_post_id:
+            post = task.instagram_post
+            if post.video_generation_status != "processing":
+                post.video_generation_status = "processing"
+                post.save(update_fields=["video_generation_status"])
+        if task.status != previous_status:
+            notify(task)
+    return task
+
+
+def finish_task(task, video_url):
+    from ..video_utils import complete_video_generation
+
+    post = task.instagram_post
+    if post is not None:
+        if not video_url:
+            fail_task(task, "Video completed but no URL provided")
+            return
+        if not complete_video_generation(post, video_url):
+            post.video_generation_status = "failed"
+            post.save()
+            fail_task(task, post.error_message or "Video completion failed")
+            return
+        post.video_generation_status = "completed"
+        post.save()
+
+    task.status = "completed"
+    task.video_url = video_url or ""
+    task.completed_at = timezone.now()
+    task.save()
+    notify(task)
+
+
+def fail_task(task, error_message):
+    task.status = "failed"
+    task.error_message = error_message
+    task.completed_at = timezone.now()
+    task.save()
+
+    post = task.instagram_post
+    if post is not None and post.video_generation_status != "failed":
+        post.error_message = f"Video generation error: {error_message}"
+        post.video_generation_status = "failed"
+        post.save()
+    notify(task)
+
+
+def notify(task):
+    """Push the task's state to its owner's notification socket"""
+    user_id = task.user_id
+    if not user_id and task.instagram_post_id:
+        user_id = task.instagram_post.brand.owner_id
+    if not user_id:
+        return
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                f"user_{user_id}",
+                {"type": "video_task_update", "task": task.to_dict()},
+            )
+    except Exception as e:
+        logger.error(f"Failed to send video task notification: {e}")
+
+
+def _processing(payload):
+    return {
+        "status": "processing",
+        "video_url": None,
+        "error": None,
+        "payload": payload,
+    }
+
+
+def check_runware_tasks(task_ids):
+    """Check many Runware tasks with one ``getResponse`` request"""
+    from ..video_utils import video_service
+
+    api_key = video_service._get_runware_api_key()
+    if not api_key:
+        raise ValueError("Runware API key not configured")
+
+    response = requests.post(
+        RUNWARE_API_URL,
+        json=[{"taskType": "getResponse", "taskUUID": task_id} for task_id in task_ids],
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        timeout=30,
+    )
+    response.raise_for_status()
+    body = response.json() or {}
+
+    results = {}
+    for item in body.get("errors") or []:
+        task_id = item.get("taskUUID")
+        if task_id in task_ids:
+            results[task_id] = {
+                "status": "failed",
+                "video_url": None,
+                "error": item.get("message") or item.get("code") or "Unknown error",
+                "payload": item,
+            }
+    for item in body.get("data") or []:
+        task_id = item.get("taskUUID")
+        if task_id not in task_ids:
+            continue
+        if item.get("error"):
+            results[task_id] = {
+                "status": "failed",
+                "video_url": None,
+                "error": item.get("error"),
+                "payload": item,
+            }
+        elif item.get("videoUUID") and item.get("videoURL"):
+            results[task_id] = {
+                "status": "completed",
+                "video_url": item["videoURL"],
+                "error": None,
+                "payload": item,
+            }
+        else:
+            results[task_id] = _processing(item)
+
+    # Runware leaves tasks it is still working on out of the response
+    for task_id in task_ids:
+        results.setdefault(task_id, _processing(None))
+    return results
+
+
+def check_kling_tasks(task_ids):
+    from ..kling_utils import kling_generator
+
+    results = {}
+    for task_id in task_ids:
+        try:
+            data = kling_generator.get_video_status(task_id)
+        except requests.exceptions.RequestException:
+            continue
+        status = data.get("status")
+        if status == "completed":
+            results[task_id] = {
+                "status": "completed",
+                "video_url": (data.get("video") or {}).get("url"),
+                "error": None,
+                "payload": data,
+            }
+        elif status == "error":
+            results[task_id] = {
+                "status": "failed",
+                "video_url": None,
+                "error": str(data.get("error") or "Generation failed"),
+                "payload": data,
+            }
+        else:
+            results[task_id] = _processing(data)
+    return results
+
+
+def check_veo_tasks(task_ids):
+    from ..veo_utils import veo_generator
+
+    results = {}
+    for task_id in task_ids:
+        try:
+            data = veo_generator.get_video_status(task_id)
+        except Exception as e:
+            logger.warning(f"Veo status check failed for {task_id}: {str(e)}")
+            continue
+        success_flag = data.get("success_flag", 0)
+        if success_flag == 1:
+            urls = data.get("result_urls") or []
+            results[task_id] = {
+                "status": "completed",
+                "video_url": urls[0] if urls else None,
+                "error": None,
+                "payload": data,
+            }
+        elif success_flag in [2, 3]:
+            results[task_id] = {
+                "status": "failed",
+                "video_url": None,
+                "error": data.get("error_message") or "Generation failed",
+                "payload": data,
+            }
+        else:
+            results[task_id] = _processing(data)
+    return results
+
+
+def sora_status_payload(video):
+    """JSON-safe status fields of an OpenAI video job"""
+    payload = {
+        "video_id": video.id,
+        "status": video.status,
+        "progress": getattr(video, "progress", 0),
+        "model": getattr(video, "model", None),
+        "size": getattr(video, "size", None),
+        "seconds": getattr(video, "seconds", None),
+        "created_at": getattr(video, "created_at", None),
+    }
+    error_info = getattr(video, "error", None)
+    if video.status == "failed" and error_info:
+        payload["error"] = {
+            "message": getattr(error_info, "message", "Video generation failed"),
+            "code": getattr(error_info, "code", None),
+        }
+    return payload
+
+
+def check_sora_tasks(task_ids):
+    from ..utils import get_openai_client
+
+    client = get_openai_client()
+    if not client:
+        raise ValueError("OpenAI API key is not configured")
+
+    results = {}
+    for task_id in task_ids:
+        try:
+            video = client.videos.retrieve(task_id)
+        except Exception as e:
+            logger.warning(f"Sora status check failed for {task_id}: {str(e)}")
+            continue
+        payload = sora_status_payload(video)
+        if video.status == "completed":
+            # Sora content has no public URL; clients download it by ID
+            results[task_id] = {
+                "status": "completed",
+                "video_url": None,
+                "error": None,
+                "payload": payload,
+            }
+        elif video.status == "failed":
+            results[task_id] = {
+                "status": "failed",
+                "video_url": None,
+                "error": (payload.get("error") or {}).get("message")
+                or "Video generation failed",
+                "payload": payload,
+            }
+        else:
+            results[task_id] = _processing(payload)
+    return results
+
+
+CHECKERS = {
+    "runware": check_runware_tasks,
+    "kling": check_kling_tasks,
+    "veo": check_veo_tasks,
+    "sora": check_sora_tasks,
+}
@@ -0,0 +1,155 @@
+"""
+Brand Website Content Cache
+
+The "generate from website" tweet and Instagram endpoints feed the visible
+text of a brand's site into the prompt. Fetching and parsing the page took
+up to the full 10s request timeout on every click, so the extracted text is
+cached per URL in the Django cache and shared by every generator.
+
+- Fresh entries (younger than ``WEBSITE_CONTENT_FRESH_SECONDS``) are served
+  as-is.
+- Stale entries are still served straight away while a background worker
+  revalidates them with ``If-None-Match`` / ``If-Modified-Since``; a 304
+  only bumps the timestamp, anything else is re-parsed off the request path.
+- A URL with no entry is fetched inline once. Failed fetches are remembered
+  for ``FAILURE_TTL`` so a dead site doesn't cost a timeout per click.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+FETCH_TIMEOUT = 10
+DEFAULT_FRESH_SECONDS = 6 * 3600
+# Entries are kept well past freshness so they can be revalidated cheaply
+ENTRY_TTL = 7 * 24 * 3600
+FAILURE_TTL = 300
+# Longest text kept per page; callers trim to what their prompt needs
+MAX_STORED_CHARS = 10000
+
+_executor = None
+_executor_lock = threading.Lock()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def cache_key(url):
+    # Versioned with extract_text: a 304 keeps the stored text as it is
+    return f"website_content:v2:{hashlib.sha256(url.encode()).hexdigest()}"
+
+
+def fresh_seconds():
+    return getattr(settings, "WEBSITE_CONTENT_FRESH_SECONDS", DEFAULT_FRESH_SECONDS)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="website-content"
+            )
+        return _executor
+
+
+def extract_text(html):
+    """Visible text of a page without scripts, styles or site chrome.
+
+    Navigation, header and footer text would otherwise fill the start of
+    the short excerpts the prompts take.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "nav", "header", "footer"]):
+        tag.decompose()
+
+    lines = (line.strip() for line in soup.get_text().splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return " ".join(chunk for chunk in chunks if chunk)[:MAX_STORED_CHARS]
+
+
+def fetch(url, entry=None):
+    """Fetch ``url``, revalidating ``entry`` when it has validators.
+
+    Returns the new cache entry; raises on network or HTTP errors.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+    if response.status_code == 304 and entry:
+        return dict(entry, fetched_at=time.time())
+    response.raise_for_status()
+
+    return {
+        "text": extract_text(response.content),
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+        "fetched_at": time.time(),
+    }
+
+
+def store(url, entry):
+    cache.set(cache_key(url), entry, ENTRY_TTL)
+
+
+def refresh(url):
+    """Revalidate the cached entry for ``url`` (runs on the worker pool)"""
+    try:
+        entry = cache.get(cache_key(url))
+        store(url, fetch(url, entry if entry and "text" in entry else None))
+    except Exception as e:
+        logger.warning(f"Failed to refresh website content for {url}: {str(e)}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(url)
+
+
+def schedule_refresh(url):
+    with _refreshing_lock:
+        if url in _refreshing:
+            return False
+        _refreshing.add(url)
+    get_executor().submit(refresh, url)
+    return True
+
+
+def get_website_text(url, max_chars=None):
+    """Extracted text of ``url``, or ``None`` if it can't be fetched"""
+    if not url:
+        return None
+
+    entry = cache.get(cache_key(url))
+    if entry is not None:
+        if entry.get("failed"):
+            return None
+        if time.time() - entry["fetched_at"] > fresh_seconds():
+            schedule_refresh(url)
+        text = entry["text"]
+    else:
+        try:
+            entry = fetch(url)
+        except Exception as e:
+            logger.warning(f"Failed to scrape website {url}: {str(e)}")
+            cache.set(cache_key(url), {"failed": True}, FAILURE_TTL)
+            return None
+        store(url, entry)
+        text = entry["text"]
+
+    return text[:max_chars] if max_chars else text
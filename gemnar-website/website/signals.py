@@ -5,7 +5,19 @@ Django signals for the website app
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import ProfileImpression
+from .analytics_models import AnalyticsProject
+from .models import (
+    AIServiceLimit,
+    Brand,
+    EncryptedVariable,
+    ProfileImpression,
+    RunwarePricingData,
+)
+from .services.ai_usage import usage_counter
+from .services.analytics_cache import analytics_lookups
+from .services.api_clients import brand_credentials_fingerprint, brand_tag, registry
+from .services.pricing import pricing_table
+from .services.secrets import secret_store
 
 User = get_user_model()
 
@@ -40,3 +52,43 @@ def update_impressions_count_on_delete(sender, instance, **kwargs):
     user = instance.profile_user
     user.impressions_count = ProfileImpression.objects.filter(profile_user=user).count()
     user.save(update_fields=["impressions_count"])
+
+
+@receiver(post_save, sender=Brand)
+def refresh_pooled_api_clients(sender, instance, **kwargs):
+    """Drop pooled Twitter/Graph clients built from old brand credentials"""
+    registry.sync_tag(brand_tag(instance), brand_credentials_fingerprint(instance))
+
+
+@receiver(post_delete, sender=Brand)
+def drop_pooled_api_clients(sender, instance, **kwargs):
+    """Drop pooled Twitter/Graph clients for a deleted brand"""
+    registry.invalidate_tag(brand_tag(instance))
+
+
+@receiver(post_save, sender=EncryptedVariable)
+@receiver(post_delete, sender=EncryptedVariable)
+def invalidate_cached_secret(sender, instance, **kwargs):
+    """Drop the decrypted copy of a changed or deleted variable"""
+    secret_store.invalidate(instance.key)
+
+
+@receiver(post_save, sender=AIServiceLimit)
+@receiver(post_delete, sender=AIServiceLimit)
+def invalidate_cached_ai_limit(sender, instance, **kwargs):
+    """Make a changed daily limit apply without waiting for the TTL"""
+    usage_counter.invalidate_limits(instance.service)
+
+
+@receiver(post_save, sender=RunwarePricingData)
+@receiver(post_delete, sender=RunwarePricingData)
+def invalidate_pricing_table(sender, instance, **kwargs):
+    """Reload prices on the next lookup after a scrape or admin edit"""
+    pricing_table.invalidate()
+
+
+@receiver(post_save, sender=AnalyticsProject)
+@receiver(post_delete, sender=AnalyticsProject)
+def invalidate_analytics_lookups(sender, instance, **kwargs):
+    """Stop accepting writes for a deactivated or deleted project at once"""
+    analytics_lookups.invalidate_project(instance)
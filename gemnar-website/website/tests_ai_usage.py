@@ -0,0 +1,99 @@
+"""
+Tests for the AI service usage counters
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from website.models import AIServiceLimit, AIServiceUsage, Brand
+from website.services.ai_usage import usage_counter
+
+User = get_user_model()
+
+
+class UsageCounterTestCase(TestCase):
+    """Atomic increments, cached limits and the write-behind buffer"""
+
+    def setUp(self):
+        usage_counter.clear()
+        self.addCleanup(usage_counter.clear)
+        user = User.objects.create_user(
+            username="counter", email="counter@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Counter Brand", url="https://counter.example.com", owner=user
+        )
+
+    def stored(self, date=None):
+        return AIServiceUsage.objects.get(
+            brand=self.brand,
+            service="openai_text",
+            usage_date=date or timezone.now().date(),
+        ).usage_count
+
+    def test_increments_are_applied_in_the_database(self):
+        self.assertEqual(AIServiceUsage.increment_usage(self.brand, "openai_text"), 1)
+
+        # Another process bumps the row behind this one's back
+        AIServiceUsage.objects.filter(brand=self.brand).update(usage_count=5)
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+
+        self.assertEqual(self.stored(), 6)
+
+    def test_back_dated_increment_lands_on_its_day(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+
+        AIServiceUsage.increment_usage(self.brand, "openai_text", date=yesterday)
+
+        self.assertEqual(self.stored(yesterday), 1)
+        self.assertFalse(
+            AIServiceUsage.objects.filter(usage_date=timezone.now().date()).exists()
+        )
+
+    def test_back_dated_increment_alongside_todays_row(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+
+        AIServiceUsage.increment_usage(self.brand, "openai_text", date=yesterday)
+        AIServiceUsage.increment_usage(self.brand, "openai_text", date=yesterday)
+
+        self.assertEqual(self.stored(yesterday), 2)
+        self.assertEqual(self.stored(), 1)
+
+    def test_limit_check_is_served_from_cache(self):
+        AIServiceLimit.set_limit("openai_text", 2)
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+        AIServiceUsage.check_limit(self.brand, "openai_text")
+
+        with self.assertNumQueries(0):
+            allowed, current, limit = AIServiceUsage.check_limit(
+                self.brand, "openai_text"
+            )
+        self.assertEqual((allowed, current, limit), (True, 1, 2))
+
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+        self.assertEqual(
+            AIServiceUsage.check_limit(self.brand, "openai_text"), (False, 2, 2)
+        )
+
+        # Saving a limit drops the cached value
+        AIServiceLimit.set_limit("openai_text", 5)
+        self.assertTrue(AIServiceUsage.check_limit(self.brand, "openai_text")[0])
+
+    @override_settings(AI_USAGE_WRITE_BEHIND=True, AI_USAGE_FLUSH_THRESHOLD=3)
+    def test_write_behind_aggregates_increments(self):
+        with self.assertNumQueries(1):
+            AIServiceUsage.increment_usage(self.brand, "openai_text")
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+
+        self.assertFalse(AIServiceUsage.objects.filter(brand=self.brand).exists())
+        self.assertEqual(AIServiceUsage.get_daily_usage(self.brand, "openai_text"), 2)
+
+        # The third increment reaches the threshold and flushes all three
+        AIServiceUsage.increment_usage(self.brand, "openai_text")
+
+        self.assertEqual(self.stored(), 3)
+        self.assertEqual(usage_counter.stats()["pending"], 0)
@@ -0,0 +1,602 @@
+"""
+Tests for batched analytics ingestion
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from website.analytics_models import (
+    AnalyticsEvent,
+    AnalyticsPageView,
+    AnalyticsProject,
+    AnalyticsRecording,
+    AnalyticsSession,
+)
+from website.models import Brand
+from website.services import analytics_live
+from website.services.analytics_buffer import (
+    IngestBuffer,
+    drain_spool_dir,
+    ingest_buffer,
+    write_behind_enabled,
+)
+from website.services.analytics_cache import analytics_lookups
+
+User = get_user_model()
+
+
+class AnalyticsTestMixin:
+    def setUp(self):
+        analytics_lookups.clear()
+        self.addCleanup(analytics_lookups.clear)
+        self.user = User.objects.create_user(
+            username="tracker", email="tracker@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Tracked Brand", url="https://tracked.example.com", owner=self.user
+        )
+        self.project = AnalyticsProject.objects.create(
+            brand=self.brand,
+            name="Site",
+            website_url="https://tracked.example.com",
+            tracking_code="batchcode",
+        )
+        self.url = reverse("website:analytics_batch")
+
+    def pageview(self, page_view_id, session_id="s1"):
+        return {
+            "type": "pageview",
+            "page_view_id": page_view_id,
+            "session_id": session_id,
+            "url": "https://tracked.example.com/pricing",
+            "path": "/pricing",
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0) Chrome/120.0",
+        }
+
+    def clicks(self, page_view_id, count):
+        return [
+            {"type": "event", "page_view_id": page_view_id, "event_type": "click"}
+            for _ in range(count)
+        ]
+
+
+@override_settings(ANALYTICS_WRITE_BEHIND=False)
+class AnalyticsBatchTestCase(AnalyticsTestMixin, TestCase):
+    """Mixed tracker messages posted to the batch endpoint"""
+
+    def post(self, messages, tracking_code="batchcode"):
+        # sendBeacon posts a text/plain blob
+        return self.client.post(
+            self.url,
+            json.dumps({"tracking_code": tracking_code, "messages": messages}),
+            content_type="text/plain",
+        )
+
+    def test_mixed_batch_is_applied_in_order(self):
+        pv = str(uuid.uuid4())
+        response = self.post(
+            [
+                self.pageview(pv),
+                *self.clicks(pv, 2),
+                {"type": "update_pageview", "page_view_id": pv, "load_time_ms": 420},
+                {
+                    "type": "metrics",
+                    "page_view_id": pv,
+                    "duration_seconds": 99999,
+                    "scroll_depth_percentage": 60,
+                    "clicks_count": 2,
+                    "form_interactions": 0,
+                    "is_final_update": True,
+                },
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["processed"], 5)
+        self.assertEqual(data["page_view_ids"], [pv])
+        self.assertEqual(data["errors"], [])
+
+        session = AnalyticsSession.objects.get(project=self.project)
+        self.assertEqual((session.browser, session.os), ("Chrome", "Windows"))
+        pageview = AnalyticsPageView.objects.get(id=pv)
+        self.assertEqual(pageview.session, session)
+        self.assertEqual(pageview.load_time_ms, 420)
+        self.assertEqual(pageview.duration_seconds, 3600)
+        self.assertEqual(pageview.clicks_count, 2)
+        self.assertIsNotNone(pageview.ended_at)
+        self.assertEqual(AnalyticsEvent.objects.filter(pageview=pageview).count(), 2)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        pv = str(uuid.uuid4())
+        self.post([self.pageview(pv)])
+
+        with CaptureQueriesContext(connection) as small:
+            self.post(self.clicks(pv, 2))
+        with CaptureQueriesContext(connection) as large:
+            self.post(self.clicks(pv, 40))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(AnalyticsEvent.objects.count(), 42)
+        self.assertEqual(AnalyticsPageView.objects.get(id=pv).clicks_count, 42)
+
+    def test_replays_and_bad_messages_do_not_fail_the_batch(self):
+        pv = str(uuid.uuid4())
+        self.post([self.pageview(pv)])
+
+        response = self.post(
+            [
+                self.pageview(pv),
+                {"type": "unknown"},
+                {"type": "event", "page_view_id": str(uuid.uuid4())},
+                self.pageview(str(uuid.uuid4())),
+            ]
+        )
+
+        data = response.json()
+        self.assertEqual((data["processed"], data["skipped"]), (1, 1))
+        self.assertEqual([e["index"] for e in data["errors"]], [1, 2])
+        self.assertEqual(AnalyticsPageView.objects.count(), 2)
+        session = AnalyticsSession.objects.get(project=self.project)
+        self.assertEqual(session.page_views, 1)
+
+    def test_malformed_fields_reject_only_their_message(self):
+        pv, broken = str(uuid.uuid4()), str(uuid.uuid4())
+        long_event = {
+            "type": "event",
+            "page_view_id": pv,
+            "event_type": "click" * 10,
+            "element_id": "x" * 500,
+        }
+
+        data = self.post(
+            [
+                self.pageview(pv),
+                {**self.pageview(broken), "viewport_width": "abc"},
+                {"type": "event", "page_view_id": pv, "x_coordinate": {"x": 1}},
+                {"type": "update_pageview", "page_view_id": pv, "load_time_ms": 2**40},
+                {**long_event, "title": "ignored"},
+            ]
+        ).json()
+
+        self.assertEqual(data["processed"], 2)
+        self.assertEqual([e["index"] for e in data["errors"]], [1, 2, 3])
+        self.assertFalse(AnalyticsPageView.objects.filter(id=broken).exists())
+        self.assertIsNone(AnalyticsPageView.objects.get(id=pv).load_time_ms)
+        event = AnalyticsEvent.objects.get(pageview_id=pv)
+        self.assertEqual(len(event.event_type), 20)
+        self.assertEqual(len(event.element_id), 200)
+        self.assertEqual(AnalyticsSession.objects.count(), 1)
+
+    def test_pageviews_of_other_projects_are_not_touched(self):
+        other = AnalyticsProject.objects.create(
+            brand=self.brand,
+            name="Other",
+            website_url="https://other.example.com",
+            tracking_code="othercode",
+        )
+        pv = str(uuid.uuid4())
+        self.post([self.pageview(pv)], tracking_code="othercode")
+
+        data = self.post(self.clicks(pv, 1)).json()
+
+        self.assertEqual(data["errors"][0]["error"], "Invalid page view")
+        self.assertFalse(AnalyticsEvent.objects.exists())
+        self.assertEqual(AnalyticsPageView.objects.get(id=pv).session.project, other)
+
+    def test_recording_is_upserted(self):
+        pv = str(uuid.uuid4())
+        self.post([self.pageview(pv)])
+
+        for movements in ("[1]", "[1, 2]"):
+            self.post(
+                [
+                    {
+                        "type": "recording",
+                        "page_view_id": pv,
+                        "mouse_movements": movements,
+                        "recording_duration": 5,
+                    }
+                ]
+            )
+
+        recording = AnalyticsRecording.objects.get(pageview_id=pv)
+        self.assertEqual(recording.data_size_bytes, len(gzip.compress(b"[1, 2]")))
+
+    def test_rejects_unknown_project_and_oversized_batches(self):
+        self.assertEqual(self.post([], tracking_code="nope").status_code, 404)
+        self.assertEqual(self.post(self.clicks("x", 201)).status_code, 413)
+        response = self.client.post(self.url, "{", content_type="text/plain")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ANALYTICS_WRITE_BEHIND=True)
+class IngestBufferTestCase(AnalyticsTestMixin, TestCase):
+    """Write-behind queueing, backpressure and spooling"""
+
+    def setUp(self):
+        super().setUp()
+        self.buffer = IngestBuffer()
+        patcher = patch.object(IngestBuffer, "_ensure_flusher")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ingest_buffer.clear()
+        self.addCleanup(ingest_buffer.clear)
+
+    def stamped(self, messages):
+        for message in messages:
+            message["ip_address"] = "127.0.0.1"
+        return messages
+
+    def test_endpoint_queues_and_answers_204(self):
+        pv = str(uuid.uuid4())
+        response = self.client.post(
+            self.url,
+            json.dumps(
+                {
+                    "tracking_code": "batchcode",
+                    "messages": [self.pageview(pv), *self.clicks(pv, 3)],
+                }
+            ),
+            content_type="text/plain",
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(AnalyticsPageView.objects.exists())
+        self.assertEqual(ingest_buffer.stats()["pending"], 4)
+
+        self.assertEqual(ingest_buffer.flush(), 4)
+        self.assertEqual(AnalyticsEvent.objects.filter(pageview_id=pv).count(), 3)
+        self.assertEqual(ingest_buffer.stats()["pending"], 0)
+
+    def test_write_behind_is_opt_in(self):
+        with self.settings():
+            del settings.ANALYTICS_WRITE_BEHIND
+            self.assertFalse(write_behind_enabled())
+            with self.settings(ANALYTICS_SPOOL_DIR=tempfile.mkdtemp()):
+                self.assertTrue(write_behind_enabled())
+
+    @override_settings(ANALYTICS_BUFFER_MAX_MESSAGES=2)
+    def test_saturated_buffer_drops_and_answers_503(self):
+        pv = str(uuid.uuid4())
+        self.assertTrue(ingest_buffer.submit(self.project.id, self.clicks(pv, 2)))
+
+        response = self.client.post(
+            reverse("website:analytics_event"),
+            json.dumps(
+                {
+                    "tracking_code": "batchcode",
+                    "page_view_id": pv,
+                    "event_type": "click",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(ingest_buffer.stats()["dropped"], 1)
+
+    def test_events_for_unflushed_pageviews_are_retried(self):
+        pv = str(uuid.uuid4())
+        self.buffer.submit(self.project.id, self.clicks(pv, 1))
+
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.stats()["retried"], 1)
+
+        self.buffer.submit(self.project.id, self.stamped([self.pageview(pv)]))
+        self.buffer.flush()
+        self.buffer.flush()
+
+        self.assertEqual(AnalyticsEvent.objects.filter(pageview_id=pv).count(), 1)
+        stats = self.buffer.stats()
+        self.assertEqual((stats["pending"], stats["rejected"]), (0, 0))
+
+    @override_settings(ANALYTICS_BUFFER_RETRIES=1)
+    def test_unresolvable_events_are_rejected_after_retries(self):
+        self.buffer.submit(self.project.id, self.clicks(str(uuid.uuid4()), 1))
+
+        self.buffer.flush()
+        self.buffer.flush()
+
+        stats = self.buffer.stats()
+        self.assertEqual((stats["pending"], stats["rejected"]), (0, 1))
+
+    @override_settings(ANALYTICS_BUFFER_RETRIES=1)
+    def test_failing_project_does_not_hold_up_others(self):
+        other = AnalyticsProject.objects.create(
+            brand=self.brand,
+            name="Other",
+            website_url="https://other.example.com",
+            tracking_code="othercode",
+        )
+        good, bad = str(uuid.uuid4()), str(uuid.uuid4())
+        broken = self.pageview(bad, session_id="s2")
+        broken["viewport_width"] = "abc"
+        self.buffer.submit(
+            self.project.id, self.stamped([self.pageview(good), *self.clicks(good, 1)])
+        )
+        self.buffer.submit(other.id, self.stamped([broken]))
+
+        for _ in range(3):
+            self.buffer.flush()
+
+        self.assertEqual(AnalyticsEvent.objects.filter(pageview_id=good).count(), 1)
+        self.assertFalse(AnalyticsPageView.objects.filter(id=bad).exists())
+        stats = self.buffer.stats()
+        self.assertEqual((stats["pending"], stats["rejected"]), (0, 1))
+
+    def test_spool_file_is_flushed_and_removed(self):
+        spool_dir = tempfile.mkdtemp()
+        pv = str(uuid.uuid4())
+
+        with override_settings(ANALYTICS_SPOOL_DIR=spool_dir):
+            self.buffer.submit(
+                self.project.id, self.stamped([self.pageview(pv), *self.clicks(pv, 2)])
+            )
+            self.assertEqual(len(os.listdir(spool_dir)), 1)
+
+            self.assertEqual(self.buffer.flush(), 3)
+
+        self.assertEqual(os.listdir(spool_dir), [])
+        self.assertEqual(AnalyticsEvent.objects.count(), 2)
+
+    def test_stale_spool_files_are_drained(self):
+        spool_dir = tempfile.mkdtemp()
+        pv = str(uuid.uuid4())
+        path = os.path.join(spool_dir, "ingest-99999.jsonl")
+        with open(path, "w") as spool:
+            entry = [str(self.project.id), self.stamped([self.pageview(pv)]), 0]
+            spool.write(json.dumps(entry) + "\n")
+            spool.write('["torn')
+
+        self.assertEqual(drain_spool_dir(spool_dir), (0, 0))
+
+        stale = time.time() - 120
+        os.utime(path, (stale, stale))
+        self.assertEqual(drain_spool_dir(spool_dir), (1, 0))
+        self.assertTrue(AnalyticsPageView.objects.filter(id=pv).exists())
+        self.assertEqual(os.listdir(spool_dir), [])
+
+    def test_spool_file_that_fails_is_kept_and_others_drained(self):
+        spool_dir = tempfile.mkdtemp()
+        stale = time.time() - 120
+        pvs = [str(uuid.uuid4()), str(uuid.uuid4())]
+        for number, pv in enumerate(pvs):
+            path = os.path.join(spool_dir, f"ingest-{number}.jsonl")
+            with open(path, "w") as spool:
+                entry = [str(self.project.id), self.stamped([self.pageview(pv)]), 0]
+                spool.write(json.dumps(entry) + "\n")
+            os.utime(path, (stale, stale))
+
+        with patch(
+            "website.services.analytics_buffer.ingest_entries",
+            side_effect=[RuntimeError("database went away"), (1, 0, [])],
+        ):
+            self.assertEqual(drain_spool_dir(spool_dir), (1, 0))
+        self.assertEqual(len(os.listdir(spool_dir)), 1)
+
+        self.assertEqual(drain_spool_dir(spool_dir), (1, 0))
+        self.assertEqual(os.listdir(spool_dir), [])
+
+
+@override_settings(ANALYTICS_WRITE_BEHIND=False)
+class AnalyticsLookupTestCase(AnalyticsTestMixin, TestCase):
+    """Cached project and pageview resolution for the ingest endpoints"""
+
+    def post(self, name, payload):
+        return self.client.post(
+            reverse(f"website:{name}"),
+            json.dumps({"tracking_code": "batchcode", **payload}),
+            content_type="application/json",
+        )
+
+    def test_project_is_cached_until_deactivated(self):
+        self.assertEqual(analytics_lookups.project("batchcode"), self.project)
+        with self.assertNumQueries(0):
+            self.assertEqual(analytics_lookups.project("batchcode"), self.project)
+
+        self.project.is_active = False
+        self.project.save()
+
+        self.assertIsNone(analytics_lookups.project("batchcode"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(analytics_lookups.project("batchcode"))
+
+    def test_follow_up_calls_skip_the_authorisation_join(self):
+        pv = self.post("analytics_pageview", {"session_id": "s1"}).json()[
+            "page_view_id"
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post(
+                "analytics_event",
+                {"page_view_id": pv, "event_type": "click"},
+            )
+            self.post(
+                "analytics_metrics",
+                {"page_view_id": pv, "duration_seconds": 12, "is_final_update": True},
+            )
+
+        self.assertFalse(
+            any("analytics_projects" in q["sql"] for q in queries.captured_queries)
+        )
+        pageview = AnalyticsPageView.objects.get(id=pv)
+        self.assertEqual(pageview.duration_seconds, 12)
+        self.assertIsNotNone(pageview.ended_at)
+        self.assertEqual(AnalyticsEvent.objects.filter(pageview=pageview).count(), 1)
+
+    def test_cached_sessions_count_pageviews_like_before(self):
+        for expected_views, expected_bounce in ((0, True), (1, True), (2, False)):
+            self.post("analytics_pageview", {"session_id": "s1"})
+            session = AnalyticsSession.objects.get(project=self.project)
+            self.assertEqual(
+                (session.page_views, session.is_bounce),
+                (expected_views, expected_bounce),
+            )
+        self.assertEqual(AnalyticsSession.objects.count(), 1)
+
+    def test_pageviews_of_other_projects_are_rejected(self):
+        other = AnalyticsProject.objects.create(
+            brand=self.brand,
+            name="Other",
+            website_url="https://other.example.com",
+            tracking_code="othercode",
+        )
+        pv = self.client.post(
+            reverse("website:analytics_pageview"),
+            json.dumps({"tracking_code": "othercode", "session_id": "s9"}),
+            content_type="application/json",
+        ).json()["page_view_id"]
+
+        response = self.post("analytics_metrics", {"page_view_id": pv})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(AnalyticsPageView.objects.get(id=pv).session.project, other)
+
+
+@override_settings(ANALYTICS_WRITE_BEHIND=False)
+class AnalyticsLiveStreamTestCase(AnalyticsTestMixin, TestCase):
+    """Ingest pushes to the live feeds instead of the feeds polling"""
+
+    def subscribe(self, stream):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(
+            analytics_live.group_name(self.project.id, stream), channel
+        )
+        self.addCleanup(
+            async_to_sync(channel_layer.group_discard),
+            analytics_live.group_name(self.project.id, stream),
+            channel,
+        )
+        return lambda: async_to_sync(channel_layer.receive)(channel)["items"]
+
+    def test_batch_publishes_pageviews_and_events_after_commit(self):
+        pageviews = self.subscribe(analytics_live.PAGEVIEWS)
+        events = self.subscribe(analytics_live.EVENTS)
+        pv = str(uuid.uuid4())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                self.url,
+                json.dumps(
+                    {
+                        "tracking_code": "batchcode",
+                        "messages": [self.pageview(pv), *self.clicks(pv, 2)],
+                    }
+                ),
+                content_type="text/plain",
+            )
+
+        [published] = pageviews()
+        self.assertEqual(published["id"], pv)
+        self.assertEqual(published["path"], "/pricing")
+        self.assertEqual(published["browser"], "Chrome")
+        clicks = events()
+        self.assertEqual(len(clicks), 2)
+        self.assertEqual({click["page_path"] for click in clicks}, {"/pricing"})
+
+    def test_single_pageview_endpoint_publishes(self):
+        pageviews = self.subscribe(analytics_live.PAGEVIEWS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                self.client.post(
+                    reverse("website:analytics_pageview"),
+                    json.dumps(
+                        {"tracking_code": "batchcode", "session_id": "s1", "path": "/"}
+                    ),
+                    content_type="application/json",
+                )
+
+        first, second = pageviews(), pageviews()
+        # The second view came through the cached session
+        self.assertEqual(first[0]["session_id"], second[0]["session_id"])
+        self.assertEqual(second[0]["device_type"], first[0]["device_type"])
+
+    async def test_stream_resumes_after_last_event_id(self):
+        session = await AnalyticsSession.objects.acreate(
+            project=self.project, session_id="s1", ip_address="127.0.0.1"
+        )
+        seen = await AnalyticsPageView.objects.acreate(
+            session=session, url="https://tracked.example.com/", path="/"
+        )
+        missed = await AnalyticsPageView.objects.acreate(
+            session=session, url="https://tracked.example.com/a", path="/a"
+        )
+
+        stream = analytics_live.sse_stream(
+            self.project.id, analytics_live.PAGEVIEWS, str(seen.id)
+        )
+        try:
+            replayed = await stream.__anext__()
+            self.assertTrue(replayed.startswith(f"id: {missed.id}\n"))
+
+            # Pushes already covered by the replay are not repeated
+            live = {**analytics_live.pageview_payload(missed, session), "id": "live"}
+            await get_channel_layer().group_send(
+                analytics_live.group_name(self.project.id, analytics_live.PAGEVIEWS),
+                {
+                    "type": "analytics.live",
+                    "items": [analytics_live.pageview_payload(missed, session), live],
+                },
+            )
+            self.assertEqual(await stream.__anext__(), analytics_live.sse_message(live))
+        finally:
+            await stream.aclose()
+
+    @override_settings(ANALYTICS_LIVE_HEARTBEAT_SECONDS=30)
+    async def test_publish_from_another_thread_wakes_the_stream(self):
+        # Debug mode makes the loop reject calls from other threads, which
+        # would otherwise go unnoticed until something else woke it up
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        self.addCleanup(loop.set_debug, False)
+
+        channel_layer = get_channel_layer()
+        group = analytics_live.group_name(self.project.id, analytics_live.EVENTS)
+        stream = analytics_live.sse_stream(self.project.id, analytics_live.EVENTS)
+        pending = asyncio.ensure_future(stream.__anext__())
+        try:
+            # No events are stored, so subscribing yields nothing yet
+            for _ in range(100):
+                if channel_layer.groups.get(group):
+                    break
+                await asyncio.sleep(0.01)
+
+            payload = {"id": str(uuid.uuid4()), "event_type": "click"}
+            # As the ingest buffer's flusher thread would
+            await asyncio.to_thread(
+                analytics_live.send,
+                self.project.id,
+                analytics_live.EVENTS,
+                [payload],
+            )
+
+            message = await asyncio.wait_for(pending, 2)
+            self.assertEqual(message, analytics_live.sse_message(payload))
+        finally:
+            pending.cancel()
+            await stream.aclose()
+
+    def test_stream_requires_login(self):
+        response = self.client.get(
+            reverse("website:analytics_pages_stream", args=[self.brand.id])
+        )
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,232 @@
+"""
+Tests for the daily analytics rollups
+"""
+
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from organizations.models import Organization
+
+from website.analytics_models import (
+    AnalyticsDailyPageStats,
+    AnalyticsDailyStats,
+    AnalyticsPageView,
+    AnalyticsProject,
+    AnalyticsSession,
+)
+from website.models import Brand
+from website.services import analytics_rollups
+from website.services.analytics_ingest import ingest_batch
+
+User = get_user_model()
+
+
+class AnalyticsRollupTestCase(TestCase):
+    """Rollup rows and the dashboards that read them"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="roller", email="roller@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Rolled Brand",
+            url="https://rolled.example.com",
+            owner=self.user,
+            organization=Organization.objects.create(name="Rollers"),
+        )
+        self.project = AnalyticsProject.objects.create(
+            brand=self.brand,
+            name="Site",
+            website_url="https://rolled.example.com",
+            tracking_code="rollcode",
+        )
+        self.now = timezone.now().replace(hour=12, minute=0)
+        self.today = self.now.date()
+
+    def session(self, session_id, when, **fields):
+        session = AnalyticsSession.objects.create(
+            project=self.project,
+            session_id=session_id,
+            ip_address="203.0.113.1",
+            browser="Chrome",
+            device_type="desktop",
+            **fields,
+        )
+        AnalyticsSession.objects.filter(pk=session.pk).update(
+            started_at=when, last_activity=when
+        )
+        return session
+
+    def view(self, session, path, when, **fields):
+        pageview = AnalyticsPageView.objects.create(
+            session=session,
+            url=f"https://rolled.example.com{path}",
+            path=path,
+            **fields,
+        )
+        AnalyticsPageView.objects.filter(pk=pageview.pk).update(started_at=when)
+        return pageview
+
+    def test_rollup_day_totals_and_exits(self):
+        first = self.session("s1", self.now, page_views=2, is_bounce=False)
+        second = self.session("s2", self.now, page_views=1)
+        self.view(first, "/", self.now, load_time_ms=800, clicks_count=2)
+        self.view(first, "/pricing", self.now + timedelta(minutes=1), load_time_ms=2000)
+        self.view(second, "/", self.now + timedelta(minutes=2), load_time_ms=4000)
+
+        analytics_rollups.rollup_day(self.today, [self.project.id])
+
+        daily = AnalyticsDailyStats.objects.get(project=self.project, date=self.today)
+        self.assertEqual(daily.sessions, 2)
+        self.assertEqual(daily.bounced_sessions, 1)
+        self.assertEqual(daily.pageviews, 3)
+        self.assertEqual(daily.devices, {"desktop": 2})
+
+        home = AnalyticsDailyPageStats.objects.get(
+            project=self.project, date=self.today, path="/"
+        )
+        self.assertEqual(home.views, 2)
+        self.assertEqual(home.sessions, 2)
+        # Only the second session ended on the home page
+        self.assertEqual(home.exits, 1)
+        self.assertEqual((home.load_fast, home.load_average, home.load_slow), (1, 0, 1))
+        self.assertEqual(home.clicks, 2)
+        self.assertEqual(sum(home.hourly.values()), 2)
+
+        pricing = AnalyticsDailyPageStats.objects.get(
+            project=self.project, date=self.today, path="/pricing"
+        )
+        self.assertEqual(pricing.exits, 1)
+
+    def test_rerun_replaces_rows_for_the_day(self):
+        session = self.session("s1", self.now)
+        self.view(session, "/", self.now)
+        analytics_rollups.rollup_day(self.today, [self.project.id])
+
+        self.view(session, "/", self.now + timedelta(minutes=1))
+        analytics_rollups.rollup_day(self.today, [self.project.id])
+
+        self.assertEqual(AnalyticsDailyStats.objects.count(), 1)
+        page = AnalyticsDailyPageStats.objects.get(path="/")
+        self.assertEqual(page.views, 2)
+
+    def test_incremental_run_only_rebuilds_touched_days(self):
+        yesterday = self.now - timedelta(days=1)
+        old = self.session("old", yesterday)
+        self.view(old, "/", yesterday)
+        self.assertEqual(analytics_rollups.rollup(now=self.now), 1)
+
+        computed = AnalyticsDailyStats.objects.get(date=yesterday.date()).computed_at
+        later = self.now + timedelta(hours=1)
+        fresh = self.session("new", later)
+        self.view(fresh, "/", later)
+
+        self.assertEqual(analytics_rollups.rollup(now=later + timedelta(minutes=5)), 1)
+        self.assertEqual(
+            AnalyticsDailyStats.objects.get(date=yesterday.date()).computed_at, computed
+        )
+        self.assertTrue(AnalyticsDailyStats.objects.filter(date=self.today).exists())
+
+    @override_settings(ANALYTICS_WRITE_BEHIND=False)
+    def test_clicks_and_load_updates_mark_their_day_dirty(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        session = self.session("s1", yesterday)
+        pageview = self.view(session, "/", yesterday)
+        analytics_rollups.rollup(now=timezone.now() - timedelta(minutes=10))
+
+        ingest_batch(
+            self.project,
+            [
+                {
+                    "type": "event",
+                    "page_view_id": str(pageview.id),
+                    "event_type": "click",
+                }
+            ],
+        )
+        self.client.post(
+            reverse("website:analytics_update_pageview"),
+            json.dumps(
+                {
+                    "tracking_code": "rollcode",
+                    "page_view_id": str(pageview.id),
+                    "load_time_ms": 800,
+                }
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(analytics_rollups.rollup(now=timezone.now()), 1)
+        page = AnalyticsDailyPageStats.objects.get(date=yesterday.date(), path="/")
+        self.assertEqual(page.clicks, 1)
+        self.assertEqual(page.load_fast, 1)
+
+    def test_command_refreshes_rollups(self):
+        session = self.session("s1", timezone.now())
+        self.view(session, "/", timezone.now())
+
+        call_command("rollup_analytics", "--days", "1", stdout=StringIO())
+
+        self.assertTrue(
+            AnalyticsDailyPageStats.objects.filter(
+                project=self.project, path="/"
+            ).exists()
+        )
+
+    def test_dashboard_api_reads_rollups(self):
+        # The traffic chart runs up to yesterday
+        AnalyticsDailyStats.objects.create(
+            project=self.project,
+            date=self.today - timedelta(days=1),
+            sessions=4,
+            pageviews=9,
+            computed_at=self.now,
+        )
+        AnalyticsDailyPageStats.objects.create(
+            project=self.project,
+            date=self.today - timedelta(days=1),
+            path="/pricing",
+            url="https://rolled.example.com/pricing",
+            views=9,
+            sessions=4,
+            duration_sum=90,
+            duration_count=3,
+            computed_at=self.now,
+        )
+        self.client.force_login(self.user)
+        url = reverse("website:analytics_api_data", args=[self.brand.id])
+
+        traffic = self.client.get(url, {"type": "traffic", "days": 7}).json()["data"]
+        self.assertEqual(sum(day["pageviews"] for day in traffic), 9)
+
+        pages = self.client.get(url, {"type": "pages"}).json()["data"]
+        self.assertEqual(pages[0]["path"], "/pricing")
+        self.assertEqual(pages[0]["views"], 9)
+        self.assertEqual(pages[0]["avg_duration"], 30)
+
+    def test_dashboard_and_page_detail_render_from_rollups(self):
+        session = self.session("s1", self.now - timedelta(days=1))
+        self.view(session, "/pricing", self.now - timedelta(days=1), load_time_ms=1500)
+        analytics_rollups.rollup(now=self.now)
+        self.client.force_login(self.user)
+
+        dashboard = self.client.get(
+            reverse("website:analytics_dashboard", args=[self.brand.id])
+        )
+        self.assertEqual(dashboard.status_code, 200)
+        self.assertEqual(dashboard.context["total_pageviews"], 1)
+
+        # Linked from the dashboard with the stored path, leading slash included
+        detail = self.client.get(
+            reverse("website:page_detail_analytics", args=[self.brand.id, "/pricing"])
+        )
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.context["total_views"], 1)
+        self.assertEqual(detail.context["load_time_buckets"]["average"], 1)
+        self.assertEqual(sum(day["views"] for day in detail.context["daily_views"]), 1)
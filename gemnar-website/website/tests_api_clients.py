@@ -0,0 +1,91 @@
+"""
+Tests for the pooled per-credential API client registry
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from website.models import Brand
+from website.services.api_clients import (
+    ClientRegistry,
+    brand_twitter_client,
+    graph_session,
+    registry,
+)
+
+User = get_user_model()
+
+
+class ClientRegistryTestCase(SimpleTestCase):
+    """Test cases for ClientRegistry"""
+
+    def test_lru_eviction(self):
+        pool = ClientRegistry(max_size=2)
+        pool.get_or_create("a", object)
+        pool.get_or_create("b", object)
+        pool.get_or_create("a", object)  # "b" is now least recently used
+        pool.get_or_create("c", object)
+
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.stats()["evictions"], 1)
+        first = pool.get_or_create("a", object)
+        self.assertIs(pool.get_or_create("a", object), first)
+
+    def test_changed_tag_fingerprint_drops_entries(self):
+        pool = ClientRegistry()
+        old = pool.get_or_create("k1", object, tag="brand:1", tag_fingerprint="v1")
+        pool.get_or_create("k2", object, tag="brand:2", tag_fingerprint="v1")
+
+        pool.sync_tag("brand:1", "v2")
+
+        self.assertEqual(len(pool), 1)
+        new = pool.get_or_create("k1", object, tag="brand:1", tag_fingerprint="v2")
+        self.assertIsNot(new, old)
+
+
+class BrandClientPoolingTestCase(TestCase):
+    """Brand clients are reused until the brand's credentials change"""
+
+    def setUp(self):
+        registry.clear()
+        user = User.objects.create_user(
+            username="pool", email="pool@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Pooled",
+            url="https://pooled.example.com",
+            owner=user,
+            twitter_api_key="k",
+            twitter_api_secret="s",
+            twitter_access_token="t",
+            twitter_access_token_secret="ts",
+            twitter_bearer_token="b",
+            instagram_access_token="EAAPOOLED",
+            instagram_user_id="123",
+        )
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_clients_are_reused_across_brand_loads(self):
+        client = brand_twitter_client(self.brand)
+        session = graph_session(self.brand)
+
+        reloaded = Brand.objects.get(pk=self.brand.pk)
+        self.assertIs(brand_twitter_client(reloaded), client)
+        self.assertIs(graph_session(reloaded), session)
+
+    def test_credential_change_invalidates_pool(self):
+        client = brand_twitter_client(self.brand)
+        session = graph_session(self.brand)
+
+        # Unrelated saves keep the pool
+        self.brand.name = "Renamed"
+        self.brand.save()
+        self.assertIs(brand_twitter_client(self.brand), client)
+
+        self.brand.twitter_access_token = "rotated"
+        self.brand.save()
+        self.assertEqual(len(registry), 0)
+        self.assertIsNot(brand_twitter_client(self.brand), client)
+        self.assertIsNot(graph_session(self.brand), session)
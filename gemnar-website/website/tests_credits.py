@@ -2,11 +2,21 @@
 Tests for AI credit system
 """
 
+from datetime import timedelta
 from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from organizations.models import Organization, OrganizationUser
-from website.models import Brand, CreditTransaction, CreditPackage
+from website.models import (
+    Brand,
+    CreditTransaction,
+    CreditPackage,
+    CreditReservation,
+    RunwarePricingData,
+)
+from website.services import credit_ledger
+from website.services.pricing import PricingTable, pricing_table
 from website.utils.credit_manager import CreditManager
 
 User = get_user_model()
@@ -229,3 +239,135 @@ class CreditSystemTestCase(TestCase):
         self.assertGreater(stats["transaction_count"], 0)
         self.assertGreater(stats["total_purchased"], Decimal("0"))
         self.assertGreater(stats["total_used"], Decimal("0"))
+
+
+class CreditLedgerTestCase(TestCase):
+    """Test cases for conditional deductions and credit reservations"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ledger", email="ledger@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Ledger Brand",
+            url="https://ledger.example.com",
+            owner=self.user,
+            credits_balance=Decimal("10.00"),
+        )
+
+    def balance(self):
+        self.brand.refresh_from_db()
+        return self.brand.credits_balance
+
+    def test_stale_instances_cannot_overdraw(self):
+        """Two copies loaded before either deduction can't both spend"""
+        first = Brand.objects.get(pk=self.brand.pk)
+        second = Brand.objects.get(pk=self.brand.pk)
+
+        self.assertTrue(first.deduct_credits(Decimal("7.00"), "First")[0])
+        success, message = second.deduct_credits(Decimal("7.00"), "Second")
+
+        self.assertFalse(success)
+        self.assertIn("Insufficient credits", message)
+        self.assertEqual(self.balance(), Decimal("3.00"))
+        self.assertEqual(CreditTransaction.objects.filter(brand=self.brand).count(), 1)
+
+    def test_reserve_and_capture_less_than_held(self):
+        reservation = credit_ledger.reserve(
+            self.brand, Decimal("4.00"), service_used="runware_image_generation"
+        )
+
+        self.assertEqual(self.brand.credits_balance, Decimal("6.00"))
+        self.assertFalse(CreditTransaction.objects.filter(brand=self.brand).exists())
+
+        entry = credit_ledger.capture(reservation, Decimal("2.50"))
+
+        self.assertEqual(entry.amount, Decimal("-2.50"))
+        self.assertEqual(entry.balance_after, Decimal("7.50"))
+        self.assertEqual(self.balance(), Decimal("7.50"))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, "captured")
+        self.assertEqual(reservation.transaction, entry)
+
+        # Settling twice is a no-op
+        self.assertIsNone(credit_ledger.capture(reservation))
+        self.assertFalse(credit_ledger.release(reservation))
+        self.assertEqual(self.balance(), Decimal("7.50"))
+
+    def test_release_returns_the_hold(self):
+        reservation = credit_ledger.reserve(self.brand, Decimal("10.00"))
+
+        self.assertIsNone(credit_ledger.reserve(self.brand, Decimal("0.01")))
+        self.assertTrue(credit_ledger.release(reservation))
+        self.assertEqual(self.balance(), Decimal("10.00"))
+        self.assertFalse(CreditTransaction.objects.filter(brand=self.brand).exists())
+
+    def test_expired_holds_are_released(self):
+        expired = credit_ledger.reserve(self.brand, Decimal("3.00"))
+        active = credit_ledger.reserve(self.brand, Decimal("2.00"))
+        CreditReservation.objects.filter(pk=expired.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(credit_ledger.release_expired(), 1)
+        self.assertEqual(self.balance(), Decimal("8.00"))
+        active.refresh_from_db()
+        self.assertEqual(active.status, "held")
+
+
+class PricingTableTestCase(TestCase):
+    """Test cases for the in-memory service pricing table"""
+
+    def setUp(self):
+        pricing_table.invalidate()
+        self.addCleanup(pricing_table.invalidate)
+        RunwarePricingData.objects.create(
+            service_name="Image Generation (Standard)",
+            runware_price=Decimal("0.01"),
+            markup_percentage=Decimal("50.00"),
+        )
+        RunwarePricingData.objects.create(
+            service_name="Video Generation",
+            runware_price=Decimal("0.20"),
+            markup_percentage=Decimal("50.00"),
+        )
+
+    def test_costs_are_served_without_queries(self):
+        self.assertEqual(
+            CreditManager.get_service_cost("image generation"), Decimal("0.015")
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CreditManager.get_service_cost("Video Generation"), Decimal("0.3")
+            )
+            # No matching row falls back to the defaults
+            self.assertEqual(
+                CreditManager.get_service_cost("Background Removal"), Decimal("0.003")
+            )
+
+    def test_saving_a_price_reloads_the_table(self):
+        CreditManager.get_service_cost("Video Generation")
+
+        row = RunwarePricingData.objects.get(service_name="Video Generation")
+        row.runware_price = Decimal("0.40")
+        row.save()
+
+        self.assertEqual(
+            CreditManager.get_service_cost("Video Generation"), Decimal("0.6")
+        )
+
+    def test_version_check_skips_unchanged_rows(self):
+        table = PricingTable(ttl=0)
+        table.rows()
+        table.rows()
+
+        self.assertEqual(table.loads, 1)
+
+    def test_estimate_multi_asset_job(self):
+        estimate = CreditManager.estimate_cost(
+            {"Image Generation": 4, "Video Generation": 1}
+        )
+
+        self.assertEqual(estimate["total"], Decimal("0.015") * 4 + Decimal("0.3"))
+        self.assertEqual([line["quantity"] for line in estimate["lines"]], [4, 1])
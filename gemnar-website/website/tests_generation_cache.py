@@ -0,0 +1,176 @@
+"""
+Tests for the content-addressed LLM generation cache
+"""
+
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from website.models import Brand, TweetStrategy
+from website.services.generation_cache import (
+    GenerationCache,
+    cached_chat_completion,
+    generation_cache,
+    generation_key,
+)
+
+User = get_user_model()
+
+
+def mock_openai_client(*contents):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        MagicMock(choices=[MagicMock(message=MagicMock(content=c))]) for c in contents
+    ]
+    return client
+
+
+MESSAGES = [
+    {"role": "system", "content": "You write tweets."},
+    {"role": "user", "content": "Launch day for  Acme\n"},
+]
+
+
+class GenerationCacheTestCase(SimpleTestCase):
+    """Keying, expiry and eviction of cached completions"""
+
+    def setUp(self):
+        generation_cache.clear()
+        self.addCleanup(generation_cache.clear)
+
+    def test_key_ignores_whitespace_but_not_parameters(self):
+        spaced = [dict(m, content=f"  {m['content']}  ") for m in MESSAGES]
+
+        self.assertEqual(
+            generation_key("gpt-4", MESSAGES, temperature=0.7),
+            generation_key("gpt-4", spaced, temperature=0.7),
+        )
+        self.assertNotEqual(
+            generation_key("gpt-4", MESSAGES, temperature=0.7),
+            generation_key("gpt-4", MESSAGES, temperature=0.9),
+        )
+        self.assertNotEqual(
+            generation_key("gpt-4", MESSAGES), generation_key("gpt-4o-mini", MESSAGES)
+        )
+
+    def test_repeat_request_is_served_from_cache(self):
+        client = mock_openai_client("First tweet", "Second tweet")
+
+        first = cached_chat_completion(client, "gpt-4", MESSAGES, max_tokens=100)
+        second = cached_chat_completion(client, "gpt-4", MESSAGES, max_tokens=100)
+
+        self.assertEqual(first, ("First tweet", False))
+        self.assertEqual(second, ("First tweet", True))
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+    def test_bypass_refreshes_the_entry(self):
+        client = mock_openai_client("First tweet", "Fresh tweet")
+        cached_chat_completion(client, "gpt-4", MESSAGES)
+
+        fresh = cached_chat_completion(client, "gpt-4", MESSAGES, bypass=True)
+        again = cached_chat_completion(client, "gpt-4", MESSAGES)
+
+        self.assertEqual(fresh, ("Fresh tweet", False))
+        self.assertEqual(again, ("Fresh tweet", True))
+        self.assertEqual(generation_cache.stats()["bypasses"], 1)
+
+    def test_clear_resets_the_counters(self):
+        cached_chat_completion(mock_openai_client("One"), "gpt-4", MESSAGES)
+
+        generation_cache.clear()
+
+        stats = generation_cache.stats()
+        self.assertEqual((stats["size"], stats["misses"], stats["bypasses"]), (0, 0, 0))
+
+    @override_settings(LLM_CACHE_ENABLED=False)
+    def test_disabled_cache_always_calls_openai(self):
+        client = mock_openai_client("One", "Two")
+
+        cached_chat_completion(client, "gpt-4", MESSAGES)
+        result = cached_chat_completion(client, "gpt-4", MESSAGES)
+
+        self.assertEqual(result, ("Two", False))
+
+    def test_expiry_and_lru_eviction(self):
+        cache = GenerationCache(ttl=0, max_entries=2)
+        cache.set("a", "x")
+        self.assertIsNone(cache.get("a"))
+
+        cache = GenerationCache(ttl=60, max_entries=2)
+        cache.set("a", "x")
+        cache.set("b", "y")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "z")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x")
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+
+class GenerationCacheEndpointTestCase(TestCase):
+    """Cached generation through the tweet content endpoint"""
+
+    def setUp(self):
+        generation_cache.clear()
+        self.addCleanup(generation_cache.clear)
+        self.user = User.objects.create_user(
+            username="writer", email="writer@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_regenerate_is_cached_unless_bypassed(self):
+        openai = mock_openai_client("Tweet one", "Tweet two")
+        data = {
+            "prompt": "About {topic} in a {tone} voice",
+            "topic": "AI",
+            "tone": "fun",
+        }
+        url = reverse("website:api_generate_tweet_content")
+
+        with patch("website.api_views.get_openai_client", return_value=openai):
+            first = self.client.post(url, data, format="json")
+            second = self.client.post(url, data, format="json")
+            fresh = self.client.post(url, dict(data, bypass_cache=True), format="json")
+
+        self.assertEqual(first.data["content"], "Tweet one")
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(second.data["content"], "Tweet one")
+        self.assertFalse(fresh.data["cached"])
+        self.assertEqual(fresh.data["content"], "Tweet two")
+
+    def test_strategy_drafts_are_never_served_from_cache(self):
+        brand = Brand.objects.create(
+            name="Acme", url="https://acme.example.com", owner=self.user
+        )
+        strategy = TweetStrategy.objects.create(
+            name="Launch",
+            category="product_feature",
+            description="Announce a launch",
+            prompt_template="Announce a launch for {brand_name}",
+        )
+        openai = mock_openai_client("Draft one", "Draft two")
+
+        with patch("website.utils.get_openai_client", return_value=openai):
+            first = strategy.generate_tweet_for_brand(brand)
+            second = strategy.generate_tweet_for_brand(brand)
+
+        self.assertEqual(
+            (first["content"], second["content"]), ("Draft one", "Draft two")
+        )
+
+    def test_stats_are_admin_only(self):
+        url = reverse("website:generation_cache_stats")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.data)
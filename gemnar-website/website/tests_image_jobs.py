@@ -0,0 +1,155 @@
+"""
+Tests for asynchronous AI image generation jobs
+"""
+
+import os
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from website.models import ImageGenerationJob
+from website.services import image_jobs
+
+User = get_user_model()
+
+
+class ImageGenerationJobTestCase(TestCase):
+    """Async opt-in, worker execution and polling of image jobs"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="imagejobs", email="imagejobs@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.executor = MagicMock()
+        patcher = patch.object(image_jobs, "get_executor", return_value=self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("website:generate_ai_image") + "?async=1", data
+            )
+        return response
+
+    def run_submitted(self):
+        _, job_id, job_request = self.executor.submit.call_args.args
+        return image_jobs.run_job(job_id, job_request)
+
+    @patch.dict(os.environ, {"RUNWARE_API_KEY": "test-key"})
+    @patch("website.api_views.requests")
+    def test_async_request_returns_job_and_worker_stores_result(self, mock_requests):
+        mock_requests.post.return_value = MagicMock(
+            status_code=200,
+            json=MagicMock(
+                return_value=[
+                    {
+                        "taskType": "imageInference",
+                        "imageURL": "https://im.runware.ai/image.png",
+                    }
+                ]
+            ),
+        )
+        # Cloudinary is not reachable in tests; the endpoint falls back to the URL
+        mock_requests.get.side_effect = Exception("offline")
+
+        response = self.submit({"prompt": "A lighthouse at dawn", "width": "256"})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = ImageGenerationJob.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.params["prompt"], "A lighthouse at dawn")
+        mock_requests.post.assert_not_called()
+
+        self.run_submitted()
+
+        poll = self.client.get(response.data["status_url"])
+        self.assertEqual(poll.data["status"], "completed")
+        self.assertEqual(
+            poll.data["result"]["image"], "https://im.runware.ai/image.png"
+        )
+        payload = mock_requests.post.call_args.kwargs["json"][0]
+        self.assertEqual(payload["width"], 256)
+
+    @patch.dict(os.environ, {"RUNWARE_API_KEY": "test-key"})
+    def test_error_response_fails_job(self):
+        response = self.submit({"prompt": ""})
+
+        job = self.run_submitted()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.response_status, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(job.error_message, "Prompt is required")
+        self.assertEqual(str(job.pk), response.data["job_id"])
+
+    def test_jobs_are_private_to_their_owner(self):
+        job = ImageGenerationJob.objects.create(
+            user=self.user, operation="generate_ai_image"
+        )
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="testpass123"
+        )
+        client = APIClient()
+        client.force_authenticate(other)
+
+        response = client.get(
+            reverse("website:image_generation_job_status", args=[job.pk])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(IMAGE_GENERATION_MAX_ACTIVE_PER_USER=1)
+    def test_active_job_limit(self):
+        ImageGenerationJob.objects.create(user=self.user, operation="generate_ai_image")
+
+        response = self.submit({"prompt": "Another"})
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.executor.submit.assert_not_called()
+
+    def test_anonymous_requests_cannot_queue_jobs(self):
+        response = APIClient().post(
+            reverse("website:gpt_image_generate_advanced") + "?async=1",
+            {"prompt": "A lighthouse"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(ImageGenerationJob.objects.exists())
+        self.executor.submit.assert_not_called()
+
+    def test_stale_jobs_are_measured_from_when_they_started(self):
+        now = timezone.now()
+        long_ago = now - timedelta(minutes=30)
+        waiting = ImageGenerationJob.objects.create(
+            user=self.user, operation="generate_ai_image"
+        )
+        just_started = ImageGenerationJob.objects.create(
+            user=self.user,
+            operation="generate_ai_image",
+            status="running",
+            started_at=now - timedelta(minutes=1),
+        )
+        stuck = ImageGenerationJob.objects.create(
+            user=self.user,
+            operation="generate_ai_image",
+            status="running",
+            started_at=long_ago,
+        )
+        ImageGenerationJob.objects.update(created_at=long_ago)
+        for job in (waiting, just_started, stuck):
+            job.refresh_from_db()
+            image_jobs.expire_stale_job(job, now=now)
+
+        self.assertEqual(
+            [job.status for job in (waiting, just_started, stuck)],
+            ["queued", "running", "failed"],
+        )
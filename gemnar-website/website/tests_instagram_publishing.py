@@ -0,0 +1,182 @@
+"""
+Tests for the staged (non-blocking) Instagram Reels publish flow
+"""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from website.models import Brand, BrandInstagramPost
+from website.services.instagram_publishing import advance_pending_containers
+
+User = get_user_model()
+
+
+def mock_response(status_code=200, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data or {}
+    response.text = str(data or {})
+    response.headers = {}
+    return response
+
+
+class InstagramPublishPollerTestCase(TestCase):
+    """Test cases for advance_pending_containers and staged posting"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="reels", email="reels@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Reels Brand",
+            url="https://reels.example.com",
+            owner=self.user,
+            stripe_subscription_status="active",
+            instagram_access_token="EAAFAKEVALIDTOKEN",
+            instagram_user_id="123456789012345",
+            instagram_app_id="999999999999999",
+            instagram_app_secret="APPSECRET1234567890",
+        )
+
+    def make_pending(self, container_id, stage="container_created", **kwargs):
+        return BrandInstagramPost.objects.create(
+            brand=self.brand,
+            content="Reel caption",
+            video_url="https://cdn.example.com/reel.mp4",
+            is_video_post=True,
+            status="publishing",
+            publish_stage=stage,
+            container_id=container_id,
+            container_api_base="https://graph.instagram.com",
+            container_created_at=kwargs.pop("created_at", timezone.now()),
+            **kwargs,
+        )
+
+    @patch("website.services.api_clients.graph_session")
+    @patch("website.services.instagram_publishing.graph_session")
+    def test_single_pass_checks_all_containers_and_publishes_finished(
+        self, mock_poll_session, mock_graph_session
+    ):
+        finished = self.make_pending("C1")
+        processing = self.make_pending("C2")
+
+        session = mock_poll_session.return_value
+        session.get.return_value = mock_response(
+            data={
+                "C1": {"id": "C1", "status_code": "FINISHED"},
+                "C2": {"id": "C2", "status_code": "IN_PROGRESS"},
+            }
+        )
+        graph = mock_graph_session.return_value
+        graph.post.return_value = mock_response(data={"id": "987654321"})
+        graph.get.return_value = mock_response(
+            data={"id": "987654321", "permalink": "https://instagram.com/p/abc/"}
+        )
+
+        summary = advance_pending_containers()
+
+        # Both containers were looked up with one batched request
+        self.assertEqual(session.get.call_count, 1)
+        params = session.get.call_args.kwargs["params"]
+        self.assertEqual(params["ids"], "C1,C2")
+
+        finished.refresh_from_db()
+        processing.refresh_from_db()
+        self.assertEqual(finished.status, "posted")
+        self.assertEqual(finished.publish_stage, "published")
+        self.assertEqual(finished.instagram_id, "987654321")
+        self.assertEqual(processing.status, "publishing")
+        self.assertEqual(processing.publish_stage, "processing")
+        self.assertIsNotNone(processing.container_checked_at)
+        self.assertEqual(summary["checked"], 2)
+        self.assertEqual(summary["published"], 1)
+
+    @patch("website.services.instagram_publishing.graph_session")
+    def test_error_and_timed_out_containers_fail(self, mock_graph_session):
+        errored = self.make_pending("E1")
+        stale = self.make_pending(
+            "S1",
+            stage="processing",
+            created_at=timezone.now() - timedelta(hours=2),
+        )
+
+        session = mock_graph_session.return_value
+        session.get.return_value = mock_response(
+            data={
+                "E1": {"id": "E1", "status_code": "ERROR"},
+                "S1": {"id": "S1", "status_code": "IN_PROGRESS"},
+            }
+        )
+
+        summary = advance_pending_containers()
+
+        errored.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(errored.status, "failed")
+        self.assertEqual(errored.publish_stage, "failed")
+        self.assertEqual(stale.status, "failed")
+        self.assertIn("timeout", stale.error_message)
+        self.assertEqual(summary["failed"], 2)
+
+    @patch("website.services.instagram_publishing.graph_session")
+    def test_dry_run_reports_without_saving(self, mock_graph_session):
+        finished = self.make_pending("C1")
+        errored = self.make_pending("E1")
+
+        session = mock_graph_session.return_value
+        session.get.return_value = mock_response(
+            data={
+                "C1": {"id": "C1", "status_code": "FINISHED"},
+                "E1": {"id": "E1", "status_code": "ERROR"},
+            }
+        )
+
+        summary = advance_pending_containers(dry_run=True)
+
+        self.assertEqual((summary["ready"], summary["failed"]), (1, 1))
+        self.assertEqual(summary["published"], 0)
+        session.post.assert_not_called()
+        for post in (finished, errored):
+            post.refresh_from_db()
+            self.assertEqual(post.status, "publishing")
+            self.assertEqual(post.publish_stage, "container_created")
+            self.assertIsNone(post.container_checked_at)
+
+    @patch("time.sleep")
+    @patch("website.services.api_clients.graph_session")
+    @patch("requests.get")
+    @patch("requests.head")
+    def test_post_to_instagram_queues_reel_without_waiting(
+        self, mock_head, mock_get, mock_graph_session, mock_sleep
+    ):
+        post = BrandInstagramPost.objects.create(
+            brand=self.brand,
+            content="Reel caption",
+            video_url="https://cdn.example.com/reel.mp4",
+            is_video_post=True,
+            status="approved",
+        )
+        head = mock_response()
+        head.headers = {"content-type": "video/mp4"}
+        mock_head.return_value = head
+        mock_get.return_value = mock_response()
+        graph = mock_graph_session.return_value
+        graph.get.return_value = mock_response(data={"id": "123456789012345"})
+        graph.post.return_value = mock_response(data={"id": "CREATION123"})
+
+        success, error = post.post_to_instagram()
+
+        self.assertTrue(success, error)
+        post.refresh_from_db()
+        self.assertEqual(post.status, "publishing")
+        self.assertEqual(post.publish_stage, "container_created")
+        self.assertEqual(post.container_id, "CREATION123")
+        mock_sleep.assert_not_called()
+        # Only the container was created; nothing was published yet
+        self.assertFalse(
+            any(c.args[0].endswith("/media_publish") for c in graph.post.call_args_list)
+        )
@@ -0,0 +1,103 @@
+"""
+Tests for streaming generated-video downloads
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from website.models import Brand, BrandInstagramPost
+from website.services import media_downloads
+from website.video_utils import complete_video_generation
+
+User = get_user_model()
+
+CHUNKS = [b"\x00\x00\x00\x18ftypmp42", b"a" * 1000, b"", b"b" * 500]
+VIDEO = b"".join(CHUNKS)
+
+
+def streaming_response(chunks=CHUNKS):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {"Content-Type": "video/mp4"}
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+@patch("website.services.media_downloads.requests.get")
+class StreamDownloadTestCase(SimpleTestCase):
+    """stream_download writes chunks to disk and hashes them"""
+
+    def test_chunks_are_written_and_hashed(self, mock_get):
+        mock_get.return_value = streaming_response()
+
+        with media_downloads.stream_download("https://cdn.example.com/v.mp4") as media:
+            with open(media.path, "rb") as f:
+                self.assertEqual(f.read(), VIDEO)
+            self.assertEqual(media.size, len(VIDEO))
+            self.assertEqual(media.sha256, hashlib.sha256(VIDEO).hexdigest())
+            path = media.path
+
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+
+    def test_oversized_download_is_aborted_and_removed(self, mock_get):
+        mock_get.return_value = streaming_response()
+        created = []
+        real_mkstemp = tempfile.mkstemp
+
+        def tracking_mkstemp(*args, **kwargs):
+            fd, path = real_mkstemp(*args, **kwargs)
+            created.append(path)
+            return fd, path
+
+        with patch.object(media_downloads.tempfile, "mkstemp", tracking_mkstemp):
+            with self.assertRaises(media_downloads.DownloadTooLarge):
+                media_downloads.stream_download(
+                    "https://cdn.example.com/v.mp4", max_bytes=100
+                )
+
+        self.assertFalse(os.path.exists(created[0]))
+
+
+class CompleteVideoGenerationTestCase(TestCase):
+    """complete_video_generation downloads the video once"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        user = User.objects.create_user(
+            username="reels", email="reels@example.com", password="testpass123"
+        )
+        brand = Brand.objects.create(
+            name="Reel Brand", url="https://reel.example.com", owner=user
+        )
+        self.post = BrandInstagramPost.objects.create(
+            brand=brand, content="Reel", is_video_post=True
+        )
+
+    @patch(
+        "website.services.media_downloads.probe_video", return_value={"duration": 5.2}
+    )
+    @patch("website.services.media_downloads.extract_thumbnail", return_value=None)
+    @patch("website.services.media_downloads.requests.get")
+    def test_video_is_saved_from_a_single_streamed_download(
+        self, mock_get, mock_thumbnail, mock_probe
+    ):
+        mock_get.return_value = streaming_response()
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            self.assertTrue(
+                complete_video_generation(self.post, "https://cdn.example.com/v.mp4")
+            )
+
+        mock_get.assert_called_once()
+        mock_thumbnail.assert_called_once()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.video_checksum, hashlib.sha256(VIDEO).hexdigest())
+        self.assertEqual(self.post.video_duration, 5.2)
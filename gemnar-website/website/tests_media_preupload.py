@@ -0,0 +1,150 @@
+"""
+Tests for ahead-of-time tweet media uploads
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from website.models import Brand, BrandTweet
+from website.services.api_clients import registry
+from website.services.media_preupload import preupload_due_media, tweets_needing_media
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06"
+    b"\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01"
+    b"\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaPreuploadTestCase(TestCase):
+    """Test cases for preupload_due_media and posting with stored media"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        user = User.objects.create_user(
+            username="media", email="media@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Media Brand",
+            url="https://media.example.com",
+            owner=user,
+            twitter_api_key="k",
+            twitter_api_secret="s",
+            twitter_access_token="t",
+            twitter_access_token_secret="ts",
+            twitter_bearer_token="b",
+        )
+        self.soon = self.make_tweet(timedelta(minutes=30))
+        self.later = self.make_tweet(timedelta(hours=5))
+
+    def tearDown(self):
+        registry.clear()
+
+    def make_tweet(self, offset):
+        return BrandTweet.objects.create(
+            brand=self.brand,
+            content="Tweet with image",
+            status="approved",
+            scheduled_for=timezone.now() + offset,
+            image=SimpleUploadedFile("pic.png", PNG, content_type="image/png"),
+        )
+
+    @patch("website.services.api_clients.brand_twitter_api")
+    def test_uploads_only_tweets_inside_the_horizon(self, mock_api):
+        mock_api.return_value.media_upload.return_value = SimpleNamespace(
+            media_id=111, expires_after_secs=86400
+        )
+
+        summary = preupload_due_media(horizon=timedelta(hours=1))
+
+        self.assertEqual(summary["uploaded"], 1)
+        self.soon.refresh_from_db()
+        self.later.refresh_from_db()
+        self.assertEqual(self.soon.twitter_media_id, "111")
+        self.assertTrue(self.soon.has_preuploaded_media(at=self.soon.scheduled_for))
+        self.assertEqual(self.later.twitter_media_id, "")
+        # Nothing left to do for the next run
+        self.assertFalse(tweets_needing_media(timedelta(hours=1)).exists())
+
+    @patch("website.services.api_clients.brand_twitter_api")
+    def test_stuck_tweets_do_not_crowd_out_due_ones(self, mock_api):
+        mock_api.return_value.media_upload.side_effect = RuntimeError("upload failed")
+        overdue = self.make_tweet(-timedelta(hours=3))
+        unconfigured = BrandTweet.objects.create(
+            brand=Brand.objects.create(
+                name="No Keys", url="https://nokeys.example.com", owner=self.brand.owner
+            ),
+            content="Tweet with image",
+            status="approved",
+            scheduled_for=timezone.now(),
+            image=SimpleUploadedFile("pic.png", PNG, content_type="image/png"),
+        )
+
+        pending = list(tweets_needing_media(timedelta(hours=1)))
+        self.assertEqual(pending, [self.soon])
+        self.assertNotIn(overdue, pending)
+        self.assertNotIn(unconfigured, pending)
+
+        summary = preupload_due_media(horizon=timedelta(hours=1))
+
+        self.assertEqual(summary["failed"], 1)
+        self.soon.refresh_from_db()
+        self.assertEqual(self.soon.twitter_media_failures, 1)
+        self.assertGreater(self.soon.twitter_media_retry_at, timezone.now())
+        # Backed off until the retry time
+        self.assertFalse(tweets_needing_media(timedelta(hours=1)).exists())
+        later = timezone.now() + timedelta(minutes=6)
+        self.assertTrue(tweets_needing_media(timedelta(hours=1), now=later).exists())
+
+    def test_replaced_image_needs_a_new_upload(self):
+        BrandTweet.objects.filter(pk=self.soon.pk).update(
+            twitter_media_id="111",
+            twitter_media_source="brand_tweets/old.png",
+            twitter_media_expires_at=timezone.now() + timedelta(hours=20),
+        )
+        self.soon.refresh_from_db()
+
+        self.assertFalse(self.soon.has_preuploaded_media())
+        self.assertIn(self.soon, tweets_needing_media(timedelta(hours=1)))
+
+    @patch("website.services.api_clients.brand_twitter_client")
+    @patch("website.services.api_clients.brand_twitter_api")
+    def test_posting_uses_stored_media_without_uploading(self, mock_api, mock_client):
+        BrandTweet.objects.filter(pk=self.soon.pk).update(
+            twitter_media_id="222",
+            twitter_media_source=self.soon.image.name,
+            twitter_media_expires_at=timezone.now() + timedelta(hours=20),
+        )
+        self.soon.refresh_from_db()
+        client = MagicMock()
+        client.create_tweet.return_value = SimpleNamespace(data={"id": "999"})
+        mock_client.return_value = client
+
+        with patch.object(BrandTweet, "_send_websocket_notification", create=True):
+            success, error = self.soon.post_to_twitter()
+
+        self.assertTrue(success, error)
+        mock_api.return_value.media_upload.assert_not_called()
+        client.create_tweet.assert_called_once_with(
+            text="Tweet with image", media_ids=["222"]
+        )
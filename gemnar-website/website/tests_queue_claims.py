@@ -0,0 +1,98 @@
+"""
+Tests for lease-based queue claims on BrandTweet and BrandInstagramPost
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from website.models import Brand, BrandInstagramPost, BrandTweet
+
+User = get_user_model()
+
+
+class QueueClaimTestCase(TestCase):
+    """Test cases for claim_ready / renew_claim / release_claim"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="claims", email="claims@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Claim Brand", url="https://claims.example.com", owner=self.user
+        )
+        past = timezone.now() - timedelta(minutes=5)
+        self.tweets = [
+            BrandTweet.objects.create(
+                brand=self.brand,
+                content=f"Tweet {i}",
+                status="approved",
+                scheduled_for=past + timedelta(seconds=i),
+            )
+            for i in range(3)
+        ]
+        # Not due yet and not approved - never claimable
+        BrandTweet.objects.create(
+            brand=self.brand,
+            content="Future",
+            status="approved",
+            scheduled_for=timezone.now() + timedelta(hours=1),
+        )
+        BrandTweet.objects.create(
+            brand=self.brand, content="Draft", status="draft", scheduled_for=past
+        )
+
+    def test_claims_are_exclusive_between_workers(self):
+        first = BrandTweet.claim_ready(worker_id="node-a:1", limit=2)
+        second = BrandTweet.claim_ready(worker_id="node-b:1")
+        third = BrandTweet.claim_ready(worker_id="node-c:1")
+
+        self.assertEqual([t.pk for t in first], [t.pk for t in self.tweets[:2]])
+        self.assertEqual([t.pk for t in second], [self.tweets[2].pk])
+        self.assertEqual(third, [])
+        self.assertTrue(all(t.claimed_by == "node-a:1" for t in first))
+
+    def test_expired_leases_are_reclaimed(self):
+        BrandTweet.claim_ready(worker_id="dead-node:1")
+        BrandTweet.objects.filter(claimed_by="dead-node:1").update(
+            claimed_until=timezone.now() - timedelta(seconds=1)
+        )
+
+        reclaimed = BrandTweet.claim_ready(worker_id="node-b:1")
+
+        self.assertEqual(len(reclaimed), 3)
+        # The dead worker lost its lease and must not post
+        self.assertFalse(self.tweets[0].renew_claim("dead-node:1"))
+        self.assertTrue(reclaimed[0].renew_claim("node-b:1"))
+
+    def test_reclaim_expired_clears_stale_claims(self):
+        BrandTweet.claim_ready(worker_id="dead-node:1")
+        BrandTweet.objects.filter(claimed_by="dead-node:1").update(
+            claimed_until=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(BrandTweet.reclaim_expired(), 3)
+        self.assertFalse(BrandTweet.objects.exclude(claimed_by="").exists())
+
+    def test_release_claim_and_brand_filter(self):
+        claimed = BrandTweet.claim_ready(worker_id="node-a:1", brand=self.brand)
+        claimed[0].release_claim()
+
+        again = BrandTweet.claim_ready(worker_id="node-b:1")
+        self.assertEqual([t.pk for t in again], [claimed[0].pk])
+
+    def test_instagram_posts_share_the_claim_api(self):
+        post = BrandInstagramPost.objects.create(
+            brand=self.brand,
+            content="Caption",
+            status="approved",
+            scheduled_for=timezone.now() - timedelta(minutes=1),
+        )
+
+        self.assertEqual(
+            [p.pk for p in BrandInstagramPost.claim_ready(worker_id="a")], [post.pk]
+        )
+        self.assertEqual(BrandInstagramPost.claim_ready(worker_id="b"), [])
+        self.assertFalse(post.claim("b"))
@@ -0,0 +1,106 @@
+"""
+Tests for the single-query tweet queue health snapshot
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from website.models import Brand, BrandTweet
+from website.services.queue_health import queue_health_snapshot
+
+User = get_user_model()
+
+TWITTER_CREDENTIALS = {
+    "twitter_api_key": "key",
+    "twitter_api_secret": "secret",
+    "twitter_access_token": "token",
+    "twitter_access_token_secret": "token-secret",
+}
+
+
+class QueueHealthSnapshotTestCase(TestCase):
+    """Test cases for queue_health_snapshot"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="queue", email="queue@example.com", password="testpass123"
+        )
+        self.now = timezone.now()
+        self.busy = self.create_brand("Busy")
+        self.quiet = self.create_brand("Quiet")
+        self.create_brand("Empty")
+        # Missing one credential - never part of the snapshot
+        Brand.objects.create(
+            name="Partial",
+            url="https://partial.example.com",
+            owner=self.user,
+            **{**TWITTER_CREDENTIALS, "twitter_access_token": ""},
+        )
+
+        for offset in (timedelta(minutes=-5), timedelta(minutes=-1)):
+            self.create_tweet(self.busy, offset)
+        for hours in (2, 30, 60, 100):
+            self.create_tweet(self.busy, timedelta(hours=hours))
+        self.create_tweet(self.quiet, timedelta(days=5), status="draft")
+
+    def create_brand(self, name):
+        return Brand.objects.create(
+            name=name,
+            url=f"https://{name.lower()}.example.com",
+            owner=self.user,
+            **TWITTER_CREDENTIALS,
+        )
+
+    def create_tweet(self, brand, offset, status="approved"):
+        return BrandTweet.objects.create(
+            brand=brand,
+            content="Queued tweet",
+            status=status,
+            scheduled_for=self.now + offset,
+        )
+
+    def test_snapshot_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            snapshot = queue_health_snapshot(now=self.now)
+            self.assertEqual(len(snapshot), 3)
+
+        busy = snapshot[self.busy.pk]
+        self.assertEqual(busy.ready, 2)
+        self.assertEqual(busy.next_24h, 1)
+        self.assertEqual(busy.next_3_days, 3)
+        self.assertEqual(busy.next_week, 4)
+        self.assertEqual(busy.total_pending, 6)
+        self.assertIsNone(busy.alert_level)
+
+        self.assertEqual(snapshot[self.quiet.pk].alert_level, "no_24h")
+        self.assertEqual(
+            [h.alert_level for h in snapshot.values() if h.brand.name == "Empty"],
+            ["empty"],
+        )
+
+    def test_ready_only_skips_leased_tweets(self):
+        self.assertEqual(
+            list(queue_health_snapshot(now=self.now, ready_only=True)),
+            [self.busy.pk],
+        )
+
+        BrandTweet.objects.filter(brand=self.busy).update(
+            claimed_by="node-a:1", claimed_until=self.now + timedelta(minutes=5)
+        )
+        self.assertEqual(queue_health_snapshot(now=self.now, ready_only=True), {})
+        self.assertEqual(queue_health_snapshot(now=self.now)[self.busy.pk].ready, 0)
+
+    @patch.object(Brand, "send_slack_notification")
+    def test_command_alerts_from_the_snapshot(self, mock_slack):
+        out = StringIO()
+        call_command("send_brand_tweets", dry_run=True, notify_queue=True, stdout=out)
+
+        self.assertIn("Processed 1 brands", out.getvalue())
+        # Quiet (nothing in 24h) and Empty are alerted, Busy is healthy
+        self.assertEqual(mock_slack.call_count, 2)
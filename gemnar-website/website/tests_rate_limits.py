@@ -0,0 +1,170 @@
+"""
+Tests for the per-credential API rate-limit governor
+"""
+
+import json
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from website.models import Brand, BrandTweet
+from website.services.rate_limits import (
+    RateLimited,
+    RateLimitGovernor,
+    endpoint_family,
+    endpoint_path,
+    governed_twitter_client,
+)
+
+User = get_user_model()
+
+
+def fake_response(status_code=200, **headers):
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class RateLimitGovernorTestCase(SimpleTestCase):
+    """Test cases for RateLimitGovernor"""
+
+    def setUp(self):
+        cache.clear()
+        self.governor = RateLimitGovernor(limits={"twitter_write": (2, 60)})
+
+    def test_bucket_is_per_credential_and_family(self):
+        self.governor.acquire("brand-a", "twitter_write")
+        self.governor.acquire("brand-a", "twitter_write")
+
+        with self.assertRaises(RateLimited) as ctx:
+            self.governor.acquire("brand-a", "twitter_write")
+        self.assertGreater(ctx.exception.retry_after, 0)
+
+        # Other credentials and families are unaffected
+        self.governor.acquire("brand-b", "twitter_write")
+        self.governor.acquire("brand-a", "twitter_read")
+
+    def test_headers_block_until_reset(self):
+        reset = int(time.time()) + 600
+        self.governor.record_response(
+            "brand-a",
+            "twitter_read",
+            fake_response(
+                429,
+                **{"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(reset)},
+            ),
+        )
+
+        with self.assertRaises(RateLimited) as ctx:
+            self.governor.acquire("brand-a", "twitter_read")
+        self.assertEqual(ctx.exception.retry_at, reset)
+
+    def test_endpoint_headers_block_only_that_endpoint(self):
+        reset = int(time.time()) + 600
+        self.governor.record_response(
+            "brand-a",
+            "twitter_read",
+            fake_response(
+                **{"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(reset)}
+            ),
+            endpoint="/2/users/me",
+        )
+
+        with self.assertRaises(RateLimited):
+            self.governor.acquire("brand-a", "twitter_read", "/2/users/me")
+        # Metrics refreshes read another endpoint of the same family
+        self.governor.acquire("brand-a", "twitter_read", "/2/tweets")
+        self.assertEqual(
+            endpoint_path("https://api.twitter.com/2/tweets/12345/"), "/2/tweets/:id"
+        )
+
+    def test_429_without_endpoint_headers_blocks_the_family(self):
+        self.governor.record_response(
+            "brand-a", "twitter_write", fake_response(429), endpoint="/2/tweets"
+        )
+
+        with self.assertRaises(RateLimited):
+            self.governor.acquire("brand-a", "twitter_write", "/2/tweets/:id")
+
+    def test_graph_usage_headers(self):
+        usage = {"123": [{"call_count": 97, "estimated_time_to_regain_access": 10}]}
+        self.governor.record_response(
+            "ig-a",
+            "graph",
+            fake_response(**{"x-business-use-case-usage": json.dumps(usage)}),
+        )
+
+        retry_at = self.governor.blocked_until("ig-a", "graph")
+        self.assertAlmostEqual(retry_at, time.time() + 600, delta=5)
+
+    def test_endpoint_families(self):
+        self.assertEqual(
+            endpoint_family("POST", "https://api.twitter.com/2/tweets"), "twitter_write"
+        )
+        self.assertEqual(
+            endpoint_family("GET", "https://api.twitter.com/2/tweets"), "twitter_read"
+        )
+        self.assertEqual(
+            endpoint_family("POST", "https://upload.twitter.com/1.1/media/upload.json"),
+            "twitter_media",
+        )
+        self.assertEqual(
+            endpoint_family("POST", "https://graph.facebook.com/v18.0/1/media_publish"),
+            "graph_publish",
+        )
+
+    def test_governed_client_does_not_sleep(self):
+        client = governed_twitter_client(
+            bearer_token="b", consumer_key="k", access_token="t"
+        )
+        self.assertFalse(client.wait_on_rate_limit)
+        self.assertTrue(hasattr(client.session, "rate_limit_key"))
+
+
+class RateLimitedPostingTestCase(TestCase):
+    """Rate-limited tweets are deferred rather than failed"""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            username="limits", email="limits@example.com", password="testpass123"
+        )
+        brand = Brand.objects.create(
+            name="Limited",
+            url="https://limited.example.com",
+            owner=user,
+            twitter_api_key="k",
+            twitter_api_secret="s",
+            twitter_access_token="t",
+            twitter_access_token_secret="ts",
+            twitter_bearer_token="b",
+        )
+        self.tweet = BrandTweet.objects.create(
+            brand=brand,
+            content="Deferred tweet",
+            status="approved",
+            scheduled_for=timezone.now() - timedelta(minutes=1),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("requests.Session.request")
+    def test_blocked_credential_defers_without_calling_twitter(self, mock_request):
+        from website.services.rate_limits import governor, twitter_credential_key
+
+        governor.block(
+            twitter_credential_key("k", "t"), "twitter_write", time.time() + 300
+        )
+
+        success, error = self.tweet.post_to_twitter()
+
+        self.assertFalse(success)
+        self.assertIn("Deferred", error)
+        mock_request.assert_not_called()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.status, "approved")
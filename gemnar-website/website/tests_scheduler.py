@@ -0,0 +1,89 @@
+"""
+Tests for the long-running automation scheduler command
+"""
+
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from website.management.commands.scheduler import ScheduledJob
+from website.models import WebLog
+
+
+class ScheduledJobTestCase(TestCase):
+    """Test cases for ScheduledJob overlap protection"""
+
+    @patch("website.management.commands.scheduler.call_command")
+    def test_trigger_while_running_is_skipped(self, mock_call_command):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_command(*args, **kwargs):
+            started.set()
+            release.wait(timeout=2)
+
+        mock_call_command.side_effect = slow_command
+        job = ScheduledJob("tweets", "send_brand_tweets", interval=60, limit=0)
+        job.start()
+
+        self.assertTrue(job.trigger())
+        started.wait(timeout=2)
+        self.assertFalse(job.trigger())
+
+        release.set()
+        job.stop()
+        job.join(timeout=2)
+
+        self.assertEqual(job.runs, 1)
+        self.assertEqual(job.skipped, 1)
+        mock_call_command.assert_called_once()
+        self.assertEqual(mock_call_command.call_args.kwargs["limit"], 0)
+
+    @patch("website.management.commands.scheduler.call_command")
+    def test_failures_are_counted_and_do_not_kill_the_job(self, mock_call_command):
+        mock_call_command.side_effect = RuntimeError("boom")
+        job = ScheduledJob("stats", "collect_system_stats", interval=60)
+
+        job.run_once()
+        job.run_once()
+
+        self.assertEqual(job.runs, 2)
+        self.assertEqual(job.failures, 2)
+
+
+class SchedulerCommandTestCase(TestCase):
+    """Test cases for manage.py scheduler"""
+
+    @patch("website.management.commands.scheduler.call_command")
+    def test_once_runs_each_enabled_job(self, mock_call_command):
+        out = StringIO()
+        call_command(
+            "scheduler", once=True, skip_stats=True, jitter=0, workers=8, stdout=out
+        )
+
+        commands = sorted(c.args[0] for c in mock_call_command.call_args_list)
+        self.assertEqual(
+            commands,
+            [
+                "flush_analytics_spool",
+                "poll_video_tasks",
+                "release_credit_holds",
+                "rollup_analytics",
+                "send_brand_instagram_posts",
+                "send_brand_tweets",
+            ],
+        )
+        tweet_call = next(
+            c
+            for c in mock_call_command.call_args_list
+            if c.args[0] == "send_brand_tweets"
+        )
+        self.assertEqual(tweet_call.kwargs["workers"], 8)
+
+        log = WebLog.objects.get(activity_name="scheduler")
+        self.assertEqual(log.status, "completed")
+        self.assertEqual(log.details["results"]["tweets"]["runs"], 1)
+        self.assertIn("Scheduler stopped", out.getvalue())
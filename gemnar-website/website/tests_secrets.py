@@ -0,0 +1,84 @@
+"""
+Tests for the decrypted secret store and shared OpenAI clients
+"""
+
+import os
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from website.models import EncryptedVariable
+from website.services.api_clients import registry
+from website.services.secrets import secret_store
+from website.utils import get_openai_client
+
+TEST_ENCRYPTION_KEY = "0123456789abcdef0123456789abcdef"
+
+
+@override_settings(CHAT_ENCRYPTION_KEY=TEST_ENCRYPTION_KEY)
+class SecretStoreTestCase(TestCase):
+    """Caching and invalidation of EncryptedVariable.get_value"""
+
+    def setUp(self):
+        secret_store.invalidate()
+        self.addCleanup(secret_store.invalidate)
+
+    def test_values_are_decrypted_once(self):
+        EncryptedVariable.set_value("RUNWARE_API_KEY", "rw-secret")
+
+        with patch.object(
+            EncryptedVariable,
+            "get_decrypted_value",
+            autospec=True,
+            side_effect=lambda var: "rw-secret",
+        ) as mock_decrypt:
+            with self.assertNumQueries(1):
+                first = EncryptedVariable.get_value("RUNWARE_API_KEY")
+                second = EncryptedVariable.get_value("RUNWARE_API_KEY")
+
+        self.assertEqual(first, "rw-secret")
+        self.assertEqual(second, "rw-secret")
+        self.assertEqual(mock_decrypt.call_count, 1)
+
+    def test_saving_a_variable_invalidates_its_entry(self):
+        EncryptedVariable.set_value("RUNWARE_API_KEY", "old")
+        self.assertEqual(EncryptedVariable.get_value("RUNWARE_API_KEY"), "old")
+
+        EncryptedVariable.set_value("RUNWARE_API_KEY", "new")
+
+        self.assertEqual(EncryptedVariable.get_value("RUNWARE_API_KEY"), "new")
+
+    def test_missing_keys_are_cached_until_created(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(EncryptedVariable.get_value("MISSING", "x"), "x")
+            self.assertIsNone(EncryptedVariable.get_value("MISSING"))
+
+        EncryptedVariable.set_value("MISSING", "found")
+
+        self.assertEqual(EncryptedVariable.get_value("MISSING"), "found")
+
+    @override_settings(SECRETS_CACHE_TTL=0)
+    def test_expired_entries_are_reloaded(self):
+        EncryptedVariable.set_value("RUNWARE_API_KEY", "rw-secret")
+
+        with self.assertNumQueries(2):
+            EncryptedVariable.get_value("RUNWARE_API_KEY")
+            EncryptedVariable.get_value("RUNWARE_API_KEY")
+
+
+class SharedOpenAIClientTestCase(TestCase):
+    """get_openai_client reuses one client per API key"""
+
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test-key-000000000000"})
+    def test_client_is_shared_per_key(self):
+        first = get_openai_client()
+
+        self.assertIsNotNone(first)
+        self.assertIs(get_openai_client(), first)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-rotated-key-00000000"}):
+            self.assertIsNot(get_openai_client(), first)
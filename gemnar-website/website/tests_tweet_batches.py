@@ -0,0 +1,161 @@
+"""
+Tests for batch strategy tweet generation
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from website.models import Brand, BrandTweet, TweetStrategy
+from website.services.generation_cache import generation_cache
+from website.services.tweet_batches import generate_batch, parse_tweets
+
+User = get_user_model()
+
+
+def mock_openai_client(*batches):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content=json.dumps(
+                            {
+                                "tweets": [
+                                    {"index": i, "content": text}
+                                    for i, text in enumerate(batch, start=1)
+                                ]
+                            }
+                        )
+                    )
+                )
+            ]
+        )
+        for batch in batches
+    ]
+    return client
+
+
+@patch.object(Brand, "get_daily_tweet_limit", return_value=3)
+class TweetBatchTestCase(TestCase):
+    """One completion per batch, validation and slot assignment"""
+
+    def setUp(self):
+        generation_cache.clear()
+        self.addCleanup(generation_cache.clear)
+        self.user = User.objects.create_user(
+            username="batcher", email="batcher@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Batch Brand", url="https://batch.example.com", owner=self.user
+        )
+        self.features = TweetStrategy.objects.create(
+            name="Feature",
+            category="product_feature",
+            prompt_template="Feature of {brand_name}",
+        )
+        self.tips = TweetStrategy.objects.create(
+            name="Tip",
+            category="product_feature",
+            prompt_template="Tip for {audience}",
+        )
+
+    def test_batch_is_one_completion_and_fills_free_slots(self, mock_limit):
+        client = mock_openai_client(["One", "Two", "x" * 270, "Four"])
+
+        result = generate_batch(
+            self.brand, [self.features, self.tips], 4, client=client
+        )
+
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        kwargs = client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs["response_format"], {"type": "json_object"})
+        prompt = kwargs["messages"][1]["content"]
+        self.assertIn("1. Feature of Batch Brand", prompt)
+        self.assertIn("2. Tip for {audience}", prompt)
+
+        # The over-long third tweet is rejected, not truncated
+        self.assertEqual(len(result["tweets"]), 3)
+        self.assertEqual(result["rejected"][0]["strategy"], "Feature")
+
+        tweets = BrandTweet.objects.filter(brand=self.brand).order_by("scheduled_for")
+        self.assertEqual(tweets.count(), 3)
+        slots = [t.scheduled_for for t in tweets]
+        self.assertTrue(all(slots))
+        self.assertEqual(len(set(slots)), 3)
+        self.assertTrue(all(t.tracking_token for t in tweets))
+        self.assertTrue(tweets[0].content.startswith("One"))
+
+        self.features.refresh_from_db()
+        self.tips.refresh_from_db()
+        self.assertEqual((self.features.usage_count, self.tips.usage_count), (1, 2))
+
+    @override_settings(TWEET_BATCH_SIZE=2)
+    def test_large_requests_are_split_into_batches(self, mock_limit):
+        client = mock_openai_client(["A", "B"], ["C"])
+
+        result = generate_batch(
+            self.brand, [self.features], 3, client=client, schedule=False
+        )
+
+        self.assertEqual(result["calls"], 2)
+        self.assertEqual(result["unscheduled"], 3)
+        self.assertFalse(
+            BrandTweet.objects.filter(scheduled_for__isnull=False).exists()
+        )
+
+    def test_identical_batches_are_generated_afresh(self, mock_limit):
+        client = mock_openai_client(["One", "Two"], ["Three", "Four"])
+
+        first = generate_batch(self.brand, [self.features], 2, client=client)
+        second = generate_batch(self.brand, [self.features], 2, client=client)
+
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+        self.assertEqual(
+            {tweet.content for tweet in first["tweets"]}
+            & {tweet.content for tweet in second["tweets"]},
+            set(),
+        )
+
+    def test_parse_tolerates_missing_and_malformed_entries(self, mock_limit):
+        raw = json.dumps({"tweets": ["First", {"index": 2, "content": "Second"}, 3]})
+
+        self.assertEqual(parse_tweets(raw, 2), ["First", "Second"])
+        self.assertEqual(parse_tweets("not json", 2), [None, None])
+
+    def test_endpoint_creates_tweets(self, mock_limit):
+        client = mock_openai_client(["Hello", "World"])
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        with patch("website.utils.get_openai_client", return_value=client):
+            response = api.post(
+                reverse("website:api_generate_tweets_batch"),
+                {
+                    "brand_id": self.brand.id,
+                    "strategy_ids": [self.features.id, "abc", self.tips.id],
+                    "count": 2,
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(response.data["tweets"]), 2)
+
+    def test_endpoint_rejects_malformed_strategy_ids(self, mock_limit):
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.post(
+            reverse("website:api_generate_tweets_batch"),
+            {"brand_id": self.brand.id, "strategy_ids": ["abc"]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
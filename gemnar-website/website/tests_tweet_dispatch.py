@@ -0,0 +1,87 @@
+"""
+Tests for the concurrent brand dispatcher used by send_brand_tweets
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from website.services.tweet_dispatch import BrandDispatcher
+
+
+def make_brand(pk):
+    return SimpleNamespace(pk=pk, name=f"Brand {pk}")
+
+
+class BrandDispatcherTestCase(SimpleTestCase):
+    """Test cases for BrandDispatcher"""
+
+    def test_respects_global_worker_limit(self):
+        """No more than max_workers brands run at the same time"""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def process(brand):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return True
+
+        results = BrandDispatcher(process, max_workers=3).dispatch(
+            [make_brand(i) for i in range(10)]
+        )
+
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r.success for r in results))
+        self.assertLessEqual(state["peak"], 3)
+        self.assertGreater(state["peak"], 1)
+
+    def test_same_brand_never_runs_twice_concurrently(self):
+        """A brand listed twice is skipped while it is already in flight"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def process(brand):
+            started.set()
+            release.wait(timeout=2)
+            return True
+
+        brand = make_brand(1)
+        dispatcher = BrandDispatcher(process, max_workers=2)
+        outer = threading.Thread(target=dispatcher.dispatch, args=([brand],))
+        outer.start()
+        started.wait(timeout=2)
+
+        results = BrandDispatcher(process, max_workers=2).dispatch([brand])
+        release.set()
+        outer.join()
+
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].skipped)
+        self.assertFalse(results[0].success)
+
+    def test_errors_are_captured_per_brand(self):
+        """A failing brand doesn't stop the others and results reach on_result"""
+        seen = []
+
+        def process(brand):
+            if brand.pk == 2:
+                raise RuntimeError("boom")
+            return brand.pk != 3
+
+        results = BrandDispatcher(
+            process, max_workers=2, on_result=seen.append
+        ).dispatch([make_brand(i) for i in range(1, 5)])
+
+        by_id = {r.brand_id: r for r in results}
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(by_id[2].error, "boom")
+        self.assertFalse(by_id[2].success)
+        self.assertFalse(by_id[3].success)
+        self.assertTrue(by_id[1].success)
+        self.assertTrue(by_id[4].success)
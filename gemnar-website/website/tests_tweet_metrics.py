@@ -0,0 +1,117 @@
+"""
+Tests for the batched tweet metrics refresh
+"""
+
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from website.models import Brand, BrandTweet
+from website.services.tweet_metrics import refresh_tweet_metrics, refreshable_tweets
+
+User = get_user_model()
+
+TWITTER_CREDENTIALS = {
+    "twitter_api_key": "key",
+    "twitter_api_secret": "secret",
+    "twitter_access_token": "token",
+    "twitter_access_token_secret": "token-secret",
+    "twitter_bearer_token": "bearer",
+}
+
+
+def lookup_response(ids, tweet_fields=None):
+    """Fake get_tweets response returning metrics for every ID but '404'"""
+    return SimpleNamespace(
+        data=[
+            SimpleNamespace(id=int(tweet_id), public_metrics={"like_count": 7})
+            for tweet_id in ids
+            if tweet_id != "404"
+        ]
+    )
+
+
+class TweetMetricsRefreshTestCase(TestCase):
+    """Test cases for refresh_tweet_metrics"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="metrics", email="metrics@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Metrics Brand",
+            url="https://metrics.example.com",
+            owner=self.user,
+            **TWITTER_CREDENTIALS,
+        )
+        now = timezone.now()
+        self.tweets = [
+            BrandTweet.objects.create(
+                brand=self.brand,
+                content=f"Tweet {i}",
+                status="posted",
+                tweet_id=str(1000 + i),
+                posted_at=now - timedelta(hours=i),
+            )
+            for i in range(150)
+        ]
+
+    def test_batches_of_one_hundred_with_bulk_update(self):
+        client = MagicMock()
+        client.get_tweets.side_effect = lookup_response
+
+        tweets = list(refreshable_tweets())
+        with CaptureQueriesContext(connection) as queries:
+            summary = refresh_tweet_metrics(tweets, client_factory=lambda b: client)
+
+        # Written back by bulk_update (the backend may split it), not per tweet
+        self.assertLessEqual(len(queries), 2)
+
+        self.assertEqual(client.get_tweets.call_count, 2)
+        self.assertEqual(len(client.get_tweets.call_args_list[0].kwargs["ids"]), 100)
+        # Most recently posted tweets are looked up first
+        self.assertEqual(client.get_tweets.call_args_list[0].kwargs["ids"][0], "1000")
+        self.assertEqual(summary["updated"], 150)
+        self.assertEqual(BrandTweet.objects.filter(like_count=7).count(), 150)
+        # Freshly refreshed tweets are not due again
+        self.assertFalse(refreshable_tweets().exists())
+
+    def test_missing_tweets_and_rate_limits(self):
+        import tweepy
+
+        BrandTweet.objects.filter(pk=self.tweets[0].pk).update(tweet_id="404")
+        client = MagicMock()
+        client.get_tweets.side_effect = [
+            lookup_response(["404"] + [str(1000 + i) for i in range(1, 100)]),
+            tweepy.TooManyRequests(MagicMock(status_code=429, json=lambda: {})),
+        ]
+
+        summary = refresh_tweet_metrics(
+            list(refreshable_tweets()), client_factory=lambda b: client
+        )
+
+        self.assertEqual(summary["updated"], 99)
+        self.assertEqual(summary["missing"], 1)
+        self.assertEqual(summary["failed_groups"], 1)
+
+    @patch("website.services.tweet_metrics.build_client")
+    def test_command_limits_to_recent_tweets(self, mock_build_client):
+        mock_build_client.return_value.get_tweets.side_effect = lookup_response
+        out = StringIO()
+
+        call_command("refresh_tweet_metrics", limit=10, stdout=out)
+
+        self.assertIn("Refreshed 10 of 10 tweets in 1 API calls", out.getvalue())
+        refreshed = BrandTweet.objects.filter(metrics_last_updated__isnull=False)
+        self.assertEqual(
+            sorted(refreshed.values_list("tweet_id", flat=True)),
+            [str(1000 + i) for i in range(10)],
+        )
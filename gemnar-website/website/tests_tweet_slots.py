@@ -0,0 +1,93 @@
+"""
+Tests for the in-memory tweet slot index
+"""
+
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from website.models import Brand, BrandTweet
+from website.services.tweet_slots import TweetSlotIndex
+
+User = get_user_model()
+
+
+class TweetSlotIndexTestCase(TestCase):
+    """Test cases for TweetSlotIndex and Brand.get_next_available_time_slot"""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username="slots", email="slots@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Slots Brand", url="https://slots.example.com", owner=user
+        )
+        # 10:30 AM on a fixed day
+        self.now = timezone.make_aware(datetime.datetime(2026, 3, 2, 10, 30))
+        self.today = self.now.date()
+
+    def at(self, days, hour):
+        return timezone.make_aware(
+            datetime.datetime.combine(
+                self.today + datetime.timedelta(days=days), datetime.time(hour, 0)
+            )
+        )
+
+    def schedule(self, when, status="approved"):
+        return BrandTweet.objects.create(
+            brand=self.brand, content="Scheduled", status=status, scheduled_for=when
+        )
+
+    def test_next_free_slot_skips_taken_hours_in_one_query(self):
+        self.schedule(self.at(0, 11))
+        self.schedule(self.at(0, 12))
+        self.schedule(self.at(0, 13), status="posted")  # does not occupy
+
+        with self.assertNumQueries(1):
+            index = TweetSlotIndex(self.brand, now=self.now, daily_limit=5)
+            slot = index.next_free_slot()
+
+        self.assertEqual(slot, self.at(0, 13))
+
+    def test_full_day_moves_to_next_day(self):
+        self.schedule(self.at(0, 11))
+        self.schedule(self.at(1, 9))
+
+        index = TweetSlotIndex(self.brand, now=self.now, daily_limit=1)
+
+        self.assertEqual(index.next_free_slot(), self.at(2, 9))
+
+    def test_next_k_slots_are_distinct_and_respect_daily_limit(self):
+        self.schedule(self.at(0, 12))
+
+        index = TweetSlotIndex(self.brand, now=self.now, daily_limit=2)
+        slots = index.next_free_slots(3)
+
+        self.assertEqual(slots, [self.at(0, 11), self.at(1, 9), self.at(1, 10)])
+
+    def test_no_slot_outside_window(self):
+        index = TweetSlotIndex(self.brand, now=self.now, days=1, daily_limit=1)
+        index.reserve(self.at(0, 15))
+
+        self.assertIsNone(index.next_free_slot())
+
+    @patch.object(Brand, "get_daily_tweet_limit", return_value=1)
+    def test_brand_excludes_tweet_being_rescheduled(self, _):
+        tweet = self.schedule(self.at(1, 9))
+
+        with patch("django.utils.timezone.now", return_value=self.now):
+            self.assertEqual(self.brand.get_next_available_time_slot(), self.at(0, 11))
+            self.schedule(self.at(0, 15))
+            self.assertEqual(self.brand.get_next_available_time_slot(), self.at(2, 9))
+            self.assertEqual(
+                self.brand.get_next_available_time_slot(exclude_tweet=tweet),
+                self.at(1, 9),
+            )
+
+    @patch.object(Brand, "get_daily_tweet_limit", return_value=0)
+    def test_no_plan_has_no_slots(self, _):
+        self.assertIsNone(self.brand.get_next_available_time_slot())
+        self.assertEqual(self.brand.get_next_available_time_slots(3), [])
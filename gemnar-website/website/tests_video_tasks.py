@@ -0,0 +1,151 @@
+"""
+Tests for the background video generation task poller
+"""
+
+import os
+import sys
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from website.models import Brand, BrandInstagramPost, VideoGenerationTask
+from website.services import video_tasks
+
+User = get_user_model()
+
+
+def mock_response(data):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = data
+    return response
+
+
+@patch.dict(os.environ, {"RUNWARE_API_KEY": "test-key"})
+class VideoTaskPollerTestCase(TestCase):
+    """Batched checks, backoff and completion of tracked video tasks"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="videos", email="videos@example.com", password="testpass123"
+        )
+        self.brand = Brand.objects.create(
+            name="Video Brand", url="https://video.example.com", owner=self.user
+        )
+        notify = patch.object(video_tasks, "notify")
+        self.notify = notify.start()
+        self.addCleanup(notify.stop)
+
+    def track(self, provider, task_id, **kwargs):
+        task = video_tasks.track_task(provider, task_id, **kwargs)
+        VideoGenerationTask.objects.filter(pk=task.pk).update(
+            next_poll_at=timezone.now() - timedelta(seconds=1)
+        )
+        return task
+
+    @patch("website.services.video_tasks.requests.post")
+    def test_runware_tasks_are_checked_in_one_request(self, mock_post):
+        post = BrandInstagramPost.objects.create(
+            brand=self.brand,
+            content="Video post",
+            is_video_post=True,
+            video_generation_task_uuid="task-done",
+            video_generation_status="pending",
+        )
+        self.track("runware", "task-done", instagram_post=post)
+        self.track("runware", "task-running", user=self.user)
+        mock_post.return_value = mock_response(
+            {
+                "data": [
+                    {
+                        "taskUUID": "task-done",
+                        "videoUUID": "video-1",
+                        "videoURL": "https://vm.runware.ai/video.mp4",
+                    }
+                ]
+            }
+        )
+
+        with patch(
+            "website.video_utils.complete_video_generation", return_value=True
+        ) as mock_complete:
+            summary = video_tasks.poll_due_tasks()
+
+        self.assertEqual(mock_post.call_count, 1)
+        queried = [item["taskUUID"] for item in mock_post.call_args.kwargs["json"]]
+        self.assertCountEqual(queried, ["task-done", "task-running"])
+        mock_complete.assert_called_once_with(post, "https://vm.runware.ai/video.mp4")
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(summary["pending"], 1)
+
+        post.refresh_from_db()
+        self.assertEqual(post.video_generation_status, "completed")
+        running = VideoGenerationTask.objects.get(task_id="task-running")
+        self.assertEqual(running.status, "processing")
+        self.assertEqual(running.poll_count, 1)
+        self.assertGreater(running.next_poll_at, timezone.now())
+
+    def test_backoff_grows_to_provider_ceiling(self):
+        delays = [video_tasks.next_delay("runware", n) for n in range(12)]
+
+        self.assertEqual(delays[0], 5)
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(delays[-1], 60)
+
+    @patch("website.services.video_tasks.requests.post")
+    def test_provider_outage_keeps_tasks_for_retry(self, mock_post):
+        self.track("runware", "task-1")
+        mock_post.side_effect = Exception("connection reset")
+
+        summary = video_tasks.poll_due_tasks()
+
+        task = VideoGenerationTask.objects.get(task_id="task-1")
+        self.assertEqual(task.status, "pending")
+        self.assertEqual(summary["api_errors"], 1)
+        self.assertGreater(task.next_poll_at, timezone.now())
+
+    def test_claimed_tasks_are_not_handed_out_twice(self):
+        self.track("veo", "veo-1")
+
+        first = video_tasks.claim_due_tasks()
+        second = video_tasks.claim_due_tasks()
+
+        self.assertEqual([t.task_id for t in first], ["veo-1"])
+        self.assertEqual(second, [])
+
+    def test_status_endpoint_answers_from_tracked_task(self):
+        task = self.track("veo", "veo-1", user=self.user)
+        VideoGenerationTask.objects.filter(pk=task.pk).update(
+            status="processing",
+            result={"task_id": "veo-1", "status": "generating", "success_flag": 0},
+        )
+        client = APIClient()
+
+        # veo_utils needs KIE_AI_API_KEY at import time
+        veo_utils = MagicMock()
+        with patch.dict(sys.modules, {"website.veo_utils": veo_utils}):
+            response = client.get(
+                reverse("website:get_veo_video_status", args=["veo-1"])
+            )
+
+        veo_utils.veo_generator.get_video_status.assert_not_called()
+        self.assertEqual(response.data["status"], "generating")
+
+    def test_stale_tracked_status_falls_back_to_the_provider(self):
+        task = self.track("veo", "veo-1", user=self.user)
+        VideoGenerationTask.objects.filter(pk=task.pk).update(
+            status="processing",
+            result={"task_id": "veo-1", "status": "generating", "success_flag": 0},
+            next_poll_at=timezone.now() - timedelta(minutes=10),
+        )
+        self.assertIsNone(video_tasks.tracked_status("veo", "veo-1"))
+
+        VideoGenerationTask.objects.filter(pk=task.pk).update(status="completed")
+        self.assertEqual(
+            video_tasks.tracked_status("veo", "veo-1")["status"], "generating"
+        )
@@ -0,0 +1,88 @@
+"""
+Tests for the shared brand website content cache
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from website.services import website_content
+
+URL = "https://brand.example.com"
+HTML = b"""
+<html><head><title>Brand</title><style>body {}</style></head>
+<body><header><nav>Home Shop Cart</nav></header>
+<h1>Handmade   coffee</h1><script>track()</script><p>Roasted daily.</p>
+<footer>Copyright Brand</footer></body>
+</html>
+"""
+
+
+def mock_response(status_code=200, content=HTML, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status_code}")
+    return response
+
+
+@patch("website.services.website_content.requests.get")
+class WebsiteContentCacheTestCase(TestCase):
+    """Fetching, sharing and revalidating cached website text"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        executor = MagicMock()
+        patcher = patch.object(website_content, "get_executor", return_value=executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.executor = executor
+
+    def test_text_is_fetched_once_and_shared(self, mock_get):
+        mock_get.return_value = mock_response(headers={"ETag": '"v1"'})
+
+        first = website_content.get_website_text(URL, max_chars=3000)
+        second = website_content.get_website_text(URL, max_chars=8)
+
+        self.assertIn("Handmade coffee", first)
+        self.assertIn("Roasted daily.", first)
+        self.assertNotIn("track()", first)
+        self.assertNotIn("Home Shop Cart", first)
+        self.assertNotIn("Copyright", first)
+        self.assertEqual(second, first[:8])
+        mock_get.assert_called_once()
+
+    def test_stale_entry_is_served_and_revalidated_in_background(self, mock_get):
+        mock_get.return_value = mock_response(headers={"ETag": '"v1"'})
+        website_content.get_website_text(URL)
+        entry = cache.get(website_content.cache_key(URL))
+        entry["fetched_at"] = time.time() - website_content.fresh_seconds() - 1
+        website_content.store(URL, entry)
+
+        text = website_content.get_website_text(URL)
+
+        self.assertEqual(text, entry["text"])
+        self.assertEqual(mock_get.call_count, 1)
+        self.executor.submit.assert_called_once_with(website_content.refresh, URL)
+
+        mock_get.return_value = mock_response(status_code=304, content=b"")
+        website_content.refresh(URL)
+
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        refreshed = cache.get(website_content.cache_key(URL))
+        self.assertEqual(refreshed["text"], entry["text"])
+        self.assertGreater(refreshed["fetched_at"], entry["fetched_at"])
+
+    def test_failures_are_remembered(self, mock_get):
+        mock_get.return_value = mock_response(status_code=500)
+
+        self.assertIsNone(website_content.get_website_text(URL))
+        self.assertIsNone(website_content.get_website_text(URL))
+
+        mock_get.assert_called_once()
@@ -9,12 +9,16 @@ from django.core.exceptions import PermissionDenied
 from django.conf import settings
 
 import tweepy
+from .services.api_clients import (
+    brand_twitter_api,
+    brand_twitter_client,
+    openai_client,
+)
 import logging
 import traceback
 from datetime import datetime, timezone
 import requests
 import os
-from openai import OpenAI
 import cloudinary
 import cloudinary.uploader
 
@@ -51,7 +55,7 @@ def has_twitter_credentials(brand):
 
 def get_twitter_client(brand):
     """
-    Create and return a Tweepy client for the given brand.
+    Return the pooled Tweepy client for the given brand.
     
     Args:
         brand: Brand instance with Twitter credentials
@@ -62,18 +66,12 @@ def get_twitter_client(brand):
     if not has_twitter_credentials(brand):
         raise ValueError("Twitter credentials not configured for this brand")
     
-    return tweepy.Client(
-        consumer_key=brand.twitter_api_key,
-        consumer_secret=brand.twitter_api_secret,
-        access_token=brand.twitter_access_token,
-        access_token_secret=brand.twitter_access_token_secret,
-        bearer_token=brand.twitter_bearer_token
-    )
+    return brand_twitter_client(brand)
 
 
 def get_twitter_api(brand):
     """
-    Create and return Tweepy API v1.1 for media upload.
+    Return the pooled Tweepy API v1.1 client for media upload.
     
     Args:
         brand: Brand instance with Twitter credentials
@@ -84,13 +82,7 @@ def get_twitter_api(brand):
     if not has_twitter_credentials(brand):
         raise ValueError("Twitter credentials not configured for this brand")
     
-    auth = tweepy.OAuth1UserHandler(
-        brand.twitter_api_key,
-        brand.twitter_api_secret,
-        brand.twitter_access_token,
-        brand.twitter_access_token_secret
-    )
-    return tweepy.API(auth)
+    return brand_twitter_api(brand)
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
@@ -564,7 +556,7 @@ def generate_ai_tweets(request, brand_id):
                 'error': 'OpenAI API key not configured'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        client_openai = OpenAI(api_key=openai_key)
+        client_openai = openai_client(openai_key)
         
         # Create system prompt based on brand and tone
         system_prompt = f"""You are a professional social media manager for {brand.name}. 
@@ -271,6 +271,11 @@ urlpatterns = [
         analytics_api.analytics_metrics,
         name="analytics_metrics",
     ),
+    path(
+        "api/analytics/batch",
+        analytics_api.analytics_batch,
+        name="analytics_batch",
+    ),
     path(
         "analytics/<str:tracking_code>/script.js",
         analytics_api.analytics_script,
@@ -291,6 +296,21 @@ urlpatterns = [
         api_views.generate_ai_image_openai,
         name="generate_ai_image_openai",
     ),
+    path(
+        "api/ai/image-jobs/<uuid:job_id>/",
+        api_views.image_generation_job_status,
+        name="image_generation_job_status",
+    ),
+    path(
+        "api/ai/generation-cache/stats/",
+        api_views.generation_cache_stats,
+        name="generation_cache_stats",
+    ),
+    path(
+        "api/ai/video-tasks/<str:provider>/<str:task_id>/",
+        api_views.video_generation_task_status,
+        name="video_generation_task_status",
+    ),
     path(
         "api/ai/edit-image-openai/",
         api_views.generate_ai_image_edit_openai,
@@ -612,6 +632,11 @@ urlpatterns = [
         api_views.generate_tweet_with_strategy,
         name="api_generate_tweet_with_strategy",
     ),
+    path(
+        "api/twitter/generate-batch/",
+        api_views.generate_tweets_batch,
+        name="api_generate_tweets_batch",
+    ),
     path(
         "api/twitter/test-website-content/",
         api_views.test_website_content,
@@ -1,4 +1,3 @@
-from django.core.cache import cache
 import logging
 import os
 
@@ -8,33 +7,15 @@ logger = logging.getLogger(__name__)
 def get_openai_api_key():
     """
     Get the OpenAI API key from the encrypted variables table only.
-    Uses caching to avoid repeated database queries.
+    Served from the process-wide secret store, so repeated calls skip the
+    database query and decryption.
     """
-    # Check cache first
-    cache_key = "openai_api_key"
-    cached_key = cache.get(cache_key)
-    if cached_key:
-        logger.debug("Retrieved OpenAI API key from cache")
-        return cached_key
-
     try:
         from website.models import EncryptedVariable
 
-        # Use the same approach as the status check for consistency
-        openai_var = EncryptedVariable.objects.filter(
-            key="OPENAI_API_KEY", is_active=True
-        ).first()
-
-        if not openai_var:
-            logger.error("OpenAI API key not found in EncryptedVariable table")
-            return None
-
-        # Try to get the API key directly to check decryption
-        api_key = openai_var.get_decrypted_value()
+        api_key = EncryptedVariable.get_value("OPENAI_API_KEY")
         if not api_key:
-            logger.error(
-                "OpenAI API key exists in database but decryption returned empty value"
-            )
+            logger.error("OpenAI API key not found in EncryptedVariable table")
             return None
 
         # Validate key format
@@ -44,9 +25,6 @@ def get_openai_api_key():
             )
             return None
 
-        logger.debug(f"Successfully retrieved OpenAI API key (length: {len(api_key)})")
-        # Cache for 1 hour
-        cache.set(cache_key, api_key, 3600)
         return api_key
 
     except Exception as e:
@@ -57,24 +35,21 @@ def get_openai_api_key():
 def get_openai_client():
     """
     Get a configured OpenAI client instance.
-    Uses OPENAI_API_KEY environment variable.
+    Uses the OPENAI_API_KEY environment variable, falling back to the
+    encrypted variables table. Clients are shared per API key so their
+    connections are reused.
     Returns None if API key is not available.
     """
     try:
-        from openai import OpenAI
+        from website.services.api_clients import openai_client
 
-        # Get API key from environment variables
-        logger.info("Getting OpenAI API key from environment")
-        api_key = os.environ.get("OPENAI_API_KEY")
+        api_key = os.environ.get("OPENAI_API_KEY") or get_openai_api_key()
 
         if not api_key:
             logger.error("Cannot create OpenAI client: No API key available")
             return None
 
-        logger.debug(f"Creating OpenAI client with API key (length: {len(api_key)})")
-        client = OpenAI(api_key=api_key)
-        logger.debug("OpenAI client created successfully")
-        return client
+        return openai_client(api_key)
 
     except ImportError:
         logger.error("OpenAI library not installed")
@@ -4,7 +4,9 @@ Credit management utilities for AI services
 
 from decimal import Decimal
 from django.utils import timezone
-from website.models import CreditTransaction, CreditPackage, RunwarePricingData
+from website.models import CreditPackage
+from website.services import credit_ledger
+from website.services.pricing import pricing_table
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,31 +19,16 @@ class CreditManager:
     def get_service_cost(service_name):
         """Get the cost for a specific AI service"""
         try:
-            pricing = RunwarePricingData.objects.filter(
-                service_name__icontains=service_name, is_active=True
-            ).first()
-
-            if pricing and pricing.gemnar_price:
-                return pricing.gemnar_price
-
-            # Default costs if no pricing data found
-            default_costs = {
-                "Image Generation": Decimal("0.02"),
-                "Text Generation": Decimal("0.001"),
-                "Image Upscaling": Decimal("0.005"),
-                "Background Removal": Decimal("0.003"),
-            }
-
-            for key, value in default_costs.items():
-                if key.lower() in service_name.lower():
-                    return value
-
-            return Decimal("0.01")  # Default fallback
-
+            return pricing_table.cost(service_name)
         except Exception as e:
             logger.error(f"Error getting service cost for {service_name}: {str(e)}")
             return Decimal("0.01")
 
+    @staticmethod
+    def estimate_cost(items):
+        """Total and per-service cost of a job using several AI services"""
+        return pricing_table.estimate(items)
+
     @staticmethod
     def check_sufficient_credits(brand, amount):
         """Check if brand has sufficient credits"""
@@ -60,26 +47,21 @@ class CreditManager:
         try:
             amount = Decimal(str(amount))
 
-            if not CreditManager.check_sufficient_credits(brand, amount):
-                return (
-                    False,
-                    f"Insufficient credits. Need {amount}, have {brand.credits_balance}",
-                )
-
-            # Deduct credits
-            brand.credits_balance -= amount
-            brand.save(update_fields=["credits_balance"])
-
-            # Create transaction record
-            CreditTransaction.objects.create(
-                brand=brand,
-                transaction_type="usage",
-                amount=-amount,  # Negative for deduction
+            # The conditional UPDATE is the balance check; a pre-check on the
+            # in-memory brand could be stale by the time it ran
+            entry = credit_ledger.deduct(
+                brand,
+                amount,
                 description=description or f"Used {service_used or 'AI service'}",
-                balance_after=brand.credits_balance,
                 service_used=service_used,
                 api_request_id=api_request_id,
             )
+            if entry is None:
+                brand.refresh_from_db(fields=["credits_balance"])
+                return (
+                    False,
+                    f"Insufficient credits. Need {amount}, have {brand.credits_balance}",
+                )
 
             logger.info(
                 f"Deducted {amount} credits from brand {brand.id}. New balance: {brand.credits_balance}"
@@ -98,17 +80,11 @@ class CreditManager:
         try:
             amount = Decimal(str(amount))
 
-            # Add credits
-            brand.credits_balance += amount
-            brand.save(update_fields=["credits_balance"])
-
-            # Create transaction record
-            CreditTransaction.objects.create(
-                brand=brand,
-                transaction_type=transaction_type,
-                amount=amount,  # Positive for addition
+            credit_ledger.add(
+                brand,
+                amount,
                 description=description or f"Credits added via {transaction_type}",
-                balance_after=brand.credits_balance,
+                transaction_type=transaction_type,
                 payment_intent_id=payment_intent_id,
             )
 
@@ -5,8 +5,6 @@ Supports multiple video generation providers with a unified interface.
 
 import logging
 import requests
-import tempfile
-import os
 from typing import Dict, Any, Optional, Tuple
 from django.core.files.base import ContentFile
 from website.models import EncryptedVariable
@@ -103,10 +101,15 @@ class VideoGenerationService:
         quality: str = "low",
         duration: float = 5.0,
         aspect_ratio: str = "9:16",
+        wait: bool = True,
         **kwargs,
-    ) -> Tuple[str, Dict[str, Any]]:
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
         """
         Generate video using Runware API.
+
+        With ``wait=False`` the task is only submitted and ``None`` is
+        returned for the URL; ``metadata["task_uuid"]`` is left for the
+        background video poller to check.
         """
         import uuid
 
@@ -221,10 +224,14 @@ class VideoGenerationService:
             # Get the task UUID to poll for results
             submitted_task_uuid = task_result.get("taskUUID", task_uuid)
 
-            # Poll for completion (Runware uses async processing)
-            logger.info(f"Starting video generation for task: {submitted_task_uuid}")
-            video_url = self._poll_runware_task(api_key, submitted_task_uuid)
-            logger.info(f"Video generation completed: {video_url[:50]}...")
+            video_url = None
+            if wait:
+                # Poll for completion (Runware uses async processing)
+                logger.info(
+                    f"Starting video generation for task: {submitted_task_uuid}"
+                )
+                video_url = self._poll_runware_task(api_key, submitted_task_uuid)
+                logger.info(f"Video generation completed: {video_url[:50]}...")
 
             metadata = {
                 "provider": "runware",
@@ -495,58 +502,18 @@ class VideoGenerationService:
 
         return aspect_ratios.get(aspect_ratio, aspect_ratios["9:16"])
 
-    def generate_video_thumbnail(self, video_url: str) -> Optional[str]:
+    def generate_video_thumbnail(self, video_url: str) -> Optional[ContentFile]:
         """
         Generate thumbnail from video URL.
-        Downloads video and extracts first frame as thumbnail.
+        Streams the video to a temporary file and extracts the first frame.
+        Callers that already have the video on disk should use
+        ``extract_thumbnail`` on it instead of downloading it again.
         """
-        try:
-            # Download video temporarily
-            response = requests.get(video_url, timeout=60)
-            response.raise_for_status()
-
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_video:
-                temp_video.write(response.content)
-                temp_video_path = temp_video.name
-
-            # Extract thumbnail using ffmpeg (if available)
-            thumbnail_path = temp_video_path.replace(".mp4", "_thumb.jpg")
-
-            # Try to use ffmpeg to extract thumbnail
-            import subprocess
-
-            try:
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-i",
-                        temp_video_path,
-                        "-vframes",
-                        "1",
-                        "-vf",
-                        "scale=512:512:force_original_aspect_ratio=decrease",
-                        thumbnail_path,
-                    ],
-                    check=True,
-                    capture_output=True,
-                )
-
-                # Read thumbnail file
-                with open(thumbnail_path, "rb") as f:
-                    thumbnail_data = f.read()
-
-                # Clean up temporary files
-                os.unlink(temp_video_path)
-                os.unlink(thumbnail_path)
-
-                return ContentFile(thumbnail_data, name="thumbnail.jpg")
-
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                logger.warning("ffmpeg not available, skipping thumbnail generation")
-                os.unlink(temp_video_path)
-                return None
+        from website.services.media_downloads import extract_thumbnail, stream_download
 
+        try:
+            with stream_download(video_url) as media:
+                return extract_thumbnail(media.path)
         except Exception as e:
             logger.error(f"Thumbnail generation failed: {str(e)}")
             return None
@@ -586,26 +553,15 @@ def generate_video_for_brand_post(
             aspect_ratio="9:16",  # Instagram format
         )
 
-        # Download and save video
-        response = requests.get(video_url, timeout=120)
-        response.raise_for_status()
-
-        # Save video to model
-        video_content = ContentFile(response.content, name=f"video_{brand_post.id}.mp4")
-        brand_post.video.save(f"video_{brand_post.id}.mp4", video_content, save=False)
-
-        # Generate and save thumbnail
-        thumbnail = video_service.generate_video_thumbnail(video_url)
-        if thumbnail:
-            brand_post.video_thumbnail.save(
-                f"thumb_{brand_post.id}.jpg", thumbnail, save=False
-            )
-
-        # Update post metadata
+        # Update post metadata; the probed duration replaces the requested
+        # one when ffprobe is available
         brand_post.video_prompt = prompt
         brand_post.is_video_post = True
         brand_post.video_duration = duration
         brand_post.video_quality = quality
+
+        # Download and save video and thumbnail
+        save_video_to_post(brand_post, video_url)
         brand_post.save()
 
         logger.info(f"Successfully generated video for post {brand_post.id}")
@@ -784,6 +740,11 @@ def submit_video_generation_task(
         brand_post.video_quality = quality
         brand_post.save()
 
+        # The background video poller picks the task up from here
+        from website.services.video_tasks import track_task
+
+        track_task("runware", submitted_task_uuid, instagram_post=brand_post)
+
         logger.info(
             f"Successfully submitted video generation task {submitted_task_uuid} for post {brand_post.id}"
         )
@@ -895,6 +856,12 @@ def check_video_generation_status(brand_post) -> str:
     if not brand_post.video_generation_task_uuid:
         return "none"
 
+    from website.services.video_tasks import get_tracked_task
+
+    # Tracked tasks are checked by the background poller, not per request
+    if get_tracked_task("runware", brand_post.video_generation_task_uuid):
+        return brand_post.video_generation_status
+
     try:
         import requests
 
@@ -967,6 +934,43 @@ def check_video_generation_status(brand_post) -> str:
         return "failed"
 
 
+def save_video_to_post(brand_post, video_url: str) -> None:
+    """
+    Stream a generated video to disk and attach it to ``brand_post``.
+
+    The video, its thumbnail, checksum and probed duration are set on the
+    post without saving it. Raises if the download fails.
+    """
+    from website.services.media_downloads import (
+        extract_thumbnail,
+        probe_video,
+        stream_download,
+    )
+
+    with stream_download(video_url) as media:
+        with media.open(f"video_{brand_post.id}.mp4") as video_file:
+            brand_post.video.save(
+                f"video_{brand_post.id}.mp4", video_file, save=False
+            )
+        brand_post.video_checksum = media.sha256
+
+        metadata = probe_video(media.path)
+        if metadata.get("duration"):
+            brand_post.video_duration = metadata["duration"]
+
+        # Thumbnail comes from the same local copy
+        thumbnail = extract_thumbnail(media.path)
+        if thumbnail:
+            brand_post.video_thumbnail.save(
+                f"thumb_{brand_post.id}.jpg", thumbnail, save=False
+            )
+
+    logger.info(
+        f"Saved {media.size} byte video for post {brand_post.id} "
+        f"(sha256 {media.sha256[:12]})"
+    )
+
+
 def complete_video_generation(brand_post, video_url: str) -> bool:
     """
     Complete video generation by downloading and saving the video.
@@ -979,24 +983,7 @@ def complete_video_generation(brand_post, video_url: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        import requests
-        from django.core.files.base import ContentFile
-
-        # Download the video
-        response = requests.get(video_url, timeout=120)
-        response.raise_for_status()
-
-        # Save video to model
-        video_content = ContentFile(response.content, name=f"video_{brand_post.id}.mp4")
-        brand_post.video.save(f"video_{brand_post.id}.mp4", video_content, save=False)
-
-        # Generate and save thumbnail
-        thumbnail = video_service.generate_video_thumbnail(video_url)
-        if thumbnail:
-            brand_post.video_thumbnail.save(
-                f"thumb_{brand_post.id}.jpg", thumbnail, save=False
-            )
-
+        save_video_to_post(brand_post, video_url)
         brand_post.save()
         logger.info(f"Successfully completed video generation for post {brand_post.id}")
         return True
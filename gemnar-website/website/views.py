@@ -25,6 +25,8 @@ import psutil
 import requests
 import stripe
 import tweepy
+from .services.api_clients import brand_twitter_client
+from .services.rate_limits import governed_twitter_api
 import stat
 import sys
 
@@ -1259,7 +1261,8 @@ def pricing(request):
     """
     Pricing page displaying Runware pricing with Gemnar markup
     """
-    from .models import RunwarePricingData, PricingPageConfig
+    from .models import PricingPageConfig
+    from .services.pricing import pricing_table
 
     # Get active pricing configuration
     config = PricingPageConfig.get_active_config()
@@ -1272,10 +1275,8 @@ def pricing(request):
             is_active=True,
         )
 
-    # Get all active pricing data
-    pricing_data = RunwarePricingData.objects.filter(is_active=True).order_by(
-        "service_name"
-    )
+    # Active pricing rows come from the in-memory pricing table
+    pricing_data = pricing_table.rows()
 
     # Get featured services if any are configured
     featured_services = (
@@ -1285,7 +1286,7 @@ def pricing(request):
     )
 
     # Calculate totals and stats
-    total_services = pricing_data.count()
+    total_services = len(pricing_data)
 
     context = {
         "config": config,
@@ -4926,7 +4927,7 @@ def twitter_api_diagnostic(request):
         auth.set_access_token(
             user.twitter_access_token, user.twitter_access_token_secret
         )
-        api = tweepy.API(auth, wait_on_rate_limit=True)
+        api = governed_twitter_api(auth)
 
         # Get user info
         twitter_user = api.verify_credentials()
@@ -5022,7 +5023,7 @@ def check_twitter_api_access_level(request):
         auth.set_access_token(
             user.twitter_access_token, user.twitter_access_token_secret
         )
-        api = tweepy.API(auth, wait_on_rate_limit=True)
+        api = governed_twitter_api(auth)
 
         # Test basic functionality
         try:
@@ -5161,8 +5162,8 @@ def send_test_tweet(request):
                 user.twitter_access_token, user.twitter_access_token_secret
             )
 
-            # Create API object with wait_on_rate_limit to handle rate limiting
-            api = tweepy.API(auth, wait_on_rate_limit=True)
+            # Create API object; rate limits raise instead of sleeping
+            api = governed_twitter_api(auth)
 
             # Test credentials first
             twitter_user = api.verify_credentials()
@@ -7318,29 +7319,11 @@ def generate_strategy_tweet_with_website(request):
                 {"success": False, "error": "Object not found"}, status=404
             )
 
-        # Scrape website content if brand has a website
-        website_content = ""
-        if brand.url:
-            try:
-                import requests
-                from bs4 import BeautifulSoup
-
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                response = requests.get(brand.url, headers=headers, timeout=10)
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Extract text from main content areas
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
+        # Website content, cached per URL and shared with the other
+        # generators; limited to 1000 characters to avoid huge prompts
+        from .services.website_content import get_website_text
 
-                text = soup.get_text(separator=" ", strip=True)
-                # Limit to first 1000 characters to avoid huge prompts
-                website_content = text[:1000] if text else ""
-            except Exception as e:
-                logger.warning(f"Failed to scrape website {brand.url}: {str(e)}")
-                website_content = ""
+        website_content = get_website_text(brand.url, max_chars=1000) or ""
 
         # Prepare context for strategy
         context = {
@@ -8331,14 +8314,7 @@ def send_contact_tweet(request, organization_pk, company_pk):
             )
 
             # Post the tweet using the brand's Twitter configuration
-            client = tweepy.Client(
-                bearer_token=brand.twitter_bearer_token,
-                consumer_key=brand.twitter_api_key,
-                consumer_secret=brand.twitter_api_secret,
-                access_token=brand.twitter_access_token,
-                access_token_secret=brand.twitter_access_token_secret,
-                wait_on_rate_limit=True,
-            )
+            client = brand_twitter_client(brand)
 
             # Post the tweet
             response = client.create_tweet(text=tweet_content)